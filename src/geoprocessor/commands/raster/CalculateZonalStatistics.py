@@ -0,0 +1,353 @@
+# CalculateZonalStatistics - command to calculate raster statistics for each polygon feature of a GeoLayer
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+from geoprocessor.commands.abstract.AbstractCommand import AbstractCommand
+
+from geoprocessor.core.CommandError import CommandError
+from geoprocessor.core.CommandLogRecord import CommandLogRecord
+from geoprocessor.core.CommandParameterError import CommandParameterError
+from geoprocessor.core.CommandParameterMetadata import CommandParameterMetadata
+from geoprocessor.core.CommandPhaseType import CommandPhaseType
+from geoprocessor.core.CommandStatusType import CommandStatusType
+
+import geoprocessor.util.command_util as command_util
+import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.string_util as string_util
+import geoprocessor.util.validator_util as validator_util
+
+import logging
+
+
+class CalculateZonalStatistics(AbstractCommand):
+    """
+    Calculate statistics of raster GeoLayer cell values for each polygon feature (zone) of a GeoLayer
+    and set the statistics as GeoLayer attributes.
+    """
+
+    # Define the command parameters.
+    __command_parameter_metadata: [CommandParameterMetadata] = [
+        CommandParameterMetadata("GeoLayerID", type("")),
+        CommandParameterMetadata("RasterGeoLayerID", type("")),
+        CommandParameterMetadata("RasterBand", type("")),
+        CommandParameterMetadata("Statistics", type("")),
+        CommandParameterMetadata("AttributePrefix", type("")),
+        CommandParameterMetadata("Method", type(""))]
+
+    # Command metadata for command editor display.
+    __command_metadata = dict()
+    __command_metadata['Description'] = (
+        "Calculate statistics of raster GeoLayer cell values for each polygon feature (zone) of a GeoLayer,\n"
+        "for example the mean precipitation for each basin, and set the statistics as attributes.\n"
+        "A cell is in a zone if the cell center is inside the polygon.  NoData cells are ignored."
+    )
+    __command_metadata['EditorType'] = "Simple"
+
+    # Command Parameter Metadata.
+    __parameter_input_metadata = dict()
+    # GeoLayerID
+    __parameter_input_metadata['GeoLayerID.Description'] = "polygon GeoLayer identifier"
+    __parameter_input_metadata['GeoLayerID.Label'] = "GeoLayerID"
+    __parameter_input_metadata['GeoLayerID.Required'] = True
+    __parameter_input_metadata['GeoLayerID.Tooltip'] = \
+        "The polygon GeoLayer with zone features, which will have attributes added."
+    # RasterGeoLayerID
+    __parameter_input_metadata['RasterGeoLayerID.Description'] = "raster GeoLayer identifier"
+    __parameter_input_metadata['RasterGeoLayerID.Label'] = "Raster GeoLayerID"
+    __parameter_input_metadata['RasterGeoLayerID.Required'] = True
+    __parameter_input_metadata['RasterGeoLayerID.Tooltip'] = "The raster GeoLayer with cell values to summarize."
+    # RasterBand
+    __parameter_input_metadata['RasterBand.Description'] = "raster band"
+    __parameter_input_metadata['RasterBand.Label'] = "Raster band"
+    __parameter_input_metadata['RasterBand.Tooltip'] = "The raster band number (1+)."
+    __parameter_input_metadata['RasterBand.Value.Default'] = "1"
+    # Statistics
+    __parameter_input_metadata['Statistics.Description'] = "statistics to calculate"
+    __parameter_input_metadata['Statistics.Label'] = "Statistics"
+    __parameter_input_metadata['Statistics.Tooltip'] = (
+        "Comma-separated statistics to calculate:  Count, Sum, Mean, Min, Max, StdDev.\n"
+        "Statistics other than Count are NULL if no cells are in the zone.")
+    __parameter_input_metadata['Statistics.Value.Default'] = "Count,Mean,Min,Max"
+    # AttributePrefix
+    __parameter_input_metadata['AttributePrefix.Description'] = "prefix for attribute names"
+    __parameter_input_metadata['AttributePrefix.Label'] = "Attribute prefix"
+    __parameter_input_metadata['AttributePrefix.Tooltip'] = (
+        "Prefix for the attribute names, which are the prefix and the statistic in lowercase, "
+        "for example:  precip_mean")
+    __parameter_input_metadata['AttributePrefix.Value.Default.Description'] = "no prefix"
+    # Method
+    __parameter_input_metadata['Method.Description'] = "calculation method"
+    __parameter_input_metadata['Method.Label'] = "Method"
+    __parameter_input_metadata['Method.Tooltip'] = (
+        "Rasterize: rasterize all zones and read the raster once, which is fast for many zones, "
+        "but a cell is only in one zone if zones overlap.\n"
+        "Window: read the raster for each zone's extent, which is fast for a few zones and allows overlapping zones.\n"
+        "Auto: use Window for up to 1000 zones and Rasterize otherwise.")
+    __parameter_input_metadata['Method.Values'] = ["", "Auto", "Rasterize", "Window"]
+    __parameter_input_metadata['Method.Value.Default'] = "Auto"
+
+    # Choices for Statistics and Method, used to validate parameter and display in editor.
+    __choices_Statistics = ["Count", "Sum", "Mean", "Min", "Max", "StdDev"]
+    __choices_Method = ["Auto", "Rasterize", "Window"]
+
+    def __init__(self) -> None:
+        """
+        Initialize the command.
+        """
+
+        # AbstractCommand data.
+        super().__init__()
+        self.command_name = "CalculateZonalStatistics"
+        self.command_parameter_metadata = self.__command_parameter_metadata
+
+        # Command metadata for command editor display.
+        self.command_metadata = self.__command_metadata
+
+        # Command Parameter Metadata.
+        self.parameter_input_metadata = self.__parameter_input_metadata
+
+        # Class data.
+        self.warning_count = 0
+        self.logger = logging.getLogger(__name__)
+
+    def check_command_parameters(self, command_parameters: dict) -> None:
+        """
+        Check the command parameters for validity.
+
+        Args:
+            command_parameters: the dictionary of command parameters to check (key:string_value)
+
+        Returns:
+            None.
+
+        Raises:
+            ValueError if any parameters are invalid or do not have a valid value.
+            The command status messages for initialization are populated with validation messages.
+        """
+
+        warning_message = ""
+
+        # Check that required parameters are non-empty, non-None strings.
+        required_parameters = command_util.get_required_parameter_names(self)
+        for parameter in required_parameters:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_string(parameter_value, False, False):
+                message = "Required {} parameter has no value.".format(parameter)
+                recommendation = "Specify the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional RasterBand parameter is a positive integer.
+        # noinspection PyPep8Naming
+        pv_RasterBand = self.get_parameter_value(parameter_name="RasterBand", command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_RasterBand, True, True, zero_allowed=False):
+            message = "RasterBand parameter value ({}) is invalid.".format(pv_RasterBand)
+            recommendation = "Specify a band number 1+."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional Statistics parameter only includes valid statistics.
+        # noinspection PyPep8Naming
+        pv_Statistics = self.get_parameter_value(parameter_name="Statistics", command_parameters=command_parameters)
+        if pv_Statistics is not None and pv_Statistics != "":
+            for statistic in string_util.delimited_string_to_list(pv_Statistics):
+                if not validator_util.validate_string_in_list(statistic, self.__choices_Statistics,
+                                                              none_allowed=False, empty_string_allowed=False,
+                                                              ignore_case=True):
+                    message = "Statistics parameter value ({}) is not recognized.".format(statistic)
+                    recommendation = "Specify one or more of the acceptable values ({}) for the " \
+                                     "Statistics parameter.".format(self.__choices_Statistics)
+                    warning_message += "\n" + message
+                    self.command_status.add_to_log(
+                        CommandPhaseType.INITIALIZATION,
+                        CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional Method parameter is a valid method.
+        # noinspection PyPep8Naming
+        pv_Method = self.get_parameter_value(parameter_name="Method", command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_Method, self.__choices_Method,
+                                                      none_allowed=True, empty_string_allowed=True, ignore_case=True):
+            message = "Method parameter value ({}) is not recognized.".format(pv_Method)
+            recommendation = "Specify one of the acceptable values ({}) for the Method parameter.".format(
+                self.__choices_Method)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check for unrecognized parameters.
+        # This returns a message that can be appended to the warning, and if non-empty triggers an exception below.
+        warning_message = command_util.validate_command_parameter_names(self, warning_message)
+
+        # If any warnings were generated, throw an exception.
+        if len(warning_message) > 0:
+            self.logger.warning(warning_message)
+            raise CommandParameterError(warning_message)
+        else:
+            # Refresh the phase severity.
+            self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
+
+    def check_runtime_data(self, geolayer_id: str, raster_geolayer_id: str, raster_band: int) -> bool:
+        """
+        Checks the following:
+        * the GeoLayer exists and is a polygon GeoLayer
+        * the raster GeoLayer exists, is a raster, and has the requested band
+
+        Args:
+            geolayer_id (str): the ID of the polygon GeoLayer
+            raster_geolayer_id (str): the ID of the raster GeoLayer
+            raster_band (int): the raster band number
+
+        Returns:
+             Boolean. If TRUE, the statistics should be calculated. If FALSE, at least one check failed.
+        """
+
+        # List of Boolean values. The Boolean values correspond to the results of the following tests.
+        # If TRUE, the test confirms that the command should be run.
+        should_run_command = list()
+
+        # If the GeoLayerID is not an existing GeoLayerID, raise a FAILURE.
+        should_run_command.append(validator_util.run_check(self, "IsGeoLayerIDExisting", "GeoLayerID",
+                                                           geolayer_id, "FAIL"))
+
+        # If the RasterGeoLayerID is not an existing GeoLayerID, raise a FAILURE.
+        should_run_command.append(validator_util.run_check(self, "IsGeoLayerIDExisting", "RasterGeoLayerID",
+                                                           raster_geolayer_id, "FAIL"))
+
+        if False not in should_run_command:
+            # If the GeoLayer is not a polygon, raise a FAILURE.
+            geolayer = self.command_processor.get_geolayer(geolayer_id)
+            if geolayer.is_raster():
+                should_run_command.append(False)
+                message = 'The GeoLayer ({}) is a raster.'.format(geolayer_id)
+                recommendation = 'Specify a polygon GeoLayer.'
+                self.warning_count += 1
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+            else:
+                should_run_command.append(validator_util.run_check(self, "DoesGeoLayerIdHaveCorrectGeometry",
+                                                                   "GeoLayerID", geolayer_id,
+                                                                   "FAIL", other_values=[["Polygon"]]))
+
+            # If the raster GeoLayer is not a raster or does not have the band, raise a FAILURE.
+            raster_geolayer = self.command_processor.get_geolayer(raster_geolayer_id)
+            if not raster_geolayer.is_raster():
+                should_run_command.append(False)
+                message = 'The RasterGeoLayerID ({}) is not a raster GeoLayer.'.format(raster_geolayer_id)
+                recommendation = 'Specify a raster GeoLayer.'
+                self.warning_count += 1
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+            elif raster_band > raster_geolayer.get_num_bands():
+                should_run_command.append(False)
+                message = 'The raster GeoLayer ({}) does not have band {}.'.format(raster_geolayer_id, raster_band)
+                recommendation = 'Specify a band 1 to {}.'.format(raster_geolayer.get_num_bands())
+                self.warning_count += 1
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Return the Boolean to determine if the process should be run.
+        if False in should_run_command:
+            return False
+        else:
+            return True
+
+    def run_command(self) -> None:
+        """
+        Run the command.  Calculate the statistics and set them as GeoLayer attributes.
+
+        Returns:
+            None.
+
+        Raises:
+            RuntimeError if any warnings occurred during run_command method.
+        """
+
+        self.warning_count = 0
+
+        # Obtain the parameter values.
+        # noinspection PyPep8Naming
+        pv_GeoLayerID = self.get_parameter_value("GeoLayerID")
+        # noinspection PyPep8Naming
+        pv_GeoLayerID = self.command_processor.expand_parameter_value(pv_GeoLayerID, self)
+        # noinspection PyPep8Naming
+        pv_RasterGeoLayerID = self.get_parameter_value("RasterGeoLayerID")
+        # noinspection PyPep8Naming
+        pv_RasterGeoLayerID = self.command_processor.expand_parameter_value(pv_RasterGeoLayerID, self)
+        # noinspection PyPep8Naming
+        pv_RasterBand = self.get_parameter_value(
+            "RasterBand", default_value=self.__parameter_input_metadata['RasterBand.Value.Default'])
+        raster_band = int(pv_RasterBand) if pv_RasterBand != "" else 1
+        # noinspection PyPep8Naming
+        pv_Statistics = self.get_parameter_value(
+            "Statistics", default_value=self.__parameter_input_metadata['Statistics.Value.Default'])
+        if pv_Statistics == "":
+            # noinspection PyPep8Naming
+            pv_Statistics = self.__parameter_input_metadata['Statistics.Value.Default']
+        statistics = string_util.delimited_string_to_list(pv_Statistics)
+        # noinspection PyPep8Naming
+        pv_AttributePrefix = self.get_parameter_value("AttributePrefix", default_value="")
+        # noinspection PyPep8Naming
+        pv_AttributePrefix = self.command_processor.expand_parameter_value(pv_AttributePrefix, self)
+        # noinspection PyPep8Naming
+        pv_Method = self.get_parameter_value(
+            "Method", default_value=self.__parameter_input_metadata['Method.Value.Default'])
+        if pv_Method == "":
+            # noinspection PyPep8Naming
+            pv_Method = self.__parameter_input_metadata['Method.Value.Default']
+
+        if self.check_runtime_data(pv_GeoLayerID, pv_RasterGeoLayerID, raster_band):
+            # noinspection PyBroadException
+            try:
+                geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
+                raster_geolayer = self.command_processor.get_geolayer(pv_RasterGeoLayerID)
+
+                # The GeoLayer is edited so make sure that a copy-on-write copy does not change the source.
+                geolayer.prepare_for_edit()
+                # The raster is read directly from its file (including /vsimem/) using GDAL.
+                zone_count = qgis_util.calculate_zonal_statistics(geolayer.qgs_layer,
+                                                                  raster_geolayer.qgs_layer.source(),
+                                                                  band_number=raster_band,
+                                                                  statistics=statistics,
+                                                                  attribute_prefix=pv_AttributePrefix,
+                                                                  method=pv_Method)
+                self.logger.info("Calculated zonal statistics for {} of {} features with raster cells.".format(
+                    zone_count, geolayer.get_feature_count()))
+
+            except Exception:
+                self.warning_count += 1
+                message = "Unexpected error calculating zonal statistics for GeoLayer ({}).".format(pv_GeoLayerID)
+                recommendation = "Check the log file for details."
+                self.logger.warning(message, exc_info=True)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        if self.warning_count > 0:
+            message = "There were {} warnings processing the command.".format(self.warning_count)
+            raise CommandError(message)
+
+        else:
+            # Set command status type as SUCCESS if there are no errors.
+            self.command_status.refresh_phase_severity(CommandPhaseType.RUN, CommandStatusType.SUCCESS)
@@ -17,6 +17,8 @@
 #     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
 # ________________________________________________________________NoticeEnd___
 
+from qgis.core import QgsRasterLayer
+
 from geoprocessor.commands.abstract.AbstractCommand import AbstractCommand
 
 from geoprocessor.core.CommandError import CommandError
@@ -30,7 +32,6 @@ from geoprocessor.core.QGISAlgorithmProcessingFeedbackHandler import QgisAlgorit
 from geoprocessor.core.RasterGeoLayer import RasterGeoLayer
 
 import geoprocessor.util.command_util as command_util
-import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.validator_util as validator_util
 
@@ -46,13 +47,20 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
     __command_parameter_metadata: [CommandParameterMetadata] = [
         CommandParameterMetadata("GeoLayerID", str),
         CommandParameterMetadata("CRS", str),
-        CommandParameterMetadata("OutputGeoLayerID", str)]
+        CommandParameterMetadata("OutputGeoLayerID", str),
+        CommandParameterMetadata("Resampling", str),
+        CommandParameterMetadata("TargetResolution", str),
+        CommandParameterMetadata("TargetExtent", str),
+        CommandParameterMetadata("NumThreads", str),
+        CommandParameterMetadata("WarpMemory", str),
+        CommandParameterMetadata("OutputMode", str)]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
     __command_metadata['Description'] = (
         "Change the coordinate reference system (CRS) of a raster GeoLayer.\n"
-        "The layer can be updated or a new layer created."
+        "The layer can be updated or a new layer created.\n"
+        "The raster is warped using multiple threads, and the output can be kept in memory or be a virtual raster."
     )
     __command_metadata['EditorType'] = "Simple"
 
@@ -75,6 +83,58 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
     __parameter_input_metadata['OutputGeoLayerID.Label'] = "Output GeoLayerID"
     __parameter_input_metadata['OutputGeoLayerID.Required'] = False
     __parameter_input_metadata['OutputGeoLayerID.Tooltip'] = "The output GeoLayerID."
+    # Resampling
+    __parameter_input_metadata['Resampling.Description'] = "resampling method"
+    __parameter_input_metadata['Resampling.Label'] = "Resampling"
+    __parameter_input_metadata['Resampling.Tooltip'] = (
+        "The method used to calculate output cell values.  Use Nearest or Mode for categorical data.")
+    __parameter_input_metadata['Resampling.Values'] = \
+        ["", "Nearest", "Bilinear", "Cubic", "CubicSpline", "Lanczos", "Average", "Mode", "Max", "Min", "Median",
+         "Q1", "Q3"]
+    __parameter_input_metadata['Resampling.Value.Default'] = "Nearest"
+    # TargetResolution
+    __parameter_input_metadata['TargetResolution.Description'] = "output cell size"
+    __parameter_input_metadata['TargetResolution.Label'] = "Target resolution"
+    __parameter_input_metadata['TargetResolution.Tooltip'] = (
+        "The output cell width and height in CRS units.  Output cells are aligned with the CRS origin.")
+    __parameter_input_metadata['TargetResolution.Value.Default.Description'] = "calculated from the input"
+    # TargetExtent
+    __parameter_input_metadata['TargetExtent.Description'] = "output extent"
+    __parameter_input_metadata['TargetExtent.Label'] = "Target extent"
+    __parameter_input_metadata['TargetExtent.Tooltip'] = (
+        "The output extent in CRS units, as MinX,MinY,MaxX,MaxY.")
+    __parameter_input_metadata['TargetExtent.Value.Default.Description'] = "calculated from the input"
+    # NumThreads
+    __parameter_input_metadata['NumThreads.Description'] = "number of threads"
+    __parameter_input_metadata['NumThreads.Label'] = "Number of threads"
+    __parameter_input_metadata['NumThreads.Tooltip'] = (
+        "The number of threads used to warp, or ALL_CPUS.  Specify 1 to warp using one thread.")
+    __parameter_input_metadata['NumThreads.Value.Default'] = "ALL_CPUS"
+    # WarpMemory
+    __parameter_input_metadata['WarpMemory.Description'] = "warp memory limit (MB)"
+    __parameter_input_metadata['WarpMemory.Label'] = "Warp memory"
+    __parameter_input_metadata['WarpMemory.Tooltip'] = (
+        "The memory in megabytes used to warp chunks of the raster.  "
+        "Larger values warp larger chunks, which is faster for large rasters.")
+    __parameter_input_metadata['WarpMemory.Value.Default.Description'] = "GDAL default (64 MB)"
+    # OutputMode
+    __parameter_input_metadata['OutputMode.Description'] = "output mode"
+    __parameter_input_metadata['OutputMode.Label'] = "Output mode"
+    __parameter_input_metadata['OutputMode.Tooltip'] = (
+        "File: warp using the QGIS 'gdal:warpreproject' algorithm to a temporary file.\n"
+        "InMemory: warp using GDAL in the GeoProcessor to an in-memory raster if the size allows, "
+        "which is fastest for intermediate results.\n"
+        "VRT: create a virtual raster that is warped when it is read, which is fast for intermediate results "
+        "that are read once, such as when written with WriteRasterGeoLayerToFile.  "
+        "Requires an OutputGeoLayerID and the input GeoLayer must not be freed while the output is used.")
+    __parameter_input_metadata['OutputMode.Values'] = ["", "File", "InMemory", "VRT"]
+    __parameter_input_metadata['OutputMode.Value.Default'] = "File"
+
+    # Choices for parameters, used to validate parameter and display in editor:
+    # - Resampling is in the order of the 'gdal:warpreproject' RESAMPLING values
+    __choices_Resampling = ["Nearest", "Bilinear", "Cubic", "CubicSpline", "Lanczos", "Average", "Mode", "Max",
+                            "Min", "Median", "Q1", "Q3"]
+    __choices_OutputMode = ["File", "InMemory", "VRT"]
 
     def __init__(self) -> None:
         """
@@ -96,6 +156,40 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
         self.warning_count = 0
         self.logger = logging.getLogger(__name__)
 
+    def __add_reprojected_geolayer(self, input_geolayer: RasterGeoLayer, reprojected_layer: QgsRasterLayer,
+                                   geolayer_id: str, output_geolayer_id: str or None) -> None:
+        """
+        Create a new GeoLayer for the reprojected layer and add it to the GeoProcessor's geolayers list.
+
+        Args:
+            input_geolayer (RasterGeoLayer): the input GeoLayer, used for the name and description
+            reprojected_layer (QgsRasterLayer): the reprojected layer
+            geolayer_id (str): the input GeoLayerID, used if the output GeoLayerID is not specified
+            output_geolayer_id (str): the output GeoLayerID, or None or empty to replace the input GeoLayer
+
+        Returns:
+            None
+        """
+        self.logger.info("Layer metadata after changing CRS:")
+        qgis_util.log_raster_metadata(reprojected_layer, logger=self.logger)
+
+        if (output_geolayer_id is not None) and (output_geolayer_id != ''):
+            # Use the new GeoLayerID.
+            new_geolayer_id = output_geolayer_id
+        else:
+            # Use the existing GeoLayerID.
+            new_geolayer_id = geolayer_id
+
+        # Create a new GeoLayer from the temporary file and add it to the GeoProcessor's geolayers list.
+        new_geolayer = RasterGeoLayer(geolayer_id=new_geolayer_id,
+                                      qgs_raster_layer=reprojected_layer,
+                                      name=input_geolayer.name,
+                                      description=input_geolayer.description,
+                                      input_path_full=GeoLayer.SOURCE_MEMORY,
+                                      input_path=GeoLayer.SOURCE_MEMORY)
+
+        self.command_processor.add_geolayer(new_geolayer)
+
     def check_command_parameters(self, command_parameters: dict) -> None:
         """
         Check the command parameters for validity.
@@ -122,6 +216,74 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional parameters with choices have valid values.
+        for parameter_name, choices in [("Resampling", self.__choices_Resampling),
+                                        ("OutputMode", self.__choices_OutputMode)]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter_name,
+                                                       command_parameters=command_parameters)
+            if not validator_util.validate_string_in_list(parameter_value, choices, none_allowed=True,
+                                                          empty_string_allowed=True, ignore_case=True):
+                message = "{} parameter value ({}) is not recognized.".format(parameter_name, parameter_value)
+                recommendation = "Specify one of the acceptable values ({}) for the {} parameter.".format(
+                    choices, parameter_name)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional TargetResolution parameter is a positive number.
+        # noinspection PyPep8Naming
+        pv_TargetResolution = self.get_parameter_value(parameter_name="TargetResolution",
+                                                       command_parameters=command_parameters)
+        if not validator_util.validate_float(pv_TargetResolution, none_allowed=True, empty_string_allowed=True,
+                                             zero_allowed=False) or \
+                (pv_TargetResolution is not None and pv_TargetResolution != "" and float(pv_TargetResolution) < 0):
+            message = "TargetResolution parameter value ({}) is invalid.".format(pv_TargetResolution)
+            recommendation = "Specify a positive number."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional TargetExtent parameter is a valid rectangle.
+        # noinspection PyPep8Naming
+        pv_TargetExtent = self.get_parameter_value(parameter_name="TargetExtent",
+                                                   command_parameters=command_parameters)
+        if pv_TargetExtent is not None and pv_TargetExtent.find("${") < 0:
+            try:
+                qgis_util.parse_qgs_rectangle(pv_TargetExtent)
+            except ValueError as e:
+                message = "TargetExtent parameter value ({}) is invalid ({}).".format(pv_TargetExtent, e)
+                recommendation = "Specify MinX,MinY,MaxX,MaxY."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional WarpMemory parameter is a positive integer.
+        # noinspection PyPep8Naming
+        pv_WarpMemory = self.get_parameter_value(parameter_name="WarpMemory", command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_WarpMemory, True, True, zero_allowed=False):
+            message = "WarpMemory parameter value ({}) is invalid.".format(pv_WarpMemory)
+            recommendation = "Specify the warp memory in megabytes, for example 2048."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that the VRT output mode has an output GeoLayer that does not replace the input GeoLayer.
+        # noinspection PyPep8Naming
+        pv_OutputMode = self.get_parameter_value(parameter_name="OutputMode", command_parameters=command_parameters)
+        if pv_OutputMode is not None and pv_OutputMode.upper() == "VRT":
+            # noinspection PyPep8Naming
+            pv_OutputGeoLayerID = self.get_parameter_value(parameter_name="OutputGeoLayerID",
+                                                           command_parameters=command_parameters)
+            # noinspection PyPep8Naming
+            pv_GeoLayerID = self.get_parameter_value(parameter_name="GeoLayerID",
+                                                     command_parameters=command_parameters)
+            if pv_OutputGeoLayerID is None or pv_OutputGeoLayerID == "" or pv_OutputGeoLayerID == pv_GeoLayerID:
+                message = "OutputMode=VRT requires an OutputGeoLayerID different from the GeoLayerID."
+                recommendation = "Specify the OutputGeoLayerID parameter."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -212,6 +374,40 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
         pv_CRS = self.get_parameter_value("CRS")
         # noinspection PyPep8Naming
         pv_OutputGeoLayerID = self.get_parameter_value("OutputGeoLayerID")
+        # noinspection PyPep8Naming
+        pv_Resampling = self.get_parameter_value(
+            "Resampling", default_value=self.__parameter_input_metadata['Resampling.Value.Default'])
+        if pv_Resampling == "":
+            # noinspection PyPep8Naming
+            pv_Resampling = self.__parameter_input_metadata['Resampling.Value.Default']
+        # noinspection PyPep8Naming
+        pv_TargetResolution = self.get_parameter_value("TargetResolution")
+        target_resolution = None
+        if pv_TargetResolution is not None and pv_TargetResolution != "":
+            target_resolution = float(pv_TargetResolution)
+        # noinspection PyPep8Naming
+        pv_TargetExtent = self.get_parameter_value("TargetExtent")
+        # noinspection PyPep8Naming
+        pv_TargetExtent = self.command_processor.expand_parameter_value(pv_TargetExtent, self)
+        # noinspection PyPep8Naming
+        pv_NumThreads = self.get_parameter_value(
+            "NumThreads", default_value=self.__parameter_input_metadata['NumThreads.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_NumThreads = self.command_processor.expand_parameter_value(pv_NumThreads, self)
+        if pv_NumThreads == "":
+            # noinspection PyPep8Naming
+            pv_NumThreads = self.__parameter_input_metadata['NumThreads.Value.Default']
+        # noinspection PyPep8Naming
+        pv_WarpMemory = self.get_parameter_value("WarpMemory")
+        warp_memory = None
+        if pv_WarpMemory is not None and pv_WarpMemory != "":
+            warp_memory = int(pv_WarpMemory)
+        # noinspection PyPep8Naming
+        pv_OutputMode = self.get_parameter_value(
+            "OutputMode", default_value=self.__parameter_input_metadata['OutputMode.Value.Default'])
+        if pv_OutputMode == "":
+            # noinspection PyPep8Naming
+            pv_OutputMode = self.__parameter_input_metadata['OutputMode.Value.Default']
 
         # Convert the pv_GeoLayerID parameter to expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -231,14 +427,40 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
                 input_geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
 
                 # Check if the input GeoLayer has an existing CRS.
-                if input_geolayer.get_crs_code():
+                if input_geolayer.get_crs_code() and pv_OutputMode.upper() != "FILE":
+                    # Reproject the GeoLayer using GDAL in this process:
+                    # - InMemory writes to /vsimem/ if the size allows
+                    # - VRT writes a small virtual raster that is warped when read
+                    if pv_OutputMode.upper() == "VRT":
+                        raster_output_file = self.command_processor.get_raster_scratch_file(
+                            'warpreproject', 0, in_process=True, ext="vrt")
+                    else:
+                        raster_output_file = self.command_processor.get_raster_scratch_file(
+                            'warpreproject', qgis_util.estimate_qgsrasterlayer_size(input_geolayer.qgs_layer),
+                            in_process=True)
+                    self.logger.info("Temporary file is: {}".format(raster_output_file))
+                    qgis_util.warp_raster_file(input_geolayer.qgs_layer.source(), raster_output_file,
+                                               qgis_util.parse_qgs_crs(pv_CRS),
+                                               resampling=pv_Resampling,
+                                               target_resolution=target_resolution,
+                                               target_extent=qgis_util.parse_qgs_rectangle(pv_TargetExtent),
+                                               output_format="VRT" if pv_OutputMode.upper() == "VRT" else "GTiff",
+                                               num_threads=pv_NumThreads,
+                                               warp_memory=warp_memory)
+                    reprojected_layer = qgis_util.read_qgsrasterlayer_from_file(raster_output_file)
+                    self.__add_reprojected_geolayer(input_geolayer, reprojected_layer, pv_GeoLayerID,
+                                                    pv_OutputGeoLayerID)
+                    # The GeoLayer uses the file, which is removed when the GeoLayer is freed.
+                    raster_output_file = None
+
+                elif input_geolayer.get_crs_code():
                     # Reproject the GeoLayer:
                     # - output is to a temporary file so have to read it
 
-                    # Get the temporary folder based on TemporaryFolder parameter:
-                    # - for now use the system temporary folder
-                    output_ext = "tif"
-                    raster_output_file = io_util.create_tmp_filename('gp', 'warpreproject', output_ext)
+                    # Get a raster scratch file, which is in memory if the size allows:
+                    # - the output is about the same size as the input
+                    raster_output_file = self.command_processor.get_raster_scratch_file(
+                        'warpreproject', qgis_util.estimate_qgsrasterlayer_size(input_geolayer.qgs_layer))
                     self.logger.info("Temporary file is: {}".format(raster_output_file))
 
                     # See:
@@ -251,17 +473,39 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
                     # The following parameters are for GeoTIFF, which is used to do the processing.
                     alg_parameters = {
                         # Generic parameters regardless of output format.
-                        "INPUT": input_geolayer.qgs_layer,
                         "TARGET_CRS": pv_CRS,
                         "OUTPUT": str(raster_output_file),
-                        # The following are for GeoTIFF.
-                        "OPTIONS": 'TILED=YES|COPY_SRC_OVERVIEWS=YES|COMPRESS=LZW'
+                        # The following are for GeoTIFF:
+                        # - the file is an intermediate that is read once so is not compressed
+                        "OPTIONS": "TILED=YES|COPY_SRC_OVERVIEWS=YES",
+                        "RESAMPLING": [choice.upper() for choice in self.__choices_Resampling].index(
+                            pv_Resampling.upper()),
+                        # Use multiple threads to warp chunks and to compute the transformation (-multi).
+                        "MULTITHREADING": pv_NumThreads != "1",
+                        "EXTRA": "-wo NUM_THREADS={}".format(pv_NumThreads)
                     }
+                    if warp_memory is not None:
+                        alg_parameters["EXTRA"] += " -wm {}".format(warp_memory)
+                    if target_resolution is not None:
+                        alg_parameters["TARGET_RESOLUTION"] = target_resolution
+                        alg_parameters["EXTRA"] += " -tap"
+                    if pv_TargetExtent is not None and pv_TargetExtent != "":
+                        target_extent = qgis_util.parse_qgs_rectangle(pv_TargetExtent)
+                        # The algorithm extent is "xmin,xmax,ymin,ymax [CRS]".
+                        alg_parameters["TARGET_EXTENT"] = "{},{},{},{} [{}]".format(
+                            target_extent.xMinimum(), target_extent.xMaximum(),
+                            target_extent.yMinimum(), target_extent.yMaximum(), pv_CRS)
+                        alg_parameters["TARGET_EXTENT_CRS"] = pv_CRS
                     feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
-                    alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
-                                                          algorithm="gdal:warpreproject",
-                                                          algorithm_parameters=alg_parameters,
-                                                          feedback_handler=feedback_handler)
+                    alg_parameters["INPUT"] = self.command_processor.prepare_raster_algorithm_input(input_geolayer)
+                    try:
+                        alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
+                                                              algorithm="gdal:warpreproject",
+                                                              algorithm_parameters=alg_parameters,
+                                                              feedback_handler=feedback_handler)
+                    finally:
+                        # Remove the copy of an in-memory input raster.
+                        self.command_processor.free_raster_algorithm_input(alg_parameters["INPUT"])
                     self.warning_count += feedback_handler.get_warning_count()
                     # Output is a dictionary.
                     self.logger.info("Algorithm output: {}".format(alg_output))
@@ -269,25 +513,11 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
                     # Create a new QgsRasterLayer from the temporary file:
                     # - output file name should be the same as specified but get from results to confirm
                     reprojected_layer = qgis_util.read_qgsrasterlayer_from_file(alg_output['OUTPUT'])
-                    self.logger.info("Layer metadata after changing CRS:")
-                    qgis_util.log_raster_metadata(reprojected_layer, logger=self.logger)
-
-                    if (pv_OutputGeoLayerID is not None) and (pv_OutputGeoLayerID != ''):
-                        # Use the new GeoLayerID.
-                        new_geolayer_id = pv_OutputGeoLayerID
-                    else:
-                        # Use the existing GeoLayerID.
-                        new_geolayer_id = pv_GeoLayerID
-
-                    # Create a new GeoLayer from the temporary file and add it to the GeoProcessor's geolayers list.
-                    new_geolayer = RasterGeoLayer(geolayer_id=new_geolayer_id,
-                                                  qgs_raster_layer=reprojected_layer,
-                                                  name=input_geolayer.name,
-                                                  description=input_geolayer.description,
-                                                  input_path_full=GeoLayer.SOURCE_MEMORY,
-                                                  input_path=GeoLayer.SOURCE_MEMORY)
 
-                    self.command_processor.add_geolayer(new_geolayer)
+                    self.__add_reprojected_geolayer(input_geolayer, reprojected_layer, pv_GeoLayerID,
+                                                    pv_OutputGeoLayerID)
+                    # The GeoLayer uses the file, which is removed when the GeoLayer is freed.
+                    raster_output_file = None
 
                 else:
                     # Input layer must have CRS defined in order to change the CRS.
@@ -307,9 +537,9 @@ class ChangeRasterGeoLayerCRS(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.RUN,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
             finally:
-                # Remove the temporary file to optimize disk space use since not needed after reading.
+                # Remove the temporary file if it was not used by a new GeoLayer.
                 if raster_output_file is not None:
-                    io_util.remove_tmp_file(raster_output_file)
+                    self.command_processor.remove_raster_scratch_file(raster_output_file)
 
         # Determine success of command processing. Raise Runtime Error if any errors occurred.
         if self.warning_count > 0:
@@ -53,8 +53,8 @@ class CreateRasterGeoLayer(AbstractCommand):
         CommandParameterMetadata("PixelWidth", float),
         CommandParameterMetadata("PixelHeight", float),
         CommandParameterMetadata("InitialValue", str),
-        # TODO smalers 2020-11-26 How to set?
-        # CommandParameterMetadata("NoDataValue", str),
+        CommandParameterMetadata("NoDataValue", str),
+        CommandParameterMetadata("InMemory", str),
         CommandParameterMetadata("IfGeoLayerIDExists", str)]
 
     # Command metadata for command editor display.
@@ -62,6 +62,7 @@ class CreateRasterGeoLayer(AbstractCommand):
     __command_metadata['Description'] = (
         "Create a new raster GeoLayer, using TIF driver.\n"
         "A temporary file will be created and will be read into memory.\n"
+        "The temporary file is created in memory if possible to avoid writing to disk.\n"
         "Once created, the layer can be processed with other commands.\n"
         "This command is under development."
     )
@@ -122,6 +123,28 @@ class CreateRasterGeoLayer(AbstractCommand):
     __parameter_input_metadata['PixelHeight.Label'] = "Pixel height"
     __parameter_input_metadata['PixelHeight.Required'] = True
     __parameter_input_metadata['PixelHeight.Tooltip'] = "Pixel height, in units of the coordinate reference system."
+    # InitialValue
+    __parameter_input_metadata['InitialValue.Description'] = "initial cell value"
+    __parameter_input_metadata['InitialValue.Label'] = "Initial value"
+    __parameter_input_metadata['InitialValue.Tooltip'] = (
+        "Initial value for all cells in all bands.\n"
+        "If not specified, cells are initialized to the NoData value, or zero if NoData is not specified.")
+    # NoDataValue
+    __parameter_input_metadata['NoDataValue.Description'] = "NoData value"
+    __parameter_input_metadata['NoDataValue.Label'] = "NoData value"
+    __parameter_input_metadata['NoDataValue.Tooltip'] = "The NoData value for all bands."
+    __parameter_input_metadata['NoDataValue.Value.Default.Description'] = "NoData is not set"
+    # InMemory
+    __parameter_input_metadata['InMemory.Description'] = "create the raster in memory?"
+    __parameter_input_metadata['InMemory.Label'] = "In memory?"
+    __parameter_input_metadata['InMemory.Tooltip'] = (
+        "Indicate whether to create the raster in memory using GDAL's /vsimem/ file system:\n"
+        "False: create a temporary GeoTIFF file in a memory-backed folder or on disk\n"
+        "True: create the GeoTIFF in GDAL's memory, which is faster but is copied to a file "
+        "if used by a GDAL algorithm.\n"
+        "The raster is created on disk if larger than the RasterScratchMemoryLimit property.")
+    __parameter_input_metadata['InMemory.Values'] = ["", "False", "True"]
+    __parameter_input_metadata['InMemory.Value.Default'] = "False"
     # IfGeoLayerIDExists
     __parameter_input_metadata['IfGeoLayerIDExists.Description'] = "action if output exists"
     __parameter_input_metadata['IfGeoLayerIDExists.Label'] = "If GeoLayerID exists"
@@ -136,6 +159,9 @@ class CreateRasterGeoLayer(AbstractCommand):
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
 
+    # Choices for InMemory, used to validate parameter and display in editor.
+    __choices_InMemory = ["False", "True"]
+
     def __init__(self) -> None:
         """
         Initialize the command.
@@ -235,6 +261,43 @@ class CreateRasterGeoLayer(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional InitialValue parameter is a number.
+        # noinspection PyPep8Naming
+        pv_InitialValue = self.get_parameter_value(parameter_name="InitialValue",
+                                                   command_parameters=command_parameters)
+        if not validator_util.validate_float(pv_InitialValue, none_allowed=True, empty_string_allowed=True):
+            message = "InitialValue parameter value ({}) is invalid.".format(pv_InitialValue)
+            recommendation = "Specify a number."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional NoDataValue parameter is a number.
+        # noinspection PyPep8Naming
+        pv_NoDataValue = self.get_parameter_value(parameter_name="NoDataValue",
+                                                  command_parameters=command_parameters)
+        if not validator_util.validate_float(pv_NoDataValue, none_allowed=True, empty_string_allowed=True):
+            message = "NoDataValue parameter value ({}) is invalid.".format(pv_NoDataValue)
+            recommendation = "Specify a number."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional InMemory parameter is True or False.
+        # noinspection PyPep8Naming
+        pv_InMemory = self.get_parameter_value(parameter_name="InMemory", command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_InMemory, self.__choices_InMemory, none_allowed=True,
+                                                      empty_string_allowed=True, ignore_case=True):
+            message = "InMemory parameter value ({}) is not recognized.".format(pv_InMemory)
+            recommendation = "Specify one of the acceptable values ({}) for the InMemory parameter.".format(
+                self.__choices_InMemory)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check that optional IfGeoLayerIDExists param is either `Replace`, `Warn`, `Fail`, `ReplaceAndWarn` or None.
         # noinspection PyPep8Naming
         pv_IfGeoLayerIDExists = self.get_parameter_value(parameter_name="IfGeoLayerIDExists",
@@ -341,16 +404,34 @@ class CreateRasterGeoLayer(AbstractCommand):
         # noinspection PyPep8Naming
         pv_InitialValue = self.get_parameter_value("InitialValue")
         initial_value = None
+        is_integer = pv_DataType.upper().find('INT') >= 0 or pv_DataType.upper() == 'BYTE'
         if pv_InitialValue is not None and pv_InitialValue != '':
-            if pv_DataType.upper().find('Int') or pv_DataType.upper() == 'BYTE':
-                initial_value = int(pv_InitialValue)
+            if is_integer:
+                initial_value = int(float(pv_InitialValue))
             else:
                 initial_value = float(pv_InitialValue)
+        # noinspection PyPep8Naming
+        pv_NoDataValue = self.get_parameter_value("NoDataValue")
+        nodata_value = None
+        if pv_NoDataValue is not None and pv_NoDataValue != '':
+            if is_integer:
+                nodata_value = int(float(pv_NoDataValue))
+            else:
+                nodata_value = float(pv_NoDataValue)
+        # noinspection PyPep8Naming
+        pv_InMemory = self.get_parameter_value("InMemory",
+                                               default_value=self.__parameter_input_metadata['InMemory.Value.Default'])
+        in_memory = pv_InMemory.upper() == "TRUE"
 
         if self.check_runtime_data(pv_NewGeoLayerID, pv_CRS):
+            raster_file = None
             # noinspection PyBroadException
             try:
-                # Create the QgsVectorLayer.
+                # Get a raster scratch file, which is in memory if the size allows:
+                # - estimate the size using 4 bytes per cell since most data types are 4 bytes or less
+                raster_file = self.command_processor.get_raster_scratch_file(
+                    'createraster', num_rows * num_columns * num_bands * 4, in_process=in_memory)
+                # Create the QgsRasterLayer.
                 layer = qgis_util.create_qgsrasterlayer(
                     crs=pv_CRS,
                     num_rows=num_rows,
@@ -361,7 +442,9 @@ class CreateRasterGeoLayer(AbstractCommand):
                     pixel_width=pixel_width,
                     pixel_height=pixel_height,
                     data_type=pv_DataType,
-                    initial_value=initial_value)
+                    initial_value=initial_value,
+                    nodata_value=nodata_value,
+                    output_file=raster_file)
 
                 # Create a new GeoLayer with the QgsVectorLayer and add it to the GeoProcesor's geolayers list:
                 # - treat as if memory since a temporary file is used but not expected to be used later
@@ -373,6 +456,8 @@ class CreateRasterGeoLayer(AbstractCommand):
                 self.command_processor.add_geolayer(new_geolayer)
 
             except Exception:
+                if raster_file is not None:
+                    self.command_processor.remove_raster_scratch_file(raster_file)
                 self.warning_count += 1
                 message = "Unexpected error creating GeoLayer ({}).".format(pv_NewGeoLayerID)
                 recommendation = "Check the log file for details."
@@ -0,0 +1,488 @@
+# RasterCalculator - command to calculate a raster GeoLayer from an expression using raster GeoLayers
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+from geoprocessor.commands.abstract.AbstractCommand import AbstractCommand
+
+from geoprocessor.core.CommandError import CommandError
+from geoprocessor.core.CommandLogRecord import CommandLogRecord
+from geoprocessor.core.CommandParameterError import CommandParameterError
+from geoprocessor.core.CommandParameterMetadata import CommandParameterMetadata
+from geoprocessor.core.CommandPhaseType import CommandPhaseType
+from geoprocessor.core.CommandStatusType import CommandStatusType
+from geoprocessor.core.GeoLayer import GeoLayer
+from geoprocessor.core import RasterFormatType
+from geoprocessor.core.RasterGeoLayer import RasterGeoLayer
+
+import geoprocessor.util.command_util as command_util
+import geoprocessor.util.io_util as io_util
+import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.raster_expression_util as raster_expression_util
+import geoprocessor.util.string_util as string_util
+import geoprocessor.util.validator_util as validator_util
+
+import logging
+
+
+class RasterCalculator(AbstractCommand):
+    """
+    Calculate a new raster GeoLayer from an expression that uses bands of one or more raster GeoLayers.
+    """
+
+    # Define the command parameters.
+    __command_parameter_metadata: [CommandParameterMetadata] = [
+        CommandParameterMetadata("InputGeoLayers", str),
+        CommandParameterMetadata("InputBands", str),
+        CommandParameterMetadata("Expression", str),
+        CommandParameterMetadata("OutputDataType", str),
+        CommandParameterMetadata("OutputNoDataValue", str),
+        CommandParameterMetadata("OutputFile", str),
+        CommandParameterMetadata("MaxWorkers", type("")),
+        CommandParameterMetadata("NewGeoLayerID", str),
+        CommandParameterMetadata("IfGeoLayerIDExists", str)]
+
+    # Command metadata for command editor display.
+    __command_metadata = dict()
+    __command_metadata['Description'] = (
+        "Calculate a new raster GeoLayer from an expression that uses bands of one or more raster GeoLayers,\n"
+        "for example a band ratio, threshold, or mask.\n"
+        "The input rasters must have the same size and cells.\n"
+        "The rasters are processed one block at a time so that large rasters can be processed."
+    )
+    __command_metadata['EditorType'] = "Simple"
+
+    # Command Parameter Metadata.
+    __parameter_input_metadata = dict()
+    # InputGeoLayers
+    __parameter_input_metadata['InputGeoLayers.Description'] = "input raster GeoLayers"
+    __parameter_input_metadata['InputGeoLayers.Label'] = "Input GeoLayers"
+    __parameter_input_metadata['InputGeoLayers.Required'] = True
+    __parameter_input_metadata['InputGeoLayers.Tooltip'] = (
+        "Expression variable names and the raster GeoLayerID for each, "
+        "for example:  A:GeoLayerID1,B:GeoLayerID2")
+    # InputBands
+    __parameter_input_metadata['InputBands.Description'] = "input bands"
+    __parameter_input_metadata['InputBands.Label'] = "Input bands"
+    __parameter_input_metadata['InputBands.Tooltip'] = (
+        "Band number (1+) for expression variables, for example:  A:1,B:4")
+    __parameter_input_metadata['InputBands.Value.Default.Description'] = "band 1"
+    # Expression
+    __parameter_input_metadata['Expression.Description'] = "expression to calculate"
+    __parameter_input_metadata['Expression.Label'] = "Expression"
+    __parameter_input_metadata['Expression.Required'] = True
+    __parameter_input_metadata['Expression.Tooltip'] = (
+        "Expression using Python syntax, for example:\n"
+        "(A - B) / (A + B)\n"
+        "1 if A > 100 and B < 5 else 0\n"
+        "Functions: {}".format(", ".join(raster_expression_util.RASTER_EXPRESSION_FUNCTIONS)))
+    # OutputDataType
+    __parameter_input_metadata['OutputDataType.Description'] = "output cell data type"
+    __parameter_input_metadata['OutputDataType.Label'] = "Output data type"
+    __parameter_input_metadata['OutputDataType.Tooltip'] = (
+        "The output cell data type.  Values are calculated as 64-bit floating point numbers and "
+        "are rounded for integer data types.")
+    __parameter_input_metadata['OutputDataType.Values'] = \
+        ["", "Byte", "Int16", "Int32", "UInt16", "UInt32", "Float32", "Float64"]
+    __parameter_input_metadata['OutputDataType.Value.Default'] = "Float32"
+    # OutputNoDataValue
+    __parameter_input_metadata['OutputNoDataValue.Description'] = "output NoData value"
+    __parameter_input_metadata['OutputNoDataValue.Label'] = "Output NoData value"
+    __parameter_input_metadata['OutputNoDataValue.Tooltip'] = (
+        "The output NoData value, used for cells where an input is NoData, the result is not a number "
+        "(e.g., division by zero), or the result does not fit in the output data type.")
+    __parameter_input_metadata['OutputNoDataValue.Value.Default.Description'] = \
+        "-9999, or the largest value for unsigned data types"
+    # OutputFile
+    __parameter_input_metadata['OutputFile.Description'] = "GeoTIFF file to write"
+    __parameter_input_metadata['OutputFile.Label'] = "Output file"
+    __parameter_input_metadata['OutputFile.Tooltip'] = (
+        "The GeoTIFF file to write, which is used by the new GeoLayer.  Can be specified using ${Property}.")
+    __parameter_input_metadata['OutputFile.Value.Default.Description'] = "temporary file"
+    __parameter_input_metadata['OutputFile.FileSelector.Type'] = "Write"
+    __parameter_input_metadata['OutputFile.FileSelector.Title'] = "Select the GeoTIFF file to write"
+    # MaxWorkers
+    __parameter_input_metadata['MaxWorkers.Description'] = "number of threads"
+    __parameter_input_metadata['MaxWorkers.Label'] = "Maximum workers"
+    __parameter_input_metadata['MaxWorkers.Tooltip'] = (
+        "The number of threads used to calculate blocks of the raster.")
+    __parameter_input_metadata['MaxWorkers.Value.Default'] = "1"
+    # NewGeoLayerID
+    __parameter_input_metadata['NewGeoLayerID.Description'] = "id of the new GeoLayer"
+    __parameter_input_metadata['NewGeoLayerID.Label'] = "New GeoLayerID"
+    __parameter_input_metadata['NewGeoLayerID.Required'] = True
+    __parameter_input_metadata['NewGeoLayerID.Tooltip'] = "The ID of the new GeoLayer."
+    # IfGeoLayerIDExists
+    __parameter_input_metadata['IfGeoLayerIDExists.Description'] = "action if output exists"
+    __parameter_input_metadata['IfGeoLayerIDExists.Label'] = "If GeoLayerID exists"
+    __parameter_input_metadata['IfGeoLayerIDExists.Tooltip'] = (
+        "The action that occurs if the NewGeoLayerID already exists within the GeoProcessor.\n"
+        "Replace: The existing GeoLayer within the GeoProcessor is overwritten with the new GeoLayer. "
+        "No warning is logged.\n"
+        "ReplaceAndWarn: The existing GeoLayer within the GeoProcessor is overwritten with the new GeoLayer. "
+        "A warning is logged.\n"
+        "Warn: The new GeoLayer is not created. A warning is logged.\n"
+        "Fail: The new GeoLayer is not created. A fail message is logged.")
+    __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
+    __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+
+    # Choices for OutputDataType, used to validate parameter and display in editor.
+    __choices_OutputDataType = ["Byte", "Int16", "Int32", "UInt16", "UInt32", "Float32", "Float64"]
+
+    def __init__(self) -> None:
+        """
+        Initialize the command.
+        """
+
+        # AbstractCommand data.
+        super().__init__()
+        self.command_name = "RasterCalculator"
+        self.command_parameter_metadata = self.__command_parameter_metadata
+
+        # Command metadata for command editor display.
+        self.command_metadata = self.__command_metadata
+
+        # Command Parameter Metadata.
+        self.parameter_input_metadata = self.__parameter_input_metadata
+
+        # Class data.
+        self.warning_count = 0
+        self.logger = logging.getLogger(__name__)
+
+    def check_command_parameters(self, command_parameters: dict) -> None:
+        """
+        Check the command parameters for validity.
+
+        Args:
+            command_parameters: the dictionary of command parameters to check (key:string_value)
+
+        Returns:
+            None.
+
+        Raises:
+            ValueError if any parameters are invalid or do not have a valid value.
+            The command status messages for initialization are populated with validation messages.
+        """
+
+        warning_message = ""
+
+        # Check that required parameters are non-empty, non-None strings.
+        required_parameters = command_util.get_required_parameter_names(self)
+        for parameter in required_parameters:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_string(parameter_value, False, False):
+                message = "Required {} parameter has no value.".format(parameter)
+                recommendation = "Specify the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that InputGeoLayers is a list of Name:GeoLayerID.
+        # noinspection PyPep8Naming
+        pv_InputGeoLayers = self.get_parameter_value(parameter_name="InputGeoLayers",
+                                                     command_parameters=command_parameters)
+        input_geolayers = dict()
+        if validator_util.validate_string(pv_InputGeoLayers, False, False):
+            try:
+                input_geolayers = string_util.delimited_string_to_dictionary_one_value(pv_InputGeoLayers, ",", ":")
+            except ValueError:
+                message = "InputGeoLayers parameter value ({}) is invalid.".format(pv_InputGeoLayers)
+                recommendation = "Specify the InputGeoLayers parameter as Name:GeoLayerID,Name:GeoLayerID."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that InputBands is a list of Name:Band for names in InputGeoLayers.
+        # noinspection PyPep8Naming
+        pv_InputBands = self.get_parameter_value(parameter_name="InputBands", command_parameters=command_parameters)
+        if pv_InputBands is not None and pv_InputBands != "":
+            try:
+                input_bands = string_util.delimited_string_to_dictionary_one_value(pv_InputBands, ",", ":")
+                for name, band in input_bands.items():
+                    if name not in input_geolayers or not validator_util.validate_int(band, False, False,
+                                                                                      zero_allowed=False):
+                        raise ValueError("Band for {} is invalid.".format(name))
+            except ValueError:
+                message = "InputBands parameter value ({}) is invalid.".format(pv_InputBands)
+                recommendation = "Specify the InputBands parameter as Name:Band,Name:Band using InputGeoLayers names."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that the expression is valid and only uses InputGeoLayers names.
+        # noinspection PyPep8Naming
+        pv_Expression = self.get_parameter_value(parameter_name="Expression", command_parameters=command_parameters)
+        if validator_util.validate_string(pv_Expression, False, False) and pv_Expression.find("${") < 0:
+            try:
+                raster_expression_util.parse_raster_expression(pv_Expression, list(input_geolayers.keys()))
+            except ValueError as e:
+                message = str(e)
+                recommendation = "Specify a valid expression using InputGeoLayers names."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional OutputDataType parameter is a valid data type.
+        # noinspection PyPep8Naming
+        pv_OutputDataType = self.get_parameter_value(parameter_name="OutputDataType",
+                                                     command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_OutputDataType, self.__choices_OutputDataType,
+                                                      none_allowed=True, empty_string_allowed=True, ignore_case=True):
+            message = "OutputDataType parameter value ({}) is not recognized.".format(pv_OutputDataType)
+            recommendation = "Specify one of the acceptable values ({}) for the OutputDataType parameter.".format(
+                self.__choices_OutputDataType)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional OutputNoDataValue parameter is a number.
+        # noinspection PyPep8Naming
+        pv_OutputNoDataValue = self.get_parameter_value(parameter_name="OutputNoDataValue",
+                                                        command_parameters=command_parameters)
+        if not validator_util.validate_float(pv_OutputNoDataValue, none_allowed=True, empty_string_allowed=True):
+            message = "OutputNoDataValue parameter value ({}) is invalid.".format(pv_OutputNoDataValue)
+            recommendation = "Specify a number."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional MaxWorkers parameter is a positive integer.
+        # noinspection PyPep8Naming
+        pv_MaxWorkers = self.get_parameter_value(parameter_name="MaxWorkers", command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_MaxWorkers, True, True, zero_allowed=False):
+            message = "MaxWorkers parameter value ({}) is invalid.".format(pv_MaxWorkers)
+            recommendation = "Specify a positive integer."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional IfGeoLayerIDExists param is either `Replace`, `Warn`, `Fail`, `ReplaceAndWarn` or None.
+        # noinspection PyPep8Naming
+        pv_IfGeoLayerIDExists = self.get_parameter_value(parameter_name="IfGeoLayerIDExists",
+                                                         command_parameters=command_parameters)
+        acceptable_values = ["Replace", "Warn", "Fail", "ReplaceAndWarn"]
+        if not validator_util.validate_string_in_list(pv_IfGeoLayerIDExists, acceptable_values, none_allowed=True,
+                                                      empty_string_allowed=True, ignore_case=True):
+            message = "IfGeoLayerIDExists parameter value ({}) is not recognized.".format(pv_IfGeoLayerIDExists)
+            recommendation = "Specify one of the acceptable values ({}) for the IfGeoLayerIDExists parameter.".format(
+                acceptable_values)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check for unrecognized parameters.
+        # This returns a message that can be appended to the warning, and if non-empty triggers an exception below.
+        warning_message = command_util.validate_command_parameter_names(self, warning_message)
+
+        # If any warnings were generated, throw an exception.
+        if len(warning_message) > 0:
+            self.logger.warning(warning_message)
+            raise CommandParameterError(warning_message)
+        else:
+            # Refresh the phase severity.
+            self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
+
+    def check_runtime_data(self, input_geolayers: dict, input_bands: dict, new_geolayer_id: str) -> bool:
+        """
+        Checks the following:
+        * the input GeoLayers exist and are raster GeoLayers
+        * the input GeoLayers have the requested bands
+        * the ID of the new GeoLayer is unique (not an existing GeoLayer ID)
+
+        Args:
+            input_geolayers (dict): expression variable name -> GeoLayerID
+            input_bands (dict): expression variable name -> band number
+            new_geolayer_id (str): the ID of the GeoLayer to be created
+
+        Returns:
+             Boolean. If TRUE, the raster should be calculated. If FALSE, at least one check failed.
+        """
+
+        # List of Boolean values. The Boolean values correspond to the results of the following tests.
+        # If TRUE, the test confirms that the command should be run.
+        should_run_command = list()
+
+        for name, geolayer_id in input_geolayers.items():
+            geolayer = self.command_processor.get_geolayer(geolayer_id)
+            if geolayer is None or not geolayer.is_raster():
+                should_run_command.append(False)
+                self.warning_count += 1
+                message = 'The input GeoLayer ID ({}) for {} does not exist or is not a raster.'.format(
+                    geolayer_id, name)
+                recommendation = 'Specify a valid raster GeoLayerID.'
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+            elif input_bands[name] > geolayer.get_num_bands():
+                should_run_command.append(False)
+                self.warning_count += 1
+                message = 'The input GeoLayer ({}) for {} does not have band {}.'.format(
+                    geolayer_id, name, input_bands[name])
+                recommendation = 'Specify a band 1 to {}.'.format(geolayer.get_num_bands())
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # If the new GeoLayerID is the same as an already-existing GeoLayerID, raise a WARNING or FAILURE
+        # (depends on the value of the IfGeoLayerIDExists parameter.)
+        should_run_command.append(validator_util.run_check(self, "IsGeoLayerIdUnique", "NewGeoLayerID",
+                                                           new_geolayer_id, None))
+
+        # Return the Boolean to determine if the process should be run.
+        if False in should_run_command:
+            return False
+        else:
+            return True
+
+    def run_command(self) -> None:
+        """
+        Run the command.  Calculate the raster and add the new GeoLayer to the GeoProcessor's geolayers list.
+
+        Returns:
+            None.
+
+        Raises:
+            RuntimeError if any warnings occurred during run_command method.
+        """
+
+        self.warning_count = 0
+
+        # Obtain the parameter values.
+        # noinspection PyPep8Naming
+        pv_InputGeoLayers = self.get_parameter_value("InputGeoLayers")
+        # noinspection PyPep8Naming
+        pv_InputGeoLayers = self.command_processor.expand_parameter_value(pv_InputGeoLayers, self)
+        input_geolayers = string_util.delimited_string_to_dictionary_one_value(pv_InputGeoLayers, ",", ":")
+        # noinspection PyPep8Naming
+        pv_InputBands = self.get_parameter_value("InputBands")
+        input_bands = dict()
+        for name in input_geolayers.keys():
+            input_bands[name] = 1
+        if pv_InputBands is not None and pv_InputBands != "":
+            for name, band in string_util.delimited_string_to_dictionary_one_value(pv_InputBands, ",", ":").items():
+                input_bands[name] = int(band)
+        # noinspection PyPep8Naming
+        pv_Expression = self.get_parameter_value("Expression")
+        # noinspection PyPep8Naming
+        pv_Expression = self.command_processor.expand_parameter_value(pv_Expression, self)
+        # noinspection PyPep8Naming
+        pv_OutputDataType = self.get_parameter_value(
+            "OutputDataType", default_value=self.__parameter_input_metadata['OutputDataType.Value.Default'])
+        if pv_OutputDataType == "":
+            # noinspection PyPep8Naming
+            pv_OutputDataType = self.__parameter_input_metadata['OutputDataType.Value.Default']
+        # noinspection PyPep8Naming
+        pv_OutputNoDataValue = self.get_parameter_value("OutputNoDataValue")
+        nodata_value = None
+        if pv_OutputNoDataValue is not None and pv_OutputNoDataValue != "":
+            if pv_OutputDataType.upper().find('INT') >= 0 or pv_OutputDataType.upper() == 'BYTE':
+                nodata_value = int(float(pv_OutputNoDataValue))
+            else:
+                nodata_value = float(pv_OutputNoDataValue)
+        # noinspection PyPep8Naming
+        pv_OutputFile = self.get_parameter_value("OutputFile")
+        # noinspection PyPep8Naming
+        pv_MaxWorkers = self.get_parameter_value(
+            "MaxWorkers", default_value=self.__parameter_input_metadata['MaxWorkers.Value.Default'])
+        max_workers = 1
+        if pv_MaxWorkers is not None and pv_MaxWorkers != "":
+            max_workers = int(pv_MaxWorkers)
+        # noinspection PyPep8Naming
+        pv_NewGeoLayerID = self.get_parameter_value("NewGeoLayerID")
+        # noinspection PyPep8Naming
+        pv_NewGeoLayerID = self.command_processor.expand_parameter_value(pv_NewGeoLayerID, self)
+
+        if self.check_runtime_data(input_geolayers, input_bands, pv_NewGeoLayerID):
+            output_is_tmp = pv_OutputFile is None or pv_OutputFile == ""
+            output_file = None
+            # noinspection PyBroadException
+            try:
+                # The input rasters are read directly from their files (including /vsimem/) using GDAL.
+                inputs = dict()
+                first_geolayer = None
+                for name, geolayer_id in input_geolayers.items():
+                    geolayer = self.command_processor.get_geolayer(geolayer_id)
+                    if first_geolayer is None:
+                        first_geolayer = geolayer
+                    inputs[name] = (geolayer.qgs_layer.source(), input_bands[name])
+
+                if output_is_tmp:
+                    # Get a raster scratch file, which is in memory if the size allows.
+                    output_file = self.command_processor.get_raster_scratch_file(
+                        'rastercalculator',
+                        first_geolayer.get_num_cells() * (8 if pv_OutputDataType.upper() == "FLOAT64" else 4),
+                        in_process=True)
+                    creation_options = None
+                else:
+                    output_file = io_util.verify_path_for_os(
+                        io_util.to_absolute_path(self.command_processor.get_property('WorkingDir'),
+                                                 self.command_processor.expand_parameter_value(pv_OutputFile, self)))
+                    # The output file is not an intermediate so compress.
+                    creation_options = ["COMPRESS=LZW"]
+
+                qgis_util.calculate_raster_expression(pv_Expression, inputs, output_file,
+                                                      data_type=pv_OutputDataType,
+                                                      nodata_value=nodata_value,
+                                                      max_workers=max_workers,
+                                                      creation_options=creation_options)
+
+                qgs_raster_layer = qgis_util.read_qgsrasterlayer_from_file(output_file)
+                if output_is_tmp:
+                    new_geolayer = RasterGeoLayer(geolayer_id=pv_NewGeoLayerID,
+                                                  name=pv_NewGeoLayerID,
+                                                  qgs_raster_layer=qgs_raster_layer,
+                                                  input_path_full=GeoLayer.SOURCE_MEMORY,
+                                                  input_path=GeoLayer.SOURCE_MEMORY)
+                else:
+                    new_geolayer = RasterGeoLayer(geolayer_id=pv_NewGeoLayerID,
+                                                  name=pv_NewGeoLayerID,
+                                                  qgs_raster_layer=qgs_raster_layer,
+                                                  input_format=RasterFormatType.GTiff,
+                                                  input_path_full=output_file,
+                                                  input_path=pv_OutputFile)
+                self.command_processor.add_geolayer(new_geolayer)
+                if output_is_tmp:
+                    # The GeoLayer uses the scratch file, which is removed when the GeoLayer is freed.
+                    output_file = None
+                else:
+                    self.command_processor.add_output_file(output_file)
+
+            except Exception:
+                if output_is_tmp and output_file is not None:
+                    self.command_processor.remove_raster_scratch_file(output_file)
+                self.warning_count += 1
+                message = "Unexpected error calculating raster GeoLayer ({}).".format(pv_NewGeoLayerID)
+                recommendation = "Check the log file for details."
+                self.logger.warning(message, exc_info=True)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        if self.warning_count > 0:
+            message = "There were {} warnings processing the command.".format(self.warning_count)
+            raise CommandError(message)
+
+        else:
+            # Set command status type as SUCCESS if there are no errors.
+            self.command_status.refresh_phase_severity(CommandPhaseType.RUN, CommandStatusType.SUCCESS)
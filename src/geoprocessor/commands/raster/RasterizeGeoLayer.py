@@ -17,6 +17,8 @@
 #     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
 # ________________________________________________________________NoticeEnd___
 
+from qgis.core import QgsRectangle
+
 from geoprocessor.commands.abstract.AbstractCommand import AbstractCommand
 
 from geoprocessor.core.CommandError import CommandError
@@ -28,17 +30,15 @@ from geoprocessor.core.CommandStatusType import CommandStatusType
 from geoprocessor.core.QGISAlgorithmProcessingFeedbackHandler import QgisAlgorithmProcessingFeedbackHandler
 from geoprocessor.core import RasterFormatType
 from geoprocessor.core.RasterGeoLayer import RasterGeoLayer
+from geoprocessor.core.VectorGeoLayer import VectorGeoLayer
 
 import geoprocessor.util.command_util as command_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.validator_util as validator_util
 
-from datetime import datetime
 import logging
-import os
 from pathlib import Path
-import tempfile
 
 
 class RasterizeGeoLayer(AbstractCommand):
@@ -61,7 +61,10 @@ class RasterizeGeoLayer(AbstractCommand):
         CommandParameterMetadata("ConstantValue", type("")),
         CommandParameterMetadata("MissingValue", type("")),
         CommandParameterMetadata("NewGeoLayerID", type("")),
-        CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
+        CommandParameterMetadata("IfGeoLayerIDExists", type("")),
+        CommandParameterMetadata("TileSize", type("")),
+        CommandParameterMetadata("TileOutputFormat", type("")),
+        CommandParameterMetadata("MaxWorkers", type(""))]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -166,6 +169,39 @@ class RasterizeGeoLayer(AbstractCommand):
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
     # __parameter_input_metadata['IfGeoLayerIDExists.Value.Default.ForEditor'] = ""
+    # TileSize
+    __parameter_input_metadata['TileSize.Description'] = "tile size (cells)"
+    __parameter_input_metadata['TileSize.Label'] = "Tile size"
+    __parameter_input_metadata['TileSize.Required'] = False
+    __parameter_input_metadata['TileSize.Tooltip'] = (
+        "If specified, rasterize in tiles with this number of columns and rows (e.g., 2048),\n"
+        "using only the features that intersect each tile, so that large outputs do not exhaust memory.\n"
+        "Should be a multiple of 16.")
+    __parameter_input_metadata['TileSize.Value.Default.Description'] = "rasterize the full extent at once"
+    # TileOutputFormat
+    __parameter_input_metadata['TileOutputFormat.Description'] = "how tiles are assembled"
+    __parameter_input_metadata['TileOutputFormat.Label'] = "Tile output format"
+    __parameter_input_metadata['TileOutputFormat.Required'] = False
+    __parameter_input_metadata['TileOutputFormat.Tooltip'] = (
+        "How the tiles are assembled if TileSize is specified:\n"
+        "GTiff: a single tiled GeoTIFF file.\n"
+        "VRT: a virtual raster (OutputFile) that references a GeoTIFF file for each tile that contains features,\n"
+        "in the folder with the OutputFile name without extension and with '_tiles' appended.")
+    __parameter_input_metadata['TileOutputFormat.Values'] = ["", "GTiff", "VRT"]
+    __parameter_input_metadata['TileOutputFormat.Value.Default'] = "GTiff"
+    # MaxWorkers
+    __parameter_input_metadata['MaxWorkers.Description'] = "number of threads"
+    __parameter_input_metadata['MaxWorkers.Label'] = "Maximum workers"
+    __parameter_input_metadata['MaxWorkers.Required'] = False
+    __parameter_input_metadata['MaxWorkers.Tooltip'] = (
+        "The number of threads used to rasterize tiles if TileSize is specified.")
+    __parameter_input_metadata['MaxWorkers.Value.Default'] = "1"
+
+    # Choices for TileOutputFormat, used to validate parameter and display in editor.
+    __choices_TileOutputFormat = ["GTiff", "VRT"]
+
+    # GDAL data type names for the 'gdal:rasterize' DATA_TYPE values.
+    __data_type_names = {0: "Byte", 1: "Int16", 4: "Int32", 5: "Float32", 6: "Float64"}
 
     def __init__(self) -> None:
         """
@@ -231,6 +267,45 @@ class RasterizeGeoLayer(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional TileSize and MaxWorkers parameters are positive integers.
+        for parameter in ["TileSize", "MaxWorkers"]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_int(parameter_value, True, True, zero_allowed=False):
+                message = "{} parameter value ({}) is invalid.".format(parameter, parameter_value)
+                recommendation = "Specify a positive integer."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional TileOutputFormat parameter is one of the acceptable values.
+        # noinspection PyPep8Naming
+        pv_TileOutputFormat = self.get_parameter_value(parameter_name="TileOutputFormat",
+                                                       command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_TileOutputFormat, self.__choices_TileOutputFormat,
+                                                      none_allowed=True, empty_string_allowed=True,
+                                                      ignore_case=True):
+            message = "TileOutputFormat parameter value ({}) is not recognized.".format(pv_TileOutputFormat)
+            recommendation = "Specify one of the acceptable values ({}) for the TileOutputFormat parameter.".format(
+                self.__choices_TileOutputFormat)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+        elif pv_TileOutputFormat is not None and pv_TileOutputFormat.upper() == "VRT":
+            # The tile files are next to the virtual raster, so a temporary output is not allowed.
+            # noinspection PyPep8Naming
+            pv_OutputFile = self.get_parameter_value(parameter_name="OutputFile", command_parameters=command_parameters)
+            # noinspection PyPep8Naming
+            pv_TileSize = self.get_parameter_value(parameter_name="TileSize", command_parameters=command_parameters)
+            if not pv_OutputFile or not pv_TileSize:
+                message = "TileOutputFormat=VRT requires the OutputFile and TileSize parameters."
+                recommendation = "Specify the OutputFile with .vrt extension and the TileSize."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -271,6 +346,79 @@ class RasterizeGeoLayer(AbstractCommand):
         else:
             return True
 
+    @staticmethod
+    def __estimate_output_size(alg_parameters: dict, extent: QgsRectangle) -> int or None:
+        """
+        Estimate the size of the rasterize output file, used to decide whether the file can be kept in memory.
+
+        Args:
+            alg_parameters (dict): the 'gdal:rasterize' algorithm parameters
+            extent (QgsRectangle): the output extent
+
+        Returns:
+            The estimated size of the output file in bytes, or None if the raster size is not specified.
+        """
+        if 'WIDTH' not in alg_parameters or 'HEIGHT' not in alg_parameters:
+            return None
+        if alg_parameters.get('UNITS', 0) == 0:
+            # Width and height are the number of pixels.
+            num_columns = alg_parameters['WIDTH']
+            num_rows = alg_parameters['HEIGHT']
+        else:
+            # Width and height are the cell size in georeferenced units.
+            if alg_parameters['WIDTH'] <= 0 or alg_parameters['HEIGHT'] <= 0:
+                return None
+            num_columns = extent.width() / alg_parameters['WIDTH']
+            num_rows = extent.height() / alg_parameters['HEIGHT']
+        # Bytes for DATA_TYPE values, default is Float32.
+        data_type_bytes = {0: 1, 1: 2, 4: 4, 5: 4, 6: 8}
+        return int(num_columns * num_rows * data_type_bytes.get(alg_parameters.get('DATA_TYPE', 5), 8))
+
+    def __rasterize_tiled(self, input_geolayer: VectorGeoLayer, alg_parameters: dict, extent: QgsRectangle,
+                          output_file: str, tile_size: int, tile_output_format: str, max_workers: int) -> None:
+        """
+        Rasterize one tile at a time using qgis_util.rasterize_qgsvectorlayer(),
+        using the same output grid and values as the 'gdal:rasterize' algorithm.
+
+        Args:
+            input_geolayer (VectorGeoLayer): the vector GeoLayer to rasterize
+            alg_parameters (dict): the 'gdal:rasterize' algorithm parameters
+            extent (QgsRectangle): the layer extent
+            output_file (str): the output GeoTIFF or VRT file
+            tile_size (int): the number of columns and rows in a tile
+            tile_output_format (str): "GTiff" or "VRT"
+            max_workers (int): the number of threads
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if the output size is not specified.
+        """
+        if 'WIDTH' not in alg_parameters or 'HEIGHT' not in alg_parameters:
+            raise ValueError("The raster width and height or cell width and height must be specified.")
+        if alg_parameters.get('UNITS', 0) == 0:
+            # Width and height are the number of pixels.
+            num_columns = int(alg_parameters['WIDTH'])
+            num_rows = int(alg_parameters['HEIGHT'])
+        else:
+            # Width and height are the cell size in georeferenced units:
+            # - determine the size the same as gdal_rasterize, keeping the cell size and top left corner
+            cell_width = float(alg_parameters['WIDTH'])
+            cell_height = float(alg_parameters['HEIGHT'])
+            num_columns = max(1, int(extent.width() / cell_width + 0.5))
+            num_rows = max(1, int(extent.height() / cell_height + 0.5))
+            extent = QgsRectangle(extent.xMinimum(), extent.yMaximum() - num_rows * cell_height,
+                                  extent.xMinimum() + num_columns * cell_width, extent.yMaximum())
+
+        tile_count = qgis_util.rasterize_qgsvectorlayer(
+            input_geolayer.qgs_layer, output_file, extent, num_columns, num_rows,
+            attribute=alg_parameters.get('FIELD'), burn_value=alg_parameters.get('BURN', 0),
+            data_type=self.__data_type_names[alg_parameters.get('DATA_TYPE', 5)],
+            nodata_value=alg_parameters.get('NODATA', 0), tile_size=tile_size, max_workers=max_workers,
+            output_format=tile_output_format)
+        self.logger.info("Rasterized {} tiles to: {}".format(tile_count, output_file))
+
     def run_command(self) -> None:
         """
         Run the command. Create the raster GeoLayer from the vector GeoLayer.
@@ -318,16 +466,29 @@ class RasterizeGeoLayer(AbstractCommand):
         pv_MissingValue = self.get_parameter_value("MissingValue")
         # noinspection PyPep8Naming
         pv_NewGeoLayerID = self.get_parameter_value("NewGeoLayerID")
+        # noinspection PyPep8Naming
+        pv_TileSize = self.get_parameter_value("TileSize")
+        tile_size = None
+        if pv_TileSize is not None and pv_TileSize != "":
+            tile_size = int(pv_TileSize)
+        # noinspection PyPep8Naming
+        pv_TileOutputFormat = self.get_parameter_value(
+            "TileOutputFormat", default_value=self.__parameter_input_metadata['TileOutputFormat.Value.Default'])
+        if pv_TileOutputFormat == "":
+            # noinspection PyPep8Naming
+            pv_TileOutputFormat = self.__parameter_input_metadata['TileOutputFormat.Value.Default']
+        # noinspection PyPep8Naming
+        pv_MaxWorkers = self.get_parameter_value(
+            "MaxWorkers", default_value=self.__parameter_input_metadata['MaxWorkers.Value.Default'])
+        max_workers = int(pv_MaxWorkers)
 
         # Convert the OutputFile parameter value relative path to an absolute path and expand for ${Property} syntax.
         output_is_tmp = False
+        raster_output_file = None
+        raster_aux_xml_output_file = None
         if pv_OutputFile is None or pv_OutputFile == "":
-            # Create a temporary file name.
+            # Use a raster scratch file, which is determined below when the size is known.
             output_is_tmp = True
-            now = datetime.today()
-            nowstring = '{:04d}-{:02d}-{:02d}-{:02d}-{:02d}-{:02d}.{}'.format(now.year, now.month, now.day,
-                                                                              now.hour, now.minute,
-                                                                              now.second, now.microsecond)
             # See:  https://svn.osgeo.org/gdal/tags/gdal_1_2_5/frmts/formats_list.html
             if raster_format_upper == 'GEOTIFF':
                 output_ext = 'tif'
@@ -336,14 +497,6 @@ class RasterizeGeoLayer(AbstractCommand):
                 output_ext = 'jpg'
             elif raster_format_upper == 'JPEG2000':
                 output_ext = 'j2k'
-            raster_output_file = Path(tempfile.gettempdir()).joinpath('gp-{}-rasterize-{}.{}'.format(
-                os.getpid(),
-                nowstring,
-                output_ext))
-            # Second file is layer extent.
-            raster_aux_xml_output_file = Path(tempfile.gettempdir()).joinpath('gp-{}-rasterize-{}.{}.aux.xml'.
-                                                                              format(os.getpid(), nowstring,
-                                                                                     output_ext))
         else:
             # Use the specified output file.
             output_file_absolute = io_util.verify_path_for_os(
@@ -433,6 +586,15 @@ class RasterizeGeoLayer(AbstractCommand):
                     else:
                         alg_parameters['NODATA'] = float(pv_MissingValue)
 
+                if output_is_tmp:
+                    # Get a raster scratch file, which is in memory if the size allows:
+                    # - the tiled output is written by GDAL in this process so can use a /vsimem/ file
+                    raster_output_file = Path(self.command_processor.get_raster_scratch_file(
+                        'rasterize', self.__estimate_output_size(alg_parameters, extent),
+                        in_process=tile_size is not None, ext=output_ext))
+                    # Second file is layer extent.
+                    raster_aux_xml_output_file = Path(str(raster_output_file) + ".aux.xml")
+
                 self.logger.info("Writing tmp output raster file: {}".format(raster_output_file))
                 self.logger.info("Writing tmp output aux.xml file: {}".format(raster_aux_xml_output_file))
                 alg_parameters['OUTPUT'] = str(raster_output_file)
@@ -468,19 +630,26 @@ class RasterizeGeoLayer(AbstractCommand):
                                                                         recommendation))
 
                 self.logger.info('Algorithm parameters: {}'.format(alg_parameters))
-                # Call runAlgorithm with the parameter "gdal:rasterize" and pass in the parameters defined above:
-                # - files ares still not unlinked
-                # - aux.xml file seems to be delayed writing, even requiring GeoProcessor to exit?
-                # - See:  https://gis.stackexchange.com/questions/136366/
-                #           turn-off-the-setting-of-qgis-to-produce-xml-when-closing
-                feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
-                alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
-                                                      algorithm="gdal:rasterize",
-                                                      algorithm_parameters=alg_parameters,
-                                                      feedback_handler=feedback_handler)
-                self.warning_count += feedback_handler.get_warning_count()
-                # Output is a dictionary.
-                self.logger.info("Algorithm output: {}".format(alg_output))
+                if tile_size is not None:
+                    self.__rasterize_tiled(input_geolayer, alg_parameters, extent, str(raster_output_file),
+                                           tile_size, pv_TileOutputFormat, max_workers)
+                else:
+                    # The algorithm runs the gdal_rasterize program so an in-memory layer must be written to a file.
+                    alg_parameters['INPUT'] = self.command_processor.prepare_algorithm_input(input_geolayer,
+                                                                                             memory_supported=False)
+                    # Call runAlgorithm with the parameter "gdal:rasterize" and pass in the parameters defined above:
+                    # - files ares still not unlinked
+                    # - aux.xml file seems to be delayed writing, even requiring GeoProcessor to exit?
+                    # - See:  https://gis.stackexchange.com/questions/136366/
+                    #           turn-off-the-setting-of-qgis-to-produce-xml-when-closing
+                    feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
+                    alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
+                                                          algorithm="gdal:rasterize",
+                                                          algorithm_parameters=alg_parameters,
+                                                          feedback_handler=feedback_handler)
+                    self.warning_count += feedback_handler.get_warning_count()
+                    # Output is a dictionary.
+                    self.logger.info("Algorithm output: {}".format(alg_output))
 
                 # Read the raster layer file that was created.
                 qgs_raster_layer = qgis_util.read_qgsrasterlayer_from_file(str(raster_output_file))
@@ -498,63 +667,16 @@ class RasterizeGeoLayer(AbstractCommand):
                                                   input_path=str(raster_output_file))
                     self.command_processor.add_geolayer(geolayer_obj)
 
-                if output_is_tmp:
+                if output_is_tmp and (pv_NewGeoLayerID is None or pv_NewGeoLayerID == ""):
                     # Remove the temporary files after running so that the file system does not fill up:
+                    # - if used by a new GeoLayer, the files are removed when the GeoLayer is freed
                     # - if not temporary file, leave the files
-                    if raster_output_file.exists():
-                        # noinspection PyBroadException
-                        try:
-                            raster_output_file.unlink()
-                            self.logger.info("Removed temporary raster output file: {}".format(raster_output_file))
-                        except Exception:
-                            message = "Error removing temporary layer file after rasterize: {}).".format(
-                                raster_output_file)
-                            self.logger.warning(message, exc_info=True)
-                            self.logger.warning("Will attempt to remove the next time GeoProcessor starts.")
-                            # TODO smalers 2020-07-19
-                            # self.warning_count += 1
-                            # recommendation = \
-                            #     "There is a known QGIS issue that is being evaluated. " \
-                            #     "Check the log file for details. " \
-                            #     "Will attempt to remove the next time GeoProcessor starts."
-                            # self.command_status.add_to_log(CommandPhaseType.RUN,
-                            #                                CommandLogRecord(CommandStatusType.WARNING, message,
-                            #                                                 recommendation))
-                            tmp_file_comments =\
-                                ["Temporary file created by RasterizeGeoLayer command, process {}".format(os.getpid())]
-                            io_util.add_tmp_file_to_remove(raster_output_file, tmp_file_comments)
-
-                    if raster_aux_xml_output_file.exists():
-                        # noinspection PyBroadException
-                        try:
-                            raster_aux_xml_output_file.unlink()
-                            self.logger.info("Removed temporary raster output file: {}".format(
-                                raster_aux_xml_output_file))
-                        except Exception:
-                            message = "Error removing temporary layer file after rasterize: {}).".format(
-                                raster_aux_xml_output_file)
-                            self.logger.warning(message, exc_info=True)
-                            self.logger.warning("Will attempt to remove the next time GeoProcessor starts.")
-                            # TODO smalers 2020-07-19
-                            # self.warning_count += 1
-                            # recommendation = \
-                            #     "There is a known QGIS issue that is being evaluated. "\
-                            #     "Check the log file for details. "\
-                            #     "Will attempt to remove the next time GeoProcessor starts."
-                            # self.command_status.add_to_log(CommandPhaseType.RUN,
-                            #                                CommandLogRecord(CommandStatusType.WARNING, message,
-                            #                                                 recommendation))
-                            tmp_file_comments =\
-                                ["Temporary file created by RasterizeGeoLayer command, process {}".format(os.getpid())]
-                            io_util.add_tmp_file_to_remove(raster_aux_xml_output_file, tmp_file_comments)
-                    else:
-                        # There seems to be a delay writing this file so add to the remove list just in case.
-                        tmp_file_comments = ["Temporary file created by RasterizeGeoLayer command, process {}".format(
-                            os.getpid())]
-                        io_util.add_tmp_file_to_remove(raster_aux_xml_output_file, tmp_file_comments)
+                    self.command_processor.remove_raster_scratch_file(raster_output_file)
 
             except Exception:
                 self.warning_count += 1
+                if output_is_tmp and raster_output_file is not None:
+                    self.command_processor.remove_raster_scratch_file(raster_output_file)
                 message = "Unexpected error rasterizing GeoLayer ({}).".format(pv_NewGeoLayerID)
                 recommendation = "Check the log file for details."
                 self.logger.warning(message, exc_info=True)
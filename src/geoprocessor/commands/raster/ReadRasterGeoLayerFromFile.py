@@ -33,6 +33,7 @@ import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.validator_util as validator_util
 
+import functools
 import os
 import logging
 
@@ -342,7 +343,16 @@ class ReadRasterGeoLayerFromFile(AbstractCommand):
             try:
                 # Create a QGSRasterLayer object in raster format.
                 # qgs_raster_layer = qgis_util.read_qgsrasterlayer_from_file(input_file_absolute, debug = debug)
-                qgs_raster_layer = qgis_util.read_qgsrasterlayer_from_file(input_file_absolute)
+                read_layer = functools.partial(qgis_util.read_qgsrasterlayer_from_file, input_file_absolute)
+                if self.command_processor.is_geolayer_lazy_load() and not input_is_url:
+                    # Record the file and CRS, and read the layer when it is first used.
+                    qgs_raster_layer = None
+                    qgs_layer_loader = read_layer
+                    crs_code = qgis_util.read_crs_code_from_file(input_file_absolute)
+                else:
+                    qgs_raster_layer = read_layer()
+                    qgs_layer_loader = None
+                    crs_code = None
 
                 file_extension = io_util.get_extension(pv_InputFile)
                 input_format = RasterFormatType.get_format_from_extension(file_extension)
@@ -353,7 +363,9 @@ class ReadRasterGeoLayerFromFile(AbstractCommand):
                                               qgs_raster_layer=qgs_raster_layer,
                                               input_format=input_format,
                                               input_path_full=input_file_absolute,
-                                              input_path=pv_InputFile)
+                                              input_path=pv_InputFile,
+                                              qgs_layer_loader=qgs_layer_loader,
+                                              crs_code=crs_code)
                 # Set the properties.
                 properties = command_util.parse_properties_from_parameter_string(pv_Properties)
                 # Set the properties as additional properties (don't just reset the property dictionary).
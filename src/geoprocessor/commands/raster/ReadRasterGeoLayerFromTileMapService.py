@@ -29,8 +29,12 @@ from geoprocessor.core import RasterFormatType
 from geoprocessor.core.RasterGeoLayer import RasterGeoLayer
 
 import geoprocessor.util.command_util as command_util
+import geoprocessor.util.io_util as io_util
+import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.tile_cache_util as tile_cache_util
 import geoprocessor.util.validator_util as validator_util
 
+import functools
 import logging
 
 
@@ -52,7 +56,13 @@ class ReadRasterGeoLayerFromTileMapService(AbstractCommand):
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
         CommandParameterMetadata("Properties", type("")),
-        CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
+        CommandParameterMetadata("IfGeoLayerIDExists", type("")),
+        CommandParameterMetadata("CacheFile", type("")),
+        CommandParameterMetadata("CacheMaxSize", type("")),
+        CommandParameterMetadata("CacheTTL", type("")),
+        CommandParameterMetadata("PrefetchExtent", type("")),
+        CommandParameterMetadata("PrefetchZoomLevels", type("")),
+        CommandParameterMetadata("PrefetchWorkers", type(""))]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -107,6 +117,56 @@ class ReadRasterGeoLayerFromTileMapService(AbstractCommand):
         "Fail : The new GeoLayer is not created. A fail message is logged.")
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+    # CacheFile
+    __parameter_input_metadata['CacheFile.Description'] = "local tile cache file"
+    __parameter_input_metadata['CacheFile.Label'] = "Cache file"
+    __parameter_input_metadata['CacheFile.Required'] = False
+    __parameter_input_metadata['CacheFile.Tooltip'] = (
+        "MBTiles file used as a local cache of tiles, created if it does not exist.\n"
+        "If specified, the GeoLayer is read from the cache rather than fetching tiles from the service each time.\n"
+        "Tiles are added to the cache by prefetching, which also sets the cache extent and zoom levels,\n"
+        "so PrefetchExtent and PrefetchZoomLevels are required. Tiles that are already cached are not fetched.\n"
+        "${Property} syntax is recognized.")
+    __parameter_input_metadata['CacheFile.Value.Default.Description'] = "no cache"
+    __parameter_input_metadata['CacheFile.FileSelector.Type'] = "Write"
+    # CacheMaxSize
+    __parameter_input_metadata['CacheMaxSize.Description'] = "maximum cache size (MB)"
+    __parameter_input_metadata['CacheMaxSize.Label'] = "Cache maximum size"
+    __parameter_input_metadata['CacheMaxSize.Required'] = False
+    __parameter_input_metadata['CacheMaxSize.Tooltip'] = (
+        "Maximum size of the cached tile images in megabytes.\n"
+        "The least recently fetched tiles are removed when the cache is larger.")
+    __parameter_input_metadata['CacheMaxSize.Value.Default.Description'] = "no limit"
+    # CacheTTL
+    __parameter_input_metadata['CacheTTL.Description'] = "tile time to live (seconds)"
+    __parameter_input_metadata['CacheTTL.Label'] = "Cache time to live"
+    __parameter_input_metadata['CacheTTL.Required'] = False
+    __parameter_input_metadata['CacheTTL.Tooltip'] = (
+        "Number of seconds after a tile is fetched that it expires and is fetched again.")
+    __parameter_input_metadata['CacheTTL.Value.Default.Description'] = "tiles do not expire"
+    # PrefetchExtent
+    __parameter_input_metadata['PrefetchExtent.Description'] = "extent to prefetch"
+    __parameter_input_metadata['PrefetchExtent.Label'] = "Prefetch extent"
+    __parameter_input_metadata['PrefetchExtent.Required'] = False
+    __parameter_input_metadata['PrefetchExtent.Tooltip'] = (
+        "Extent of tiles to prefetch into the cache as MinX,MinY,MaxX,MaxY in longitude and latitude degrees.\n"
+        "Requires CacheFile and PrefetchZoomLevels.")
+    __parameter_input_metadata['PrefetchExtent.Value.Default.Description'] = "no prefetch"
+    # PrefetchZoomLevels
+    __parameter_input_metadata['PrefetchZoomLevels.Description'] = "zoom levels to prefetch"
+    __parameter_input_metadata['PrefetchZoomLevels.Label'] = "Prefetch zoom levels"
+    __parameter_input_metadata['PrefetchZoomLevels.Required'] = False
+    __parameter_input_metadata['PrefetchZoomLevels.Tooltip'] = (
+        "Range of zoom levels to prefetch as MinZoom-MaxZoom (e.g., 0-12), or a single zoom level.\n"
+        "Requires CacheFile and PrefetchExtent.")
+    __parameter_input_metadata['PrefetchZoomLevels.Value.Default.Description'] = "no prefetch"
+    # PrefetchWorkers
+    __parameter_input_metadata['PrefetchWorkers.Description'] = "number of concurrent requests"
+    __parameter_input_metadata['PrefetchWorkers.Label'] = "Prefetch workers"
+    __parameter_input_metadata['PrefetchWorkers.Required'] = False
+    __parameter_input_metadata['PrefetchWorkers.Tooltip'] = (
+        "Number of concurrent tile requests when prefetching, which share a pool of connections.")
+    __parameter_input_metadata['PrefetchWorkers.Value.Default'] = "8"
 
     # Choices for IfGeoLayerIDExists, used to validate parameter and display in editor.
     __choices_IfGeoLayerIDExists = ["Replace", "ReplaceAndWarn", "Warn", "Fail"]
@@ -171,6 +231,56 @@ class ReadRasterGeoLayerFromTileMapService(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional CacheMaxSize, CacheTTL, and PrefetchWorkers parameters are positive integers.
+        for parameter in ["CacheMaxSize", "CacheTTL", "PrefetchWorkers"]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_int(parameter_value, True, True, zero_allowed=False):
+                message = "{} parameter value ({}) is invalid.".format(parameter, parameter_value)
+                recommendation = "Specify a positive integer."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional PrefetchExtent parameter is a valid rectangle.
+        # noinspection PyPep8Naming
+        pv_PrefetchExtent = self.get_parameter_value(parameter_name="PrefetchExtent",
+                                                     command_parameters=command_parameters)
+        if pv_PrefetchExtent is not None and pv_PrefetchExtent.find("${") < 0:
+            try:
+                qgis_util.parse_qgs_rectangle(pv_PrefetchExtent)
+            except ValueError as e:
+                message = "PrefetchExtent parameter value ({}) is invalid ({}).".format(pv_PrefetchExtent, e)
+                recommendation = "Specify MinX,MinY,MaxX,MaxY in longitude and latitude degrees."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional PrefetchZoomLevels parameter is a valid range.
+        # noinspection PyPep8Naming
+        pv_PrefetchZoomLevels = self.get_parameter_value(parameter_name="PrefetchZoomLevels",
+                                                         command_parameters=command_parameters)
+        if pv_PrefetchZoomLevels is not None and pv_PrefetchZoomLevels.find("${") < 0:
+            try:
+                tile_cache_util.parse_zoom_levels(pv_PrefetchZoomLevels)
+            except ValueError as e:
+                message = "PrefetchZoomLevels parameter value ({}) is invalid ({}).".format(pv_PrefetchZoomLevels, e)
+                recommendation = "Specify MinZoom-MaxZoom with zoom levels 0 to 24."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that the cache file is specified with the prefetch extent and zoom levels:
+        # - prefetching sets the cache metadata (bounds and zoom levels) that is needed to read the cache as a layer
+        # noinspection PyPep8Naming
+        pv_CacheFile = self.get_parameter_value(parameter_name="CacheFile", command_parameters=command_parameters)
+        if (pv_CacheFile or pv_PrefetchExtent or pv_PrefetchZoomLevels) and \
+                not (pv_CacheFile and pv_PrefetchExtent and pv_PrefetchZoomLevels):
+            message = "The CacheFile, PrefetchExtent, and PrefetchZoomLevels parameters must be specified together."
+            recommendation = "Specify all of the parameters to use a tile cache."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -184,15 +294,17 @@ class ReadRasterGeoLayerFromTileMapService(AbstractCommand):
             # Refresh the phase severity.
             self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
 
-    def check_runtime_data(self, input_url: str, geolayer_id: str) -> bool:
+    def check_runtime_data(self, input_url: str, geolayer_id: str, cache_file: str = None) -> bool:
         """
         Checks the following:
         * the input file (absolute) is a valid file
+        * the URL can be used to request tiles if a cache file is used
         * the ID of the output GeoLayer is unique (not an existing GeoLayer ID)
 
         Args:
             input_url: the URL to the Tile Map Service
             geolayer_id: the ID of the output GeoLayer
+            cache_file: the tile cache file, or None if not used
 
         Returns:
             run_read: Boolean. If TRUE, the read process should be run. If FALSE, the read process should not be run.
@@ -212,6 +324,16 @@ class ReadRasterGeoLayerFromTileMapService(AbstractCommand):
         #     self.command_status.add_to_log(CommandPhaseType.RUN,
         #                                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # If a tile cache is used, the URL must be a template for tile requests.
+        if cache_file and input_url.find("{z}") < 0:
+            run_read = False
+            self.warning_count += 1
+            message = "The InputUrl ({}) does not contain {{z}}, which is needed to cache tiles.".format(input_url)
+            recommendation = "Specify the URL with {z}, {x}, and {y} (or {-y}) for the tile position."
+            self.logger.warning(message)
+            self.command_status.add_to_log(CommandPhaseType.RUN,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # If the GeoLayerID is the same as an already-registered GeoLayerID,
         # react according to the pv_IfGeoLayerIDExists value.
         if self.command_processor.get_geolayer(geolayer_id):
@@ -328,13 +450,71 @@ class ReadRasterGeoLayerFromTileMapService(AbstractCommand):
         #                                       input_path=pv_InputFile)
         #         self.command_processor.add_geolayer(geolayer_obj)
 
-        if self.check_runtime_data(pv_InputUrl, pv_GeoLayerID):
+        # noinspection PyPep8Naming
+        pv_CacheFile = self.get_parameter_value("CacheFile")
+        cache_file_absolute = None
+        if pv_CacheFile:
+            cache_file_absolute = io_util.verify_path_for_os(
+                io_util.to_absolute_path(self.command_processor.get_property('WorkingDir'),
+                                         self.command_processor.expand_parameter_value(pv_CacheFile, self)))
+        # noinspection PyPep8Naming
+        pv_CacheMaxSize = self.get_parameter_value("CacheMaxSize")
+        cache_max_size = None
+        if pv_CacheMaxSize:
+            cache_max_size = int(pv_CacheMaxSize) * 1024 * 1024
+        # noinspection PyPep8Naming
+        pv_CacheTTL = self.get_parameter_value("CacheTTL")
+        cache_ttl = None
+        if pv_CacheTTL:
+            cache_ttl = int(pv_CacheTTL)
+        # noinspection PyPep8Naming
+        pv_PrefetchExtent = self.get_parameter_value("PrefetchExtent")
+        # noinspection PyPep8Naming
+        pv_PrefetchExtent = self.command_processor.expand_parameter_value(pv_PrefetchExtent, self)
+        # noinspection PyPep8Naming
+        pv_PrefetchZoomLevels = self.get_parameter_value("PrefetchZoomLevels")
+        # noinspection PyPep8Naming
+        pv_PrefetchZoomLevels = self.command_processor.expand_parameter_value(pv_PrefetchZoomLevels, self)
+        # noinspection PyPep8Naming
+        pv_PrefetchWorkers = self.get_parameter_value(
+            "PrefetchWorkers", default_value=self.parameter_input_metadata['PrefetchWorkers.Value.Default'])
+        prefetch_workers = int(pv_PrefetchWorkers)
+
+        if self.check_runtime_data(pv_InputUrl, pv_GeoLayerID, cache_file_absolute):
             try:
                 qgs_raster_layer = None
+                qgs_layer_loader = None
+                crs_code = None
+                if cache_file_absolute:
+                    # Prefetch tiles into the cache.
+                    extent = qgis_util.parse_qgs_rectangle(pv_PrefetchExtent)
+                    min_zoom, max_zoom = tile_cache_util.parse_zoom_levels(pv_PrefetchZoomLevels)
+                    counts = tile_cache_util.seed_tile_cache(
+                        cache_file_absolute, pv_InputUrl,
+                        [extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()],
+                        min_zoom, max_zoom, max_workers=prefetch_workers, max_size=cache_max_size,
+                        ttl=cache_ttl)
+                    if counts["Failed"] > 0:
+                        self.warning_count += 1
+                        message = "{} of the tiles could not be fetched from {}.".format(
+                            counts["Failed"], pv_InputUrl)
+                        recommendation = "Check the log file for details."
+                        self.logger.warning(message)
+                        self.command_status.add_to_log(CommandPhaseType.RUN,
+                                                       CommandLogRecord(CommandStatusType.WARNING,
+                                                                        message, recommendation))
+
+                    # Read the layer from the cache (MBTiles) file when it is first used.
+                    qgs_layer_loader = functools.partial(qgis_util.read_qgsrasterlayer_from_file,
+                                                         cache_file_absolute)
+                    crs_code = "EPSG:3857"
+
                 geolayer_obj = RasterGeoLayer(geolayer_id=pv_GeoLayerID,
                                               name=pv_GeoLayerID,
                                               description=pv_Description,
                                               qgs_raster_layer=qgs_raster_layer,
+                                              qgs_layer_loader=qgs_layer_loader,
+                                              crs_code=crs_code,
                                               input_format=RasterFormatType.WMTS,
                                               input_path_full=pv_InputUrl,
                                               input_path=pv_InputUrl)
@@ -30,7 +30,6 @@ from geoprocessor.core.QGISAlgorithmProcessingFeedbackHandler import QgisAlgorit
 from geoprocessor.core.RasterGeoLayer import RasterGeoLayer
 
 import geoprocessor.util.command_util as command_util
-import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
@@ -47,7 +46,8 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
     __command_parameter_metadata: [CommandParameterMetadata] = [
         CommandParameterMetadata("GeoLayerID", str),
         CommandParameterMetadata("Bands", str),
-        CommandParameterMetadata("OutputGeoLayerID", str)]
+        CommandParameterMetadata("OutputGeoLayerID", str),
+        CommandParameterMetadata("OutputMode", str)]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -74,6 +74,22 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
     __parameter_input_metadata['OutputGeoLayerID.Label'] = "Output GeoLayerID"
     __parameter_input_metadata['OutputGeoLayerID.Required'] = False
     __parameter_input_metadata['OutputGeoLayerID.Tooltip'] = "The output GeoLayerID."
+    # OutputMode
+    __parameter_input_metadata['OutputMode.Description'] = "output mode"
+    __parameter_input_metadata['OutputMode.Label'] = "Output mode"
+    __parameter_input_metadata['OutputMode.Required'] = False
+    __parameter_input_metadata['OutputMode.Tooltip'] = (
+        "File: materialize the bands using the QGIS 'gdal:rearrange_bands' algorithm, "
+        "which copies all cells to a temporary file.\n"
+        "VRT: create a virtual raster that references the input bands, which is immediate for large rasters.  "
+        "Cells are not copied until the layer is written, for example with WriteRasterGeoLayerToFile.  "
+        "The input GeoLayer must not be freed while the output is used, "
+        "and an in-memory input GeoLayer cannot be replaced.")
+    __parameter_input_metadata['OutputMode.Values'] = ["", "File", "VRT"]
+    __parameter_input_metadata['OutputMode.Value.Default'] = "File"
+
+    # Choices for OutputMode, used to validate parameter and display in editor.
+    __choices_OutputMode = ["File", "VRT"]
 
     def __init__(self) -> None:
         """
@@ -121,6 +137,19 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional OutputMode parameter is one of the acceptable values.
+        # noinspection PyPep8Naming
+        pv_OutputMode = self.get_parameter_value(parameter_name="OutputMode", command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_OutputMode, self.__choices_OutputMode,
+                                                      none_allowed=True, empty_string_allowed=True,
+                                                      ignore_case=True):
+            message = "OutputMode parameter value ({}) is not recognized.".format(pv_OutputMode)
+            recommendation = "Specify one of the acceptable values ({}) for the OutputMode parameter.".format(
+                self.__choices_OutputMode)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -133,15 +162,20 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
             # Refresh the phase severity.
             self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
 
-    def check_runtime_data(self, geolayer_id: str, bands: [int]) -> bool:
+    def check_runtime_data(self, geolayer_id: str, bands: [int], output_geolayer_id: str = None,
+                           output_mode: str = "File") -> bool:
         """
         Checks the following:
          * The ID of the input GeoLayer is an actual GeoLayer (if not, log an error message & do not continue.)
          * The input geolayer includes the requested band numbers
+         * A virtual output does not replace an input GeoLayer that uses a raster scratch file,
+           because the file would be removed when the input GeoLayer is freed
 
         Args:
             geolayer_id (str): the ID of the GeoLayer to add the new attribute
             bands ([int]): list of bands, each value 1+
+            output_geolayer_id (str): the output GeoLayerID, or None or empty to replace the input GeoLayer
+            output_mode (str): "File" or "VRT"
 
         Returns:
             run_ok: Boolean. If TRUE, OK to run. If FALSE, command should not be run.
@@ -174,6 +208,18 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
                     self.command_status.add_to_log(CommandPhaseType.RUN,
                                                    CommandLogRecord(CommandStatusType.WARNING, message, recommendation))
 
+            if output_mode.upper() == "VRT" and \
+                    (output_geolayer_id is None or output_geolayer_id == "" or output_geolayer_id == geolayer_id) and \
+                    input_geolayer.qgs_layer.source() in self.command_processor.raster_scratch_files:
+                run_ok = False
+                self.warning_count += 1
+                message = 'The input GeoLayer ({}) is in memory and cannot be replaced with a virtual raster.'.format(
+                    geolayer_id)
+                recommendation = 'Specify an OutputGeoLayerID or use OutputMode=File.'
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Return the Boolean to determine if the crs should be set. If TRUE, all checks passed.
         # If FALSE, one or many checks failed.
         return run_ok
@@ -198,6 +244,12 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
         pv_Bands = self.get_parameter_value("Bands")
         # noinspection PyPep8Naming
         pv_OutputGeoLayerID = self.get_parameter_value("OutputGeoLayerID")
+        # noinspection PyPep8Naming
+        pv_OutputMode = self.get_parameter_value(
+            "OutputMode", default_value=self.__parameter_input_metadata['OutputMode.Value.Default'])
+        if pv_OutputMode == "":
+            # noinspection PyPep8Naming
+            pv_OutputMode = self.__parameter_input_metadata['OutputMode.Value.Default']
 
         # Convert the pv_GeoLayerID parameter to expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -212,7 +264,7 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
             bands = string_util.delimited_string_to_int_list(pv_Bands, ",")
 
         # Run the checks on the parameter values. Only continue if the checks passed.
-        if self.check_runtime_data(pv_GeoLayerID, bands):
+        if self.check_runtime_data(pv_GeoLayerID, bands, pv_OutputGeoLayerID, pv_OutputMode):
             # Run the process.
 
             raster_output_file = None
@@ -221,44 +273,63 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
                 # Get the input GeoLayer.
                 input_geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
 
-                # Rearrange the layer bands:
-                # - output is to a temporary file so have to read it
-
-                # Get the temporary folder based on TemporaryFolder parameter:
-                # - for now use the system temporary folder
-                output_ext = "tif"
-                raster_output_file = io_util.create_tmp_filename('gp', 'rearrange_bands', output_ext)
-                self.logger.info("Temporary file is: {}".format(raster_output_file))
-
-                # See:
-                #   https://docs.qgis.org/3.16/en/docs/user_manual/processing_algs/gdal/rasterconversion.html
-                #      #rearrange-bands
-                # GeoTIF OPTIONS:
-                # https://gdal.org/drivers/raster/gtiff.html#raster-gtiff
-                #
-                # See cloud optimized GeoTIFF:  https://trac.osgeo.org/gdal/wiki/CloudOptimizedGeoTIFF
-
-                # The following parameters are for GeoTIFF.
-                alg_parameters = {
-                    # Generic parameters regardless of output format.
-                    "INPUT": input_geolayer.qgs_layer,
-                    "BANDS": bands,
-                    "OUTPUT": str(raster_output_file),
-                    # The following are for GeoTIFF.
-                    "OPTIONS": "TILED=YES|COPY_SRC_OVERVIEWS=YES|COMPRESS=LZW",
-                }
-                feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
-                alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
-                                                      algorithm="gdal:rearrange_bands",
-                                                      algorithm_parameters=alg_parameters,
-                                                      feedback_handler=feedback_handler)
-                self.warning_count += feedback_handler.get_warning_count()
-                # Output is a dictionary.
-                self.logger.info("Algorithm output: {}".format(alg_output))
+                if pv_OutputMode.upper() == "VRT":
+                    # Create a virtual raster that references the input bands:
+                    # - no cells are copied until the layer is read, for example when written to a file
+                    # - if the input is a file, the VRT is also a file so that the GDAL programs run by
+                    #   'gdal:' algorithms can read it without copying the input to a scratch file
+                    # - if the input is in GDAL's /vsimem/ in-memory file system, the VRT must also be in memory
+                    input_file = input_geolayer.qgs_layer.source()
+                    raster_output_file = self.command_processor.get_raster_scratch_file(
+                        'rearrange_bands', 0, in_process=input_file.startswith("/vsimem/"), ext="vrt")
+                    self.logger.info("Temporary file is: {}".format(raster_output_file))
+                    qgis_util.rearrange_raster_file_bands(input_file, raster_output_file, bands)
+                    output_file = raster_output_file
+                else:
+                    # Rearrange the layer bands:
+                    # - output is to a temporary file so have to read it
+
+                    # Get a raster scratch file, which is in memory if the size allows:
+                    # - the output is about the same size as the input
+                    raster_output_file = self.command_processor.get_raster_scratch_file(
+                        'rearrange_bands', qgis_util.estimate_qgsrasterlayer_size(input_geolayer.qgs_layer))
+                    self.logger.info("Temporary file is: {}".format(raster_output_file))
+
+                    # See:
+                    #   https://docs.qgis.org/3.16/en/docs/user_manual/processing_algs/gdal/rasterconversion.html
+                    #      #rearrange-bands
+                    # GeoTIF OPTIONS:
+                    # https://gdal.org/drivers/raster/gtiff.html#raster-gtiff
+                    #
+                    # See cloud optimized GeoTIFF:  https://trac.osgeo.org/gdal/wiki/CloudOptimizedGeoTIFF
+
+                    # The following parameters are for GeoTIFF.
+                    alg_parameters = {
+                        # Generic parameters regardless of output format.
+                        "BANDS": bands,
+                        "OUTPUT": str(raster_output_file),
+                        # The following are for GeoTIFF:
+                        # - the file is an intermediate that is read once so is not compressed
+                        "OPTIONS": "TILED=YES|COPY_SRC_OVERVIEWS=YES",
+                    }
+                    feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
+                    alg_parameters["INPUT"] = self.command_processor.prepare_raster_algorithm_input(input_geolayer)
+                    try:
+                        alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
+                                                              algorithm="gdal:rearrange_bands",
+                                                              algorithm_parameters=alg_parameters,
+                                                              feedback_handler=feedback_handler)
+                    finally:
+                        # Remove the copy of an in-memory input raster.
+                        self.command_processor.free_raster_algorithm_input(alg_parameters["INPUT"])
+                    self.warning_count += feedback_handler.get_warning_count()
+                    # Output is a dictionary.
+                    self.logger.info("Algorithm output: {}".format(alg_output))
+                    output_file = alg_output['OUTPUT']
 
                 # Create a new QgsRasterLayer from the temporary file:
                 # - output file name should be the same as specified but get from results to confirm
-                rearranged_layer = qgis_util.read_qgsrasterlayer_from_file(alg_output['OUTPUT'])
+                rearranged_layer = qgis_util.read_qgsrasterlayer_from_file(output_file)
                 self.logger.info("Layer metadata after rearranging bands:")
                 qgis_util.log_raster_metadata(rearranged_layer, logger=self.logger)
 
@@ -278,6 +349,8 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
                                               input_path=GeoLayer.SOURCE_MEMORY)
 
                 self.command_processor.add_geolayer(new_geolayer)
+                # The GeoLayer uses the file, which is removed when the GeoLayer is freed.
+                raster_output_file = None
 
             except Exception:
                 # Raise an exception if an unexpected error occurs during the process.
@@ -288,9 +361,9 @@ class RearrangeRasterGeoLayerBands(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.RUN,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
             finally:
-                # Remove the temporary file to optimize disk space use.
+                # Remove the temporary file if it was not used by a new GeoLayer.
                 if raster_output_file is not None:
-                    io_util.remove_tmp_file(raster_output_file)
+                    self.command_processor.remove_raster_scratch_file(raster_output_file)
 
         # Determine success of command processing. Raise Runtime Error if any errors occurred.
         if self.warning_count > 0:
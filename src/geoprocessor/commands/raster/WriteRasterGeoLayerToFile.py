@@ -32,6 +32,7 @@ from geoprocessor.core.QGISAlgorithmProcessingFeedbackHandler import QgisAlgorit
 import geoprocessor.util.command_util as command_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
@@ -46,7 +47,14 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
     __command_parameter_metadata = [
         CommandParameterMetadata("GeoLayerID", str),
         CommandParameterMetadata("OutputFile", str),
-        CommandParameterMetadata("OutputCRS", str)]
+        CommandParameterMetadata("OutputCRS", str),
+        CommandParameterMetadata("OutputProfile", str),
+        CommandParameterMetadata("BlockSize", str),
+        CommandParameterMetadata("Compression", str),
+        CommandParameterMetadata("Predictor", str),
+        CommandParameterMetadata("OverviewLevels", str),
+        CommandParameterMetadata("OverviewResampling", str),
+        CommandParameterMetadata("NumThreads", str)]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -54,6 +62,8 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
         "Write a raster GeoLayer to a file.\n"
         "The raster file format is determined from the file extension.\n"
         "The coordinate reference system (CRS) can optionally be changed for the output.\n"
+        "An output profile can be specified to write a tiled GeoTIFF or Cloud Optimized GeoTIFF (COG)\n"
+        "with overviews, which is fast to read for web maps and large rasters.\n"
     )
     __command_metadata['EditorType'] = "Simple"
 
@@ -82,6 +92,69 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
         "If the output CRS is different than the CRS of the GeoLayer, the output GeoJSON is reprojected "
         "to the new CRS.")
     __parameter_input_metadata['OutputCRS.Value.Default'] = "CRS from input"
+    # OutputProfile
+    __parameter_input_metadata['OutputProfile.Description'] = "GeoTIFF output profile"
+    __parameter_input_metadata['OutputProfile.Label'] = "Output profile"
+    __parameter_input_metadata['OutputProfile.Tooltip'] = (
+        "GeoTIFF layout, which enables the parameters below:\n"
+        "GTiff: tiled GeoTIFF, with overviews after the full resolution data.\n"
+        "COG: Cloud Optimized GeoTIFF, with overviews before the full resolution data, "
+        "for reading over HTTP.\n"
+        "If not specified, the GDAL 'translate' algorithm is used, with LZW compression and tiles for TIF files.")
+    __parameter_input_metadata['OutputProfile.Values'] = ["", "GTiff", "COG"]
+    __parameter_input_metadata['OutputProfile.Value.Default.Description'] = "use GDAL 'translate'"
+    # BlockSize
+    __parameter_input_metadata['BlockSize.Description'] = "tile size in pixels"
+    __parameter_input_metadata['BlockSize.Label'] = "Block size"
+    __parameter_input_metadata['BlockSize.Tooltip'] = \
+        "Tile width and height in pixels, a multiple of 16, used with OutputProfile."
+    __parameter_input_metadata['BlockSize.Value.Default'] = "512"
+    # Compression
+    __parameter_input_metadata['Compression.Description'] = "compression"
+    __parameter_input_metadata['Compression.Label'] = "Compression"
+    __parameter_input_metadata['Compression.Tooltip'] = (
+        "Compression used with OutputProfile.  JPEG and WEBP are lossy and only work with Byte data.")
+    __parameter_input_metadata['Compression.Values'] = ["", "None", "LZW", "Deflate", "ZSTD", "LERC", "JPEG", "WEBP"]
+    __parameter_input_metadata['Compression.Value.Default'] = "LZW"
+    # Predictor
+    __parameter_input_metadata['Predictor.Description'] = "compression predictor"
+    __parameter_input_metadata['Predictor.Label'] = "Predictor"
+    __parameter_input_metadata['Predictor.Tooltip'] = (
+        "Compression predictor used with OutputProfile, which improves LZW, Deflate and ZSTD compression:\n"
+        "Horizontal: for integer data.\n"
+        "FloatingPoint: for floating point data.\n"
+        "Auto: use the predictor for the data type.")
+    __parameter_input_metadata['Predictor.Values'] = ["", "None", "Auto", "Horizontal", "FloatingPoint"]
+    __parameter_input_metadata['Predictor.Value.Default'] = "None"
+    # OverviewLevels
+    __parameter_input_metadata['OverviewLevels.Description'] = "overview levels"
+    __parameter_input_metadata['OverviewLevels.Label'] = "Overview levels"
+    __parameter_input_metadata['OverviewLevels.Tooltip'] = (
+        "Overview decimation factors used with OutputProfile, for example: 2,4,8,16\n"
+        "Auto: add levels until the overview fits in one tile.\n"
+        "None: no overviews.\n"
+        "For COG, the levels must be 2,4,8, etc.")
+    __parameter_input_metadata['OverviewLevels.Value.Default.Description'] = "Auto for COG, None for GTiff"
+    # OverviewResampling
+    __parameter_input_metadata['OverviewResampling.Description'] = "overview resampling"
+    __parameter_input_metadata['OverviewResampling.Label'] = "Overview resampling"
+    __parameter_input_metadata['OverviewResampling.Tooltip'] = (
+        "Resampling method used to calculate overviews.  Use Nearest or Mode for categorical data.")
+    __parameter_input_metadata['OverviewResampling.Values'] = \
+        ["", "Nearest", "Average", "Bilinear", "Cubic", "CubicSpline", "Lanczos", "Mode"]
+    __parameter_input_metadata['OverviewResampling.Value.Default'] = "Average"
+    # NumThreads
+    __parameter_input_metadata['NumThreads.Description'] = "number of threads"
+    __parameter_input_metadata['NumThreads.Label'] = "Number of threads"
+    __parameter_input_metadata['NumThreads.Tooltip'] = (
+        "Number of threads used with OutputProfile to compress tiles and build overviews, or ALL_CPUS.")
+    __parameter_input_metadata['NumThreads.Value.Default'] = "ALL_CPUS"
+
+    # Choices for parameters, used to validate parameter and display in editor.
+    __choices_OutputProfile = ["GTiff", "COG"]
+    __choices_Compression = ["None", "LZW", "Deflate", "ZSTD", "LERC", "JPEG", "WEBP"]
+    __choices_Predictor = ["None", "Auto", "Horizontal", "FloatingPoint"]
+    __choices_OverviewResampling = ["Nearest", "Average", "Bilinear", "Cubic", "CubicSpline", "Lanczos", "Mode"]
 
     def __init__(self) -> None:
         """
@@ -129,6 +202,49 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional parameters with choices have valid values.
+        for parameter_name, choices in [("OutputProfile", self.__choices_OutputProfile),
+                                        ("Compression", self.__choices_Compression),
+                                        ("Predictor", self.__choices_Predictor),
+                                        ("OverviewResampling", self.__choices_OverviewResampling)]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter_name,
+                                                       command_parameters=command_parameters)
+            if not validator_util.validate_string_in_list(parameter_value, choices, none_allowed=True,
+                                                          empty_string_allowed=True, ignore_case=True):
+                message = "{} parameter value ({}) is not recognized.".format(parameter_name, parameter_value)
+                recommendation = "Specify one of the acceptable values ({}) for the {} parameter.".format(
+                    choices, parameter_name)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional BlockSize parameter is a multiple of 16.
+        # noinspection PyPep8Naming
+        pv_BlockSize = self.get_parameter_value(parameter_name="BlockSize", command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_BlockSize, True, True, zero_allowed=False) or \
+                (pv_BlockSize is not None and pv_BlockSize != "" and int(pv_BlockSize) % 16 != 0):
+            message = "BlockSize parameter value ({}) is invalid.".format(pv_BlockSize)
+            recommendation = "Specify a multiple of 16, for example 256 or 512."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional OverviewLevels parameter is Auto, None, or a list of integers.
+        # noinspection PyPep8Naming
+        pv_OverviewLevels = self.get_parameter_value(parameter_name="OverviewLevels",
+                                                     command_parameters=command_parameters)
+        if pv_OverviewLevels is not None and pv_OverviewLevels != "" and \
+                pv_OverviewLevels.upper() not in ["AUTO", "NONE"]:
+            for level in string_util.delimited_string_to_list(pv_OverviewLevels):
+                if not validator_util.validate_int(level, False, False) or int(level) < 2:
+                    message = "OverviewLevels parameter value ({}) is invalid.".format(pv_OverviewLevels)
+                    recommendation = "Specify Auto, None, or levels 2+, for example: 2,4,8,16"
+                    warning_message += "\n" + message
+                    self.command_status.add_to_log(
+                        CommandPhaseType.INITIALIZATION,
+                        CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+                    break
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -193,6 +309,27 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
         pv_OutputFile = self.get_parameter_value("OutputFile")
         # noinspection PyPep8Naming
         pv_OutputCRS = self.get_parameter_value("OutputCRS")
+        # noinspection PyPep8Naming
+        pv_OutputProfile = self.get_parameter_value("OutputProfile")
+        # noinspection PyPep8Naming
+        pv_BlockSize = self.get_parameter_value(
+            "BlockSize", default_value=self.__parameter_input_metadata['BlockSize.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_Compression = self.get_parameter_value(
+            "Compression", default_value=self.__parameter_input_metadata['Compression.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_Predictor = self.get_parameter_value(
+            "Predictor", default_value=self.__parameter_input_metadata['Predictor.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_OverviewLevels = self.get_parameter_value("OverviewLevels")
+        # noinspection PyPep8Naming
+        pv_OverviewResampling = self.get_parameter_value(
+            "OverviewResampling", default_value=self.__parameter_input_metadata['OverviewResampling.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_NumThreads = self.get_parameter_value(
+            "NumThreads", default_value=self.__parameter_input_metadata['NumThreads.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_NumThreads = self.command_processor.expand_parameter_value(pv_NumThreads, self)
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -234,14 +371,34 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
                     crs = geolayer.qgs_layer.crs()
 
                 use_gdal_translate = True
-                if use_gdal_translate:
+                if pv_OutputProfile is not None and pv_OutputProfile != "":
+                    # Write a tiled GeoTIFF or COG using GDAL in this process, which allows overviews.
+                    use_gdal_translate = False
+                    if pv_OverviewLevels is None or pv_OverviewLevels == "":
+                        overview_levels = "Auto" if pv_OutputProfile.upper() == "COG" else None
+                    elif pv_OverviewLevels.upper() in ["AUTO", "NONE"]:
+                        overview_levels = pv_OverviewLevels
+                    else:
+                        overview_levels = [int(level) for level in
+                                           string_util.delimited_string_to_list(pv_OverviewLevels)]
+                    qgis_util.write_raster_file_to_geotiff(
+                        geolayer.qgs_layer.source(), output_file_absolute,
+                        profile=pv_OutputProfile,
+                        block_size=int(pv_BlockSize) if pv_BlockSize != "" else 512,
+                        compression=pv_Compression,
+                        predictor=pv_Predictor,
+                        overview_levels=overview_levels,
+                        overview_resampling=pv_OverviewResampling if pv_OverviewResampling != "" else "Average",
+                        num_threads=pv_NumThreads,
+                        output_crs=crs if (pv_OutputCRS is not None and pv_OutputCRS != "") else None)
+                    self.command_processor.add_output_file(output_file_absolute)
+                elif use_gdal_translate:
                     # Use GDAL translate algorithm because it accepts any output format.
                     self.logger.info("Using GDAL 'translate' to change format and/or CRS and write raster.")
 
                     # The following parameters are for GeoTIFF.
                     alg_parameters = {
                         # Generic parameters regardless of output format.
-                        "INPUT": geolayer.qgs_layer,
                         "OUTPUT": str(output_file_absolute),
                         "TARGET_CRS": crs.geographicCrsAuthId()
                         # NODATA
@@ -259,12 +416,17 @@ class WriteRasterGeoLayerToFile(AbstractCommand):
                         # See cloud optimized GeoTIFF:  https://trac.osgeo.org/gdal/wiki/CloudOptimizedGeoTIFF
                         alg_parameters["OPTIONS"] = "TILED=YES|COPY_SRC_OVERVIEWS=YES|COMPRESS=LZW"
 
-                    self.logger.info("Algorithm parameters: {}".format(alg_parameters))
                     feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
-                    alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
-                                                          algorithm="gdal:translate",
-                                                          algorithm_parameters=alg_parameters,
-                                                          feedback_handler=feedback_handler)
+                    alg_parameters["INPUT"] = self.command_processor.prepare_raster_algorithm_input(geolayer)
+                    try:
+                        self.logger.info("Algorithm parameters: {}".format(alg_parameters))
+                        alg_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
+                                                              algorithm="gdal:translate",
+                                                              algorithm_parameters=alg_parameters,
+                                                              feedback_handler=feedback_handler)
+                    finally:
+                        # Remove the copy of an in-memory input raster.
+                        self.command_processor.free_raster_algorithm_input(alg_parameters["INPUT"])
                     self.warning_count += feedback_handler.get_warning_count()
                     self.logger.info("Algorithm OUTPUT={}".format(alg_output['OUTPUT']))
 
@@ -0,0 +1,336 @@
+# SetPropertiesFromRasterStatistics - command to set processor properties from raster GeoLayer band statistics
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+from geoprocessor.commands.abstract.AbstractCommand import AbstractCommand
+
+from geoprocessor.core.CommandError import CommandError
+from geoprocessor.core.CommandLogRecord import CommandLogRecord
+from geoprocessor.core.CommandParameterError import CommandParameterError
+from geoprocessor.core.CommandParameterMetadata import CommandParameterMetadata
+from geoprocessor.core.CommandPhaseType import CommandPhaseType
+from geoprocessor.core.CommandStatusType import CommandStatusType
+
+import geoprocessor.util.command_util as command_util
+import geoprocessor.util.string_util as string_util
+import geoprocessor.util.validator_util as validator_util
+
+import logging
+
+
+class SetPropertiesFromRasterStatistics(AbstractCommand):
+    """
+    The SetPropertiesFromRasterStatistics command sets GeoProcessor properties from the band statistics
+    of a raster GeoLayer, for example to set the range of a graduated symbol or to check the values.
+    The statistics are cached on the RasterGeoLayer and in the raster's '.aux.xml' file,
+    so the raster is only scanned the first time.
+    """
+
+    __command_parameter_metadata: [CommandParameterMetadata] = [
+        CommandParameterMetadata("GeoLayerID", type("")),
+        CommandParameterMetadata("Bands", type("")),
+        CommandParameterMetadata("Statistics", type("")),
+        CommandParameterMetadata("Approximate", type("")),
+        CommandParameterMetadata("HistogramBins", type("")),
+        CommandParameterMetadata("PropertyPrefix", type(""))
+    ]
+
+    # Command metadata for command editor display.
+    __command_metadata = dict()
+    __command_metadata['Description'] = (
+        "Set the values of properties used by the processor, by using the band statistics of a raster GeoLayer.\n"
+        "Property names are the prefix, band, and statistic, for example:  dem_Band1Maximum")
+    __command_metadata['EditorType'] = "Simple"
+
+    # Command Parameter Metadata.
+    __parameter_input_metadata = dict()
+    # GeoLayerID
+    __parameter_input_metadata['GeoLayerID.Description'] = "raster GeoLayer identifier"
+    __parameter_input_metadata['GeoLayerID.Label'] = "GeoLayerID"
+    __parameter_input_metadata['GeoLayerID.Required'] = True
+    __parameter_input_metadata['GeoLayerID.Tooltip'] = "The raster GeoLayer identifier, can use ${Property} syntax."
+    # Bands
+    __parameter_input_metadata['Bands.Description'] = "bands to process"
+    __parameter_input_metadata['Bands.Label'] = "Bands"
+    __parameter_input_metadata['Bands.Tooltip'] = "Comma-separated band numbers (1+)."
+    __parameter_input_metadata['Bands.Value.Default.Description'] = "all bands"
+    # Statistics
+    __parameter_input_metadata['Statistics.Description'] = "statistics to set"
+    __parameter_input_metadata['Statistics.Label'] = "Statistics"
+    __parameter_input_metadata['Statistics.Tooltip'] = (
+        "Comma-separated statistics:  Minimum, Maximum, Mean, StdDev, ValidPercent, Histogram.\n"
+        "Histogram sets a list of counts and also the HistogramMinimum and HistogramMaximum properties.")
+    __parameter_input_metadata['Statistics.Value.Default'] = "Minimum,Maximum,Mean,StdDev"
+    # Approximate
+    __parameter_input_metadata['Approximate.Description'] = "whether approximate statistics are OK"
+    __parameter_input_metadata['Approximate.Label'] = "Approximate?"
+    __parameter_input_metadata['Approximate.Tooltip'] = (
+        "True: calculate the statistics from overviews or a sample of the raster, which is fast for large rasters.\n"
+        "False: calculate the statistics from all cells.")
+    __parameter_input_metadata['Approximate.Values'] = ["", "False", "True"]
+    __parameter_input_metadata['Approximate.Value.Default'] = "False"
+    # HistogramBins
+    __parameter_input_metadata['HistogramBins.Description'] = "number of histogram bins"
+    __parameter_input_metadata['HistogramBins.Label'] = "Histogram bins"
+    __parameter_input_metadata['HistogramBins.Tooltip'] = \
+        "The number of histogram bins between the minimum and maximum, used if Statistics includes Histogram."
+    __parameter_input_metadata['HistogramBins.Value.Default'] = "256"
+    # PropertyPrefix
+    __parameter_input_metadata['PropertyPrefix.Description'] = "prefix for property names"
+    __parameter_input_metadata['PropertyPrefix.Label'] = "Property prefix"
+    __parameter_input_metadata['PropertyPrefix.Tooltip'] = \
+        "Prefix for the property names, can use ${Property} syntax."
+    __parameter_input_metadata['PropertyPrefix.Value.Default.Description'] = "GeoLayerID and underscore"
+
+    # Choices for Statistics, used to validate parameter and display in editor.
+    __choices_Statistics = ["Minimum", "Maximum", "Mean", "StdDev", "ValidPercent", "Histogram"]
+
+    def __init__(self) -> None:
+        """
+        Initialize a command instance.
+        """
+        # AbstractCommand data.
+        super().__init__()
+        self.command_name = "SetPropertiesFromRasterStatistics"
+        self.command_parameter_metadata = self.__command_parameter_metadata
+
+        # Command metadata for command editor display.
+        self.command_metadata = self.__command_metadata
+
+        # Command Parameter Metadata.
+        self.parameter_input_metadata = self.__parameter_input_metadata
+
+        # Class data.
+        self.warning_count = 0
+        self.logger = logging.getLogger(__name__)
+
+    def check_command_parameters(self, command_parameters: dict) -> None:
+        """
+        Check the command parameters for validity.
+
+        Args:
+            command_parameters: the dictionary of command parameters to check (key:string_value)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError if any parameters are invalid or do not have a valid value.
+            The command status messages for initialization are populated with validation messages.
+        """
+        warning_message = ""
+
+        # Check that required parameters are non-empty, non-None strings.
+        required_parameters = command_util.get_required_parameter_names(self)
+        for parameter in required_parameters:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_string(parameter_value, False, False):
+                message = "Required {} parameter has no value.".format(parameter)
+                recommendation = "Specify the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional Bands parameter only includes positive integers.
+        # noinspection PyPep8Naming
+        pv_Bands = self.get_parameter_value(parameter_name="Bands", command_parameters=command_parameters)
+        if pv_Bands is not None and pv_Bands != "":
+            for band in string_util.delimited_string_to_list(pv_Bands):
+                if not validator_util.validate_int(band, False, False, zero_allowed=False):
+                    message = "Bands parameter value ({}) is invalid.".format(band)
+                    recommendation = "Specify band numbers 1+."
+                    warning_message += "\n" + message
+                    self.command_status.add_to_log(
+                        CommandPhaseType.INITIALIZATION,
+                        CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional Statistics parameter only includes valid statistics.
+        # noinspection PyPep8Naming
+        pv_Statistics = self.get_parameter_value(parameter_name="Statistics", command_parameters=command_parameters)
+        if pv_Statistics is not None and pv_Statistics != "":
+            for statistic in string_util.delimited_string_to_list(pv_Statistics):
+                if not validator_util.validate_string_in_list(statistic, self.__choices_Statistics,
+                                                              none_allowed=False, empty_string_allowed=False,
+                                                              ignore_case=True):
+                    message = "Statistics parameter value ({}) is not recognized.".format(statistic)
+                    recommendation = "Specify one or more of the acceptable values ({}) for the " \
+                                     "Statistics parameter.".format(self.__choices_Statistics)
+                    warning_message += "\n" + message
+                    self.command_status.add_to_log(
+                        CommandPhaseType.INITIALIZATION,
+                        CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional Approximate parameter is a boolean.
+        # noinspection PyPep8Naming
+        pv_Approximate = self.get_parameter_value(parameter_name="Approximate", command_parameters=command_parameters)
+        if not validator_util.validate_bool(pv_Approximate, True, True):
+            message = "Approximate parameter value ({}) is invalid.".format(pv_Approximate)
+            recommendation = "Specify True or False."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional HistogramBins parameter is a positive integer.
+        # noinspection PyPep8Naming
+        pv_HistogramBins = self.get_parameter_value(parameter_name="HistogramBins",
+                                                    command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_HistogramBins, True, True, zero_allowed=False):
+            message = "HistogramBins parameter value ({}) is invalid.".format(pv_HistogramBins)
+            recommendation = "Specify a number of bins 1+."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check for unrecognized parameters.
+        # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
+        warning_message = command_util.validate_command_parameter_names(self, warning_message)
+
+        # If any warnings were generated, throw an exception.
+        if len(warning_message) > 0:
+            self.logger.warning(warning_message)
+            raise CommandParameterError(warning_message)
+
+        # Refresh the phase severity.
+        self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
+
+    def check_runtime_data(self, geolayer_id: str, bands: [int]) -> bool:
+        """
+        Checks the following:
+        * the GeoLayer exists and is a raster
+        * the raster has the requested bands
+
+        Args:
+            geolayer_id (str): the ID of the raster GeoLayer
+            bands ([int]): the band numbers
+
+        Returns:
+             Boolean. If TRUE, the properties should be set. If FALSE, at least one check failed.
+        """
+
+        # If the GeoLayerID is not an existing GeoLayerID, raise a FAILURE.
+        if not validator_util.run_check(self, "IsGeoLayerIDExisting", "GeoLayerID", geolayer_id, "FAIL"):
+            return False
+
+        geolayer = self.command_processor.get_geolayer(geolayer_id)
+        if not geolayer.is_raster():
+            message = 'The GeoLayer ({}) is not a raster GeoLayer.'.format(geolayer_id)
+            recommendation = 'Specify a raster GeoLayer.'
+            self.warning_count += 1
+            self.logger.warning(message)
+            self.command_status.add_to_log(CommandPhaseType.RUN,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+            return False
+
+        should_run_command = True
+        for band in bands:
+            if band > geolayer.get_num_bands():
+                should_run_command = False
+                message = 'The raster GeoLayer ({}) does not have band {}.'.format(geolayer_id, band)
+                recommendation = 'Specify bands 1 to {}.'.format(geolayer.get_num_bands())
+                self.warning_count += 1
+                self.logger.warning(message)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+        return should_run_command
+
+    def run_command(self) -> None:
+        """
+        Run the command.  Set GeoProcessor properties to the raster GeoLayer band statistics.
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError if an exception occurs, for example if the statistics cannot be calculated.
+        """
+        self.warning_count = 0
+
+        # noinspection PyPep8Naming
+        pv_GeoLayerID = self.get_parameter_value("GeoLayerID")
+        # noinspection PyPep8Naming
+        pv_GeoLayerID = self.command_processor.expand_parameter_value(pv_GeoLayerID, self)
+        # noinspection PyPep8Naming
+        pv_Bands = self.get_parameter_value("Bands", default_value="")
+        # noinspection PyPep8Naming
+        pv_Statistics = self.get_parameter_value(
+            "Statistics", default_value=self.__parameter_input_metadata['Statistics.Value.Default'])
+        if pv_Statistics == "":
+            # noinspection PyPep8Naming
+            pv_Statistics = self.__parameter_input_metadata['Statistics.Value.Default']
+        # Use the statistic names with the case of the choices for the property names.
+        statistics = [choice for statistic in string_util.delimited_string_to_list(pv_Statistics)
+                      for choice in self.__choices_Statistics if choice.upper() == statistic.upper()]
+        # noinspection PyPep8Naming
+        pv_Approximate = self.get_parameter_value(
+            "Approximate", default_value=self.__parameter_input_metadata['Approximate.Value.Default'])
+        approximate = string_util.str_to_bool(pv_Approximate) if pv_Approximate != "" else False
+        # noinspection PyPep8Naming
+        pv_HistogramBins = self.get_parameter_value(
+            "HistogramBins", default_value=self.__parameter_input_metadata['HistogramBins.Value.Default'])
+        histogram_bins = int(pv_HistogramBins) if pv_HistogramBins != "" else 256
+        # noinspection PyPep8Naming
+        pv_PropertyPrefix = self.get_parameter_value("PropertyPrefix", default_value=pv_GeoLayerID + "_")
+        # noinspection PyPep8Naming
+        pv_PropertyPrefix = self.command_processor.expand_parameter_value(pv_PropertyPrefix, self)
+
+        geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
+        if pv_Bands != "":
+            bands = [int(band) for band in string_util.delimited_string_to_list(pv_Bands)]
+        elif geolayer is not None and geolayer.is_raster():
+            bands = list(range(1, geolayer.get_num_bands() + 1))
+        else:
+            bands = []
+
+        if self.check_runtime_data(pv_GeoLayerID, bands):
+            # noinspection PyBroadException
+            try:
+                for band in bands:
+                    # The statistics are cached so only the first request for a band scans the raster.
+                    band_statistics = geolayer.get_band_statistics(
+                        band, approximate=approximate,
+                        histogram_bins=histogram_bins if "Histogram" in statistics else None)
+                    property_names = []
+                    for statistic in statistics:
+                        if statistic == "Histogram":
+                            property_names.extend(["Histogram", "HistogramMinimum", "HistogramMaximum"])
+                        else:
+                            property_names.append(statistic)
+                    for property_name in property_names:
+                        if band_statistics[property_name] is not None:
+                            self.command_processor.set_property(
+                                "{}Band{}{}".format(pv_PropertyPrefix, band, property_name),
+                                band_statistics[property_name])
+                    self.logger.info("Set {} properties for band {} of GeoLayer {} (approximate={}).".format(
+                        len(property_names), band, pv_GeoLayerID, band_statistics["Approximate"]))
+            except Exception:
+                self.warning_count += 1
+                message = 'Unexpected error setting properties from statistics for GeoLayer "{}"'.format(
+                    pv_GeoLayerID)
+                self.logger.warning(message, exc_info=True)
+                self.command_status.add_to_log(
+                    CommandPhaseType.RUN,
+                    CommandLogRecord(CommandStatusType.FAILURE, message,
+                                     "Check the log file for details."))
+
+        if self.warning_count > 0:
+            message = "There were " + str(self.warning_count) + " warnings processing the command."
+            raise CommandError(message)
+
+        self.command_status.refresh_phase_severity(CommandPhaseType.RUN, CommandStatusType.SUCCESS)
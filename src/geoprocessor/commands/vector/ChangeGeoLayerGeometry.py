@@ -349,7 +349,8 @@ class ChangeGeoLayerGeometry(AbstractCommand):
                             algorithm = "qgis:linestopolygons"
                             algorithm_parameters = {
                                 'INPUT': input_geolayer.qgs_layer,
-                                'OUTPUT': "memory:"
+                                'OUTPUT': self.command_processor.prepare_algorithm_output([input_geolayer],
+                                                                                          pv_OutputGeoLayerID)
                             }
                         elif alg_to_use == 2:
                             # https://docs.qgis.org/3.16/en/docs/user_manual/processing_algs/qgis/
@@ -359,7 +360,8 @@ class ChangeGeoLayerGeometry(AbstractCommand):
                             algorithm_parameters = {
                                 'INPUT': input_geolayer.qgs_layer,
                                 'KEEP_FIELDS': True,
-                                'OUTPUT': "memory:"
+                                'OUTPUT': self.command_processor.prepare_algorithm_output([input_geolayer],
+                                                                                          pv_OutputGeoLayerID)
                             }
                     else:
                         # Unhandled.
@@ -429,7 +431,7 @@ class ChangeGeoLayerGeometry(AbstractCommand):
                                                                 algorithm_parameters=algorithm_parameters,
                                                                 feedback_handler=feedback_handler)
                     self.warning_count += feedback_handler.get_warning_count()
-                    output_qgs_layer = converted_output['OUTPUT']
+                    output_qgs_layer = self.command_processor.get_algorithm_output_layer(converted_output['OUTPUT'])
 
                     # noinspection PyBroadException
                     # Use the ID for the name until more control is added.
@@ -440,7 +442,7 @@ class ChangeGeoLayerGeometry(AbstractCommand):
                                                   description=pv_OutputGeoLayerID,
                                                   input_path_full=GeoLayer.SOURCE_MEMORY,
                                                   input_path=GeoLayer.SOURCE_MEMORY)
-                    self.command_processor.add_geolayer(new_geolayer)
+                    self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
                     # TODO smalers 2020-07-12 need to enable removing the temporary split files,
                     # but workflow will neeed to copy or read/write to another location.
@@ -34,7 +34,6 @@ import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
-import os
 
 # from processing.core.Processing import Processing
 
@@ -300,38 +299,14 @@ class ClipGeoLayer(AbstractCommand):
                 input_geolayer = self.command_processor.get_geolayer(pv_InputGeoLayerID)
                 clipping_geolayer = self.command_processor.get_geolayer(pv_ClippingGeoLayerID)
 
-                # If the input GeoLayer is an in-memory GeoLayer, make it an on-disk GeoLayer.
-                if input_geolayer.input_path_full is None or input_geolayer.input_path_full.upper() in\
-                        ["", GeoLayer.SOURCE_MEMORY]:
-
-                    # Get the absolute path of the GeoLayer to write to disk.
-                    geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'),
-                                                          input_geolayer.id)
-
-                    # Write the GeoLayer to disk.
-                    # Overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                    input_geolayer = input_geolayer.write_to_disk(geolayer_disk_abs_path)
-                    self.command_processor.add_geolayer(input_geolayer)
-
-                # If the clipping GeoLayer is an in-memory GeoLayer, make it an on-disk GeoLayer.
-                if clipping_geolayer.input_path_full is None or clipping_geolayer.input_path_full.upper() in\
-                        ["", GeoLayer.SOURCE_MEMORY]:
-
-                    # Get the absolute path of the GeoLayer to write to disk.
-                    geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'),
-                                                          clipping_geolayer.id)
-
-                    # Write the GeoLayer to disk.
-                    # Overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                    clipping_geolayer = clipping_geolayer.write_to_disk(geolayer_disk_abs_path)
-                    self.command_processor.add_geolayer(clipping_geolayer)
-
                 # Perform the QGIS clip function. Refer to the reference below for parameter descriptions.
                 # REF: https://docs.qgis.org/2.8/en/docs/user_manual/processing_algs/qgis/vector_overlay_tools/clip.html
+                # - in-memory layers are passed directly rather than being written to temporary files
+                # - a large output is written to a scratch GeoPackage rather than memory
                 alg_parameters = {
-                    "INPUT": input_geolayer.qgs_layer,
-                    "OVERLAY": clipping_geolayer.qgs_layer,
-                    "OUTPUT": "memory:"
+                    "INPUT": self.command_processor.prepare_algorithm_input(input_geolayer),
+                    "OVERLAY": self.command_processor.prepare_algorithm_input(clipping_geolayer),
+                    "OUTPUT": self.command_processor.prepare_algorithm_output([input_geolayer], pv_OutputGeoLayerID)
                 }
                 feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
                 clipped_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
@@ -349,12 +324,13 @@ class ClipGeoLayer(AbstractCommand):
 
                 # In QGIS 3 the clipped_output["OUTPUT"] returns the QGS vector layer object.
                 new_geolayer = VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
-                                              qgs_vector_layer=clipped_output["OUTPUT"],
+                                              qgs_vector_layer=self.command_processor.get_algorithm_output_layer(
+                                                  clipped_output["OUTPUT"]),
                                               name=pv_Name,
                                               description=pv_Description,
                                               input_path_full=GeoLayer.SOURCE_MEMORY,
                                               input_path=GeoLayer.SOURCE_MEMORY)
-                self.command_processor.add_geolayer(new_geolayer)
+                self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
             except Exception:
                 # Raise an exception if an unexpected error occurs during the process.
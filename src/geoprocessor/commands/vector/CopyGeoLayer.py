@@ -309,6 +309,10 @@ class CopyGeoLayer(AbstractCommand):
 
                 # If the features are configured to be removed, continue.
                 if pv_IncludeFeaturesIf:
+                    # The copy shares the input layer's features until edited:
+                    # - prepare before getting feature IDs because the IDs change when the features are copied
+                    copied_geolayer.prepare_for_edit()
+
                     # Get the QGSExpression object.
                     exp = qgis_util.parse_qgs_expression(pv_IncludeFeaturesIf)
 
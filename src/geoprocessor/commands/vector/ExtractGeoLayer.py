@@ -36,7 +36,6 @@ import geoprocessor.util.validator_util as validator_util
 from geoprocessor.commands.vector.ExtractGeoLayerSelectionConditionType import ExtractGeoLayerSelectionConditionType
 
 import logging
-import os
 
 # from plugins.processing.tools import general
 
@@ -337,45 +336,17 @@ class ExtractGeoLayer(AbstractCommand):
                 input_geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
                 intersect_geolayer = self.command_processor.get_geolayer(pv_IntersectGeoLayerID)
 
-                # Make a copy of the intersect GeoLayer - manipulations will occur on this layer and the original
-                # should not be affected.
-                intersect_geolayer_copy = intersect_geolayer.deepcopy("intersect_geolayer_copy")
-
-                if input_geolayer.input_path_full is None or input_geolayer.input_path_full.upper() in\
-                        ["", GeoLayer.SOURCE_MEMORY]:
-                    # If the input GeoLayer is an in-memory GeoLayer, make it an on-disk GeoLayer.
-
-                    # Get the absolute path of the GeoLayer to write to disk.
-                    geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'),
-                                                          input_geolayer.id)
-
-                    # Write the GeoLayer to disk.
-                    # Overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                    input_geolayer = input_geolayer.write_to_disk(geolayer_disk_abs_path)
-                    self.command_processor.add_geolayer(input_geolayer)
-
-                if intersect_geolayer_copy.input_path_full is None or\
-                    intersect_geolayer_copy.input_path_full.upper() in \
-                        ["", GeoLayer.SOURCE_MEMORY]:
-                    # If the intersect GeoLayer is an in-memory GeoLayer, make it an on-disk GeoLayer.
-                    # Get the absolute path of the GeoLayer to write to disk.
-                    geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'),
-                                                          intersect_geolayer_copy.id)
-
-                    # Write the GeoLayer to disk.
-                    # Overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                    intersect_geolayer_copy = intersect_geolayer_copy.write_to_disk(geolayer_disk_abs_path)
-                    self.command_processor.add_geolayer(intersect_geolayer_copy)
-
                 # Perform the QGIS extract by location function.
                 # Refer to the reference below for parameter descriptions.
                 # REF: https://docs.qgis.org/latest/en/docs/user_manual/processing_algs/qgis/
                 # vectorselection.html#extract-by-location
+                # - in-memory layers are passed directly rather than being written to temporary files,
+                #   so the intersect GeoLayer does not need to be copied
                 alg_parameters = {
-                    "INPUT": input_geolayer.qgs_layer,
-                    "INTERSECT": intersect_geolayer_copy.qgs_layer,
+                    "INPUT": self.command_processor.prepare_algorithm_input(input_geolayer),
+                    "INTERSECT": self.command_processor.prepare_algorithm_input(intersect_geolayer),
                     "PREDICATE": selection_conditions,
-                    "OUTPUT": "memory:"
+                    "OUTPUT": self.command_processor.prepare_algorithm_output([input_geolayer], pv_OutputGeoLayerID)
                 }
                 feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
                 intersected_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
@@ -388,17 +359,13 @@ class ExtractGeoLayer(AbstractCommand):
                 # in QGIS3, intersected_output["OUTPUT"] returns the returns the QGS vector layer object
                 # see ClipGeoLayer.py for information about value in QGIS2 environment.
                 new_geolayer = VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
-                                              qgs_vector_layer=intersected_output["OUTPUT"],
+                                              qgs_vector_layer=self.command_processor.get_algorithm_output_layer(
+                                                  intersected_output["OUTPUT"]),
                                               name=pv_Name,
                                               description=pv_Description,
                                               input_path_full=GeoLayer.SOURCE_MEMORY,
                                               input_path=GeoLayer.SOURCE_MEMORY)
-                self.command_processor.add_geolayer(new_geolayer)
-
-                # Remove the copied intersect GeoLayer from the GeoProcessor's geolayers list. Delete the GeoLayer.
-                index = self.command_processor.geolayers.index(intersect_geolayer_copy)
-                del self.command_processor.geolayers[index]
-                del intersect_geolayer_copy
+                self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
             except Exception:
                 # Raise an exception if an unexpected error occurs during the process.
@@ -188,12 +188,14 @@ class FreeGeoLayers(AbstractCommand):
                     # Get GeoLayer to remove.
                     geolayer = self.command_processor.get_geolayer(geolayer_id)
 
-                    # Remove the GeoLayer from the GeoProcessor's geolayers list.
-                    index = self.command_processor.geolayers.index(geolayer)
-                    del self.command_processor.geolayers[index]
-
-                    # Delete the Qgs Vector Layer object.
-                    del geolayer.qgs_layer
+                    # Remove the GeoLayer from the GeoProcessor's geolayers list:
+                    # - also removes the scratch GeoPackage if the GeoLayer was spilled to disk
+                    self.command_processor.free_geolayer(geolayer)
+
+                    # Release the Qgs Vector Layer object:
+                    # - set to None rather than deleting because 'qgs_layer' is a property
+                    # - a lazy-loaded layer that was never used is not loaded
+                    geolayer.qgs_layer = None
 
                     # Delete the GeoLayer.
                     del geolayer
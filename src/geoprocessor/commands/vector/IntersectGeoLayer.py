@@ -30,14 +30,11 @@ from geoprocessor.core.QGISAlgorithmProcessingFeedbackHandler import QgisAlgorit
 from geoprocessor.core.VectorGeoLayer import VectorGeoLayer
 
 import geoprocessor.util.command_util as command_util
-import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
-import os
-from datetime import datetime
 
 # from plugins.processing.tools import general
 
@@ -71,6 +68,13 @@ class IntersectGeoLayer(AbstractCommand):
     * IfGeoLayerIDExists (str, optional): This parameter determines the action that occurs if the OutputGeoLayerID
         already exists within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         (Refer to user documentation for detailed description.) Default value is `Replace`.
+    * IntersectMethod (str, optional): the method used to intersect:
+        `QGIS` (default) uses the QGIS intersection algorithm, which clips input features by intersect features,
+        `AttributeJoin` does not clip input features and joins the attributes of the intersect features
+        to the input features that intersect them, using a spatial index.
+    * JoinStatistic (str, optional): for the `AttributeJoin` method, the statistic used to combine numeric
+        attribute values when an input feature intersects multiple intersect features:
+        `Mean` (default), `Sum`, `Min`, or `Max`.  String values are joined with commas.
     """
 
     # Define the command parameters.
@@ -82,7 +86,9 @@ class IntersectGeoLayer(AbstractCommand):
         CommandParameterMetadata("OutputGeoLayerID", type("")),
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
-        CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
+        CommandParameterMetadata("IfGeoLayerIDExists", type("")),
+        CommandParameterMetadata("IntersectMethod", type("")),
+        CommandParameterMetadata("JoinStatistic", type(""))]
 
     __command_metadata = dict()
     __command_metadata['Description'] = \
@@ -146,6 +152,24 @@ class IntersectGeoLayer(AbstractCommand):
         "Fail : The new GeoLayer is not created. A fail message is logged.")
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+    # IntersectMethod
+    __parameter_input_metadata['IntersectMethod.Description'] = "intersect method"
+    __parameter_input_metadata['IntersectMethod.Label'] = "Intersect method"
+    __parameter_input_metadata['IntersectMethod.Tooltip'] = (
+        "The method used to intersect:\n"
+        "QGIS : Use the QGIS intersection algorithm, which clips input features by the intersect features.\n"
+        "AttributeJoin : Do not clip input features. Join the attributes of the intersect features "
+        "to the input features that intersect them.")
+    __parameter_input_metadata['IntersectMethod.Values'] = ["", "QGIS", "AttributeJoin"]
+    __parameter_input_metadata['IntersectMethod.Value.Default'] = "QGIS"
+    # JoinStatistic
+    __parameter_input_metadata['JoinStatistic.Description'] = "statistic for multiple intersect features"
+    __parameter_input_metadata['JoinStatistic.Label'] = "Join statistic"
+    __parameter_input_metadata['JoinStatistic.Tooltip'] = (
+        "For IntersectMethod=AttributeJoin, the statistic used to combine numeric attribute values when an "
+        "input feature intersects multiple intersect features. String values are joined with commas.")
+    __parameter_input_metadata['JoinStatistic.Values'] = ["", "Mean", "Sum", "Min", "Max"]
+    __parameter_input_metadata['JoinStatistic.Value.Default'] = "Mean"
 
     def __init__(self) -> None:
         """
@@ -222,6 +246,36 @@ class IntersectGeoLayer(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional parameter IntersectMethod is either `QGIS`, `AttributeJoin` or None.
+        # noinspection PyPep8Naming
+        pv_IntersectMethod = self.get_parameter_value(parameter_name="IntersectMethod",
+                                                      command_parameters=command_parameters)
+        acceptable_values = ["QGIS", "AttributeJoin"]
+        if not validator_util.validate_string_in_list(pv_IntersectMethod, acceptable_values, none_allowed=True,
+                                                      empty_string_allowed=True, ignore_case=True):
+            message = "IntersectMethod parameter value ({}) is not recognized.".format(pv_IntersectMethod)
+            recommendation = "Specify one of the acceptable values ({}) for the IntersectMethod parameter.".format(
+                acceptable_values)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional parameter JoinStatistic is either `Mean`, `Sum`, `Min`, `Max` or None.
+        # noinspection PyPep8Naming
+        pv_JoinStatistic = self.get_parameter_value(parameter_name="JoinStatistic",
+                                                    command_parameters=command_parameters)
+        acceptable_values = ["Mean", "Sum", "Min", "Max"]
+        if not validator_util.validate_string_in_list(pv_JoinStatistic, acceptable_values, none_allowed=True,
+                                                      empty_string_allowed=True, ignore_case=True):
+            message = "JoinStatistic parameter value ({}) is not recognized.".format(pv_JoinStatistic)
+            recommendation = "Specify one of the acceptable values ({}) for the JoinStatistic parameter.".format(
+                acceptable_values)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -306,10 +360,12 @@ class IntersectGeoLayer(AbstractCommand):
     # noinspection PyPep8Naming
     def __single_feature_and_attribute_method(self, input_geolayer: VectorGeoLayer,
                                               pv_OutputGeoLayerID: str,
-                                              intersect_geolayer_copy: VectorGeoLayer) -> None:
+                                              pv_Name: str,
+                                              pv_Description: str,
+                                              intersect_geolayer_copy: VectorGeoLayer,
+                                              join_statistic: str) -> None:
         """
-        This is an under-construction intersection method designed by Open Water Foundation Emma Giles.
-        It is not in use within the command yet because its implementation is under discussion.
+        This intersection method was designed by Open Water Foundation Emma Giles.
         This intersect method will not clip input features that overlap multiple intersect features.
         Note that in the qgis_method, the input features that overlap the intersect features are clipped.
         With the "single feature single attribute method" the attribute values of the output features that were
@@ -320,145 +376,26 @@ class IntersectGeoLayer(AbstractCommand):
         The first overlapping intersect polygon has the "Name" attribute value of "Hill" and
         the other has the name attribute value of "Moon".
         The "Name" attribute field in the output intersected line layer would be "Hill, Moon".
-        For integer values, a summary statistic of mean, min, max or sum can be applied.
-        """
+        For numeric values, a summary statistic of mean, min, max or sum can be applied.
 
-        # Command variables.
-        within_target_feats = {}
-        intersecting_target_feats = {}
+        The intersect features are found using a spatial index rather than testing every pair of features.
+        """
 
         target_geolayer = input_geolayer.deepcopy(pv_OutputGeoLayerID)
-        target_layer = target_geolayer.qgs_layer
-        intersect_geolayer = intersect_geolayer_copy
-        intersect_layer = intersect_geolayer.qgs_layer
+        # The target layer is edited below so make sure that it does not share the input layer's features.
+        target_geolayer.prepare_for_edit()
+        target_geolayer.name = pv_Name
+        target_geolayer.description = pv_Description
         attributes_to_join = intersect_geolayer_copy.get_attribute_field_names()
-        statistic_summary = "mean"
-
-        # Iterate over the target features.
-        for target_feat in target_layer.getFeatures():
-
-            # Iterate over the intersect features.
-            for intersect_feat in intersect_layer.getFeatures():
-
-                # Get the geometries of the target feature and the intersect feature.
-                target_geom = target_feat.geometry()
-                intersect_geom = intersect_feat.geometry()
-
-                # Determine if the target feature is within/intersects the intersect feature.
-                is_within = target_geom.within(intersect_geom)
-                does_intersect = target_geom.intersects(intersect_geom)
-
-                # If the target feature is within the intersecting feature,
-                # add an entry to the within dictionary where the key is the target feature and the
-                # value is the intersect feature.
-                if is_within:
-                    within_target_feats[target_feat] = intersect_feat
-
-                # Otherwise if the target feature is intersecting the intersect feature, continue.
-                elif does_intersect:
-                    # If the target feature (the key) is already registered in the dictionary,
-                    # add the intersecting feature to the list of intersecting features (the value).
-                    if target_feat in intersecting_target_feats.keys():
-                        curr_dic_value = intersecting_target_feats[target_feat]
-                        curr_dic_value.append(intersect_feat)
-
-                    # If the target feature has not yet been registered in the dictionary,
-                    # add an entry to the intersect dictionary where the key is the target feature and the value
-                    # is a list of the intersect features.
-                    else:
-                        intersecting_target_feats[target_feat] = [intersect_feat]
-
-        # Move the appropriate entries within the intersecting dictionary to the within dictionary.
-        to_delete = []
-        for target_feature, intersect_feature_list in intersecting_target_feats.items():
-
-            # If the dictionary entry only has one intersect feature, continue.
-            if len(list(set(intersect_feature_list))) == 1:
-                # Add the entry to the within dictionary.
-                within_target_feats[target_feature] = intersect_feature_list[0]
-
-                # Add the key to the to_delete list to remove the entry from the intersecting dictionary.
-                to_delete.append(target_feature)
-
-        # Delete the entries in the intersect dictionary if they have been moved to the within dictionary.
-        for item in to_delete:
-            del intersecting_target_feats[item]
-
-        # Get the intersect layer's attributes to add as indexes.
-        intersect_layer_attrs_to_add_idx = []
-        for input_attr in attributes_to_join:
-            intersect_layer_attrs_to_add_idx.append(intersect_layer.fieldNameIndex(input_attr))
-
-        # Iterate over the intersect layer's attributes to add as indexes.
-        for intersect_attr_to_add_idx in intersect_layer_attrs_to_add_idx:
-
-            # Get a field object of the intersect attribute.
-            field = intersect_layer.pendingFields()[intersect_attr_to_add_idx]
 
-            # Get a list of the existing attribute names in the target layer.
-            existing_target_layer_attrs = [attr_field.name() for attr_field in target_layer.pendingFields()]
+        join_count = qgis_util.join_qgsvectorlayer_attributes_by_location(target_geolayer.qgs_layer,
+                                                                         intersect_geolayer_copy.qgs_layer,
+                                                                         attributes_to_join,
+                                                                         statistic=join_statistic)
+        self.logger.info("Joined intersect attributes to {} of {} features.".format(
+            join_count, target_geolayer.get_feature_count()))
 
-            # Add the intersect layer's attribute to add to the target layer (if it does not already exist).
-            if field.name() not in existing_target_layer_attrs:
-                # Add the new attributes to the target layer.
-                # noinspection PyPep8Naming
-                typeName_attrType_dic = {"Integer": "int", "String": "string"}
-                qgis_util.add_qgsvectorlayer_attribute(target_layer, field.name(),
-                                                       typeName_attrType_dic[field.typeName()])
-
-            # Get the index of the target feature that matches the intersect attribute name.
-            target_attr_idx = target_layer.fieldNameIndex(field.name())
-
-            # Iterate over the within dictionary.
-            for target_feat, intersect_feat in within_target_feats.items():
-                # Get the intersect attribute value.
-                intersect_feat_value = intersect_feat.attributes()[intersect_attr_to_add_idx]
-
-                # Create an attribute dictionary. KEY: target attribute index VALUE: new attribute value.
-                attr_dic = {target_attr_idx: intersect_feat_value}
-
-                # Add the correct attribute value to the target layer.
-                target_layer.dataProvider().changeAttributeValues(({target_feat.id(): attr_dic}))
-
-            # Iterate over the intersect dictionary.
-            for target_feat, intersect_feats in intersecting_target_feats.items():
-
-                list_of_intersect_attr_values = []
-
-                intersect_feat_value_updated = None
-
-                # Iterate over the intersection features and add the attribute values to the
-                # list_of_intersect_attr_values.
-                for intersect_feat in intersect_feats:
-                    list_of_intersect_attr_values.append(intersect_feat.attributes()[intersect_attr_to_add_idx])
-
-                # If the attribute is type String, continue.
-                if field.typeName() == "String":
-
-                    intersect_feat_value_updated = ",".join(list_of_intersect_attr_values)
-
-                # If the attribute is type Integer, continue.
-                elif field.typeName() == "Integer":
-
-                    if statistic_summary.upper() == "SUM":
-                        intersect_feat_value_updated = sum(list_of_intersect_attr_values)
-                    elif statistic_summary.upper() == "MEAN":
-                        intersect_feat_value_updated = sum(list_of_intersect_attr_values) / len(
-                            list_of_intersect_attr_values)
-                    elif statistic_summary.upper() == "MIN":
-                        intersect_feat_value_updated = min(list_of_intersect_attr_values)
-                    elif statistic_summary.upper() == "MAX":
-                        intersect_feat_value_updated = max(list_of_intersect_attr_values)
-
-                # Create an attribute dictionary. KEY: target attribute index VALUE: new attribute value.
-                attr_dic = {target_attr_idx: intersect_feat_value_updated}
-
-                # Add the correct attribute value to the target layer.
-                target_layer.dataProvider().changeAttributeValues(({target_feat.id(): attr_dic}))
-
-        # Create a new GeoLayer and add it to the GeoProcessor's geolayers list.
-        # intersected_output["OUTPUT"] returns the full file pathname of the memory output layer
-        # (saved in a QGIS temporary folder)
+        # Add the new GeoLayer to the GeoProcessor's geolayers list.
         self.command_processor.add_geolayer(target_geolayer)
 
     def run_command(self) -> None:
@@ -493,6 +430,12 @@ class IntersectGeoLayer(AbstractCommand):
         pv_IncludeIntersectAttributes = self.get_parameter_value("IncludeIntersectAttributes", default_value="*")
         # noinspection PyPep8Naming
         pv_ExcludeIntersectAttributes = self.get_parameter_value("ExcludeIntersectAttributes", default_value="''")
+        # noinspection PyPep8Naming
+        pv_IntersectMethod = self.get_parameter_value(
+            "IntersectMethod", default_value=self.parameter_input_metadata['IntersectMethod.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_JoinStatistic = self.get_parameter_value(
+            "JoinStatistic", default_value=self.parameter_input_metadata['JoinStatistic.Value.Default'])
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -507,18 +450,15 @@ class IntersectGeoLayer(AbstractCommand):
         pv_Description = self.command_processor.expand_parameter_value(pv_Description, self)
 
         # Set the method used for the command.
-        # The IntersectGeoLayer methodology can be completed in different ways.
-        # Currently, there are two designs:
+        # The IntersectGeoLayer methodology can be completed in different ways:
         #   1. qgis_method: use "qgis: intersect" algorithm where input features that overlap multiple
         #   intersecting features, are clipped.
-        #   2. owf_method: owf-design in progress where input features that overlap multiple
+        #   2. owf_method: owf-design where input features that overlap multiple
         #   intersecting features retain their geometry but the output attribute is a combination of the attributes of
         #   the overlapping intersect features
-        # Because the second method is not complete and is still in debate at OWF,
-        # the code is memorialized under the __single_feature_and_attribute_method function.
-        # The function is never called and the QGIS_method is always used (until further notice).
-        qgis_method = True
-        owf_method = False
+        # The method is selected with the IntersectMethod parameter.
+        owf_method = pv_IntersectMethod.upper() == "ATTRIBUTEJOIN"
+        qgis_method = not owf_method
 
         error_found = False
 
@@ -559,67 +499,17 @@ class IntersectGeoLayer(AbstractCommand):
                     self.logger.info(message)
                     intersect_geolayer_copy.remove_attributes(attrs_to_include, attrs_to_exclude)
 
-                    if input_geolayer.input_path_full is None or input_geolayer.input_path_full.upper() in\
-                            ["", GeoLayer.SOURCE_MEMORY]:
-                        # If the input GeoLayer is an in-memory GeoLayer:
-                        # - make it an on-disk GeoLayer as a temporary file
-                        # - use a unque name to avoid file locking/contention
-
-                        # Get the absolute path of the GeoLayer to write to disk.
-                        now = datetime.now()
-                        now_string = now.strftime("-%m%d%YT%H%M%S")
-                        geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'),
-                                                              input_geolayer.id + now_string)
-                        message = "Writing in-memory input layer to file: {}".format(geolayer_disk_abs_path)
-                        self.logger.info(message)
-
-                        # Write the GeoLayer to disk:
-                        # - overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer
-                        # - this by default writes a shapefile
-                        input_geolayer = input_geolayer.write_to_disk(geolayer_disk_abs_path)
-                        self.command_processor.add_geolayer(input_geolayer)
-                        # Indicate that the files should be removed later:
-                        # - TODO smalers 2024-05-29 could use a format other than shapefile
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".gpkg")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".shp")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".shx")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".dbf")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".prj")
-
-                if not error_found:
-                    if intersect_geolayer_copy.input_path_full is None or\
-                        intersect_geolayer_copy.input_path_full.upper() in \
-                            ["", GeoLayer.SOURCE_MEMORY]:
-                        # If the 'intersect' GeoLayer is an in-memory GeoLayer, make it an on-disk GeoLayer.
-                        # Get the absolute path of the GeoLayer to write to disk.
-                        now = datetime.now()
-                        now_string = now.strftime("-%m%d%YT%H%M%S")
-                        geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'),
-                                                              intersect_geolayer_copy.id + now_string)
-
-                        # Write the GeoLayer to disk.
-                        # Overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                        message = "Writing in-memory intersect layer copy to file: {}".format(geolayer_disk_abs_path)
-                        self.logger.info(message)
-                        intersect_geolayer_copy = intersect_geolayer_copy.write_to_disk(geolayer_disk_abs_path)
-                        self.command_processor.add_geolayer(intersect_geolayer_copy)
-                        # Indicate that the files should be removed later:
-                        # - TODO smalers 2024-05-29 could use a format other than shapefile
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".gpkg")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".shp")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".shx")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".dbf")
-                        io_util.add_tmp_file_to_remove(geolayer_disk_abs_path + ".prj")
-
                 if qgis_method and not error_found:
                     # If using QGIS version of intersect. Set to TRUE always until later notice.
                     # Perform the QGIS intersection function. Refer to the reference below for parameter descriptions.
                     # REF: https://docs.qgis.org/2.18/en/docs/user_manual/processing_algs/qgis/
                     # vector_overlay_tools.html#intersection
+                    # - in-memory layers are passed directly rather than being written to temporary files
                     alg_parameters = {
-                        "INPUT": input_geolayer.qgs_layer,
-                        "OVERLAY": intersect_geolayer_copy.qgs_layer,
-                        "OUTPUT": "memory:"
+                        "INPUT": self.command_processor.prepare_algorithm_input(input_geolayer),
+                        "OVERLAY": self.command_processor.prepare_algorithm_input(intersect_geolayer_copy),
+                        "OUTPUT": self.command_processor.prepare_algorithm_output(
+                            [input_geolayer, intersect_geolayer_copy], pv_OutputGeoLayerID)
                     }
                     feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
                     message = "Running qgis:intersection algorithm."
@@ -642,26 +532,27 @@ class IntersectGeoLayer(AbstractCommand):
                         # Create a new GeoLayer and add it to the GeoProcessor's geolayers list.
                         # In QGIS3, intersected_output["OUTPUT"] returns the QGS vector layer object
                         # see ClipGeoLayer.py for information about value in QGIS2 environment
-                        message = "Adding in-memory layer to output."
+                        message = "Adding output layer."
                         self.logger.info(message)
+                        output_qgs_layer = self.command_processor.get_algorithm_output_layer(
+                            intersected_output["OUTPUT"])
                         new_geolayer = VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
-                                                      qgs_vector_layer=intersected_output["OUTPUT"],
+                                                      qgs_vector_layer=output_qgs_layer,
                                                       name=pv_Name,
                                                       description=pv_Description,
                                                       input_path_full=GeoLayer.SOURCE_MEMORY,
                                                       input_path=GeoLayer.SOURCE_MEMORY)
-                        self.command_processor.add_geolayer(new_geolayer)
+                        self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
                 elif owf_method and not error_found:
-                    # If using OWF version of intersect. Set to FALSE always until later notice.
-
-                    # TODO smalers 2020-01-16 argument types below are not consistent with method
-                    self.__single_feature_and_attribute_method(pv_GeoLayerID, pv_IntersectGeoLayerID,
-                                                               pv_OutputGeoLayerID)
+                    # If using OWF version of intersect.
+                    message = "Joining intersect attributes using a spatial index."
+                    self.logger.info(message)
+                    self.__single_feature_and_attribute_method(input_geolayer, pv_OutputGeoLayerID,
+                                                               pv_Name, pv_Description,
+                                                               intersect_geolayer_copy, pv_JoinStatistic)
 
-                # Remove the copied intersect GeoLayer from the GeoProcessor's geolayers list. Delete the GeoLayer.
-                index = self.command_processor.geolayers.index(intersect_geolayer_copy)
-                del self.command_processor.geolayers[index]
+                # Delete the copied intersect GeoLayer, which was not added to the GeoProcessor's geolayers list.
                 del intersect_geolayer_copy
 
             except Exception:
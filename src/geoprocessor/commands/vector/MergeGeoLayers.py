@@ -35,7 +35,6 @@ import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
-import os
 
 
 class MergeGeoLayers(AbstractCommand):
@@ -460,10 +459,10 @@ class MergeGeoLayers(AbstractCommand):
                     # after the processing has been completed. This list will be used to remove the copied GeoLayers.
                     copied_geolayer_ids = []
 
-                    # A list to hold the full pathname of the copied GeoLayers (written to disk).
-                    # The qgis:mergevectorlayers requires that the QGSVectorLayer objects are not in memory.
+                    # A list to hold the algorithm inputs for the copied GeoLayers.
+                    # In-memory layers are passed directly rather than being written to temporary files.
                     # This list will be used as an input to the qgis:mergevectorlayers algorithm.
-                    copied_geolayer_sourcepath = []
+                    copied_geolayer_inputs = []
 
                 first_geolayer = self.command_processor.get_geolayer(list_of_geolayer_ids[0])
                 first_crs = first_geolayer.get_crs_code()
@@ -492,24 +491,18 @@ class MergeGeoLayers(AbstractCommand):
                         if not (existing_attr_name == new_attr_name):
                             copied_geolayer.rename_attribute(existing_attr_name, new_attr_name)
 
-                    # Write copied GeoLayer (memory) to the temporary directory (written to disk).
-                    output_file_absolute = os.path.join(self.command_processor.get_property('TempDir'),
-                                                        copied_geolayer.id)
-                    on_disk_geolayer = copied_geolayer.write_to_disk(output_file_absolute)
-
-                    # Overwrite the copied (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                    self.command_processor.add_geolayer(on_disk_geolayer)
-
-                    # Add the source path of the copied on-disk GeoLayer to the master list.
-                    copied_geolayer_sourcepath.append(on_disk_geolayer.input_path_full)
+                    # Add the copied GeoLayer to the algorithm inputs.
+                    copied_geolayer_inputs.append(self.command_processor.prepare_algorithm_input(copied_geolayer))
 
                 # Merge all the copied GeoLayers (the GeoLayers with the new attribute names).
                 # Using QGIS algorithm but can also use saga:mergelayers algorithm.
                 # saga:mergelayers documentation at http://www.saga-gis.org/saga_tool_doc/2.3.0/shapes_tools_2.html
                 alg_parameters = {
-                    "LAYERS": copied_geolayer_sourcepath,
+                    "LAYERS": copied_geolayer_inputs,
                     "CRS": first_crs,
-                    "OUTPUT": "memory:"
+                    "OUTPUT": self.command_processor.prepare_algorithm_output(
+                        [self.command_processor.get_geolayer(geolayer_id) for geolayer_id in list_of_geolayer_ids],
+                        pv_OutputGeoLayerID)
                 }
                 feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
                 merged_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
@@ -521,12 +514,14 @@ class MergeGeoLayers(AbstractCommand):
                 # Create a new GeoLayer and add it to the GeoProcessor's geolayers list.
                 # In QGIS3, merged_output["OUTPUT"] returns the QGS vector layer object
                 # see ClipGeoLayer.py for information about value in QGIS2 environment.
-                self.command_processor.add_geolayer(VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
-                                                                   qgs_vector_layer=merged_output["OUTPUT"],
-                                                                   name=pv_Name,
-                                                                   description=pv_Description,
-                                                                   input_path_full=GeoLayer.SOURCE_MEMORY,
-                                                                   input_path=GeoLayer.SOURCE_MEMORY))
+                new_geolayer = VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
+                                              qgs_vector_layer=self.command_processor.get_algorithm_output_layer(
+                                                  merged_output["OUTPUT"]),
+                                              name=pv_Name,
+                                              description=pv_Description,
+                                              input_path_full=GeoLayer.SOURCE_MEMORY,
+                                              input_path=GeoLayer.SOURCE_MEMORY)
+                self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
                 # Release the copied GeoLayers from the GeoProcessor.
                 for copied_geolayer_id in copied_geolayer_ids:
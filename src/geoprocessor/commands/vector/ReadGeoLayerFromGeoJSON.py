@@ -33,6 +33,7 @@ import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.validator_util as validator_util
 
+import functools
 import os
 import logging
 
@@ -64,6 +65,19 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
     * IfGeoLayerIDExists (str, optional): This parameter determines the action that occurs if the CopiedGeoLayerID
         already exists within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         (Refer to user documentation for detailed description.) Default value is `Replace`.
+    * BoundingBox (str, optional): only read features that intersect the bounding box, using the format
+        "MinX,MinY,MaxX,MaxY" in the coordinate reference system of the layer.
+    * ClipGeoLayerID (str, optional): only read features that intersect the features of an existing GeoLayer.
+    * WhereClause (str, optional): SQL where clause used by the data provider to select the features to read.
+    * ReadAttributes (str, optional): comma-separated list of attributes to read.
+        Other attributes are not read.  If not specified, all attributes are read.
+    * ReadMode (str, optional): `OGR` (default) to read the file with the OGR GeoJSON driver, which parses the
+        entire file, or `Stream` to read features incrementally in batches.  `Stream` also reads GeoJSONSeq
+        and gzip-compressed files, uses the WhereClause as a QGIS expression, and does not support ClipGeoLayerID.
+    * BatchSize (int, optional): number of features to parse at a time when ReadMode=Stream.
+    * FeatureLimit (int, optional): maximum number of features to read when ReadMode=Stream, for previewing.
+    * GeoPackageFile (str, optional): GeoPackage file to store the features when ReadMode=Stream,
+        default is an in-memory layer.
     """
 
     # Define the command parameters.
@@ -73,6 +87,14 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
         CommandParameterMetadata("Properties", type("")),
+        CommandParameterMetadata("BoundingBox", type("")),
+        CommandParameterMetadata("ClipGeoLayerID", type("")),
+        CommandParameterMetadata("WhereClause", type("")),
+        CommandParameterMetadata("ReadAttributes", type("")),
+        CommandParameterMetadata("ReadMode", type("")),
+        CommandParameterMetadata("BatchSize", type("")),
+        CommandParameterMetadata("FeatureLimit", type("")),
+        CommandParameterMetadata("GeoPackageFile", type("")),
         CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
 
     # Command metadata for command editor display.
@@ -132,6 +154,44 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
         "  Fail : The new GeoLayer is not created. A fail message is logged.")
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+    # BoundingBox, ClipGeoLayerID, WhereClause, ReadAttributes
+    command_util.add_read_filter_parameter_input_metadata(__parameter_input_metadata)
+    # ReadMode
+    __parameter_input_metadata['ReadMode.Description'] = "how to read the file"
+    __parameter_input_metadata['ReadMode.Label'] = "Read mode"
+    __parameter_input_metadata['ReadMode.Tooltip'] = (
+        "OGR:  read the file with the OGR GeoJSON driver, which parses the entire file.\n"
+        "Stream:  read features incrementally in batches, which limits memory use for very large files. "
+        "GeoJSONSeq and gzip-compressed files can be read. "
+        "The WhereClause is evaluated as a QGIS expression and ClipGeoLayerID is not supported.")
+    __parameter_input_metadata['ReadMode.Values'] = ["", "OGR", "Stream"]
+    __parameter_input_metadata['ReadMode.Value.Default'] = "OGR"
+    # BatchSize
+    __parameter_input_metadata['BatchSize.Description'] = "features to parse at a time"
+    __parameter_input_metadata['BatchSize.Label'] = "Batch size"
+    __parameter_input_metadata['BatchSize.Tooltip'] = (
+        "The number of features to parse at a time when ReadMode=Stream. "
+        "Smaller batches use less memory.")
+    __parameter_input_metadata['BatchSize.Value.Default'] = "10000"
+    # FeatureLimit
+    __parameter_input_metadata['FeatureLimit.Description'] = "maximum features to read"
+    __parameter_input_metadata['FeatureLimit.Label'] = "Feature limit"
+    __parameter_input_metadata['FeatureLimit.Tooltip'] = (
+        "The maximum number of features to read when ReadMode=Stream, for example to preview a large file.")
+    __parameter_input_metadata['FeatureLimit.Value.Default.Description'] = "read all features"
+    # GeoPackageFile
+    __parameter_input_metadata['GeoPackageFile.Description'] = "GeoPackage file to store features"
+    __parameter_input_metadata['GeoPackageFile.Label'] = "GeoPackage file"
+    __parameter_input_metadata['GeoPackageFile.Tooltip'] = (
+        "GeoPackage file to store the features when ReadMode=Stream, so that the features are not held in memory. "
+        "The layer is created using the GeoLayerID as the layer name. ${Property} syntax is recognized.")
+    __parameter_input_metadata['GeoPackageFile.Value.Default.Description'] = "in-memory layer"
+    __parameter_input_metadata['GeoPackageFile.FileSelector.Type'] = "Write"
+    __parameter_input_metadata['GeoPackageFile.FileSelector.Filters'] = \
+        ["GeoPackage file (*.gpkg)", "All files (*.*)"]
+
+    # Choices for ReadMode, used to validate parameter and display in editor.
+    __choices_ReadMode = ["OGR", "Stream"]
 
     # Choices for IfGeoLayerIDExists, used to validate parameter and display in editor.
     __choices_IfGeoLayerIDExists = ["Replace", "ReplaceAndWarn", "Warn", "Fail"]
@@ -211,6 +271,44 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check the parameters that filter the features that are read.
+        warning_message = command_util.check_read_filter_parameters(self, command_parameters, warning_message)
+
+        # Check that optional parameter ReadMode is one of the acceptable values or is None.
+        # noinspection PyPep8Naming
+        pv_ReadMode = self.get_parameter_value(parameter_name="ReadMode", command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_ReadMode, self.__choices_ReadMode,
+                                                      none_allowed=True, empty_string_allowed=True, ignore_case=True):
+            message = "ReadMode parameter value ({}) is not recognized.".format(pv_ReadMode)
+            recommendation = "Specify one of the acceptable values ({}) for the ReadMode parameter.".format(
+                self.__choices_ReadMode)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+        elif pv_ReadMode is not None and pv_ReadMode.upper() == "STREAM":
+            # noinspection PyPep8Naming
+            pv_ClipGeoLayerID = self.get_parameter_value(parameter_name="ClipGeoLayerID",
+                                                         command_parameters=command_parameters)
+            if pv_ClipGeoLayerID:
+                message = "ClipGeoLayerID is not supported when ReadMode=Stream."
+                recommendation = "Use BoundingBox, or use ReadMode=OGR."
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional parameters BatchSize and FeatureLimit are positive integers.
+        for parameter in ["BatchSize", "FeatureLimit"]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_int(parameter_value, True, True, zero_allowed=False):
+                message = "{} parameter value ({}) is not a valid integer.".format(parameter, parameter_value)
+                recommendation = "Specify a positive integer for the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -223,7 +321,8 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
             # Refresh the phase severity.
             self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
 
-    def check_runtime_data(self, input_file_absolute: str, input_is_url: bool, geolayer_id: str) -> bool:
+    def check_runtime_data(self, input_file_absolute: str, input_is_url: bool, geolayer_id: str,
+                           stream: bool = False) -> bool:
         """
         Checks the following:
         * the InputFile (absolute) is a valid file
@@ -233,6 +332,7 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
         Args:
             input_file_absolute: the full pathname to the input spatial data file
             input_is_url: whether the input file is a URL
+            stream: whether the file will be read with ReadMode=Stream
             geolayer_id: the ID of the output GeoLayer
 
         Returns:
@@ -242,7 +342,15 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
         # Boolean to determine if the read process should be run. Set to true until an error occurs.
         run_read = True
 
-        if input_is_url:
+        if input_is_url and stream:
+            run_read = False
+            self.warning_count += 1
+            message = "The InputFile ({}) cannot be a URL when ReadMode=Stream.".format(input_file_absolute)
+            recommendation = "Download the file first, or use ReadMode=OGR."
+            self.logger.warning(message)
+            self.command_status.add_to_log(CommandPhaseType.RUN,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+        elif input_is_url:
             # No checks because would be a performance hit to download a large file.
             pass
         else:
@@ -257,8 +365,13 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
             else:
                 # Also check the file extension.
-                # If the input spatial data file does not end in .geojson, raise a WARNING.
-                if not input_file_absolute.upper().endswith(".GEOJSON"):
+                # If the input spatial data file does not end in .geojson, raise a WARNING:
+                # - streaming also reads GeoJSONSeq and gzip-compressed files
+                if stream:
+                    extensions = (".GEOJSON", ".JSON", ".GEOJSONL", ".GEOJSONS", ".GZ")
+                else:
+                    extensions = (".GEOJSON",)
+                if not input_file_absolute.upper().endswith(extensions):
                     self.warning_count += 1
                     message = 'The InputFile ({}) does not end with the .geojson extension.'.format(input_file_absolute)
                     recommendation = "Specify a GeoJson file to read."
@@ -336,6 +449,18 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
                                      default_value=self.parameter_input_metadata['Description.Value.Default'])
         # noinspection PyPep8Naming
         pv_Properties = self.get_parameter_value("Properties")
+        # noinspection PyPep8Naming
+        pv_WhereClause = self.get_parameter_value("WhereClause")
+        # noinspection PyPep8Naming
+        pv_ReadMode = self.get_parameter_value("ReadMode",
+                                               default_value=self.parameter_input_metadata['ReadMode.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_BatchSize = self.get_parameter_value("BatchSize",
+                                                default_value=self.parameter_input_metadata['BatchSize.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_FeatureLimit = self.get_parameter_value("FeatureLimit")
+        # noinspection PyPep8Naming
+        pv_GeoPackageFile = self.get_parameter_value("GeoPackageFile")
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -346,6 +471,8 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
         pv_Description = self.command_processor.expand_parameter_value(pv_Description, self)
         # noinspection PyPep8Naming
         pv_Properties = self.command_processor.expand_parameter_value(pv_Properties, self)
+        # noinspection PyPep8Naming
+        pv_WhereClause = self.command_processor.expand_parameter_value(pv_WhereClause, self)
 
         # Convert the InputFile parameter value to an absolute path and expand for ${Property} syntax.
         input_is_url = False
@@ -373,11 +500,45 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
             pv_GeoLayerID = io_util.expand_formatter(input_file_absolute, pv_GeoLayerID)
 
         # Run the checks on the parameter values. Only continue if the checks passed.
-        if self.check_runtime_data(input_file_absolute, input_is_url, pv_GeoLayerID):
+        stream = pv_ReadMode.upper() == "STREAM"
+        if self.check_runtime_data(input_file_absolute, input_is_url, pv_GeoLayerID, stream):
             # noinspection PyBroadException
             try:
                 # Create a QGSVectorLayer object with the GeoJSON InputFile.
-                qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_file(input_file_absolute)
+                bounding_box, clip_layer, read_attributes = command_util.get_read_filters(self)
+                qgs_layer_loader = None
+                crs_code = None
+                if stream:
+                    # Read features incrementally, optionally into a GeoPackage layer.
+                    geopackage_file_absolute = None
+                    if pv_GeoPackageFile:
+                        geopackage_file_absolute = io_util.verify_path_for_os(
+                            io_util.to_absolute_path(self.command_processor.get_property('WorkingDir'),
+                                                     self.command_processor.expand_parameter_value(
+                                                         pv_GeoPackageFile, self)))
+                    feature_limit = None
+                    if pv_FeatureLimit:
+                        feature_limit = int(pv_FeatureLimit)
+                    qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_geojson_stream(
+                        input_file_absolute,
+                        layer_name=pv_GeoLayerID,
+                        geopackage_file_abs=geopackage_file_absolute,
+                        bounding_box=bounding_box,
+                        filter_expression=pv_WhereClause,
+                        read_attributes=read_attributes,
+                        feature_limit=feature_limit,
+                        batch_size=int(pv_BatchSize))
+                else:
+                    read_layer = functools.partial(qgis_util.read_qgsvectorlayer_from_file, input_file_absolute,
+                                                   where_clause=pv_WhereClause, bounding_box=bounding_box,
+                                                   clip_layer=clip_layer, read_attributes=read_attributes)
+                    if self.command_processor.is_geolayer_lazy_load() and not input_is_url:
+                        # Record the file and CRS, and read the layer when it is first used.
+                        qgs_vector_layer = None
+                        qgs_layer_loader = read_layer
+                        crs_code = qgis_util.read_crs_code_from_file(input_file_absolute)
+                    else:
+                        qgs_vector_layer = read_layer()
 
                 # Create a GeoLayer and add it to the geoprocessor's GeoLayers list:
                 # - specify the input_format to ensure that downstream code knows the format because the
@@ -388,7 +549,9 @@ class ReadGeoLayerFromGeoJSON(AbstractCommand):
                                               qgs_vector_layer=qgs_vector_layer,
                                               input_format=VectorFormatType.GeoJSON,
                                               input_path_full=input_file_absolute,
-                                              input_path=pv_InputFile)
+                                              input_path=pv_InputFile,
+                                              qgs_layer_loader=qgs_layer_loader,
+                                              crs_code=crs_code)
 
                 # Set the properties.
                 properties = command_util.parse_properties_from_parameter_string(pv_Properties)
@@ -392,7 +392,8 @@ class ReadGeoLayerFromKML(AbstractCommand):
                 # To solve this problem, copy the initially read layer to a new instance and then add the copy to
                 # the geoprocessor.
 
-                new_geolayer = new_geolayer0.deepcopy(pv_GeoLayerID)
+                # - copy the features now (not copy-on-write) so that the KML layer is not used after the command
+                new_geolayer = new_geolayer0.deepcopy(pv_GeoLayerID, copy_on_write=False)
 
                 # Set the properties.
                 properties = command_util.parse_properties_from_parameter_string(pv_Properties)
@@ -33,6 +33,7 @@ import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.validator_util as validator_util
 
+import functools
 import os
 import logging
 
@@ -62,6 +63,12 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
     * IfGeoLayerIDExists (str, optional): This parameter determines the action that occurs if the CopiedGeoLayerID
         already exists within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         (Refer to user documentation for detailed description.) Default value is `Replace`.
+    * BoundingBox (str, optional): only read features that intersect the bounding box, using the format
+        "MinX,MinY,MaxX,MaxY" in the coordinate reference system of the layer.
+    * ClipGeoLayerID (str, optional): only read features that intersect the features of an existing GeoLayer.
+    * WhereClause (str, optional): SQL where clause used by the data provider to select the features to read.
+    * ReadAttributes (str, optional): comma-separated list of attributes to read.
+        Other attributes are not read.  If not specified, all attributes are read.
     """
 
     # Define the command parameters.
@@ -71,6 +78,10 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
         CommandParameterMetadata("Properties", type("")),
+        CommandParameterMetadata("BoundingBox", type("")),
+        CommandParameterMetadata("ClipGeoLayerID", type("")),
+        CommandParameterMetadata("WhereClause", type("")),
+        CommandParameterMetadata("ReadAttributes", type("")),
         CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
 
     # Command metadata for command editor display.
@@ -127,6 +138,8 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
         "Fail : The new GeoLayer is not created. A fail message is logged.")
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+    # BoundingBox, ClipGeoLayerID, WhereClause, ReadAttributes
+    command_util.add_read_filter_parameter_input_metadata(__parameter_input_metadata)
 
     # Choices for IfGeoLayerIDExists, used to validate parameter and display in editor.
     __choices_IfGeoLayerIDExists = ["Replace", "ReplaceAndWarn", "Warn", "Fail"]
@@ -205,6 +218,9 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check the parameters that filter the features that are read.
+        warning_message = command_util.check_read_filter_parameters(self, command_parameters, warning_message)
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -329,6 +345,8 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
                                      default_value=self.parameter_input_metadata['Description.Value.Default'])
         # noinspection PyPep8Naming
         pv_Properties = self.get_parameter_value("Properties")
+        # noinspection PyPep8Naming
+        pv_WhereClause = self.get_parameter_value("WhereClause")
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -339,6 +357,8 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
         pv_Description = self.command_processor.expand_parameter_value(pv_Description, self)
         # noinspection PyPep8Naming
         pv_Properties = self.command_processor.expand_parameter_value(pv_Properties, self)
+        # noinspection PyPep8Naming
+        pv_WhereClause = self.command_processor.expand_parameter_value(pv_WhereClause, self)
 
         # Convert the InputFile parameter value relative path to an absolute path and expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -356,7 +376,19 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
             # noinspection PyBroadException
             try:
                 # Create a QGSVectorLayer object with the InputFile in Shapefile format.
-                qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_file(input_file_absolute)
+                bounding_box, clip_layer, read_attributes = command_util.get_read_filters(self)
+                read_layer = functools.partial(qgis_util.read_qgsvectorlayer_from_file, input_file_absolute,
+                                               where_clause=pv_WhereClause, bounding_box=bounding_box,
+                                               clip_layer=clip_layer, read_attributes=read_attributes)
+                if self.command_processor.is_geolayer_lazy_load():
+                    # Record the file and CRS, and read the layer when it is first used.
+                    qgs_vector_layer = None
+                    qgs_layer_loader = read_layer
+                    crs_code = qgis_util.read_crs_code_from_file(input_file_absolute)
+                else:
+                    qgs_vector_layer = read_layer()
+                    qgs_layer_loader = None
+                    crs_code = None
 
                 # Create a GeoLayer and add it to the geoprocessor's GeoLayers list.
                 new_geolayer = VectorGeoLayer(geolayer_id=pv_GeoLayerID,
@@ -365,7 +397,9 @@ class ReadGeoLayerFromShapefile(AbstractCommand):
                                               description=pv_Description,
                                               input_format=VectorFormatType.ESRIShapefile,
                                               input_path_full=input_file_absolute,
-                                              input_path=pv_InputFile)
+                                              input_path=pv_InputFile,
+                                              qgs_layer_loader=qgs_layer_loader,
+                                              crs_code=crs_code)
 
                 # Set the properties.
                 properties = command_util.parse_properties_from_parameter_string(pv_Properties)
@@ -35,6 +35,7 @@ import geoprocessor.util.string_util as string_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.validator_util as validator_util
 
+import functools
 import os
 import logging
 # import re
@@ -81,6 +82,11 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
         already exists within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         (Refer to user documentation for detailed description.) Default value is `Replace`. Used if
         ReadOnlyOneFeatureClass is TRUE or FALSE.
+    * BoundingBox (str, optional): only read features that intersect the bounding box, using the format
+        "MinX,MinY,MaxX,MaxY" in the coordinate reference system of the layer.
+    * ClipGeoLayerID (str, optional): only read features that intersect the features of an existing GeoLayer.
+    * ReadAttributes (str, optional): comma-separated list of attributes to read.
+        Other attributes are not read.  If not specified, all attributes are read.
     """
 
     # Define the command parameters.
@@ -95,6 +101,9 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
         CommandParameterMetadata("Properties", type("")),
+        CommandParameterMetadata("BoundingBox", type("")),
+        CommandParameterMetadata("ClipGeoLayerID", type("")),
+        CommandParameterMetadata("ReadAttributes", type("")),
         CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
 
     # Command metadata for command editor display.
@@ -137,6 +146,11 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
         "Fail : The new GeoLayer is not created. A fail message is logged.")
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+
+    # BoundingBox, ClipGeoLayerID, ReadAttributes
+    command_util.add_read_filter_parameter_input_metadata(__parameter_input_metadata,
+                                                          include_where_clause=False)
+
     # FeatureClass
     __parameter_input_metadata['FeatureClass.Description'] = "name of feature class to read"
     __parameter_input_metadata['FeatureClass.Label'] = "Feature class"
@@ -290,6 +304,9 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check the parameters that filter the features that are read.
+        warning_message = command_util.check_read_filter_parameters(self, command_parameters, warning_message)
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -467,9 +484,20 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
                         input_folder_absolute = os.path.join(sd_folder_abs, str(pv_FeatureClass))
 
                         # Create a QgsVectorLayer object from the feature class.
-                        qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_feature_class(sd_folder_abs,
-                                                                                            pv_FeatureClass,
-                                                                                            query=pv_Query)
+                        bounding_box, clip_layer, read_attributes = command_util.get_read_filters(self)
+                        read_layer = functools.partial(
+                            qgis_util.read_qgsvectorlayer_from_feature_class,
+                            sd_folder_abs, pv_FeatureClass, query=pv_Query, bounding_box=bounding_box,
+                            clip_layer=clip_layer, read_attributes=read_attributes)
+                        if self.command_processor.is_geolayer_lazy_load():
+                            # Record the file and CRS, and read the layer when it is first used.
+                            qgs_vector_layer = None
+                            qgs_layer_loader = read_layer
+                            crs_code = qgis_util.read_crs_code_from_file(sd_folder_abs, layer_name=pv_FeatureClass)
+                        else:
+                            qgs_vector_layer = read_layer()
+                            qgs_layer_loader = None
+                            crs_code = None
 
                         # Create a GeoLayer and add it to the geoprocessor's GeoLayers list:
                         # - TODO smalers 2020-08-23 is built in OpenFileGDB used by default in underlying
@@ -480,7 +508,9 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
                                                       description=pv_Description,
                                                       input_format=VectorFormatType.OpenFileGDB,
                                                       input_path_full=input_folder_absolute,
-                                                      input_path=pv_InputFolder)
+                                                      input_path=pv_InputFolder,
+                                                      qgs_layer_loader=qgs_layer_loader,
+                                                      crs_code=crs_code)
 
                         # Set the properties as additional properties (don't just reset the property dictionary).
                         properties = command_util.parse_properties_from_parameter_string(pv_Properties)
@@ -527,8 +557,20 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
                             input_file_absolute = os.path.join(sd_folder_abs, str(feature_class))
 
                             # Create a QgsVectorLayer object from the feature class.
-                            qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_feature_class(sd_folder_abs,
-                                                                                                feature_class)
+                            bounding_box, clip_layer, read_attributes = command_util.get_read_filters(self)
+                            read_layer = functools.partial(
+                                qgis_util.read_qgsvectorlayer_from_feature_class,
+                                sd_folder_abs, feature_class, bounding_box=bounding_box, clip_layer=clip_layer,
+                                read_attributes=read_attributes)
+                            if self.command_processor.is_geolayer_lazy_load():
+                                # Record the file and CRS, and read the layer when it is first used.
+                                qgs_vector_layer = None
+                                qgs_layer_loader = read_layer
+                                crs_code = qgis_util.read_crs_code_from_file(sd_folder_abs, layer_name=feature_class)
+                            else:
+                                qgs_vector_layer = read_layer()
+                                qgs_layer_loader = None
+                                crs_code = None
 
                             # Create a GeoLayer and add it to the geoprocessor's GeoLayers list.
                             geolayer_obj = VectorGeoLayer(geolayer_id=geolayer_id,
@@ -537,7 +579,9 @@ class ReadGeoLayersFromFGDB(AbstractCommand):
                                                           description=pv_Description,
                                                           input_format=VectorFormatType.FileGDB,
                                                           input_path_full=input_file_absolute,
-                                                          input_path=pv_InputFolder)
+                                                          input_path=pv_InputFolder,
+                                                          qgs_layer_loader=qgs_layer_loader,
+                                                          crs_code=crs_code)
                             self.command_processor.add_geolayer(geolayer_obj)
 
                         except Exception:
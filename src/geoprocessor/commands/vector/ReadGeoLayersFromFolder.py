@@ -30,11 +30,12 @@ from geoprocessor.core.VectorGeoLayer import VectorGeoLayer
 import geoprocessor.util.command_util as command_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.io_util as io_util
+import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
 
 import os
 import logging
-import glob
+import time
 
 
 class ReadGeoLayersFromFolder(AbstractCommand):
@@ -64,6 +65,11 @@ class ReadGeoLayersFromFolder(AbstractCommand):
     * IfGeoLayerIDExists (str, optional): This parameter determines the action that occurs if the CopiedGeoLayerID
         already exists within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         Refer to user documentation for detailed description.) Default value is `Replace`.
+    * FileExtensions (str, optional): comma-separated list of file extensions to read, default is `.shp,.geojson`.
+    * Recursive (bool, optional): whether to also read files in sub-folders, default is False.
+        The GeoLayerID for a file in a sub-folder includes the sub-folders, for example `subfolder_filename`.
+    * MaxWorkers (int, optional): the maximum number of threads used to open files concurrently,
+        default is determined from the number of CPUs.  Layers are added in sorted file order regardless.
     """
 
     # Define the command parameters.
@@ -71,7 +77,10 @@ class ReadGeoLayersFromFolder(AbstractCommand):
         CommandParameterMetadata("InputFolder", type("")),
         CommandParameterMetadata("GeoLayerID_prefix", type("")),
         CommandParameterMetadata("Subset_Pattern", type("")),
-        CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
+        CommandParameterMetadata("IfGeoLayerIDExists", type("")),
+        CommandParameterMetadata("FileExtensions", type("")),
+        CommandParameterMetadata("Recursive", type("")),
+        CommandParameterMetadata("MaxWorkers", type(""))]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -115,6 +124,27 @@ class ReadGeoLayersFromFolder(AbstractCommand):
         "Fail : The new GeoLayer is not created. A fail message is logged.")
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
+    # FileExtensions
+    __parameter_input_metadata['FileExtensions.Description'] = "file extensions to read"
+    __parameter_input_metadata['FileExtensions.Label'] = "File extensions"
+    __parameter_input_metadata['FileExtensions.Tooltip'] = \
+        "File extensions of spatial data files to read, separated by commas (e.g., .shp,.geojson,.gpkg)."
+    __parameter_input_metadata['FileExtensions.Value.Default'] = ".shp,.geojson"
+    # Recursive
+    __parameter_input_metadata['Recursive.Description'] = "whether to read sub-folders"
+    __parameter_input_metadata['Recursive.Label'] = "Recursive"
+    __parameter_input_metadata['Recursive.Tooltip'] = (
+        "True: read spatial data files in the folder and its sub-folders.\n"
+        "The GeoLayerID for a file in a sub-folder includes the sub-folders, for example subfolder_filename.\n"
+        "False: only read spatial data files in the folder.")
+    __parameter_input_metadata['Recursive.Value.Default'] = "False"
+    __parameter_input_metadata['Recursive.Values'] = ["", "True", "False"]
+    # MaxWorkers
+    __parameter_input_metadata['MaxWorkers.Description'] = "maximum number of threads"
+    __parameter_input_metadata['MaxWorkers.Label'] = "Maximum workers"
+    __parameter_input_metadata['MaxWorkers.Tooltip'] = \
+        "The maximum number of threads used to open files concurrently. Specify 1 to read files sequentially."
+    __parameter_input_metadata['MaxWorkers.Value.Default'] = "determined from the number of CPUs"
 
     def __init__(self) -> None:
         """
@@ -177,6 +207,26 @@ class ReadGeoLayersFromFolder(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional Recursive parameter value is a valid Boolean value or is None.
+        # noinspection PyPep8Naming
+        pv_Recursive = self.get_parameter_value(parameter_name="Recursive", command_parameters=command_parameters)
+        if not validator_util.validate_bool(pv_Recursive, none_allowed=True, empty_string_allowed=True):
+            message = "Recursive parameter value ({}) is not a recognized boolean value.".format(pv_Recursive)
+            recommendation = "Specify either 'True' or 'False' for the Recursive parameter."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional MaxWorkers parameter value is a positive integer if specified.
+        # noinspection PyPep8Naming
+        pv_MaxWorkers = self.get_parameter_value(parameter_name="MaxWorkers", command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_MaxWorkers, True, True, zero_allowed=False):
+            message = "MaxWorkers parameter value ({}) is not a valid integer.".format(pv_MaxWorkers)
+            recommendation = "Specify the MaxWorkers parameter as a positive integer."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -219,13 +269,15 @@ class ReadGeoLayersFromFolder(AbstractCommand):
         # If FALSE, one or many checks failed.
         return run_read
 
-    def check_runtime_data_geolayer(self, geolayer_id: str) -> bool:
+    def check_runtime_data_geolayer(self, geolayer_id: str, batch_geolayer_ids: set = None) -> bool:
         """
         Checks the following:
-        * the ID of the output GeoLayer is unique (not an existing GeoLayer ID)
+        * the ID of the output GeoLayer is unique (not an existing GeoLayer ID
+          and not the ID of another file read by this command)
 
         Args:
             geolayer_id: the ID of the output GeoLayer
+            batch_geolayer_ids: the IDs of the GeoLayers that will be added for previous files read by this command
 
         Returns:
             run_read: Boolean. If TRUE, the GeoLayer read process should be run.
@@ -237,7 +289,8 @@ class ReadGeoLayersFromFolder(AbstractCommand):
 
         # If the GeoLayerID is the same as an already-registered GeoLayerID,
         # react according to the pv_IfGeoLayerIDExists value.
-        if self.command_processor.get_geolayer(geolayer_id):
+        if self.command_processor.get_geolayer(geolayer_id) or \
+                (batch_geolayer_ids is not None and geolayer_id in batch_geolayer_ids):
             # noinspection PyPep8Naming
             pv_IfGeoLayerIDExists = self.get_parameter_value("IfGeoLayerIDExists", default_value="Replace")
 
@@ -299,6 +352,21 @@ class ReadGeoLayersFromFolder(AbstractCommand):
         pv_Subset_Pattern = self.get_parameter_value("Subset_Pattern")
         # noinspection PyPep8Naming
         pv_GeoLayerID_prefix = self.get_parameter_value("GeoLayerID_prefix")
+        # noinspection PyPep8Naming
+        pv_FileExtensions = self.get_parameter_value(
+            "FileExtensions", default_value=self.parameter_input_metadata['FileExtensions.Value.Default'])
+        # Make sure that the extensions start with a period.
+        file_extensions = [extension if extension.startswith(".") else "." + extension
+                           for extension in string_util.delimited_string_to_list(pv_FileExtensions)
+                           if extension != ""]
+        # noinspection PyPep8Naming
+        pv_Recursive = self.get_parameter_value("Recursive", default_value="False")
+        recursive = string_util.str_to_bool(pv_Recursive)
+        # noinspection PyPep8Naming
+        pv_MaxWorkers = self.get_parameter_value("MaxWorkers")
+        max_workers = None
+        if pv_MaxWorkers is not None and pv_MaxWorkers != "":
+            max_workers = int(pv_MaxWorkers)
 
         # Convert the InputFolder parameter value relative path to an absolute path.
         sd_folder_abs = io_util.verify_path_for_os(
@@ -312,53 +380,66 @@ class ReadGeoLayersFromFolder(AbstractCommand):
             # Otherwise only files that match the given pattern will be processed.
             # Check that each file in the folder is:
             #   1. a file
-            #   2. a spatial data file (ends in .shp or .geojson)
+            #   2. a spatial data file (ends in one of the file extensions)
             #   3. follows the given pattern (if Subset_Pattern parameter value does not equal None)
-            if pv_Subset_Pattern:
-                input_files_abs = [os.path.join(sd_folder_abs, source_file)
-                                   for source_file in glob.glob(os.path.join(sd_folder_abs, pv_Subset_Pattern))
-                                   if os.path.isfile(os.path.join(sd_folder_abs, source_file))
-                                   and (source_file.endswith(".shp") or source_file.endswith(".geojson"))]
-
-            else:
-                input_files_abs = [os.path.join(sd_folder_abs, source_file)
-                                   for source_file in os.listdir(sd_folder_abs)
-                                   if os.path.isfile(os.path.join(sd_folder_abs, source_file))
-                                   and (source_file.endswith(".shp") or source_file.endswith(".geojson"))]
-
-            # Iterate through the desired spatial data files.
+            # The files are sorted so that the GeoLayers are added in the same order for each run.
+            input_files_abs = io_util.list_files(sd_folder_abs, extensions=file_extensions, pattern=pv_Subset_Pattern,
+                                                 recursive=recursive)
+
+            # Determine the GeoLayerID for each file and only read the files that pass the checks.
+            files_to_read = []
+            geolayer_ids = []
+            batch_geolayer_ids = set()
             for input_file_absolute in input_files_abs:
-                # Determine the GeoLayerID.
+                # Determine the GeoLayerID:
+                # - the filename without the extension (%f)
+                # - for files in sub-folders, also the sub-folders so that files with the same name have unique IDs
+                filename = io_util.expand_formatter(input_file_absolute, '%f')
+                if recursive:
+                    relative_folder = os.path.relpath(os.path.dirname(input_file_absolute), sd_folder_abs)
+                    if relative_folder != os.curdir:
+                        filename = "{}_{}".format(relative_folder.replace(os.sep, "_"), filename)
                 if pv_GeoLayerID_prefix:
-                    geolayer_id = "{}_{}".format(pv_GeoLayerID_prefix,
-                                                 io_util.expand_formatter(input_file_absolute, '%f'))
+                    geolayer_id = "{}_{}".format(pv_GeoLayerID_prefix, filename)
                 else:
-                    geolayer_id = io_util.expand_formatter(input_file_absolute, '%f')
+                    geolayer_id = filename
 
                 # Run the secondary checks on the parameter values. Only continue if the checks passed.
-                if self.check_runtime_data_geolayer(geolayer_id):
-                    # noinspection PyBroadException
-                    try:
-                        # Create a QGSVectorLayer object with the GeoJSON InputFolder.
-                        qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_file(input_files_abs)
-
-                        # Create a GeoLayer and add it to the geoprocessor's GeoLayers list.
-                        geolayer_obj = VectorGeoLayer(geolayer_id=geolayer_id,
-                                                      qgs_vector_layer=qgs_vector_layer,
-                                                      input_path_full=input_file_absolute,
-                                                      input_path=pv_InputFolder)
-                        self.command_processor.add_geolayer(geolayer_obj)
-
-                    # Raise an exception if an unexpected error occurs during the process.
-                    except Exception:
-                        self.warning_count += 1
-                        message = "Unexpected error reading GeoLayer {} from" \
-                                  " file {}.".format(geolayer_id, input_file_absolute)
-                        recommendation = "Check the log file for details."
-                        self.logger.warning(message, exc_info=True)
-                        self.command_status.add_to_log(CommandPhaseType.RUN,
-                                                       CommandLogRecord(CommandStatusType.FAILURE, message,
-                                                                        recommendation))
+                # Files in the same folder can have the same GeoLayerID (e.g., roads.shp and roads.geojson),
+                # so also check the IDs of previous files.
+                if self.check_runtime_data_geolayer(geolayer_id, batch_geolayer_ids):
+                    files_to_read.append(input_file_absolute)
+                    geolayer_ids.append(geolayer_id)
+                    batch_geolayer_ids.add(geolayer_id)
+
+            # Open the files concurrently:
+            # - the results are in the same order as the files
+            # - errors are collected for each file rather than stopping the read
+            start_time = time.perf_counter()
+            read_results = qgis_util.read_qgsvectorlayers_from_files(files_to_read, max_workers=max_workers)
+            self.logger.info("Opened {} files in {:.3f} seconds.".format(len(files_to_read),
+                                                                        time.perf_counter() - start_time))
+
+            for input_file_absolute, geolayer_id, (qgs_vector_layer, read_exception) in \
+                    zip(files_to_read, geolayer_ids, read_results):
+                if read_exception is not None:
+                    # Log an error for the file and continue with other files.
+                    self.warning_count += 1
+                    message = "Unexpected error reading GeoLayer {} from" \
+                              " file {} ({}).".format(geolayer_id, input_file_absolute, read_exception)
+                    recommendation = "Check the log file for details."
+                    self.logger.warning(message, exc_info=read_exception)
+                    self.command_status.add_to_log(CommandPhaseType.RUN,
+                                                   CommandLogRecord(CommandStatusType.FAILURE, message,
+                                                                    recommendation))
+                    continue
+
+                # Create a GeoLayer and add it to the geoprocessor's GeoLayers list.
+                geolayer_obj = VectorGeoLayer(geolayer_id=geolayer_id,
+                                              qgs_vector_layer=qgs_vector_layer,
+                                              input_path_full=input_file_absolute,
+                                              input_path=pv_InputFolder)
+                self.command_processor.add_geolayer(geolayer_obj)
 
         # Determine success of command processing. Raise Runtime Error if any errors occurred.
         if self.warning_count > 0:
@@ -37,6 +37,7 @@ import geoprocessor.util.string_util as string_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.validator_util as validator_util
 
+import functools
 import os
 import logging
 # import re
@@ -71,6 +72,12 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
         already exists within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         (Refer to user documentation for detailed description.) Default value is `Replace`. Used if
         ReadOneLayer is TRUE or FALSE.
+    * BoundingBox (str, optional): only read features that intersect the bounding box, using the format
+        "MinX,MinY,MaxX,MaxY" in the coordinate reference system of the layer.
+    * ClipGeoLayerID (str, optional): only read features that intersect the features of an existing GeoLayer.
+    * WhereClause (str, optional): SQL where clause used by the data provider to select the features to read.
+    * ReadAttributes (str, optional): comma-separated list of attributes to read.
+        Other attributes are not read.  If not specified, all attributes are read.
     """
 
     # Define the command parameters.
@@ -84,6 +91,10 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
         CommandParameterMetadata("Properties", type("")),
+        CommandParameterMetadata("BoundingBox", type("")),
+        CommandParameterMetadata("ClipGeoLayerID", type("")),
+        CommandParameterMetadata("WhereClause", type("")),
+        CommandParameterMetadata("ReadAttributes", type("")),
         CommandParameterMetadata("IfGeoLayerIDExists", type(""))]
 
     # Command metadata for command editor display.
@@ -182,6 +193,9 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
     __parameter_input_metadata['IfGeoLayerIDExists.Values'] = ["", "Replace", "ReplaceAndWarn", "Warn", "Fail"]
     __parameter_input_metadata['IfGeoLayerIDExists.Value.Default'] = "Replace"
 
+    # BoundingBox, ClipGeoLayerID, WhereClause, ReadAttributes
+    command_util.add_read_filter_parameter_input_metadata(__parameter_input_metadata)
+
     def __init__(self) -> None:
         """
         Initialize the command.
@@ -282,6 +296,9 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check the parameters that filter the features that are read.
+        warning_message = command_util.check_read_filter_parameters(self, command_parameters, warning_message)
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -447,6 +464,8 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
                                      default_value=self.parameter_input_metadata['Description.Value.Default'])
         # noinspection PyPep8Naming
         pv_Properties = self.get_parameter_value("Properties")
+        # noinspection PyPep8Naming
+        pv_WhereClause = self.get_parameter_value("WhereClause")
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -459,6 +478,8 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
             pv_Description = pv_Name
         # noinspection PyPep8Naming
         pv_Properties = self.command_processor.expand_parameter_value(pv_Properties, self)
+        # noinspection PyPep8Naming
+        pv_WhereClause = self.command_processor.expand_parameter_value(pv_WhereClause, self)
 
         # Convert the ReadOneLayer from a string value to a Boolean value.
         # noinspection PyPep8Naming
@@ -479,9 +500,21 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
                     # noinspection PyBroadException
                     try:
                         # Create a QgsVectorLayer object for the layer and sub-layer.
-                        qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_geopackage(input_file_abs,
-                                                                                         pv_LayerName,
-                                                                                         pv_Description)
+                        bounding_box, clip_layer, read_attributes = command_util.get_read_filters(self)
+                        read_layer = functools.partial(
+                            qgis_util.read_qgsvectorlayer_from_geopackage,
+                            input_file_abs, pv_LayerName, pv_Description,
+                            where_clause=pv_WhereClause, bounding_box=bounding_box, clip_layer=clip_layer,
+                            read_attributes=read_attributes)
+                        if self.command_processor.is_geolayer_lazy_load():
+                            # Record the file and CRS, and read the layer when it is first used.
+                            qgs_vector_layer = None
+                            qgs_layer_loader = read_layer
+                            crs_code = qgis_util.read_crs_code_from_file(input_file_abs, layer_name=pv_LayerName)
+                        else:
+                            qgs_vector_layer = read_layer()
+                            qgs_layer_loader = None
+                            crs_code = None
 
                         # Create a GeoLayer and add it to the geoprocessor's GeoLayers list.
                         new_geolayer = VectorGeoLayer(geolayer_id=pv_GeoLayerID,
@@ -489,7 +522,9 @@ class ReadGeoLayersFromGeoPackage(AbstractCommand):
                                                       name=pv_Name,
                                                       description=pv_Description,
                                                       input_path_full=input_file_abs,
-                                                      input_path=pv_InputFile)
+                                                      input_path=pv_InputFile,
+                                                      qgs_layer_loader=qgs_layer_loader,
+                                                      crs_code=crs_code)
 
                         # Set the properties.
                         properties = command_util.parse_properties_from_parameter_string(pv_Properties)
@@ -32,6 +32,7 @@ import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
+import time
 
 
 class RemoveGeoLayerFeatures(AbstractCommand):
@@ -287,31 +288,38 @@ class RemoveGeoLayerFeatures(AbstractCommand):
             try:
                 # Get the input GeoLayer.
                 input_geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
+                # Make sure that copies of the layer are not affected:
+                # - prepare before getting feature IDs because the IDs change when the features are copied
+                input_geolayer.prepare_for_edit()
                 feature_count_start = input_geolayer.qgs_layer.featureCount()
 
-                feature_ids_to_remove = []
+                # Feature IDs to remove, as a set so that duplicates are ignored.
+                feature_ids_to_remove = set()
+                start_time = time.perf_counter()
                 if pv_IncludeTableID is not None:
                     # Have a table to check.
                     attribute_name = pv_MatchAttribute
                     # Get the table with attribute values to include.
                     table = self.command_processor.get_table(pv_IncludeTableID)
-                    table_columns = [pv_IncludeTableColumn]
-
-                    # Iterate over the features and check that the requested attribute value is in the table column.
-                    for feature in input_geolayer.qgs_layer.getFeatures():
-                        # Remove the attribute from the GeoLayer.
-                        if pv_IncludeTableID is not None:
-                            attribute_value = feature[attribute_name]
-                            # Column values to check in table.
-                            column_values = [attribute_value]
-                            if table_columns is not None:
-                                # Make sure that the feature's attribute value matches a table column value.
-                                records = table.get_records(table_columns, column_values)
-                                if len(records) == 0:
-                                    # No table records matched the feature attribute value so remove the feature:
-                                    # - TODO smalers 2020-11-14 probably have to fix so don't get an
-                                    #   iterator concurrency issue
-                                    feature_ids_to_remove.append(feature.id())
+
+                    # Get the set of values to include from the table column, once:
+                    # - string columns are compared with the string representation of the feature attribute value
+                    #   (consistent with DataTable.get_records)
+                    column_index = table.get_column_index(pv_IncludeTableColumn)
+                    column_is_str = table.get_field_data_type(column_index) == str
+                    include_values = set(table.get_column_values_as_list(pv_IncludeTableColumn))
+                    self.logger.info("Include table has {} unique values in column '{}'.".format(
+                        len(include_values), pv_IncludeTableColumn))
+
+                    # Iterate over the features and check that the requested attribute value is in the table column:
+                    # - only the attribute value is fetched
+                    for feature_id, attribute_value in qgis_util.get_feature_attribute_values(
+                            input_geolayer.qgs_layer, attribute_name):
+                        if column_is_str and attribute_value is not None and not isinstance(attribute_value, str):
+                            attribute_value = "{}".format(attribute_value)
+                        if attribute_value not in include_values:
+                            # No table records matched the feature attribute value so remove the feature.
+                            feature_ids_to_remove.add(feature_id)
 
                 if exclude_attributes is not None:
                     # Remove features that match attribute values:
@@ -319,22 +327,16 @@ class RemoveGeoLayerFeatures(AbstractCommand):
                     # - attribute values from command parsing are strings so need to check types
                     exclude_features = qgis_util.get_features_matching_attributes(input_geolayer.qgs_layer,
                                                                                   exclude_attributes)
-                    for exclude_feature in exclude_features:
-                        # Only add feature ID to remove if not already in the list.
-                        found = False
-                        for feature_id in feature_ids_to_remove:
-                            if feature_id == exclude_feature.id():
-                                # Already in the list so don't exclude/remove.
-                                found = True
-                                break
-                        if not found:
-                            # Not already in the list so exclude/remove.
-                            feature_ids_to_remove.append(exclude_feature.id())
+                    feature_ids_to_remove.update([exclude_feature.id() for exclude_feature in exclude_features])
+                select_time = time.perf_counter()
 
                 # Remove the features.
                 qgis_util.remove_qgsvectorlayer_features(input_geolayer.qgs_layer, feature_ids_to_remove)
+                remove_time = time.perf_counter()
                 self.logger.info("Started with {} features, have {} features after removing features.".format(
                     feature_count_start, input_geolayer.qgs_layer.featureCount()))
+                self.logger.info("Selected {} features to remove in {:.3f} seconds, removed in {:.3f} seconds.".format(
+                    len(feature_ids_to_remove), select_time - start_time, remove_time - select_time))
 
             except Exception:
                 # Raise an exception if an unexpected error occurs during the process.
@@ -53,13 +53,16 @@ class SetGeoLayerAttribute(AbstractCommand):
     * AttributeValue (str, optional): a string value used to populate the added attribute for each feature. All
         features will have the same attribute value. This parameter is used mainly for testing. If not specified,
         the attribute values are set to NULL.
+    * AttributeExpression (str, optional): a QGIS expression that is evaluated for each feature to compute
+        the attribute value. Cannot be specified with AttributeValue.
     """
 
     # Define command parameters.
     __command_parameter_metadata: [CommandParameterMetadata] = [
         CommandParameterMetadata("GeoLayerID", str),
         CommandParameterMetadata("AttributeName", str),
-        CommandParameterMetadata("AttributeValue", str)]
+        CommandParameterMetadata("AttributeValue", str),
+        CommandParameterMetadata("AttributeExpression", str)]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -89,6 +92,12 @@ class SetGeoLayerAttribute(AbstractCommand):
     __parameter_input_metadata['AttributeValue.Tooltip'] =\
         "Attribute value. ${Property} syntax is recognized. \n" \
         "All features are populated with the same value. This parameter is designed to aid in command testing. "
+    # AttributeExpression
+    __parameter_input_metadata['AttributeExpression.Description'] = "attribute expression"
+    __parameter_input_metadata['AttributeExpression.Label'] = "Attribute expression"
+    __parameter_input_metadata['AttributeExpression.Tooltip'] =\
+        "QGIS expression to compute the attribute value for each feature, for example: \"AREA\" * 2. \n" \
+        "${Property} syntax is recognized. Cannot be specified with AttributeValue."
 
     def __init__(self) -> None:
         """
@@ -137,6 +146,20 @@ class SetGeoLayerAttribute(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that AttributeValue and AttributeExpression are not both specified.
+        # noinspection PyPep8Naming
+        pv_AttributeValue = self.get_parameter_value(parameter_name="AttributeValue",
+                                                     command_parameters=command_parameters)
+        # noinspection PyPep8Naming
+        pv_AttributeExpression = self.get_parameter_value(parameter_name="AttributeExpression",
+                                                          command_parameters=command_parameters)
+        if pv_AttributeValue is not None and pv_AttributeExpression is not None:
+            message = "AttributeValue and AttributeExpression cannot both be specified."
+            recommendation = "Specify AttributeValue or AttributeExpression."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -153,16 +176,15 @@ class SetGeoLayerAttribute(AbstractCommand):
         """
         Checks the following:
          * The ID of the input GeoLayer is an actual GeoLayer (if not, log an error message and do not continue.)
-         * The attribute name is a unique name for the GeoLayer (if not, log an error message and do not continue.)
-         * The attribute name is 10 or less characters (if not, log a warning but still create the attribute.)
+         * The attribute name exists in the GeoLayer (if not, log an error message and do not continue.)
 
         Args:
-            geolayer_id: the ID of the GeoLayer to add the new attribute
-            attribute_name: the name of the attribute to add to the GeoLayer
+            geolayer_id: the ID of the GeoLayer to set the attribute
+            attribute_name: the name of the attribute to set
 
         Returns:
-            add_attribute: Boolean. If TRUE, the attribute should be added to the GeoLayer. If FALSE, a check has
-             failed and the attribute should not be added.
+            add_attribute: Boolean. If TRUE, the attribute should be set. If FALSE, a check has
+             failed and the attribute should not be set.
         """
 
         # Boolean to determine if the attribute should be added. Set to TRUE until one or many checks fail.
@@ -188,29 +210,18 @@ class SetGeoLayerAttribute(AbstractCommand):
             # Get the existing attribute names of the input GeoLayer.
             list_of_existing_attributes = input_geolayer.get_attribute_field_names()
 
-            # If the input attribute name is not unique to the attribute table, raise a FAILURE.
-            if attribute_name in list_of_existing_attributes:
+            # If the input attribute name does not exist in the attribute table, raise a FAILURE:
+            # - the attribute must have been added, for example with AddGeoLayerAttribute
+            if attribute_name not in list_of_existing_attributes:
 
                 add_attribute = False
                 self.warning_count += 1
-                message = 'The attribute name ({}) is not unique.'.format(attribute_name)
-                recommendation = 'Specify a unique attribute name.'
+                message = 'The attribute name ({}) does not exist.'.format(attribute_name)
+                recommendation = 'Specify an existing attribute name or use AddGeoLayerAttribute to add the attribute.'
                 self.logger.warning(message)
                 self.command_status.add_to_log(CommandPhaseType.RUN,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
-            # If the input attribute name is longer than 10 characters, raise a WARNING.
-            if len(attribute_name) > 10:
-
-                self.warning_count += 1
-                message = 'The attribute name ({}) is longer than 10 characters. Esri Shapefiles require the' \
-                          ' attribute names to be 10 or less characters.'.format(attribute_name)
-                recommendation = 'If this GeoLayer will be written in shapefile format, change the attribute name to' \
-                                 ' only include 10 or less characters.'
-                self.logger.warning(message)
-                self.command_status.add_to_log(CommandPhaseType.RUN,
-                                               CommandLogRecord(CommandStatusType.WARNING, message, recommendation))
-
         # Return the Boolean to determine if the attribute should be added. If TRUE, all checks passed.
         # If FALSE, one or many checks failed.
         return add_attribute
@@ -235,6 +246,8 @@ class SetGeoLayerAttribute(AbstractCommand):
         pv_AttributeName = self.get_parameter_value("AttributeName")
         # noinspection PyPep8Naming
         pv_AttributeValue = self.get_parameter_value("AttributeValue", default_value=None)
+        # noinspection PyPep8Naming
+        pv_AttributeExpression = self.get_parameter_value("AttributeExpression", default_value=None)
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -255,7 +268,16 @@ class SetGeoLayerAttribute(AbstractCommand):
                 # Expand for ${Property} syntax.
                 # noinspection PyPep8Naming
                 pv_AttributeValue = self.command_processor.expand_parameter_value(pv_AttributeValue, self)
-                if pv_AttributeValue:
+                if pv_AttributeExpression is not None:
+                    # Compute the value for each feature from the expression.
+                    # noinspection PyPep8Naming
+                    pv_AttributeExpression = self.command_processor.expand_parameter_value(
+                        pv_AttributeExpression, self)
+                    set_count = input_geolayer.set_attribute(pv_AttributeName,
+                                                             attribute_expression=pv_AttributeExpression)
+                    self.logger.info("Set layer attribute '{}' using expression '{}' for {} features".format(
+                        pv_AttributeName, pv_AttributeExpression, set_count))
+                elif pv_AttributeValue:
                     input_geolayer.set_attribute(pv_AttributeName, pv_AttributeValue)
 
             # Raise an exception if an unexpected error occurs during the process.
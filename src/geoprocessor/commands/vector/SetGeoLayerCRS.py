@@ -228,7 +228,7 @@ class SetGeoLayerCRS(AbstractCommand):
                     alg_parameters = {
                         "INPUT": input_geolayer.qgs_layer,
                         "TARGET_CRS": pv_CRS,
-                        "OUTPUT": "memory:"
+                        "OUTPUT": self.command_processor.prepare_algorithm_output([input_geolayer], input_geolayer.id)
                     }
                     feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
                     reprojected_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
@@ -247,12 +247,13 @@ class SetGeoLayerCRS(AbstractCommand):
                     # In QGIS 3 the reprojected["OUTPUT"] returns the QGS vector layer object:
                     # - use the same name and description as the original
                     new_geolayer = VectorGeoLayer(geolayer_id=input_geolayer.id,
-                                                  qgs_vector_layer=reprojected_output["OUTPUT"],
+                                                  qgs_vector_layer=self.command_processor.get_algorithm_output_layer(
+                                                      reprojected_output["OUTPUT"]),
                                                   name=input_geolayer.name,
                                                   description=input_geolayer.description,
                                                   input_path_full=GeoLayer.SOURCE_MEMORY,
                                                   input_path=GeoLayer.SOURCE_MEMORY)
-                    self.command_processor.add_geolayer(new_geolayer)
+                    self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
                 else:
                     alg_parameters = {
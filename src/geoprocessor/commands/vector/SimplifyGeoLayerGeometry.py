@@ -34,7 +34,6 @@ import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
-import os
 # from plugins.processing.tools import general
 
 
@@ -55,6 +54,9 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
     * SimplifyMethod (str, optional): the method used to simplify the GeoLayer. Options are as follows:
         DouglasPeucker: use the Douglas-Peucker algorithm to simplify the GeoLayer
         Default: DouglasPeuker
+    * MaxWorkers (int, optional): the maximum number of worker processes used to simplify geometries in chunks.
+        If not specified, the QGIS algorithm is run in one process.
+    * ChunkSize (int, optional): the number of features in each chunk when MaxWorkers is specified.
     * SimplifiedGeoLaterID (str, optional): the ID of the simplified GeoLayer. By default, the simplified geolayer id
         is geolayerid_simple_tolerance where geolayerid is the GeoLayerID value and tolerance is the Tolerance value.
     * IfGeoLayerIDExists (str, optional): This parameter determines the action that occurs if the OutputGeoLayerID
@@ -67,6 +69,8 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
         CommandParameterMetadata("GeoLayerID", type("")),
         CommandParameterMetadata("Tolerance", type(2.5)),
         CommandParameterMetadata("SimplifyMethod", type(str)),
+        CommandParameterMetadata("MaxWorkers", type("")),
+        CommandParameterMetadata("ChunkSize", type("")),
         CommandParameterMetadata("OutputGeoLayerID", type("")),
         CommandParameterMetadata("Name", type("")),
         CommandParameterMetadata("Description", type("")),
@@ -101,6 +105,21 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
         "\nDouglasPeucker : Use the Douglas-Peucker algorithm to simplify the GeoLayer.")
     __parameter_input_metadata['SimplifyMethod.Values'] = ["", "DouglasPeucker"]
     __parameter_input_metadata['SimplifyMethod.Value.Default'] = "DouglasPeucker"
+    # MaxWorkers
+    __parameter_input_metadata['MaxWorkers.Description'] = "maximum number of worker processes"
+    __parameter_input_metadata['MaxWorkers.Label'] = "Maximum workers"
+    __parameter_input_metadata['MaxWorkers.Tooltip'] = (
+        "The maximum number of worker processes used to simplify geometries in chunks.\n"
+        "If specified, features are split into chunks that are processed in parallel, "
+        "which is faster for large layers on computers with many CPUs.\n"
+        "If not specified, the QGIS algorithm is run in one process.")
+    __parameter_input_metadata['MaxWorkers.Value.Default.Description'] = "run the QGIS algorithm in one process"
+    # ChunkSize
+    __parameter_input_metadata['ChunkSize.Description'] = "features per chunk"
+    __parameter_input_metadata['ChunkSize.Label'] = "Chunk size"
+    __parameter_input_metadata['ChunkSize.Tooltip'] = (
+        "The number of features in each chunk when MaxWorkers is specified.")
+    __parameter_input_metadata['ChunkSize.Value.Default'] = "10000"
     # OutputGeoLayerID
     __parameter_input_metadata['OutputGeoLayerID.Description'] = "output GeoLayer identifier"
     __parameter_input_metadata['OutputGeoLayerID.Label'] = "Simplified GeoLayerID"
@@ -209,6 +228,17 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
                 CommandPhaseType.INITIALIZATION,
                 CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional parameters MaxWorkers and ChunkSize are positive integers.
+        for parameter in ["MaxWorkers", "ChunkSize"]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_int(parameter_value, True, True, zero_allowed=False):
+                message = "{} parameter value ({}) is not a valid integer.".format(parameter, parameter_value)
+                recommendation = "Specify a positive integer for the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning = command_util.validate_command_parameter_names(self, warning_message)
@@ -291,6 +321,11 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
         pv_Description = \
             self.get_parameter_value("Description",
                                      default_value=self.parameter_input_metadata['Description.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_MaxWorkers = self.get_parameter_value("MaxWorkers")
+        # noinspection PyPep8Naming
+        pv_ChunkSize = self.get_parameter_value("ChunkSize",
+                                                default_value=self.parameter_input_metadata['ChunkSize.Value.Default'])
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -309,26 +344,29 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
                 # Get the GeoLayer.
                 geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
 
-                # If the GeoLayer is an in-memory GeoLayer, make it an on-disk GeoLayer.
-                if geolayer.input_path_full is None or geolayer.input_path_full.upper() in ["", GeoLayer.SOURCE_MEMORY]:
-
-                    # Get the absolute path of the GeoLayer to write to disk.
-                    geolayer_disk_abs_path = os.path.join(self.command_processor.get_property('TempDir'), geolayer.id)
-
-                    # Write the GeoLayer to disk.
-                    # Overwrite the (memory) GeoLayer in the geoprocessor with the on-disk GeoLayer.
-                    geolayer = geolayer.write_to_disk(geolayer_disk_abs_path)
-                    self.command_processor.add_geolayer(geolayer)
+                if pv_SimplifyMethod == "DOUGLASPEUCKER" and pv_MaxWorkers:
+                    # Simplify the geometries in chunks using worker processes.
+                    qgs_vector_layer = qgis_util.process_qgsvectorlayer_geometries(geolayer.qgs_layer, "Simplify",
+                                                                                   tolerance=tolerance_float,
+                                                                                   max_workers=int(pv_MaxWorkers),
+                                                                                   chunk_size=int(pv_ChunkSize))
+                    new_geolayer = VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
+                                                  qgs_vector_layer=qgs_vector_layer,
+                                                  name=pv_Name,
+                                                  description=pv_Description,
+                                                  input_path_full=GeoLayer.SOURCE_MEMORY,
+                                                  input_path=GeoLayer.SOURCE_MEMORY)
+                    self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
-                if pv_SimplifyMethod == "DOUGLASPEUCKER":
+                elif pv_SimplifyMethod == "DOUGLASPEUCKER":
                     # Perform the QGIS simplify geometries function. Refer to the REF below for parameter descriptions.
                     # REF: https://docs.qgis.org/2.8/en/docs/user_manual/processing_algs/qgis/
                     #       vector_geometry_tools/simplifygeometries.html
                     alg_parameters = {
-                        "INPUT": geolayer.qgs_layer,
+                        "INPUT": self.command_processor.prepare_algorithm_input(geolayer),
                         "METHOD": 0,
                         "TOLERANCE": tolerance_float,
-                        "OUTPUT": "memory:"
+                        "OUTPUT": self.command_processor.prepare_algorithm_output([geolayer], pv_OutputGeoLayerID)
                     }
                     feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
                     simple_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
@@ -341,12 +379,13 @@ class SimplifyGeoLayerGeometry(AbstractCommand):
                     # in QGIS3, simple_output["OUTPUT"] returns the QGS vector layer object
                     # see ClipGeoLayer.py for information about value in QGIS2 environment
                     new_geolayer = VectorGeoLayer(geolayer_id=pv_OutputGeoLayerID,
-                                                  qgs_vector_layer=simple_output["OUTPUT"],
+                                                  qgs_vector_layer=self.command_processor.get_algorithm_output_layer(
+                                                      simple_output["OUTPUT"]),
                                                   name=pv_Name,
                                                   description=pv_Description,
                                                   input_path_full=GeoLayer.SOURCE_MEMORY,
                                                   input_path=GeoLayer.SOURCE_MEMORY)
-                    self.command_processor.add_geolayer(new_geolayer)
+                    self.command_processor.add_algorithm_output_geolayer(new_geolayer)
 
             except Exception:
                 # Raise an exception if an unexpected error occurs during the process.
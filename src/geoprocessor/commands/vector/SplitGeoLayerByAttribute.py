@@ -25,10 +25,9 @@ from geoprocessor.core.CommandParameterError import CommandParameterError
 from geoprocessor.core.CommandParameterMetadata import CommandParameterMetadata
 from geoprocessor.core.CommandPhaseType import CommandPhaseType
 from geoprocessor.core.CommandStatusType import CommandStatusType
-from geoprocessor.core.QGISAlgorithmProcessingFeedbackHandler import QgisAlgorithmProcessingFeedbackHandler
+from geoprocessor.core.GeoLayer import GeoLayer
 from geoprocessor.core.VectorGeoLayer import VectorGeoLayer
 # from processing.core.Processing import Processing
-from qgis.core import QgsVectorLayer
 
 # import glob
 import geoprocessor.util.command_util as command_util
@@ -36,7 +35,7 @@ import geoprocessor.util.io_util as io_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.validator_util as validator_util
 import logging
-import tempfile
+import os
 
 
 
@@ -57,6 +56,8 @@ class SplitGeoLayerByAttribute(AbstractCommand):
     * IfGeoLayerIDExists (str, optional): This parameter determines the action that occurs if the OutputGeoLayerIDs
         already exist within the GeoProcessor. Available options are: `Replace`, `ReplaceAndWarn`, `Warn` and `Fail`
         (Refer to user documentation for detailed description.) Default value is `Replace`.
+    * TemporaryFolder (str, optional): folder to write the output layers as GeoPackage files,
+        useful for troubleshooting.  By default, the output layers are only created in memory.
     """
 
     # Define the command parameters.
@@ -134,8 +135,9 @@ class SplitGeoLayerByAttribute(AbstractCommand):
     __parameter_input_metadata['TemporaryFolder.Description'] = "temporary location for output files"
     __parameter_input_metadata['TemporaryFolder.Label'] = "Temporary files folder"
     __parameter_input_metadata['TemporaryFolder.Tooltip'] = \
-        "Folder for temporary output layer files, useful for troubleshooting. See the documentation."
-    __parameter_input_metadata['TemporaryFolder.Value.Default'] = "default temporary folder directory"
+        "Folder for output layer GeoPackage files, useful for troubleshooting. See the documentation.\n" \
+        "By default, the output layers are only created in memory."
+    __parameter_input_metadata['TemporaryFolder.Value.Default'] = "files are not written"
     __parameter_input_metadata['TemporaryFolder.FileSelector.Title'] = \
         "Select the folder for temporary files"
     __parameter_input_metadata['TemporaryFolder.FileSelector.SelectFolder'] = True
@@ -345,22 +347,21 @@ class SplitGeoLayerByAttribute(AbstractCommand):
         exclude_attribute_values = []
         if pv_ExcludeAttributeValues is not None and pv_ExcludeAttributeValues != "":
             exclude_attribute_values = pv_ExcludeAttributeValues.split(',')
-            for i in range(len(include_attribute_values)):
+            for i in range(len(exclude_attribute_values)):
                 exclude_attribute_values[i] = exclude_attribute_values[i].strip()
         # noinspection PyPep8Naming
         pv_TemporaryFolder = self.get_parameter_value("TemporaryFolder")
 
-        # Get the temporary folder based on TemporaryFolder parameter.
+        # Get the temporary folder based on TemporaryFolder parameter:
+        # - split layers are only written to files if the folder is specified
+        temp_folder_absolute = None
         if pv_TemporaryFolder is not None and pv_TemporaryFolder != "":
             # Convert the TemporaryFolder parameter value to an absolute path and expand for ${Property} syntax.
             temp_folder_absolute = io_util.verify_path_for_os(
                 io_util.to_absolute_path(self.command_processor.get_property('WorkingDir'),
                                          self.command_processor.expand_parameter_value(
                                              pv_TemporaryFolder, self)))
-        else:
-            # If using the default temp directory from environment variables create a temp folder.
-            temp_folder_absolute = tempfile.gettempdir()
-            temp_folder_absolute += "/qgissplitvectorlayer-outputfiles"
+            os.makedirs(temp_folder_absolute, exist_ok=True)
 
         # TODO jurentie 01/26/2019 Need to figure out how default should work in this case
         # @jurentie
@@ -402,142 +403,39 @@ class SplitGeoLayerByAttribute(AbstractCommand):
 
                 attribute_name = pv_AttributeName
 
-                # Perform the QGIS split vector layer function. Refer to the reference below for parameter descriptions.
-                # REF: https://docs.qgis.org/
-                # 2.8/en/docs/user_manual/processing_algs/qgis/vector_general_tools.html#split-vector-layer
-                # TODO smalers 2020-07-07 the QGIS documentation is bad.
-
-                # Assign parameter to pass into runAlgorithm for splitting the GeoLayer:
-                # INPUT = input GeoLayer (QgsVectorLayer)
-                # FIELD = Attribute name to split by
-                # OUTPUT = path to write output GeoLayers to this creates a list of files following the naming
-                #          convention attributeName_attributeValue.extension
-                #          ex: GNIS_ID_00030007.shp
-                #          The default format for QGIS 3.10 is GeoPackage with .gpkg extension.
-                #          There is discussion that the format (via extension) should be able to be specified,
-                #          but go with GeoPackage.
-                alg_parameters = {"INPUT": input_geolayer.qgs_layer,
-                                  "FIELD": attribute_name,
-                                  "OUTPUT": temp_folder_absolute}
-                # Call runAlgorithm with the parameter "qgis:splitvectorlayer" pass in the parameters defined above.
-                # This should result in separate GeoLayer files written to the OUTPUT directory.
-                # Unfortunately, there is no way to limit which attributes are processed until after the split occurs,
-                # so additional work will be done and unneeded files will be created.
-                feedback_handler = QgisAlgorithmProcessingFeedbackHandler(self)
-                split_output = qgis_util.run_processing(processor=self.command_processor.qgis_processor,
-                                                        algorithm="qgis:splitvectorlayer",
-                                                        algorithm_parameters=alg_parameters,
-                                                        feedback_handler=feedback_handler)
-                self.warning_count += feedback_handler.get_warning_count()
-
-                # Get the list of features from the input GeoLayer. This returns all attributes for each feature listed:
-                # - this is used to determine the attribute values used below to create layers
-                # - returns a QgsFeatureIterator
-                features = input_geolayer.qgs_layer.getFeatures()
-                num_features = input_geolayer.qgs_layer.featureCount()
-                # TODO smalers 2020-07-07 Make sure that the number of output GeoLayerID match the features to include.
-                # for i, feature in enumerate(features):
-                #    #attribute = feature[attribute_name]
-
-                # Create new GeoLayers and add them to the GeoProcessor's geolayers list.
-                # Set the extension for the filenames for created layers, which will indicate the layer format.
-                filename_extension = ".gpkg"
-
-                # Parse through the list of features in the input layer and also enumerate to get the index which
-                # is used for accessing which OutputGeoLayerIDs to name each GeoLayer.
-                # TODO jurentie 01/26/2019 need to decide what to do with a default OutputGeoLayerIDs:
-                # 1. Get the attribute of interest from each feature
-                # TODO jurentie 01/26/2019 need to handle parsing out unique attributes only:
-                # 2. Create the path name using the output folder specified in alg_parameters and passed in to
-                #    split_output, and the naming convention defaults for qgis:splitvectorlayer
-                # 3. Construct a QgsVectorLayer()
-                #    Parameters:
-                #       path: The path or url of the parameter. Typically this encodes parameters used by the data
-                #       provider as url query items.
-                #       baseName: The name used to represent the layer in the legend
-                #       providerLib: The name of the data provider, e.g., "memory", "postgres"
-                #       options: layer load options
-                #    For more info see:
-                #       https://qgis.org/api/classQgsVectorLayer.html#a1e7827a9d7bd33549babdc3bd7a279fd
-                # 4. Construct a new GeoLayer from the QgsVectorLayer()
-                #    Parameters:
-                #       geolayer_id (str): String that is the GeoLayer's reference ID. This ID is used to access the
-                #       GeoLayer from the GeoProcessor for manipulation.
-                #       geolayer_qgs_vector_layer (QGSVectorLayer): Object created by the QGIS processor.
-                #       All GeoLayer spatial manipulations are performed on the GeoLayer's qgs_vector_layer.
-                #       geolayer_source_path (str): The full pathname to the original spatial data file on the
-                #       user's local computer. If the geolayer was made in memory from the GeoProcessor, this value
-                #       is set to `MEMORY`.
-                # 5. Add the new GeoLayer to the GeoProcessor
-
-                # Get the list of attributes to process:
-                # - sort the attributes so that when added as GeoLayer they are easier to review
-                attributes_to_process = []
-                for i, feature in enumerate(features):
-                    attribute = feature[attribute_name]
-                    attribute_str = str(attribute)
-                    # logger.info("Checking attribute \"" + attribute_name + "\" value \"" + attribute_str + "\"")
-                    if self.is_attribute_included(attribute_str, include_attribute_values, exclude_attribute_values):
-                        # logger.info("Attribute is included for split processing.")
-                        # The attribute is OK to be processed.
-                        # Make sure to only process the layer once for its matching attribute.
-                        found = False
-                        for attribute_to_process in attributes_to_process:
-                            if attribute_str == attribute_to_process:
-                                found = True
-                                break
-                        # Indicate that attribute has been processed.
-                        if not found:
-                            # Have a new attribute to process.
-                            attributes_to_process.append(attribute_str)
-
-                # Sort the attributes.
-                attributes_to_process.sort()
-
-                # Now process the attributes that are to be included.
-                for attribute_str in attributes_to_process:
-                    # The attribute was not previously processed so create the layer from the file.
-                    logger.info("Attribute has not previously been processed... so read the split file.")
-                    split_file_path = temp_folder_absolute + "/" + attribute_name + "_" + attribute_str +\
-                       filename_extension
-                    logger.info("Reading temporary split output file into GeoLayer: " + split_file_path)
-                    layer = QgsVectorLayer(split_file_path, "layer" + attribute_str, "ogr")
+                # Split the layer in memory using a single pass over the features:
+                # - qgis:splitvectorlayer was used previously, which wrote a GeoPackage file for every
+                #   attribute value (including values that were not included), and the files were then read
+                # - the include/exclude filter is applied as the features are grouped so that
+                #   layers are only created for included values
+                split_layers = qgis_util.split_qgsvectorlayer_by_attribute(
+                    input_geolayer.qgs_layer, attribute_name,
+                    include_value=lambda value: self.is_attribute_included(value, include_attribute_values,
+                                                                           exclude_attribute_values))
+
+                # Create new GeoLayers and add them to the GeoProcessor's geolayers list:
+                # - sort the attribute values so that when added as GeoLayer they are easier to review
+                for attribute_str in sorted(split_layers.keys()):
+                    layer = split_layers[attribute_str]
                     geolayer_id = input_geolayer.id + "_" + attribute_name + "_" + attribute_str
                     logger.info("Creating GeoLayerID: " + geolayer_id)
-                    # noinspection PyBroadException
+                    if temp_folder_absolute is not None:
+                        # Only write files if requested, for example for troubleshooting:
+                        # - use the same file name as qgis:splitvectorlayer
+                        split_file_path = temp_folder_absolute + "/" + attribute_name + "_" + attribute_str + \
+                            ".gpkg"
+                        logger.info("Writing split layer to file: " + split_file_path)
+                        qgis_util.write_qgsvectorlayer_to_geopackage(layer, split_file_path,
+                                                                     input_geolayer.get_crs_code())
                     # Use the ID for the name until more control is added.
                     # Currently only support default output GeoLayerID.
                     new_geolayer = VectorGeoLayer(geolayer_id=geolayer_id,
                                                   name=geolayer_id,
                                                   qgs_vector_layer=layer,
-                                                  input_path_full=split_file_path,
-                                                  input_path=split_file_path)
+                                                  input_path_full=GeoLayer.SOURCE_MEMORY,
+                                                  input_path=GeoLayer.SOURCE_MEMORY)
                     self.command_processor.add_geolayer(new_geolayer)
 
-                # TODO smalers 2020-07-12 need to enable removing the temporary split files,
-                # but workflow will neeed to copy or read/write to another location.
-                # @jurentie
-                # Remove files if specified in parameters.
-                # TODO @jurentie figure out how to delete files after using them.
-                # remove_files = self.get_parameter_value("RemoveTemporaryFiles")
-                # files = glob.glob(temp_directory + "/*")
-                # print(files)
-                # if remove_files == None:
-                #     # Remove all files from directory.
-                #     for f in files:
-                #         os.remove(f)
-                #     os.rmdir(temp_directory)
-
-                # In QGIS 2 the clipped_output["OUTPUT"] returned the full file pathname of the memory output layer
-                # (saved in a QGIS temporary folder).
-                # qgs_vector_layer = qgis_util.read_qgsvectorlayer_from_file(clipped_output["OUTPUT"])
-                # new_geolayer = VectorGeoLayer(pv_OutputGeoLayerID, qgs_vector_layer, GeoLayer.SOURCE_MEMORY)
-                # Get this list of ID's, name can be changed later to make more sense in a dynamic fashion.
-
-                # In QGIS 3 the clipped_output["OUTPUT"] returns the QGS vector layer object.
-                # new_geolayer = VectorGeoLayer(pv_OutputGeoLayerIDs, split_output["OUTPUT"], GeoLayer.SOURCE_MEMORY)
-                # self.command_processor.add_geolayer(new_geolayer)
-
             except Exception:
                 # Raise an exception if an unexpected error occurs during the process.
                 self.warning_count += 1
@@ -29,6 +29,7 @@ from geoprocessor.core.CommandStatusType import CommandStatusType
 import geoprocessor.util.command_util as command_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.io_util as io_util
+import geoprocessor.util.string_util as string_util
 import geoprocessor.util.validator_util as validator_util
 
 import logging
@@ -42,6 +43,10 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
     Each GeoLayer object within the geoprocessor's GeoLayers list has one feature type (point, line, polygon, etc.)
     and other data (an identifier, a coordinate reference system, etc). This
     function only writes as single GeoLayer to a single GeoJSON file.
+
+    Features are written to the file as they are read from the layer, so the output is not built in memory.
+    The output can be limited to selected attributes, written as newline-delimited GeoJSON (GeoJSONSeq),
+    and compressed with gzip.
     """
 
     # Define the command parameters.
@@ -49,7 +54,12 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
         CommandParameterMetadata("GeoLayerID", type("")),
         CommandParameterMetadata("OutputFile", type("")),
         CommandParameterMetadata("OutputCRS", type("")),
-        CommandParameterMetadata("OutputPrecision", type(2))]
+        CommandParameterMetadata("OutputPrecision", type(2)),
+        CommandParameterMetadata("RFC7946", type("")),
+        CommandParameterMetadata("IncludeAttributes", type("")),
+        CommandParameterMetadata("ExcludeAttributes", type("")),
+        CommandParameterMetadata("OutputFormat", type("")),
+        CommandParameterMetadata("GzipOutput", type(""))]
 
     # Command metadata for command editor display.
     __command_metadata = dict()
@@ -73,13 +83,14 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
     __parameter_input_metadata['OutputFile.FileSelector.Type'] = "Write"
     __parameter_input_metadata['OutputFile.FileSelector.Title'] = "Select GeoJSON file to write"
     __parameter_input_metadata['OutputFile.FileSelector.Filters'] = \
-        ["GeoJSON file (*.geojson *.json)", "All files (*.*)"]
+        ["GeoJSON file (*.geojson *.json *.geojsonl *.geojsons)", "Gzip file (*.gz)", "All files (*.*)"]
     # OutputCRS
-    __parameter_input_metadata['OutputCRS.Description'] = "coordinate reference system of output (always WGS84)"
-    __parameter_input_metadata['OutputCRS.Enabled'] = False  # Because default value is always used
+    __parameter_input_metadata['OutputCRS.Description'] = "coordinate reference system of output"
     __parameter_input_metadata['OutputCRS.Label'] = "Output CRS"
     __parameter_input_metadata['OutputCRS.Tooltip'] = (
-        "The coordinate reference system of the output GeoJSON, always EPSG:4326 (WGS84)." )
+        "The coordinate reference system of the output GeoJSON.\n"
+        "If RFC7946 is True (default), the output is always EPSG:4326 (WGS84).\n"
+        "If RFC7946 is False, the default is the GeoLayer's coordinate reference system.")
     __parameter_input_metadata['OutputCRS.Value.Default'] = "EPSG:4326" # WGS84
     # OutputPrecision
     __parameter_input_metadata['OutputPrecision.Description'] = "number of decimal points in output"
@@ -92,6 +103,47 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
         "For example, a higher OutputPrecision value increases the output GeoJSON file size and "
         "increases the geometry's precision.")
     __parameter_input_metadata['OutputPrecision.Value.Default'] = "5"  # must be between 0 and 15
+    # RFC7946
+    __parameter_input_metadata['RFC7946.Description'] = "whether to follow RFC 7946"
+    __parameter_input_metadata['RFC7946.Label'] = "RFC 7946?"
+    __parameter_input_metadata['RFC7946.Tooltip'] = (
+        "If True, follow the RFC 7946 GeoJSON standard:  coordinates are reprojected to EPSG:4326 (WGS84) and "
+        "polygon exterior rings are counterclockwise.\n"
+        "If False, coordinates are written using the OutputCRS and the 'crs' member is written.")
+    __parameter_input_metadata['RFC7946.Values'] = ["", "True", "False"]
+    __parameter_input_metadata['RFC7946.Value.Default'] = "True"
+    # IncludeAttributes
+    __parameter_input_metadata['IncludeAttributes.Description'] = "attributes to write"
+    __parameter_input_metadata['IncludeAttributes.Label'] = "Include attributes"
+    __parameter_input_metadata['IncludeAttributes.Tooltip'] = \
+        "A comma-separated list of the glob-style patterns to filter the attributes to include in the output."
+    __parameter_input_metadata['IncludeAttributes.Value.Default'] = "*"
+    # ExcludeAttributes
+    __parameter_input_metadata['ExcludeAttributes.Description'] = "attributes to not write"
+    __parameter_input_metadata['ExcludeAttributes.Label'] = "Exclude attributes"
+    __parameter_input_metadata['ExcludeAttributes.Tooltip'] = \
+        "A comma-separated list of the glob-style patterns to filter the attributes to exclude from the output."
+    __parameter_input_metadata['ExcludeAttributes.Value.Default'] = "'' (empty string)"
+    # OutputFormat
+    __parameter_input_metadata['OutputFormat.Description'] = "GeoJSON or GeoJSONSeq"
+    __parameter_input_metadata['OutputFormat.Label'] = "Output format"
+    __parameter_input_metadata['OutputFormat.Tooltip'] = (
+        "GeoJSON:  write a FeatureCollection.\n"
+        "GeoJSONSeq:  write newline-delimited GeoJSON with one feature per line, "
+        "which can be read one feature at a time.")
+    __parameter_input_metadata['OutputFormat.Values'] = ["", "GeoJSON", "GeoJSONSeq"]
+    __parameter_input_metadata['OutputFormat.Value.Default'] = "GeoJSON"
+    # GzipOutput
+    __parameter_input_metadata['GzipOutput.Description'] = "whether to gzip the output"
+    __parameter_input_metadata['GzipOutput.Label'] = "Gzip output?"
+    __parameter_input_metadata['GzipOutput.Tooltip'] = (
+        "If True, the output file is compressed with gzip and .gz is appended to the filename if necessary.\n"
+        "If False, the output file is not compressed.")
+    __parameter_input_metadata['GzipOutput.Values'] = ["", "True", "False"]
+    __parameter_input_metadata['GzipOutput.Value.Default.Description'] = "True if OutputFile ends with .gz"
+
+    # Choices for OutputFormat, used to validate parameter and display in editor.
+    __choices_OutputFormat = ["GeoJSON", "GeoJSONSeq"]
 
     def __init__(self) -> None:
         """
@@ -141,6 +193,31 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
                 self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
                                                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
 
+        # Check that optional parameters RFC7946 and GzipOutput are valid Boolean values or None.
+        for parameter in ["RFC7946", "GzipOutput"]:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_bool(parameter_value, none_allowed=True, empty_string_allowed=True):
+                message = "{} parameter value ({}) is not a recognized boolean value.".format(parameter,
+                                                                                            parameter_value)
+                recommendation = "Specify either 'True' or 'False' for the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(
+                    CommandPhaseType.INITIALIZATION,
+                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional parameter OutputFormat is one of the acceptable values or is None.
+        # noinspection PyPep8Naming
+        pv_OutputFormat = self.get_parameter_value(parameter_name="OutputFormat", command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_OutputFormat, self.__choices_OutputFormat,
+                                                      none_allowed=True, empty_string_allowed=True, ignore_case=True):
+            message = "OutputFormat parameter value ({}) is not recognized.".format(pv_OutputFormat)
+            recommendation = "Specify one of the acceptable values ({}) for the OutputFormat parameter.".format(
+                self.__choices_OutputFormat)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
         # Check for unrecognized parameters.
         # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
         warning_message = command_util.validate_command_parameter_names(self, warning_message)
@@ -214,6 +291,19 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
                                      default_value=self.parameter_input_metadata['OutputPrecision.Value.Default']))
         # noinspection PyPep8Naming
         pv_OutputFile = self.get_parameter_value("OutputFile")
+        # noinspection PyPep8Naming
+        pv_RFC7946 = self.get_parameter_value("RFC7946",
+                                              default_value=self.parameter_input_metadata['RFC7946.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_IncludeAttributes = self.get_parameter_value("IncludeAttributes", default_value="*")
+        # noinspection PyPep8Naming
+        pv_ExcludeAttributes = self.get_parameter_value("ExcludeAttributes", default_value="''")
+        # noinspection PyPep8Naming
+        pv_OutputFormat = self.get_parameter_value("OutputFormat",
+                                                   default_value=self.parameter_input_metadata[
+                                                       'OutputFormat.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_GzipOutput = self.get_parameter_value("GzipOutput")
 
         # Expand for ${Property} syntax.
         # noinspection PyPep8Naming
@@ -224,6 +314,18 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
             io_util.to_absolute_path(self.command_processor.get_property('WorkingDir'),
                                      self.command_processor.expand_parameter_value(pv_OutputFile, self)))
 
+        # Convert the Boolean and list parameters.
+        rfc7946 = string_util.str_to_bool(pv_RFC7946)
+        sequence = pv_OutputFormat.upper() == "GEOJSONSEQ"
+        if pv_GzipOutput:
+            gzip_output = string_util.str_to_bool(pv_GzipOutput)
+            if gzip_output and not output_file_absolute.lower().endswith(".gz"):
+                output_file_absolute += ".gz"
+        else:
+            gzip_output = output_file_absolute.lower().endswith(".gz")
+        attrs_to_include = string_util.delimited_string_to_list(pv_IncludeAttributes)
+        attrs_to_exclude = string_util.delimited_string_to_list(pv_ExcludeAttributes)
+
         # Run the checks on the parameter values. Only continue if the checks passed.
         if self.check_runtime_data(pv_GeoLayerID, output_file_absolute, pv_OutputPrecision):
 
@@ -232,13 +334,14 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
                 # Get the GeoLayer.
                 geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
 
-                # Get the current coordinate reference system (in EPSG code) of the current GeoLayer.
-                geolayer_crs_code = geolayer.get_crs_code()
-
-                # OutputCRS is always EPSG:4326 (WGS84).
-                # noinspection PyPep8Naming
-                pv_OutputCRS = self.get_parameter_value("OutputCRS", default_value='EPSG:4326')
-                if pv_OutputCRS != "EPSG:4326":
+                # OutputCRS is always EPSG:4326 (WGS84) for RFC 7946, otherwise default to the GeoLayer's CRS.
+                if rfc7946:
+                    # noinspection PyPep8Naming
+                    pv_OutputCRS = self.get_parameter_value("OutputCRS", default_value='EPSG:4326')
+                else:
+                    # noinspection PyPep8Naming
+                    pv_OutputCRS = self.get_parameter_value("OutputCRS", default_value=geolayer.get_crs_code())
+                if rfc7946 and pv_OutputCRS != "EPSG:4326":
                     self.warning_count += 1
                     message = "OutputCRS must be EPSG:4326 (resetting automatically)"
                     recommendation = "Change the OutputCRS to ESPG:4326 (using text editor)."
@@ -247,11 +350,19 @@ class WriteGeoLayerToGeoJSON(AbstractCommand):
                                                    CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
                     pv_OutputCRS = "EPSG:4326"
 
-                # Write the GeoLayer to a spatial data file in GeoJSON format.
-                qgis_util.write_qgsvectorlayer_to_geojson(geolayer.qgs_layer,
-                                                          output_file_absolute,
-                                                          pv_OutputCRS,
-                                                          pv_OutputPrecision)
+                # Determine the attributes to write.
+                attribute_names = string_util.filter_list_of_strings(geolayer.get_attribute_field_names(),
+                                                                     attrs_to_include, attrs_to_exclude)
+
+                # Write the GeoLayer to a spatial data file in GeoJSON format, one feature at a time.
+                qgis_util.write_qgsvectorlayer_to_geojson_stream(geolayer.qgs_layer,
+                                                                 output_file_absolute,
+                                                                 precision=pv_OutputPrecision,
+                                                                 crs_code=pv_OutputCRS,
+                                                                 rfc7946=rfc7946,
+                                                                 attribute_names=attribute_names,
+                                                                 sequence=sequence,
+                                                                 gzip_output=gzip_output)
 
                 # Save the output file names in the layer, used when creating a GeoMapProject.
                 self.logger.debug("Setting output_path_full='" + output_file_absolute + "' output_path='" +
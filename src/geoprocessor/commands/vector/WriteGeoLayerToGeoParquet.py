@@ -0,0 +1,321 @@
+# WriteGeoLayerToGeoParquet - write a GeoLayer to a GeoParquet file
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+from geoprocessor.commands.abstract.AbstractCommand import AbstractCommand
+
+from geoprocessor.core.CommandError import CommandError
+from geoprocessor.core.CommandLogRecord import CommandLogRecord
+from geoprocessor.core.CommandParameterError import CommandParameterError
+from geoprocessor.core.CommandParameterMetadata import CommandParameterMetadata
+from geoprocessor.core.CommandPhaseType import CommandPhaseType
+from geoprocessor.core.CommandStatusType import CommandStatusType
+
+import geoprocessor.util.command_util as command_util
+import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.io_util as io_util
+import geoprocessor.util.validator_util as validator_util
+
+import os
+import logging
+
+
+class WriteGeoLayerToGeoParquet(AbstractCommand):
+    """
+    Write a GeoLayer to a spatial data file in GeoParquet format.
+
+    This command writes a GeoLayer registered within the geoprocessor to a spatial data file in GeoParquet format,
+    which is a columnar format that can be used with analytics tools.  Geometry is written as WKB with GeoParquet
+    metadata and attributes are written as typed columns.  The GDAL Parquet driver is used so no network access
+    or additional Python packages are needed.
+    """
+
+    # Define the command parameters.
+    __command_parameter_metadata: [CommandParameterMetadata] = [
+        CommandParameterMetadata("GeoLayerID", str),
+        CommandParameterMetadata("OutputFile", str),
+        CommandParameterMetadata("OutputCRS", str),
+        CommandParameterMetadata("Compression", str),
+        CommandParameterMetadata("RowGroupSize", int)]
+
+    # Command metadata for command editor display.
+    __command_metadata = dict()
+    __command_metadata['Description'] = "Write a GeoLayer to a file in GeoParquet format."
+    __command_metadata['EditorType'] = "Simple"
+
+    # Command Parameter Metadata.
+    __parameter_input_metadata = dict()
+    # GeoLayerID
+    __parameter_input_metadata['GeoLayerID.Description'] = "identifier of the GeoLayer to write"
+    __parameter_input_metadata['GeoLayerID.Label'] = "GeoLayerID"
+    __parameter_input_metadata['GeoLayerID.Required'] = True
+    __parameter_input_metadata['GeoLayerID.Tooltip'] = "The identifier of the GeoLayer to write."
+    # OutputFile
+    __parameter_input_metadata['OutputFile.Description'] = "the GeoParquet file to write"
+    __parameter_input_metadata['OutputFile.Label'] = "Output file"
+    __parameter_input_metadata['OutputFile.Required'] = True
+    __parameter_input_metadata['OutputFile.Tooltip'] = \
+        "The output GeoParquet file (relative or absolute path). ${Property} syntax is recognized."
+    __parameter_input_metadata['OutputFile.FileSelector.Type'] = "Write"
+    __parameter_input_metadata['OutputFile.FileSelector.Title'] = "Select GeoParquet file to write"
+    __parameter_input_metadata['OutputFile.FileSelector.Filters'] = \
+        ["GeoParquet file (*.parquet)", "All files (*.*)"]
+    # OutputCRS
+    __parameter_input_metadata['OutputCRS.Description'] = "coordinate reference system of the GeoParquet file"
+    __parameter_input_metadata['OutputCRS.Label'] = "Output CRS"
+    __parameter_input_metadata['OutputCRS.Tooltip'] = (
+        "The coordinate reference system of the output GeoParquet file. EPSG or ESRI code format required "
+        "(e.g. EPSG:4326, EPSG:26913, ESRI:102003).\n"
+        "If the output CRS is different than the CRS of the GeoLayer, the output GeoParquet file is reprojected "
+        "to the new CRS.")
+    __parameter_input_metadata['OutputCRS.Value.Default'] = "The GeoLayer's CRS"
+    # Compression
+    __parameter_input_metadata['Compression.Description'] = "compression codec"
+    __parameter_input_metadata['Compression.Label'] = "Compression"
+    __parameter_input_metadata['Compression.Tooltip'] = (
+        "The compression codec for column data.  ZSTD usually gives smaller files, "
+        "SNAPPY is faster to read and write.")
+    __parameter_input_metadata['Compression.Value.Default'] = "SNAPPY"
+    __parameter_input_metadata['Compression.Values'] = ["", "NONE", "SNAPPY", "GZIP", "BROTLI", "ZSTD", "LZ4_RAW"]
+    # RowGroupSize
+    __parameter_input_metadata['RowGroupSize.Description'] = "maximum features in a row group"
+    __parameter_input_metadata['RowGroupSize.Label'] = "Row group size"
+    __parameter_input_metadata['RowGroupSize.Tooltip'] = (
+        "The maximum number of features in a row group.  Smaller row groups allow more selective reads "
+        "using the row group statistics, larger row groups compress better.")
+    __parameter_input_metadata['RowGroupSize.Value.Default'] = "65536"
+
+    # Choices for Compression, used to validate parameter and display in editor.
+    __choices_Compression = ["NONE", "SNAPPY", "GZIP", "BROTLI", "ZSTD", "LZ4_RAW"]
+
+    def __init__(self) -> None:
+        """
+        Initialize the command.
+        """
+
+        # AbstractCommand data.
+        super().__init__()
+        self.command_name = "WriteGeoLayerToGeoParquet"
+        self.command_parameter_metadata = self.__command_parameter_metadata
+
+        # Command metadata for command editor display.
+        self.command_metadata = self.__command_metadata
+
+        # Command Parameter Metadata.
+        self.parameter_input_metadata = self.__parameter_input_metadata
+
+        # Class data.
+        self.warning_count = 0
+        self.logger = logging.getLogger(__name__)
+
+    def check_command_parameters(self, command_parameters: dict) -> None:
+        """
+        Check the command parameters for validity.
+
+        Args:
+            command_parameters: the dictionary of command parameters to check (key:string_value)
+
+        Returns: None.
+
+        Raises:
+            ValueError if any parameters are invalid or do not have a valid value.
+            The command status messages for initialization are populated with validation messages.
+        """
+
+        warning_message = ""
+
+        # Check that required parameters are non-empty, non-None strings.
+        required_parameters = command_util.get_required_parameter_names(self)
+        for parameter in required_parameters:
+            parameter_value = self.get_parameter_value(parameter_name=parameter, command_parameters=command_parameters)
+            if not validator_util.validate_string(parameter_value, False, False):
+                message = "Required {} parameter has no value.".format(parameter)
+                recommendation = "Specify the {} parameter.".format(parameter)
+                warning_message += "\n" + message
+                self.command_status.add_to_log(CommandPhaseType.INITIALIZATION,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional parameter Compression is one of the acceptable values or is None.
+        # noinspection PyPep8Naming
+        pv_Compression = self.get_parameter_value(parameter_name="Compression", command_parameters=command_parameters)
+        if not validator_util.validate_string_in_list(pv_Compression, self.__choices_Compression,
+                                                      none_allowed=True, empty_string_allowed=True, ignore_case=True):
+            message = "Compression parameter value ({}) is not recognized.".format(pv_Compression)
+            recommendation = "Specify one of the acceptable values ({}) for the Compression parameter.".format(
+                self.__choices_Compression)
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check that optional parameter RowGroupSize is a positive integer.
+        # noinspection PyPep8Naming
+        pv_RowGroupSize = self.get_parameter_value(parameter_name="RowGroupSize",
+                                                   command_parameters=command_parameters)
+        if not validator_util.validate_int(pv_RowGroupSize, True, True, zero_allowed=False):
+            message = "RowGroupSize parameter value ({}) is not a valid integer.".format(pv_RowGroupSize)
+            recommendation = "Specify a positive integer for the RowGroupSize parameter."
+            warning_message += "\n" + message
+            self.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Check for unrecognized parameters.
+        # This returns a message that can be appended to the warning, which if non-empty triggers an exception below.
+        warning_message = command_util.validate_command_parameter_names(self, warning_message)
+
+        # If any warnings were generated, throw an exception.
+        if len(warning_message) > 0:
+            self.logger.warning(warning_message)
+            raise CommandParameterError(warning_message)
+
+        # Refresh the phase severity.
+        self.command_status.refresh_phase_severity(CommandPhaseType.INITIALIZATION, CommandStatusType.SUCCESS)
+
+    def check_runtime_data(self, geolayer_id: str, output_file_abs: str) -> bool:
+        """
+        Checks the following:
+        * the ID of the GeoLayer is an existing GeoLayer ID
+        * the output folder is a valid folder
+
+        Args:
+            geolayer_id: the ID of the GeoLayer to be written
+            output_file_abs: the full pathname to the output file
+
+        Returns:
+            run_write: Boolean. If TRUE, the writing process should be run. If FALSE, it should not be run.
+        """
+
+        # Boolean to determine if the writing process should be run. Set to true until an error occurs.
+        run_write = True
+
+        # Boolean to determine if the output format parameters have valid bool values. Set to true until proven false.
+        # valid_output_bool = True
+
+        # If the GeoLayer ID is not an existing GeoLayer ID, raise a FAILURE.
+        if not self.command_processor.get_geolayer(geolayer_id):
+            run_write = False
+            self.warning_count += 1
+            message = 'The GeoLayerID ({}) is not a valid GeoLayer ID.'.format(geolayer_id)
+            recommendation = 'Specify a valid GeoLayerID.'
+            self.logger.warning(message)
+            self.command_status.add_to_log(CommandPhaseType.RUN,
+                                           CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # If the OutputFolder is not a valid folder, raise a FAILURE.
+        output_folder = os.path.dirname(output_file_abs)
+        if not os.path.isdir(output_folder):
+            run_write = False
+            self.warning_count += 1
+            message = 'The output folder ({}) of the OutputFile is not a valid folder.'.format(output_folder)
+            recommendation = 'Specify a valid relative pathname for the output file.'
+            self.logger.warning(message)
+            self.command_status.add_to_log(CommandPhaseType.RUN, CommandLogRecord(CommandStatusType.FAILURE,
+                                                                                  message, recommendation))
+
+        # Return the Boolean to determine if the write process should be run. If TRUE, all checks passed.
+        # If FALSE, one or many checks failed.
+        return run_write
+
+    def run_command(self) -> None:
+        """
+        Run the command. Write the GeoLayer to a spatial data file in GeoParquet format.
+
+        Returns:
+            None.
+
+        Raises:
+            RuntimeError if any warnings occurred during run_command method.
+        """
+
+        self.warning_count = 0
+
+        # Obtain the parameter values except for the OutputCRS.
+        # noinspection PyPep8Naming
+        pv_GeoLayerID = self.get_parameter_value("GeoLayerID")
+        # noinspection PyPep8Naming
+        pv_OutputFile = self.get_parameter_value("OutputFile")
+        # noinspection PyPep8Naming
+        pv_Compression = self.get_parameter_value("Compression",
+                                                  default_value=self.parameter_input_metadata[
+                                                      'Compression.Value.Default'])
+        # noinspection PyPep8Naming
+        pv_RowGroupSize = self.get_parameter_value("RowGroupSize",
+                                                   default_value=self.parameter_input_metadata[
+                                                       'RowGroupSize.Value.Default'])
+
+        # Expand for ${Property} syntax.
+        # noinspection PyPep8Naming
+        pv_GeoLayerID = self.command_processor.expand_parameter_value(pv_GeoLayerID, self)
+
+        # Convert the RowGroupSize value to an integer.
+        row_group_size = int(pv_RowGroupSize)
+
+        # Convert the OutputFile parameter value relative path to an absolute path and expand for ${Property} syntax.
+        output_file_absolute = io_util.verify_path_for_os(
+            io_util.to_absolute_path(self.command_processor.get_property('WorkingDir'),
+                                     self.command_processor.expand_parameter_value(pv_OutputFile, self)))
+
+        # Run the checks on the parameter values. Only continue if the checks passed.
+        if self.check_runtime_data(pv_GeoLayerID, output_file_absolute):
+
+            # noinspection PyBroadException
+            try:
+
+                # Get the GeoLayer.
+                geolayer = self.command_processor.get_geolayer(pv_GeoLayerID)
+
+                # Get the current coordinate reference system (in EPSG code) of the current GeoLayer.
+                geolayer_crs = geolayer.get_crs()
+
+                # Obtain the parameter value of the OutputCRS.
+                # noinspection PyPep8Naming
+                pv_OutputCRS = self.get_parameter_value("OutputCRS", default_value=geolayer_crs)
+
+                # Write the GeoLayer to a spatial data file in GeoParquet format.
+                qgis_util.write_qgsvectorlayer_to_geoparquet(geolayer.qgs_layer,
+                                                             output_file_absolute,
+                                                             pv_OutputCRS,
+                                                             compression=pv_Compression,
+                                                             row_group_size=row_group_size)
+
+                # Save the output file names in the layer, used when creating a GeoMapProject.
+                geolayer.output_path_full = output_file_absolute
+                geolayer.output_path = pv_OutputFile
+
+                # Save the output file in the processor, used by the UI to list output files.
+                self.command_processor.add_output_file(output_file_absolute)
+
+            except Exception:
+                # Raise an exception if an unexpected error occurs during the process.
+                self.warning_count += 1
+                message = "Unexpected error writing GeoLayer {} to spatial data file in GeoParquet format.".format(
+                    pv_GeoLayerID)
+                recommendation = "Check the log file for details."
+                self.logger.warning(message, exc_info=True)
+                self.command_status.add_to_log(CommandPhaseType.RUN,
+                                               CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+
+        # Determine success of command processing. Raise Runtime Error if any errors occurred.
+        if self.warning_count > 0:
+            message = "There were {} warnings processing the command.".format(self.warning_count)
+            raise CommandError(message)
+
+        # Set command status type as SUCCESS if there are no errors.
+        else:
+            self.command_status.refresh_phase_severity(CommandPhaseType.RUN, CommandStatusType.SUCCESS)
@@ -25,7 +25,8 @@ from __future__ import annotations
 from qgis.core import QgsMapLayer as QgsMapLayer
 from qgis.core import QgsCoordinateReferenceSystem as QgsCoordinateReferenceSystem
 
-# import logging
+import logging
+from typing import Callable
 
 
 class GeoLayer(object):
@@ -51,6 +52,11 @@ class GeoLayer(object):
     creates a new GeoLayer (example: Clip).
     When this occurs, the in-memory GeoLayer is assigned a geolayer_id from within the command,
     the geolayer_qgs_vector_layer is created from within the command and the geolayer_source_path is set to 'MEMORY'.
+
+    A GeoLayer can be lazy-loaded by providing a 'qgs_layer_loader' function instead of a QgsMapLayer.
+    The loader is called the first time that 'qgs_layer' is accessed, for example to access features or geometry.
+    Metadata such as the CRS code can be provided when the GeoLayer is created
+    so that checks, such as whether layers have the same CRS, do not need to load the layer.
     """
 
     # Indicates that the layer source is memory, rather than being read from a file:
@@ -68,7 +74,9 @@ class GeoLayer(object):
                  input_format: str = FORMAT_MEMORY,
                  input_path_full: str = SOURCE_MEMORY,
                  input_path: str = SOURCE_MEMORY,
-                 properties: dict = None) -> None:
+                 properties: dict = None,
+                 qgs_layer_loader: Callable[[], QgsMapLayer] = None,
+                 crs_code: str = None) -> None:
         """
         Initialize a new GeoLayer instance.
 
@@ -102,8 +110,20 @@ class GeoLayer(object):
             properties ({}):
                 A dictionary of user (non-built-in) properties that can be assigned to the layer.
                 These properties facilitate processing by external applications if written to map project.
+            qgs_layer_loader (function):
+                Function with no arguments that returns the QgsMapLayer, used to lazy-load the layer
+                when 'qgs_layer' is first accessed.  Use instead of 'qgs_layer'.
+            crs_code (str):
+                Coordinate reference system code (e.g., "EPSG:4326") of a lazy-loaded layer,
+                used until the layer is loaded.
         """
 
+        # Function used to lazy-load the QgsMapLayer, set to None after the layer is loaded.
+        self.__qgs_layer_loader = qgs_layer_loader
+
+        # Cached CRS code for a lazy-loaded layer, used until the layer is loaded.
+        self.__crs_code = crs_code
+
         # "id" is a string that is the GeoLayer's reference ID.
         # This ID is used to access the GeoLayer from the GeoProcessor for manipulation.
         self.id = geolayer_id
@@ -116,7 +136,8 @@ class GeoLayer(object):
 
         # "qgs_layer" is a QgsVectorLayer or QgsRasterLayer object created by the QGIS processor.
         # All spatial manipulations are performed on the GeoLayer's qgs_layer.
-        self.qgs_layer = qgs_layer
+        # The layer is stored in '__qgs_layer' so that it can be lazy-loaded (see the 'qgs_layer' property).
+        self.__qgs_layer = qgs_layer
 
         # self.input_format (str) is the format of the input, corresponding to the file format or web service format.
         # See the following:  https://gdal.org/drivers/vector/index.html
@@ -212,19 +233,25 @@ class GeoLayer(object):
         """
         Returns the coordinate reference system EPSG object.
         Use get_crs_code() to get the string code (e.g., "EPSG:4326").
+        If the layer has not been loaded, the cached CRS code is used if available.
         """
 
         # "crs" (str) is the GeoLayer's coordinate reference system in
         # <EPSG format 'http://spatialreference.org/ref/epsg/'>_.
+        if not self.is_loaded() and self.__crs_code:
+            return QgsCoordinateReferenceSystem(self.__crs_code)
         return self.qgs_layer.crs()
 
     def get_crs_code(self) -> str or None:
         """
         Returns the coordinate reference system EPSG code of a GeoLayer, for example "EPSG:4326".
+        If the layer has not been loaded, the cached CRS code is used if available.
         """
 
         # "crs" (str) is the GeoLayer's coordinate reference system
         # <EPSG format 'http://spatialreference.org/ref/epsg/'>_.
+        if not self.is_loaded() and self.__crs_code:
+            return self.__crs_code
         if self.qgs_layer is None:
             return None
         else:
@@ -280,6 +307,15 @@ class GeoLayer(object):
             else:
                 return if_not_found_val
 
+    def is_loaded(self) -> bool:
+        """
+        Indicate whether the layer has been loaded, which is always the case unless the layer is lazy-loaded.
+
+        Returns:
+            True if the layer has been loaded, False if it will be loaded when 'qgs_layer' is accessed.
+        """
+        return self.__qgs_layer_loader is None
+
     def is_raster(self) -> bool:
         """
         Indicate whether a raster layer.
@@ -298,6 +334,45 @@ class GeoLayer(object):
         """
         raise RuntimeError("is_vector() function should be implemented in derived class.")
 
+    @property
+    def qgs_layer(self) -> QgsMapLayer or None:
+        """
+        The QgsVectorLayer or QgsRasterLayer for the GeoLayer.
+        If the layer is lazy-loaded, it is loaded the first time that it is accessed.
+
+        Returns:
+            The QgsMapLayer for the GeoLayer.
+
+        Raises:
+            Exceptions raised by the loader, for example IOError if the layer cannot be read.
+        """
+        if self.__qgs_layer_loader is not None:
+            logger = logging.getLogger(__name__)
+            logger.info("Loading GeoLayer '{}' from: {}".format(self.id, self.input_path_full))
+            # Clear the loader only after the layer is loaded so that a failed read is raised again
+            # when the layer is next accessed, rather than the layer being None.
+            self.__qgs_layer = self.__qgs_layer_loader()
+            self.__qgs_layer_loader = None
+            self.__crs_code = None
+            if self.__qgs_layer is not None:
+                self.qgs_id = self.__qgs_layer.id()
+        return self.__qgs_layer
+
+    @qgs_layer.setter
+    def qgs_layer(self, qgs_layer: QgsMapLayer or None) -> None:
+        """
+        Set the QgsVectorLayer or QgsRasterLayer for the GeoLayer, which replaces a lazy-loaded layer.
+
+        Args:
+            qgs_layer (QgsMapLayer): the QgsMapLayer for the GeoLayer
+
+        Returns:
+            None
+        """
+        self.__qgs_layer_loader = None
+        self.__crs_code = None
+        self.__qgs_layer = qgs_layer
+
     def set_property(self, property_name: str, property_value: object) -> None:
         """
         Set a GeoLayer property.
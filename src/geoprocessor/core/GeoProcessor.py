@@ -34,9 +34,11 @@ from geoprocessor.commands.running.If import If
 
 import geoprocessor.util.app_util as app_util
 import geoprocessor.util.command_util as command_util
+import geoprocessor.util.io_util as io_util
 import geoprocessor.util.os_util as os_util
 import geoprocessor.util.qgis_util as qgis_util
 import geoprocessor.util.qgis_version_util as qgis_version_util
+import geoprocessor.util.string_util as string_util
 
 # QGIS-specific code.
 from plugins.processing.core import Processing
@@ -47,6 +49,7 @@ import logging
 import os
 from pathlib import Path
 import platform
+import shutil
 # import sys
 import tempfile
 from time import gmtime, strftime
@@ -189,6 +192,28 @@ class GeoProcessor(object):
         # - should always work for RunCommands but what if nested several layers?
         self.env_properties = {}
 
+        # Scratch GeoPackage used for algorithm inputs that can't be passed as in-memory layers:
+        # - one file is used for the run, with one layer per input
+        # - created when first needed by prepare_algorithm_input() and removed at the end of the run
+        self.scratch_geopackage: str or None = None
+        self.scratch_geopackage_layer_count: int = 0
+
+        # GeoPackage files for large algorithm outputs that were moved out of memory (spilled):
+        # - one file is used for each spilled GeoLayer so that freeing the GeoLayer can remove the file
+        # - created by prepare_algorithm_output() or add_algorithm_output_geolayer()
+        #   and removed when the GeoLayer is freed or the run ends
+        self.spill_geopackage_files: [str] = []
+        self.spill_geopackage_count: int = 0
+
+        # Raster files for intermediate results, such as raster algorithm outputs that are read into GeoLayers:
+        # - files are in GDAL's /vsimem/, a memory-backed folder or the scratch folder (see get_raster_scratch_file())
+        # - files in memory are also in the list of memory files, which is limited by 'RasterScratchMemoryLimit'
+        # - removed when the GeoLayer is freed or the next run starts,
+        #   so that GeoLayers are available after the run
+        self.raster_scratch_files: [str] = []
+        self.raster_scratch_memory_files: [str] = []
+        self.raster_scratch_count: int = 0
+
     def __len__(self) -> int:
         """
         Return the length of the command list.
@@ -201,6 +226,47 @@ class GeoProcessor(object):
         else:
             return len(self.commands)
 
+    def add_algorithm_output_geolayer(self, geolayer: GeoLayer) -> None:
+        """
+        Add a GeoLayer created by a QGIS processing algorithm to the geolayers list,
+        applying the storage policy for large layers.
+        If the algorithm output was written to a scratch GeoPackage (see prepare_algorithm_output()),
+        the GeoLayer is recorded as spilled.
+        Otherwise, if the in-memory layer has more features than the 'GeoLayerSpillFeatureCount' processor property,
+        or its estimated size in bytes is larger than the 'GeoLayerSpillSize' processor property,
+        the features are written to a scratch GeoPackage in the 'ScratchDir' or 'TempDir' folder
+        and the GeoLayer is changed to use the GeoPackage layer, releasing the in-memory layer.
+        This handles outputs that are larger than their inputs and layers created without an algorithm,
+        but does not reduce the peak memory use, which requires using prepare_algorithm_output().
+        The GeoLayer keeps its ID and is otherwise used like any other GeoLayer.
+        The GeoPackage is removed when the GeoLayer is freed and at the end of the run,
+        so spilled GeoLayers that are needed after the run should be written to a file.
+
+        Args:
+            geolayer: instance of a GeoLayer object
+
+        Returns:
+            None
+        """
+        spill_geopackage = None
+        if geolayer.is_vector() and geolayer.qgs_layer is not None and geolayer.qgs_layer.providerType() == "ogr":
+            spill_geopackage = geolayer.qgs_layer.source().split("|")[0]
+        if spill_geopackage in self.spill_geopackage_files:
+            # The algorithm wrote the output to a scratch GeoPackage.
+            geolayer.input_path_full = spill_geopackage
+            geolayer.input_path = spill_geopackage
+        elif geolayer.is_vector() and geolayer.qgs_layer is not None and \
+                geolayer.qgs_layer.providerType() == "memory" and self.__is_geolayer_spill_needed([geolayer]):
+            # noinspection PyBroadException
+            try:
+                self.__spill_geolayer(geolayer)
+            except Exception:
+                # Keep the in-memory layer, which may still work if enough memory is available.
+                logger = logging.getLogger(__name__)
+                logger.warning("Error writing GeoLayer '{}' to a scratch GeoPackage, keeping in memory.".format(
+                    geolayer.id), exc_info=True)
+        self.add_geolayer(geolayer)
+
     def add_command(self, command_string: str) -> None:
         """
         Add a command string to the end.
@@ -306,12 +372,16 @@ class GeoProcessor(object):
             None
         """
 
-        # Iterate over the existing GeoLayers.
-        for existing_geolayer in self.geolayers:
+        # Iterate over a copy of the existing GeoLayers because GeoLayers may be removed.
+        for existing_geolayer in list(self.geolayers):
             # If an existing GeoLayer has the same ID as the input GeoLayer,
             # remove the existing GeoLayer from the geolayers list.
             if existing_geolayer.id == geolayer.id:
-                self.free_geolayer(existing_geolayer)
+                if existing_geolayer is geolayer:
+                    # The same GeoLayer is being added again so don't free its data.
+                    self.geolayers.remove(existing_geolayer)
+                else:
+                    self.free_geolayer(existing_geolayer)
 
         # Add the input GeoLayer to the geolayers list.
         self.geolayers.append(geolayer)
@@ -657,6 +727,9 @@ class GeoProcessor(object):
     def free_geolayer(self, geolayer: GeoLayer) -> None:
         """
         Removes a GeoLayer object from the geolayers list.
+        If the GeoLayer was spilled to a scratch GeoPackage (see add_algorithm_output_geolayer()),
+        the GeoPackage is also removed.
+        If the GeoLayer uses a raster scratch file (see get_raster_scratch_file()), the file is also removed.
 
         Args:
             geolayer: instance of a GeoLayer object
@@ -665,6 +738,14 @@ class GeoProcessor(object):
             None
         """
         self.geolayers.remove(geolayer)
+        if geolayer.input_path_full in self.spill_geopackage_files:
+            self.__remove_spill_geopackage(geolayer)
+        elif geolayer.is_raster() and geolayer.is_loaded() and geolayer.qgs_layer is not None:
+            raster_file = geolayer.qgs_layer.source()
+            if raster_file in self.raster_scratch_files:
+                # Release the layer so that the file is closed.
+                geolayer.qgs_layer = None
+                self.remove_raster_scratch_file(raster_file)
 
     def free_geomap(self, geomap: GeoMap) -> None:
         """
@@ -690,6 +771,22 @@ class GeoProcessor(object):
         """
         self.geomapprojects.remove(geomapproject)
 
+    def free_raster_algorithm_input(self, algorithm_input: object) -> None:
+        """
+        Free the algorithm input returned by prepare_raster_algorithm_input(),
+        which removes the scratch copy of an in-memory raster.
+        This should be called after the algorithm runs, including if the algorithm fails.
+
+        Args:
+            algorithm_input (object): the QgsRasterLayer or raster file path returned by
+                prepare_raster_algorithm_input()
+
+        Returns:
+            None
+        """
+        if isinstance(algorithm_input, str) and algorithm_input in self.raster_scratch_files:
+            self.remove_raster_scratch_file(algorithm_input)
+
     def free_table(self, table: DataTable) -> None:
         """
         Removes a DataTable object from the tables list.
@@ -702,6 +799,27 @@ class GeoProcessor(object):
         """
         self.tables.remove(table)
 
+    @classmethod
+    def get_algorithm_output_layer(cls, algorithm_output: object) -> object:
+        """
+        Return the layer for the output of a vector QGIS processing algorithm.
+        In-memory outputs are returned by the algorithm as a layer,
+        whereas outputs written to a scratch GeoPackage (see prepare_algorithm_output()) are returned as a data source,
+        which is opened.
+
+        Args:
+            algorithm_output: the 'OUTPUT' value from the algorithm results
+
+        Returns:
+            The QgsVectorLayer for the output.
+
+        Raises:
+            IOError if the output data source cannot be opened.
+        """
+        if isinstance(algorithm_output, str):
+            return qgis_util.read_qgsvectorlayer_from_file(algorithm_output)
+        return algorithm_output
+
     def get_command_list(self) -> [AbstractCommand]:
         """
         Return the list of command objects from the processor.
@@ -801,6 +919,27 @@ class GeoProcessor(object):
         # Did not find the requested identifier so return None.
         return None
 
+    def __get_int_property(self, property_name: str) -> int or None:
+        """
+        Return a processor property as an integer, for example a property set with SetProperty or 'gp -p'.
+
+        Args:
+            property_name (str): name of the property
+
+        Returns:
+            The integer value of the property, or None if the property is not set or is not an integer.
+        """
+        property_value = self.get_property(property_name)
+        if property_value is None or property_value == "":
+            return None
+        try:
+            return int(property_value)
+        except (TypeError, ValueError):
+            logger = logging.getLogger(__name__)
+            logger.warning("Property '{}' value ({}) is not an integer - ignoring.".format(
+                property_name, property_value))
+            return None
+
     def get_number_errors(self) -> int:
         """
         Return the number of errors in commands.
@@ -853,6 +992,140 @@ class GeoProcessor(object):
                 # print('Property not found so throwing exception')
                 raise
 
+    def get_raster_scratch_file(self, name: str, size: int or None, in_process: bool = False,
+                                ext: str = "tif") -> str:
+        """
+        Return the path for an intermediate raster file, such as the output of a raster algorithm
+        that is read into a RasterGeoLayer.
+        Intermediate files are kept in memory if possible so that chained raster commands don't read and write disk:
+
+        * if 'in_process' is True, a GDAL /vsimem/ path is used,
+          which can only be used by GDAL in the GeoProcessor process
+        * otherwise, a file in the memory-backed (tmpfs) folder given by the 'RasterScratchMemoryDir' property
+          is used, or /dev/shm if not set and it exists,
+          which can also be used by the GDAL programs run by QGIS 'gdal:' algorithms
+        * if the size is not known, the memory files would use more than the 'RasterScratchMemoryLimit' property
+          (bytes, default 1 GB), or the memory folder does not have space,
+          a file in the 'ScratchDir' or 'TempDir' folder is used
+
+        Intermediate files are read once and should be created without compression.
+        The file is removed when the GeoLayer using it is freed or the next run starts.
+
+        Args:
+            name (str): name to include in the filename, for example the algorithm name
+            size (int): estimated size of the file in bytes, or None if not known
+            in_process (bool): whether the file is only used by GDAL in the GeoProcessor process
+            ext (str): file extension
+
+        Returns:
+            The path to the raster scratch file, which does not yet exist.
+        """
+        logger = logging.getLogger(__name__)
+        self.raster_scratch_count += 1
+        filename = "geoprocessor-{}-{}-{}.{}".format(name, os.getpid(), self.raster_scratch_count, ext)
+
+        memory_limit = self.__get_int_property('RasterScratchMemoryLimit')
+        if memory_limit is None:
+            memory_limit = 1073741824
+        raster_file = None
+        if size is not None and self.__get_raster_scratch_memory_used() + size <= memory_limit:
+            if in_process:
+                raster_file = "/vsimem/" + filename
+            else:
+                memory_dir = self.__get_raster_scratch_memory_dir()
+                if memory_dir is not None and shutil.disk_usage(memory_dir).free > size:
+                    raster_file = os.path.join(memory_dir, filename)
+            if raster_file is not None:
+                self.raster_scratch_memory_files.append(raster_file)
+
+        if raster_file is None:
+            raster_file = os.path.join(self.__get_scratch_dir(), filename)
+            # Make sure that the file is removed even if not removed by the processor.
+            io_util.add_tmp_file_to_remove(raster_file, ["GeoProcessor raster scratch file"])
+        logger.info("Using raster scratch file: {}".format(raster_file))
+        self.raster_scratch_files.append(raster_file)
+        return raster_file
+
+    def __get_raster_scratch_memory_dir(self) -> str or None:
+        """
+        Return the memory-backed (tmpfs) folder for raster scratch files,
+        which is the 'RasterScratchMemoryDir' property if set, or /dev/shm if it exists (Linux).
+
+        Returns:
+            The folder for raster scratch files in memory, or None if not available.
+        """
+        memory_dir = self.get_property('RasterScratchMemoryDir')
+        if not memory_dir and os.path.isdir("/dev/shm"):
+            memory_dir = "/dev/shm"
+        if memory_dir and os.path.isdir(memory_dir) and os.access(memory_dir, os.W_OK):
+            return memory_dir
+        return None
+
+    def __get_raster_scratch_memory_used(self) -> int:
+        """
+        Return the memory used by raster scratch files in /vsimem/ or the memory-backed folder.
+
+        Returns:
+            The total size of the raster scratch files in memory, in bytes.
+        """
+        return sum([qgis_util.get_raster_file_size(raster_file) for raster_file in self.raster_scratch_memory_files])
+
+    def __get_scratch_dir(self) -> str:
+        """
+        Return the folder for scratch files,
+        which is the 'ScratchDir' property if set, the 'TempDir' property if set, or the system temporary folder.
+
+        Returns:
+            The folder for scratch files.
+        """
+        scratch_dir = self.get_property('ScratchDir')
+        if not scratch_dir:
+            scratch_dir = self.get_property('TempDir')
+        if not scratch_dir:
+            scratch_dir = tempfile.gettempdir()
+        return scratch_dir
+
+    def get_scratch_geopackage(self) -> str:
+        """
+        Return the path to the scratch GeoPackage for the run, creating the path if not yet set.
+        The file is located in the folder given by the 'ScratchDir' property if set,
+        for example a tmpfs (RAM) folder such as /dev/shm on Linux, and otherwise the 'TempDir' property.
+        The file itself is created when the first layer is written.
+
+        Returns:
+            The full path to the scratch GeoPackage.
+        """
+        if self.scratch_geopackage is None:
+            self.scratch_geopackage = os.path.join(
+                self.__get_scratch_dir(),
+                "geoprocessor-scratch-{}-{}.gpkg".format(os.getpid(), strftime("%Y%m%dT%H%M%S")))
+            self.scratch_geopackage_layer_count = 0
+            # Make sure that the file is removed even if the run does not complete.
+            io_util.add_tmp_file_to_remove(self.scratch_geopackage, ["GeoProcessor scratch GeoPackage"])
+        return self.scratch_geopackage
+
+    def __get_spill_geopackage(self, geolayer_id: str) -> str:
+        """
+        Return the path to a new scratch GeoPackage for a spilled GeoLayer.
+        The file is located in the folder given by the 'ScratchDir' property if set,
+        and otherwise the 'TempDir' property, and is removed when the GeoLayer is freed or at the end of the run.
+
+        Args:
+            geolayer_id (str): GeoLayer identifier, used in messages
+
+        Returns:
+            The full path to the GeoPackage, which is created when the layer is written.
+        """
+        self.spill_geopackage_count += 1
+        spill_geopackage = os.path.join(
+            self.__get_scratch_dir(),
+            "geoprocessor-spill-{}-{}-{}.gpkg".format(os.getpid(), strftime("%Y%m%dT%H%M%S"),
+                                                     self.spill_geopackage_count))
+        # Make sure the file is removed if the application is stopped before the run ends.
+        io_util.add_tmp_file_to_remove(spill_geopackage, ["GeoProcessor spilled GeoLayer '{}'".format(geolayer_id)])
+        self.spill_geopackage_files.append(spill_geopackage)
+        return spill_geopackage
+
     def get_table(self, table_id: str) -> DataTable or None:
         """
         Return the DataTable that has the requested ID.
@@ -886,6 +1159,55 @@ class GeoProcessor(object):
         current_command = tab + current_command
         self.commands[index].command_string = current_command
 
+    def is_geolayer_lazy_load(self) -> bool:
+        """
+        Indicate whether read commands should create lazy-loaded GeoLayers,
+        which is the case if the 'GeoLayerLazyLoad' processor property is True.
+        Lazy-loaded GeoLayers record the input file and CRS when read and load the layer when first used,
+        which avoids the cost of opening layers that are not used.
+
+        Returns:
+            True if GeoLayers should be lazy-loaded, False if not (default).
+        """
+        lazy_load = self.get_property('GeoLayerLazyLoad')
+        if isinstance(lazy_load, bool):
+            return lazy_load
+        elif isinstance(lazy_load, str):
+            return string_util.str_to_bool(lazy_load) is True
+        return False
+
+    def __is_geolayer_spill_needed(self, geolayers: [GeoLayer]) -> bool:
+        """
+        Determine whether vector GeoLayers are too large to keep in memory,
+        based on the 'GeoLayerSpillFeatureCount' and 'GeoLayerSpillSize' processor properties,
+        which are compared with the total number of features and estimated size of the GeoLayers.
+
+        Args:
+            geolayers ([GeoLayer]): list of GeoLayer objects, non-vector GeoLayers are ignored
+
+        Returns:
+            True if the GeoLayers are too large to keep in memory, False if not.
+        """
+        spill_feature_count = self.__get_int_property('GeoLayerSpillFeatureCount')
+        spill_size = self.__get_int_property('GeoLayerSpillSize')
+        if spill_feature_count is None and spill_size is None:
+            return False
+
+        feature_count = 0
+        size = 0
+        for geolayer in geolayers:
+            if not geolayer.is_vector() or geolayer.qgs_layer is None:
+                continue
+            if spill_feature_count is not None:
+                feature_count += geolayer.get_feature_count()
+            if spill_size is not None:
+                size += qgis_util.estimate_qgsvectorlayer_size(geolayer.qgs_layer)
+        if spill_feature_count is not None and feature_count > spill_feature_count:
+            return True
+        if spill_size is not None and size > spill_size:
+            return True
+        return False
+
     @classmethod
     def __lookup_endfor_command_index(cls, command_list: [AbstractCommand], for_name: str) -> [EndFor]:
         """
@@ -1016,6 +1338,95 @@ class GeoProcessor(object):
             for listener_from_array in self.command_processor_listener_array:
                 listener_from_array.command_started(icommand, ncommand, command, -1.0, "Command started.")
 
+    def prepare_algorithm_input(self, geolayer: GeoLayer, memory_supported: bool = True) -> object:
+        """
+        Prepare a vector GeoLayer for use as input to a QGIS processing algorithm, such as an overlay algorithm.
+        QGIS algorithms generally accept layer objects, including in-memory layers,
+        in which case the layer is used directly without copying.
+        If an algorithm requires a data source, such as GDAL algorithms that run a separate program,
+        an in-memory layer is appended to the run's scratch GeoPackage
+        (see get_scratch_geopackage()) and the data source URI is returned.
+        The GeoLayer in the processor is not modified.
+
+        Args:
+            geolayer (GeoLayer): vector GeoLayer to use as algorithm input
+            memory_supported (bool): whether the algorithm can use an in-memory layer object
+
+        Returns:
+            The QgsVectorLayer or data source string to use for the algorithm input.
+        """
+        if memory_supported:
+            return geolayer.qgs_layer
+
+        if geolayer.input_path_full is None or geolayer.input_path_full.upper() in ["", GeoLayer.SOURCE_MEMORY]:
+            logger = logging.getLogger(__name__)
+            self.scratch_geopackage_layer_count += 1
+            scratch_geopackage = self.get_scratch_geopackage()
+            # Use a unique layer name in case the same GeoLayer is used more than once.
+            layer_name = "{}_{}".format(geolayer.id, self.scratch_geopackage_layer_count)
+            logger.info("Writing in-memory layer '{}' to scratch GeoPackage layer '{}'.".format(
+                geolayer.id, layer_name))
+            return qgis_util.append_qgsvectorlayer_to_geopackage(geolayer.qgs_layer, scratch_geopackage, layer_name)
+        else:
+            # The layer is already from a data source.
+            return geolayer.qgs_layer.source()
+
+    def prepare_algorithm_output(self, input_geolayers: [GeoLayer], output_geolayer_id: str) -> str:
+        """
+        Return the 'OUTPUT' parameter for a vector QGIS processing algorithm,
+        applying the storage policy for large layers.
+        The output is normally an in-memory layer ("memory:").
+        If the input GeoLayers that provide the output features have more features in total than
+        the 'GeoLayerSpillFeatureCount' processor property, or their estimated size in bytes is larger than
+        the 'GeoLayerSpillSize' processor property, the output is expected to be large and the algorithm
+        writes it directly to a new scratch GeoPackage, so that the output features are not held in memory.
+        Use get_algorithm_output_layer() to get the output layer from the algorithm results and
+        add_algorithm_output_geolayer() to add the GeoLayer.
+
+        Args:
+            input_geolayers ([GeoLayer]): the GeoLayers that provide the output features,
+                for example the input layer but not the overlay layer of a clip
+            output_geolayer_id (str): the identifier of the output GeoLayer, used in messages
+
+        Returns:
+            The 'OUTPUT' parameter value.
+        """
+        if not self.__is_geolayer_spill_needed(input_geolayers):
+            return "memory:"
+
+        spill_geopackage = self.__get_spill_geopackage(output_geolayer_id)
+        logger = logging.getLogger(__name__)
+        logger.info("Writing algorithm output for GeoLayer '{}' to scratch GeoPackage: {}".format(
+            output_geolayer_id, spill_geopackage))
+        # The layer name is fixed because the GeoLayer ID may contain characters that are not allowed.
+        return "ogr:dbname='{}' table=\"geolayer\" (geom)".format(spill_geopackage)
+
+    def prepare_raster_algorithm_input(self, geolayer: GeoLayer) -> object:
+        """
+        Prepare a raster GeoLayer for use as input to a QGIS 'gdal:' processing algorithm,
+        which runs a GDAL program in a separate process.
+        A raster in GDAL's /vsimem/ in-memory file system cannot be read by other processes,
+        so it is copied to a raster scratch file (see get_raster_scratch_file()) and the path is returned.
+        The GeoLayer in the processor is not modified.
+        Call free_raster_algorithm_input() after the algorithm runs to remove the copy.
+
+        Args:
+            geolayer (GeoLayer): raster GeoLayer to use as algorithm input
+
+        Returns:
+            The QgsRasterLayer or raster file path to use for the algorithm input.
+        """
+        raster_file = geolayer.qgs_layer.source()
+        if not raster_file.startswith("/vsimem/"):
+            return geolayer.qgs_layer
+
+        logger = logging.getLogger(__name__)
+        scratch_file = self.get_raster_scratch_file(
+            "input", qgis_util.estimate_qgsrasterlayer_size(geolayer.qgs_layer))
+        logger.info("Copying in-memory raster '{}' to '{}'.".format(raster_file, scratch_file))
+        qgis_util.copy_raster_file(raster_file, scratch_file, ["TILED=YES"])
+        return scratch_file
+
     # TODO smalers 2017-12-31 Need to switch to CommandFileRunner class.
     def process_command_file(self, command_file: str) -> None:
         """
@@ -1233,6 +1644,90 @@ class GeoProcessor(object):
         # TODO smalers 2020-03-10 Not sure this is needed in current design.
         # self.notify_command_list_processor_listener_update_commands()
 
+    def remove_raster_scratch_file(self, raster_file: str) -> None:
+        """
+        Remove a raster scratch file (see get_raster_scratch_file()),
+        for example if a command could not create a GeoLayer from the file.
+
+        Args:
+            raster_file (str): path to the raster scratch file
+
+        Returns:
+            None
+        """
+        raster_file = str(raster_file)
+        if raster_file in self.raster_scratch_files:
+            self.raster_scratch_files.remove(raster_file)
+        if raster_file in self.raster_scratch_memory_files:
+            self.raster_scratch_memory_files.remove(raster_file)
+        qgis_util.remove_raster_file(raster_file)
+
+    def __remove_raster_scratch_files(self) -> None:
+        """
+        Remove all raster scratch files, including freeing the GeoLayers that use them.
+
+        Returns:
+            None
+        """
+        for geolayer in list(self.geolayers):
+            if geolayer.is_raster() and geolayer.is_loaded() and geolayer.qgs_layer is not None and \
+                    geolayer.qgs_layer.source() in self.raster_scratch_files:
+                self.free_geolayer(geolayer)
+        # Remove files for GeoLayers that are no longer in the list, and files that were not used by a GeoLayer.
+        for raster_file in list(self.raster_scratch_files):
+            self.remove_raster_scratch_file(raster_file)
+
+    def __remove_scratch_geopackage(self) -> None:
+        """
+        Remove the scratch GeoPackage used for algorithm inputs, if it was created.
+
+        Returns:
+            None
+        """
+        if self.scratch_geopackage is not None:
+            io_util.remove_tmp_file(self.scratch_geopackage)
+            self.scratch_geopackage = None
+            self.scratch_geopackage_layer_count = 0
+
+    def __remove_spill_geopackage(self, geolayer: GeoLayer) -> None:
+        """
+        Remove the scratch GeoPackage for a spilled GeoLayer.
+        Copy-on-write copies that share the layer are first copied into memory.
+
+        Args:
+            geolayer: instance of a spilled GeoLayer object
+
+        Returns:
+            None
+        """
+        spill_geopackage = geolayer.input_path_full
+        # Copy the features of copies that share the layer.
+        geolayer.prepare_for_edit()
+        # Release the layer so that the file is closed.
+        geolayer.qgs_layer = None
+        self.spill_geopackage_files.remove(spill_geopackage)
+        # Also remove the SQLite write-ahead log files, if they exist.
+        for spill_file in [spill_geopackage, spill_geopackage + "-wal", spill_geopackage + "-shm"]:
+            io_util.remove_tmp_file(spill_file)
+
+    def __remove_spill_geopackages(self) -> None:
+        """
+        Remove the scratch GeoPackages for all spilled GeoLayers, including freeing the GeoLayers.
+
+        Returns:
+            None
+        """
+        for geolayer in list(self.geolayers):
+            if geolayer.input_path_full in self.spill_geopackage_files:
+                logger = logging.getLogger(__name__)
+                logger.info("Freeing spilled GeoLayer '{}'.".format(geolayer.id))
+                self.free_geolayer(geolayer)
+        # Remove files for GeoLayers that are no longer in the list, for example if the list was reset.
+        for spill_geopackage in self.spill_geopackage_files:
+            for spill_file in [spill_geopackage, spill_geopackage + "-wal", spill_geopackage + "-shm"]:
+                io_util.remove_tmp_file(spill_file)
+        self.spill_geopackage_files = []
+
     def __reset_data_for_run_start(self, append_results: bool = False) -> None:
         """
         Reset the processor data prior to running the commands.
@@ -1382,6 +1877,9 @@ class GeoProcessor(object):
 
         # Remove all items within the geoprocessor from the previous run:
         # - TODO smalers 2020-03-16 evaluate how this relates to __reset_data_for_run_start
+        self.__remove_scratch_geopackage()
+        self.__remove_spill_geopackages()
+        self.__remove_raster_scratch_files()
         self.geolayers = []
         self.geomaps = []
         self.geomapprojects = []
@@ -1749,6 +2247,11 @@ class GeoProcessor(object):
 
         # TODO smalers 2018-01-01 Java code has multiple checks at the end for checking error counts:
         # - may or may not need something similar in Python code if above error-handling is not enough
+        # Remove the scratch GeoPackage, which is only used during algorithms.
+        self.__remove_scratch_geopackage()
+        # Remove spilled GeoLayers, which are only available during the run.
+        self.__remove_spill_geopackages()
+
         logger.info("At end of run_commands")
 
     def run_selected_commands(self, selected_indices: [int], command_list: [AbstractCommand] = None,
@@ -1853,6 +2356,31 @@ class GeoProcessor(object):
         """
         self.properties[property_name] = property_value
 
+    def __spill_geolayer(self, geolayer: GeoLayer) -> None:
+        """
+        Write an in-memory GeoLayer to a new scratch GeoPackage and change the GeoLayer to use the GeoPackage layer.
+
+        Args:
+            geolayer: instance of an in-memory vector GeoLayer object
+
+        Returns:
+            None
+        """
+        logger = logging.getLogger(__name__)
+        spill_geopackage = self.__get_spill_geopackage(geolayer.id)
+        logger.info("Spilling GeoLayer '{}' ({} features) to scratch GeoPackage: {}".format(
+            geolayer.id, geolayer.get_feature_count(), spill_geopackage))
+        # The layer name is fixed because the GeoLayer ID may contain characters that are not allowed.
+        layer_name = "geolayer"
+        qgis_util.append_qgsvectorlayer_to_geopackage(geolayer.qgs_layer, spill_geopackage, layer_name)
+
+        # Replace the in-memory layer with the GeoPackage layer.
+        qgs_layer = qgis_util.read_qgsvectorlayer_from_geopackage(spill_geopackage, layer_name, geolayer.id)
+        geolayer.qgs_layer = qgs_layer
+        geolayer.qgs_id = qgs_layer.id()
+        geolayer.input_path_full = spill_geopackage
+        geolayer.input_path = spill_geopackage
+
     def update_command(self, index: int, command_string: str) -> None:
         """
         If the command has been edited by a command editor it must be updated in the command list.
@@ -43,8 +43,10 @@ from geoprocessor.commands.map.SetGeoLayerViewSingleSymbol import SetGeoLayerVie
 # from geoprocessor.commands.map.WriteGeoMapToJSON import WriteGeoMapToJSON
 from geoprocessor.commands.map.WriteGeoMapProjectToJSON import WriteGeoMapProjectToJSON
 
+from geoprocessor.commands.raster.CalculateZonalStatistics import CalculateZonalStatistics
 from geoprocessor.commands.raster.ChangeRasterGeoLayerCRS import ChangeRasterGeoLayerCRS
 from geoprocessor.commands.raster.CreateRasterGeoLayer import CreateRasterGeoLayer
+from geoprocessor.commands.raster.RasterCalculator import RasterCalculator
 from geoprocessor.commands.raster.RasterizeGeoLayer import RasterizeGeoLayer
 from geoprocessor.commands.raster.RearrangeRasterGeoLayerBands import RearrangeRasterGeoLayerBands
 from geoprocessor.commands.raster.ReadRasterGeoLayerFromFile import ReadRasterGeoLayerFromFile
@@ -62,6 +64,7 @@ from geoprocessor.commands.running.RunGdalProgram import RunGdalProgram
 from geoprocessor.commands.running.RunOgrProgram import RunOgrProgram
 from geoprocessor.commands.running.RunProgram import RunProgram
 from geoprocessor.commands.running.QgisAlgorithmHelp import QgisAlgorithmHelp
+from geoprocessor.commands.running.SetPropertiesFromRasterStatistics import SetPropertiesFromRasterStatistics
 from geoprocessor.commands.running.SetProperty import SetProperty
 from geoprocessor.commands.running.SetPropertyFromGeoLayer import SetPropertyFromGeoLayer
 from geoprocessor.commands.running.WritePropertiesToFile import WritePropertiesToFile
@@ -102,7 +105,9 @@ from geoprocessor.commands.vector.FreeGeoLayers import FreeGeoLayers
 from geoprocessor.commands.vector.IntersectGeoLayer import IntersectGeoLayer
 from geoprocessor.commands.vector.MergeGeoLayers import MergeGeoLayers
 from geoprocessor.commands.vector.ReadGeoLayerFromDelimitedFile import ReadGeoLayerFromDelimitedFile
+from geoprocessor.commands.vector.ReadGeoLayerFromFlatGeobuf import ReadGeoLayerFromFlatGeobuf
 from geoprocessor.commands.vector.ReadGeoLayerFromGeoJSON import ReadGeoLayerFromGeoJSON
+from geoprocessor.commands.vector.ReadGeoLayerFromGeoParquet import ReadGeoLayerFromGeoParquet
 from geoprocessor.commands.vector.ReadGeoLayerFromKML import ReadGeoLayerFromKML
 from geoprocessor.commands.vector.ReadGeoLayerFromShapefile import ReadGeoLayerFromShapefile
 from geoprocessor.commands.vector.ReadGeoLayerFromWebFeatureService import ReadGeoLayerFromWebFeatureService
@@ -119,7 +124,9 @@ from geoprocessor.commands.vector.SimplifyGeoLayerGeometry import SimplifyGeoLay
 from geoprocessor.commands.vector.SplitGeoLayerByAttribute import SplitGeoLayerByAttribute
 from geoprocessor.commands.vector.WriteGeoLayerPropertiesToFile import WriteGeoLayerPropertiesToFile
 from geoprocessor.commands.vector.WriteGeoLayerToDelimitedFile import WriteGeoLayerToDelimitedFile
+from geoprocessor.commands.vector.WriteGeoLayerToFlatGeobuf import WriteGeoLayerToFlatGeobuf
 from geoprocessor.commands.vector.WriteGeoLayerToGeoJSON import WriteGeoLayerToGeoJSON
+from geoprocessor.commands.vector.WriteGeoLayerToGeoParquet import WriteGeoLayerToGeoParquet
 from geoprocessor.commands.vector.WriteGeoLayerToKML import WriteGeoLayerToKML
 from geoprocessor.commands.vector.WriteGeoLayerToShapefile import WriteGeoLayerToShapefile
 
@@ -144,6 +151,7 @@ class GeoProcessorCommandFactory(object):
         "ADDGEOLAYERVIEWTOGEOMAP": AddGeoLayerViewToGeoMap(),
         "ADDGEOMAPTOGEOMAPPROJECT": AddGeoMapToGeoMapProject(),
         "BLANK": Blank(),  # Actually has no name, is whitespace only
+        "CALCULATEZONALSTATISTICS": CalculateZonalStatistics(),
         "CHANGEGEOLAYERGEOMETRY": ChangeGeoLayerGeometry(),
         "CHANGERASTERGEOLAYERCRS": ChangeRasterGeoLayerCRS(),
         "CLIPGEOLAYER": ClipGeoLayer(),
@@ -175,9 +183,12 @@ class GeoProcessorCommandFactory(object):
         "MESSAGE": Message(),
         "OPENDATASTORE": OpenDataStore(),
         "QGISALGORITHMHELP": QgisAlgorithmHelp(),
+        "RASTERCALCULATOR": RasterCalculator(),
         "RASTERIZEGEOLAYER": RasterizeGeoLayer(),
         "READGEOLAYERFROMDELIMITEDFILE": ReadGeoLayerFromDelimitedFile(),
+        "READGEOLAYERFROMFLATGEOBUF": ReadGeoLayerFromFlatGeobuf(),
         "READGEOLAYERFROMGEOJSON": ReadGeoLayerFromGeoJSON(),
+        "READGEOLAYERFROMGEOPARQUET": ReadGeoLayerFromGeoParquet(),
         "READGEOLAYERFROMKML": ReadGeoLayerFromKML(),
         "READGEOLAYERFROMSHAPEFILE": ReadGeoLayerFromShapefile(),
         "READGEOLAYERFROMWEBFEATURESERVICE": ReadGeoLayerFromWebFeatureService(),
@@ -207,6 +218,7 @@ class GeoProcessorCommandFactory(object):
         "SETGEOLAYERVIEWGRADUATEDSYMBOL": SetGeoLayerViewGraduatedSymbol(),
         "SETGEOLAYERVIEWEVENTHANDLER": SetGeoLayerViewEventHandler(),
         "SETGEOLAYERVIEWSINGLESYMBOL": SetGeoLayerViewSingleSymbol(),
+        "SETPROPERTIESFROMRASTERSTATISTICS": SetPropertiesFromRasterStatistics(),
         "SETPROPERTY": SetProperty(),
         "SETPROPERTYFROMGEOLAYER": SetPropertyFromGeoLayer(),
         "SIMPLIFYGEOLAYERGEOMETRY": SimplifyGeoLayerGeometry(),
@@ -218,7 +230,9 @@ class GeoProcessorCommandFactory(object):
         "WRITECOMMANDSUMMARYTOFILE": WriteCommandSummaryToFile(),
         "WRITEGEOLAYERPROPERTIESTOFILE": WriteGeoLayerPropertiesToFile(),
         "WRITEGEOLAYERTODELIMITEDFILE": WriteGeoLayerToDelimitedFile(),
+        "WRITEGEOLAYERTOFLATGEOBUF": WriteGeoLayerToFlatGeobuf(),
         "WRITEGEOLAYERTOGEOJSON": WriteGeoLayerToGeoJSON(),
+        "WRITEGEOLAYERTOGEOPARQUET": WriteGeoLayerToGeoParquet(),
         "WRITEGEOLAYERTOKML": WriteGeoLayerToKML(),
         "WRITEGEOLAYERTOSHAPEFILE": WriteGeoLayerToShapefile(),
         "WRITERASTERGEOLAYERTOFILE": WriteRasterGeoLayerToFile(),
@@ -328,6 +342,8 @@ class GeoProcessorCommandFactory(object):
                     return Blank()
 
                 # 'C' commands.
+                elif command_name_upper == "CALCULATEZONALSTATISTICS":
+                    return CalculateZonalStatistics()
                 elif command_name_upper == "CHANGEGEOLAYERGEOMETRY":
                     return ChangeGeoLayerGeometry()
                 elif command_name_upper == "CHANGERASTERGEOLAYERCRS":
@@ -402,12 +418,18 @@ class GeoProcessorCommandFactory(object):
                     return QgisAlgorithmHelp()
 
                 # 'R' commands:
+                elif command_name_upper == "RASTERCALCULATOR":
+                    return RasterCalculator()
                 elif command_name_upper == "RASTERIZEGEOLAYER":
                     return RasterizeGeoLayer()
                 elif command_name_upper == "READGEOLAYERFROMDELIMITEDFILE":
                     return ReadGeoLayerFromDelimitedFile()
+                elif command_name_upper == "READGEOLAYERFROMFLATGEOBUF":
+                    return ReadGeoLayerFromFlatGeobuf()
                 elif command_name_upper == "READGEOLAYERFROMGEOJSON":
                     return ReadGeoLayerFromGeoJSON()
+                elif command_name_upper == "READGEOLAYERFROMGEOPARQUET":
+                    return ReadGeoLayerFromGeoParquet()
                 elif command_name_upper == "READGEOLAYERFROMKML":
                     return ReadGeoLayerFromKML()
                 elif command_name_upper == "READGEOLAYERFROMSHAPEFILE":
@@ -468,6 +490,8 @@ class GeoProcessorCommandFactory(object):
                     return SetGeoLayerViewGraduatedSymbol()
                 elif command_name_upper == "SETGEOLAYERVIEWSINGLESYMBOL":
                     return SetGeoLayerViewSingleSymbol()
+                elif command_name_upper == "SETPROPERTIESFROMRASTERSTATISTICS":
+                    return SetPropertiesFromRasterStatistics()
                 elif command_name_upper == "SETPROPERTY":
                     return SetProperty()
                 elif command_name_upper == "SETPROPERTYFROMGEOLAYER":
@@ -494,8 +518,12 @@ class GeoProcessorCommandFactory(object):
                     return WriteGeoLayerPropertiesToFile()
                 elif command_name_upper == "WRITEGEOLAYERTODELIMITEDFILE":
                     return WriteGeoLayerToDelimitedFile()
+                elif command_name_upper == "WRITEGEOLAYERTOFLATGEOBUF":
+                    return WriteGeoLayerToFlatGeobuf()
                 elif command_name_upper == "WRITEGEOLAYERTOGEOJSON":
                     return WriteGeoLayerToGeoJSON()
+                elif command_name_upper == "WRITEGEOLAYERTOGEOPARQUET":
+                    return WriteGeoLayerToGeoParquet()
                 elif command_name_upper == "WRITEGEOLAYERTOKML":
                     return WriteGeoLayerToKML()
                 elif command_name_upper == "WRITEGEOLAYERTOSHAPEFILE":
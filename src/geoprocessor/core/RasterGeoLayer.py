@@ -26,6 +26,8 @@ import geoprocessor.util.qgis_util as qgis_util
 from geoprocessor.core.GeoLayer import GeoLayer
 from qgis.core import QgsRasterLayer
 
+from typing import Callable
+
 
 class RasterGeoLayer(GeoLayer):
     """
@@ -59,7 +61,9 @@ class RasterGeoLayer(GeoLayer):
                  input_format: str = GeoLayer.FORMAT_MEMORY,
                  input_path_full: str = GeoLayer.SOURCE_MEMORY,
                  input_path: str = GeoLayer.SOURCE_MEMORY,
-                 properties: dict = None) -> None:
+                 properties: dict = None,
+                 qgs_layer_loader: Callable[[], QgsRasterLayer] = None,
+                 crs_code: str = None) -> None:
         """
         Initialize a new RasterGeoLayer instance.
 
@@ -93,6 +97,12 @@ class RasterGeoLayer(GeoLayer):
             properties ({}):
                 A dictionary of user (non-built-in) properties that can be assigned to the layer.
                 These properties facilitate processing.
+            qgs_layer_loader (function):
+                Function with no arguments that returns the QgsRasterLayer, used to lazy-load the layer
+                when 'qgs_layer' is first accessed.  Use instead of the layer object.
+            crs_code (str):
+                Coordinate reference system code (e.g., "EPSG:4326") of a lazy-loaded layer,
+                used until the layer is loaded.
         """
 
         # GeoLayer data:
@@ -104,7 +114,14 @@ class RasterGeoLayer(GeoLayer):
                          input_format=input_format,
                          input_path_full=input_path_full,
                          input_path=input_path,
-                         properties=properties)
+                         properties=properties,
+                         qgs_layer_loader=qgs_layer_loader,
+                         crs_code=crs_code)
+
+        # Band statistics that have been calculated, to avoid scanning the raster for each request:
+        # - the key is (source, band number, approximate, histogram bins)
+        # - the value is the statistics dictionary from qgis_util.get_raster_band_statistics()
+        self.__band_statistics: dict = {}
 
         # All other differences are implemented through behavior with additional methods below.
 
@@ -130,6 +147,34 @@ class RasterGeoLayer(GeoLayer):
         # The GeoLayer ID is provided by the argument parameter `copied_geolayer_id`.
         return RasterGeoLayer(copied_geolayer_id, duplicate_qgs_raster_layer, "")
 
+    def get_band_statistics(self, band_number: int = 1, approximate: bool = False,
+                            histogram_bins: int = None) -> dict:
+        """
+        Get the statistics and optionally the histogram for a band of the RasterGeoLayer.
+        Results are cached on the layer, and GDAL also saves them in the raster's '.aux.xml' file,
+        so only the first request scans the raster.  Exact statistics are also used for approximate requests.
+
+        Args:
+            band_number (int): band number (1+)
+            approximate (bool): whether approximate statistics (from overviews or sampled blocks) are OK
+            histogram_bins (int): number of histogram bins, or None to not include a histogram
+
+        Returns:
+            Dictionary of statistics, see qgis_util.get_raster_band_statistics().
+
+        Raises:
+            ValueError if the statistics cannot be calculated.
+        """
+        source = self.qgs_layer.source()
+        for approximate_ok in ([False, True] if approximate else [False]):
+            statistics = self.__band_statistics.get((source, band_number, approximate_ok, histogram_bins))
+            if statistics is not None:
+                return dict(statistics)
+        statistics = qgis_util.get_raster_band_statistics(source, band_number, approximate=approximate,
+                                                          histogram_bins=histogram_bins)
+        self.__band_statistics[(source, band_number, approximate, histogram_bins)] = statistics
+        return dict(statistics)
+
     def get_feature_count(self) -> int:
         """
         Returns the number of features (int) within a RasterGeoLayer, in this case the number of cells.
@@ -25,7 +25,9 @@
 CSV = 'CSV'  # Comma separated value.
 ESRIShapefile = 'ESRIShapefile'  # Esri shapefile.
 FileGDB = 'FileGDB'  # Esri file geodatabase.
+FlatGeobuf = 'FlatGeobuf'  # FlatGeobuf.
 GeoJSON = 'GeoJSON'  # GeoJSON.
+GeoParquet = 'GeoParquet'  # GeoParquet.
 KML = 'KML'  # KML.
 OpenFileGDB = 'OpenFileGDB' # Esri file geodatabase, read-only, built-in, no third party libraries, better than FileGDB.
 WFS = 'WFS'  # OGC web feature service.
@@ -35,7 +37,9 @@ vector_formats = [
     CSV,
     ESRIShapefile,
     FileGDB,
+    FlatGeobuf,
     GeoJSON,
+    GeoParquet,
     KML,
     OpenFileGDB,
     WFS
@@ -23,11 +23,14 @@
 from __future__ import annotations
 
 import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.string_util as string_util
 from geoprocessor.core.GeoLayer import GeoLayer
 from qgis.core import QgsVectorLayer
 
+import logging
 import os
-from typing import Any
+from typing import Any, Callable
+import weakref
 
 
 class VectorGeoLayer(GeoLayer):
@@ -50,7 +53,9 @@ class VectorGeoLayer(GeoLayer):
                  input_format: str = GeoLayer.FORMAT_MEMORY,
                  input_path_full: str = GeoLayer.SOURCE_MEMORY,
                  input_path: str = GeoLayer.SOURCE_MEMORY,
-                 properties: dict = None) -> None:
+                 properties: dict = None,
+                 qgs_layer_loader: Callable[[], QgsVectorLayer] = None,
+                 crs_code: str = None) -> None:
         """
         Initialize a new GeoLayer instance.
 
@@ -84,6 +89,12 @@ class VectorGeoLayer(GeoLayer):
             properties ({}):
                 A dictionary of user (non-built-in) properties that can be assigned to the layer.
                 These properties facilitate processing.
+            qgs_layer_loader (function):
+                Function with no arguments that returns the QgsVectorLayer, used to lazy-load the layer
+                when 'qgs_layer' is first accessed.  Use instead of the layer object.
+            crs_code (str):
+                Coordinate reference system code (e.g., "EPSG:4326") of a lazy-loaded layer,
+                used until the layer is loaded.
         """
 
         # GeoLayer data:
@@ -95,7 +106,17 @@ class VectorGeoLayer(GeoLayer):
                          input_format=input_format,
                          input_path_full=input_path_full,
                          input_path=input_path,
-                         properties=properties)
+                         properties=properties,
+                         qgs_layer_loader=qgs_layer_loader,
+                         crs_code=crs_code)
+
+        # Copy-on-write data, used by deepcopy():
+        # - "copy_on_write_source" is the VectorGeoLayer that owns the QgsVectorLayer that is shared by this copy,
+        #   or None if this layer owns its QgsVectorLayer
+        # - "copy_on_write_copies" are the copies that share this layer's QgsVectorLayer,
+        #   which must be materialized before this layer is edited
+        self.copy_on_write_source: VectorGeoLayer or None = None
+        self.copy_on_write_copies = weakref.WeakSet()
 
     def add_attribute(self, attribute_name: str, attribute_type: str) -> None:
         """
@@ -111,28 +132,49 @@ class VectorGeoLayer(GeoLayer):
         """
 
         # Run processing in the qgis utility function.
+        self.prepare_for_edit()
         qgis_util.add_qgsvectorlayer_attribute(self.qgs_layer, attribute_name, attribute_type)
 
-    def deepcopy(self, copied_geolayer_id: str) -> VectorGeoLayer:
+    def deepcopy(self, copied_geolayer_id: str, copy_on_write: bool = True) -> VectorGeoLayer:
         """
         Create a copy of the GeoLayer.
 
+        By default, the copy is copy-on-write:
+        the copy shares this layer's QgsVectorLayer until either layer is edited,
+        at which time the copy's features are copied into a new in-memory layer.
+        This makes copies that are only read (for example, written to a file or used as algorithm input) nearly free.
+        Code that edits the QgsVectorLayer directly must call prepare_for_edit() first.
+
         Args:
             copied_geolayer_id(str): The ID of the output copied GeoLayer.
+            copy_on_write(bool): If True (default), create a copy-on-write copy.
+                If False, copy the features immediately.
 
         Returns:
             The copied GeoLayer object.
         """
 
+        # Create and return a new GeoLayer object with the copied qgs vector layer. The source will be an empty string.
+        # The GeoLayer ID is provided by the argument parameter `copied_geolayer_id`.
+        copy_name = ""
+        if copy_on_write:
+            # Share the QgsVectorLayer with the layer that owns it:
+            # - if this layer is itself an unedited copy, share the original layer
+            if self.copy_on_write_source is not None:
+                source_geolayer = self.copy_on_write_source
+            else:
+                source_geolayer = self
+            copied_geolayer = VectorGeoLayer(copied_geolayer_id, qgs_vector_layer=self.qgs_layer, name=copy_name)
+            copied_geolayer.copy_on_write_source = source_geolayer
+            source_geolayer.copy_on_write_copies.add(copied_geolayer)
+            return copied_geolayer
+
         # Create a deep copy of the qgs vector layer.
         duplicate_qgs_vector_layer = qgis_util.deepcopy_qqsvectorlayer(self.qgs_layer)
 
         # Update the layer's fields.
         self.qgs_layer.updateFields()
 
-        # Create and return a new GeoLayer object with the copied qgs vector layer. The source will be an empty string.
-        # The GeoLayer ID is provided by the argument parameter `copied_geolayer_id`.
-        copy_name = ""
         return VectorGeoLayer(copied_geolayer_id, qgs_vector_layer=duplicate_qgs_vector_layer, name=copy_name)
 
     def get_attribute_field_names(self) -> [str]:
@@ -189,6 +231,15 @@ class VectorGeoLayer(GeoLayer):
             raise ValueError("Geom_format ({}) is not a valid geometry format. Valid geometry formats are:"
                              " {}".format(geom_format, valid_geom_formats))
 
+    def is_copy_on_write_shared(self) -> bool:
+        """
+        Indicate whether the layer is a copy-on-write copy that still shares the QgsVectorLayer of another layer.
+
+        Returns:
+            True if the QgsVectorLayer is shared with the source layer, False if owned by this layer.
+        """
+        return self.copy_on_write_source is not None
+
     def is_raster(self) -> bool:
         """
         Indicate whether a raster layer, False always.
@@ -207,6 +258,49 @@ class VectorGeoLayer(GeoLayer):
         """
         return True
 
+    def __materialize(self) -> None:
+        """
+        Copy the features of a copy-on-write layer into a new in-memory layer owned by this layer.
+        The features are streamed from the shared layer in batches.
+
+        Returns:
+            None
+        """
+        if self.copy_on_write_source is None:
+            # Already owns the layer.
+            return
+
+        logger = logging.getLogger(__name__)
+        logger.info("Materializing copy-on-write GeoLayer '{}' ({} features).".format(
+            self.id, self.get_feature_count()))
+        self.qgs_layer = qgis_util.deepcopy_qqsvectorlayer(self.qgs_layer)
+        self.qgs_id = self.qgs_layer.id()
+        self.copy_on_write_source.copy_on_write_copies.discard(self)
+        self.copy_on_write_source = None
+
+    def prepare_for_edit(self) -> None:
+        """
+        Prepare the layer to be edited, which is needed because of copy-on-write copies:
+
+        * if this layer is a copy-on-write copy, copy the shared features so that the source is not changed
+        * if copies share this layer's QgsVectorLayer, materialize the copies so that they are not changed
+
+        This is called by the methods in this class that edit the layer and must be called by
+        code that edits the QgsVectorLayer directly.
+
+        Returns:
+            None
+        """
+        if self.copy_on_write_source is not None:
+            self.__materialize()
+        else:
+            # Copy the set because materializing a copy removes it from the set.
+            for copied_geolayer in list(self.copy_on_write_copies):
+                if copied_geolayer.qgs_layer is self.qgs_layer:
+                    copied_geolayer.__materialize()
+                else:
+                    self.copy_on_write_copies.discard(copied_geolayer)
+
     def remove_attribute(self, attribute_name: str) -> None:
         """
         Removes an attribute of the GeoLayer.
@@ -219,6 +313,7 @@ class VectorGeoLayer(GeoLayer):
         """
 
         # Run processing in the qgis utility function.
+        self.prepare_for_edit()
         qgis_util.remove_qgsvectorlayer_attribute(self.qgs_layer, attribute_name)
 
     def remove_attributes(self, keep_pattern: list = None, remove_pattern: list = None) -> None:
@@ -235,7 +330,15 @@ class VectorGeoLayer(GeoLayer):
             None
         """
 
+        # Only edit the layer if attributes will be removed, to avoid materializing a copy-on-write copy.
+        attrs_to_remove = string_util.filter_list_of_strings(self.get_attribute_field_names(),
+                                                             keep_pattern, remove_pattern,
+                                                             return_inclusions=False)
+        if len(attrs_to_remove) == 0:
+            return
+
         # Run processing in the qgis utility function.
+        self.prepare_for_edit()
         qgis_util.remove_qgsvectorlayer_attributes(self.qgs_layer, keep_pattern, remove_pattern)
 
     def rename_attribute(self, attribute_name: str, new_attribute_name: str) -> None:
@@ -251,23 +354,33 @@ class VectorGeoLayer(GeoLayer):
         """
 
         # Run processing in the qgis utility function.
+        self.prepare_for_edit()
         qgis_util.rename_qgsvectorlayer_attribute(self.qgs_layer, attribute_name, new_attribute_name)
 
     # TODO smalers 2020-11-16 need to add way to match records, similar to TSTool table commands.
-    def set_attribute(self, attribute_name: str, attribute_value: Any) -> int:
+    def set_attribute(self, attribute_name: str, attribute_value: Any = None,
+                      attribute_values: dict = None, attribute_expression: str = None) -> int:
         """
-        Set the attribute of all features with a common attribute value.
+        Set the attribute of features.
+        By default, all features are set to a common attribute value.
+        Per-feature values can be set using a dictionary keyed by feature ID, or a QGIS expression.
 
         Args:
             attribute_name: the name of the attribute to populate.
             attribute_value: the string to populate as the attribute's value
+            attribute_values: dictionary of feature ID and attribute value, used instead of attribute_value
+                (for a copy-on-write copy, call prepare_for_edit() before getting the feature IDs)
+            attribute_expression: QGIS expression evaluated for each feature, used instead of attribute_value
 
         Returns:
             Number of features for which the attribute was set.
         """
 
         # Run processing in the qgis utility function.
-        return qgis_util.set_qgsvectorlayer_attribute(self.qgs_layer, attribute_name, attribute_value)
+        self.prepare_for_edit()
+        return qgis_util.set_qgsvectorlayer_attribute(self.qgs_layer, attribute_name, attribute_value,
+                                                      attribute_values=attribute_values,
+                                                      attribute_expression=attribute_expression)
 
     def split_by_attribute(self, attribute_name: str, output_qgsvectorlayers: str) -> None:
         """
@@ -251,7 +251,9 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         # Commands / Read GeoLayer
         self.Menu_Commands_Read_GeoLayer: QtWidgets.QMenu or None = None
         self.Menu_Commands_Read_ReadGeoLayerFromDelimitedFile: QtWidgets.QAction or None = None
+        self.Menu_Commands_Read_ReadGeoLayerFromFlatGeobuf: QtWidgets.QAction or None = None
         self.Menu_Commands_Read_ReadGeoLayerFromGeoJSON: QtWidgets.QAction or None = None
+        self.Menu_Commands_Read_ReadGeoLayerFromGeoParquet: QtWidgets.QAction or None = None
         self.Menu_Commands_Read_ReadGeoLayerFromKML: QtWidgets.QAction or None = None
         self.Menu_Commands_Read_ReadGeoLayerFromShapefile: QtWidgets.QAction or None = None
         self.Menu_Commands_Read_ReadGeoLayerFromWebFeatureService: QtWidgets.QAction or None = None
@@ -287,6 +289,7 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
 
         # Commands / Analyze GeoLayer
         self.Menu_Commands_Analyze_GeoLayer: QtWidgets.QMenu or None = None
+        self.Menu_Commands_Analyze_CalculateZonalStatistics: QtWidgets.QAction or None = None
 
         # Commands / Check GeoLayer
         self.Menu_Commands_Check_GeoLayer: QtWidgets.QMenu or None = None
@@ -294,7 +297,9 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         # Commands / Write GeoLayer
         self.Menu_Commands_Write_GeoLayer: QtWidgets.QMenu or None = None
         self.Menu_Commands_Write_WriteGeoLayerToDelimitedFile: QtWidgets.QAction or None = None
+        self.Menu_Commands_Write_WriteGeoLayerToFlatGeobuf: QtWidgets.QAction or None = None
         self.Menu_Commands_Write_WriteGeoLayerToGeoJSON: QtWidgets.QAction or None = None
+        self.Menu_Commands_Write_WriteGeoLayerToGeoParquet: QtWidgets.QAction or None = None
         self.Menu_Commands_Write_WriteGeoLayerToKML: QtWidgets.QAction or None = None
         self.Menu_Commands_Write_WriteGeoLayerToShapefile: QtWidgets.QAction or None = None
 
@@ -367,6 +372,8 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         self.Menu_Commands_General_RunningProperties_RunProgram: QtWidgets.QAction or None = None
         self.Menu_Commands_General_RunningProperties_SetProperty: QtWidgets.QAction or None = None
         self.Menu_Commands_General_RunningProperties_SetPropertyFromGeoLayer: QtWidgets.QAction or None = None
+        self.Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics: QtWidgets.QAction or None = \
+            None
         self.Menu_Commands_General_RunningProperties_WritePropertiesToFile: QtWidgets.QAction or None = None
         self.Menu_Commands_General_RunningProperties_Exit: QtWidgets.QAction or None = None
         self.Menu_Commands_General_RunningProperties_QgisAlgorithmHelp: QtWidgets.QAction or None = None
@@ -396,6 +403,7 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         # Commands(Raster) / Manipulate Raster GeoLayer
         self.Menu_Commands_Raster_Manipulate_RasterGeoLayer: QtWidgets.QMenu or None = None
         self.Menu_Commands_Raster_Manipulate_ChangeRasterGeoLayerCRS: QtWidgets.QAction or None = None
+        self.Menu_Commands_Raster_Manipulate_RasterCalculator: QtWidgets.QAction or None = None
         self.Menu_Commands_Raster_Manipulate_RearrangeRasterGeoLayerBands: QtWidgets.QAction or None = None
 
         # Commands(Raster) / Write Raster GeoLayer
@@ -1634,6 +1642,18 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
             functools.partial(self.edit_new_command, "ReadGeoLayerFromDelimitedFile()"))
         self.Menu_Commands_Read_GeoLayer.addAction(self.Menu_Commands_Read_ReadGeoLayerFromDelimitedFile)
 
+        # ReadGeoLayerFromFlatGeobuf
+        self.Menu_Commands_Read_ReadGeoLayerFromFlatGeobuf = QtWidgets.QAction(main_window)
+        self.Menu_Commands_Read_ReadGeoLayerFromFlatGeobuf.setObjectName(
+            qt_util.from_utf8("Menu_Commands_GeoLayers_Read_ReadGeoLayerFromFlatGeobuf"))
+        self.Menu_Commands_Read_ReadGeoLayerFromFlatGeobuf.setText(
+            "ReadGeoLayerFromFlatGeobuf()... <reads a GeoLayer from a FlatGeobuf file>")
+        self.Menu_Commands_Read_GeoLayer.addAction(self.Menu_Commands_Read_ReadGeoLayerFromFlatGeobuf)
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_Read_ReadGeoLayerFromFlatGeobuf.triggered.connect(
+            functools.partial(self.edit_new_command, "ReadGeoLayerFromFlatGeobuf()"))
+
         # ReadGeoLayerFromGeoJSON
         self.Menu_Commands_Read_ReadGeoLayerFromGeoJSON = QtWidgets.QAction(main_window)
         self.Menu_Commands_Read_ReadGeoLayerFromGeoJSON.setObjectName(
@@ -1646,6 +1666,18 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         self.Menu_Commands_Read_ReadGeoLayerFromGeoJSON.triggered.connect(
             functools.partial(self.edit_new_command, "ReadGeoLayerFromGeoJSON()"))
 
+        # ReadGeoLayerFromGeoParquet
+        self.Menu_Commands_Read_ReadGeoLayerFromGeoParquet = QtWidgets.QAction(main_window)
+        self.Menu_Commands_Read_ReadGeoLayerFromGeoParquet.setObjectName(
+            qt_util.from_utf8("Menu_Commands_GeoLayers_Read_ReadGeoLayerFromGeoParquet"))
+        self.Menu_Commands_Read_ReadGeoLayerFromGeoParquet.setText(
+            "ReadGeoLayerFromGeoParquet()... <reads a GeoLayer from a GeoParquet file>")
+        self.Menu_Commands_Read_GeoLayer.addAction(self.Menu_Commands_Read_ReadGeoLayerFromGeoParquet)
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_Read_ReadGeoLayerFromGeoParquet.triggered.connect(
+            functools.partial(self.edit_new_command, "ReadGeoLayerFromGeoParquet()"))
+
         # ReadGeoLayerFromKML
         self.Menu_Commands_Read_ReadGeoLayerFromKML = QtWidgets.QAction(main_window)
         self.Menu_Commands_Read_ReadGeoLayerFromKML.setObjectName(
@@ -1938,15 +1970,26 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
             self.Menu_Commands_Manipulate_SplitGeoLayerByAttribute)
 
         # ------------------------------------------------------------------------------------------------------------
-        # Commands / Analyze GeoLayer menu (disabled)
+        # Commands / Analyze GeoLayer menu
         # ------------------------------------------------------------------------------------------------------------
         self.Menu_Commands_Analyze_GeoLayer = QtWidgets.QMenu(self.Menu_Commands)
         self.Menu_Commands_Analyze_GeoLayer.setObjectName(
             qt_util.from_utf8("Menu_Commands_Analyze_GeoLayer"))
         self.Menu_Commands_Analyze_GeoLayer.setTitle("Analyze GeoLayer")
-        self.Menu_Commands_Analyze_GeoLayer.setEnabled(False)
         self.Menu_Commands.addAction(self.Menu_Commands_Analyze_GeoLayer.menuAction())
 
+        # CalculateZonalStatistics
+        self.Menu_Commands_Analyze_CalculateZonalStatistics = QtWidgets.QAction(main_window)
+        self.Menu_Commands_Analyze_CalculateZonalStatistics.setObjectName(
+            qt_util.from_utf8("Menu_Commands_Analyze_CalculateZonalStatistics"))
+        self.Menu_Commands_Analyze_CalculateZonalStatistics.setText(
+            "CalculateZonalStatistics()... <calculate raster statistics for polygon features>")
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_Analyze_CalculateZonalStatistics.triggered.connect(
+            functools.partial(self.edit_new_command, "CalculateZonalStatistics()"))
+        self.Menu_Commands_Analyze_GeoLayer.addAction(self.Menu_Commands_Analyze_CalculateZonalStatistics)
+
         # ------------------------------------------------------------------------------------------------------------
         # Commands / Check GeoLayer menu (disabled)
         # ------------------------------------------------------------------------------------------------------------
@@ -1978,6 +2021,18 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
             functools.partial(self.edit_new_command, "WriteGeoLayerToDelimitedFile()"))
         self.Menu_Commands_Write_GeoLayer.addAction(self.Menu_Commands_Write_WriteGeoLayerToDelimitedFile)
 
+        # WriteGeoLayerToFlatGeobuf
+        self.Menu_Commands_Write_WriteGeoLayerToFlatGeobuf = QtWidgets.QAction(main_window)
+        self.Menu_Commands_Write_WriteGeoLayerToFlatGeobuf.setObjectName(
+            qt_util.from_utf8("Menu_Commands_Write_WriteGeoLayerToFlatGeobuf"))
+        self.Menu_Commands_Write_WriteGeoLayerToFlatGeobuf.setText(
+            "WriteGeoLayerToFlatGeobuf()... <write GeoLayer to a file in FlatGeobuf format>")
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_Write_WriteGeoLayerToFlatGeobuf.triggered.connect(
+            functools.partial(self.edit_new_command, "WriteGeoLayerToFlatGeobuf()"))
+        self.Menu_Commands_Write_GeoLayer.addAction(self.Menu_Commands_Write_WriteGeoLayerToFlatGeobuf)
+
         # WriteGeoLayerToGeoJSON
         self.Menu_Commands_Write_WriteGeoLayerToGeoJSON = QtWidgets.QAction(main_window)
         self.Menu_Commands_Write_WriteGeoLayerToGeoJSON.setObjectName(
@@ -1990,6 +2045,18 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
             functools.partial(self.edit_new_command, "WriteGeoLayerToGeoJSON()"))
         self.Menu_Commands_Write_GeoLayer.addAction(self.Menu_Commands_Write_WriteGeoLayerToGeoJSON)
 
+        # WriteGeoLayerToGeoParquet
+        self.Menu_Commands_Write_WriteGeoLayerToGeoParquet = QtWidgets.QAction(main_window)
+        self.Menu_Commands_Write_WriteGeoLayerToGeoParquet.setObjectName(
+            qt_util.from_utf8("Menu_Commands_Write_WriteGeoLayerToGeoParquet"))
+        self.Menu_Commands_Write_WriteGeoLayerToGeoParquet.setText(
+            "WriteGeoLayerToGeoParquet()... <write GeoLayer to a file in GeoParquet format>")
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_Write_WriteGeoLayerToGeoParquet.triggered.connect(
+            functools.partial(self.edit_new_command, "WriteGeoLayerToGeoParquet()"))
+        self.Menu_Commands_Write_GeoLayer.addAction(self.Menu_Commands_Write_WriteGeoLayerToGeoParquet)
+
         # WriteGeoLayerToKML
         self.Menu_Commands_Write_WriteGeoLayerToKML = QtWidgets.QAction(main_window)
         self.Menu_Commands_Write_WriteGeoLayerToKML.setObjectName(
@@ -2594,6 +2661,19 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         self.Menu_Commands_General_RunningProperties.addAction(
             self.Menu_Commands_General_RunningProperties_SetPropertyFromGeoLayer)
 
+        # SetPropertiesFromRasterStatistics
+        self.Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics = QtWidgets.QAction(main_window)
+        self.Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics.setObjectName(
+            qt_util.from_utf8("Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics"))
+        self.Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics.setText(
+            "SetPropertiesFromRasterStatistics()... <set GeoProcessor properties from raster band statistics>")
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics.triggered.connect(
+            functools.partial(self.edit_new_command, "SetPropertiesFromRasterStatistics()"))
+        self.Menu_Commands_General_RunningProperties.addAction(
+            self.Menu_Commands_General_RunningProperties_SetPropertiesFromRasterStatistics)
+
         # WritePropertiesToFile
         self.Menu_Commands_General_RunningProperties_WritePropertiesToFile = QtWidgets.QAction(main_window)
         self.Menu_Commands_General_RunningProperties_WritePropertiesToFile.setObjectName(
@@ -2828,6 +2908,19 @@ class GeoProcessorUI(QtWidgets.QMainWindow):  # , Ui_MainWindow):
         self.Menu_Commands_Raster_Manipulate_RasterGeoLayer.addAction(
             self.Menu_Commands_Raster_Manipulate_ChangeRasterGeoLayerCRS)
 
+        # RasterCalculator
+        self.Menu_Commands_Raster_Manipulate_RasterCalculator = QtWidgets.QAction(main_window)
+        self.Menu_Commands_Raster_Manipulate_RasterCalculator.setObjectName(
+            qt_util.from_utf8("Menu_Commands_Raster_Manipulate_RasterCalculator"))
+        self.Menu_Commands_Raster_Manipulate_RasterCalculator.setText(
+            "RasterCalculator()... <calculate a raster GeoLayer from an expression>")
+        # Use the following because triggered.connect() is shown as unresolved reference in PyCharm.
+        # noinspection PyUnresolvedReferences
+        self.Menu_Commands_Raster_Manipulate_RasterCalculator.triggered.connect(
+            functools.partial(self.edit_new_command, "RasterCalculator()"))
+        self.Menu_Commands_Raster_Manipulate_RasterGeoLayer.addAction(
+            self.Menu_Commands_Raster_Manipulate_RasterCalculator)
+
         # RearrangeRasterGeoLayerBands
         self.Menu_Commands_Raster_Manipulate_RearrangeRasterGeoLayerBands = QtWidgets.QAction(main_window)
         self.Menu_Commands_Raster_Manipulate_RearrangeRasterGeoLayerBands.setObjectName(
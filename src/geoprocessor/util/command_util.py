@@ -27,9 +27,61 @@ from geoprocessor.core.CommandStatus import CommandStatus
 from geoprocessor.core.CommandStatusType import CommandStatusType
 # from geoprocessor.core.GeoProcessor import GeoProcessor
 
+import geoprocessor.util.qgis_util as qgis_util
+import geoprocessor.util.string_util as string_util
+
 import logging
 
 
+def add_read_filter_parameter_input_metadata(parameter_input_metadata: dict,
+                                             include_where_clause: bool = True) -> None:
+    """
+    Add the input metadata for the parameters used by vector read commands to filter the features and attributes
+    that are read:  BoundingBox, ClipGeoLayerID, WhereClause (optional) and ReadAttributes.
+    The parameters must also be included in the command's parameter metadata.
+    See get_read_filters() to get the filters when the command is run.
+
+    Args:
+        parameter_input_metadata (dict):  The command's parameter input metadata, which is modified.
+        include_where_clause (bool):  Whether to add the WhereClause parameter.
+
+    Returns:
+        None
+    """
+    # BoundingBox
+    parameter_input_metadata['BoundingBox.Description'] = "bounding box of features to read"
+    parameter_input_metadata['BoundingBox.Label'] = "Bounding box"
+    parameter_input_metadata['BoundingBox.Required'] = False
+    parameter_input_metadata['BoundingBox.Tooltip'] = (
+        "Only read features that intersect the bounding box, specified as MinX,MinY,MaxX,MaxY in the "
+        "coordinate reference system of the layer. ${Property} syntax is recognized.")
+    parameter_input_metadata['BoundingBox.Value.Default.Description'] = "read all features"
+    # ClipGeoLayerID
+    parameter_input_metadata['ClipGeoLayerID.Description'] = "GeoLayer to clip features to"
+    parameter_input_metadata['ClipGeoLayerID.Label'] = "Clip GeoLayerID"
+    parameter_input_metadata['ClipGeoLayerID.Required'] = False
+    parameter_input_metadata['ClipGeoLayerID.Tooltip'] = (
+        "Only read features that intersect the features of an existing GeoLayer. "
+        "${Property} syntax is recognized.")
+    parameter_input_metadata['ClipGeoLayerID.Value.Default.Description'] = "read all features"
+    if include_where_clause:
+        # WhereClause
+        parameter_input_metadata['WhereClause.Description'] = "SQL where clause to select features"
+        parameter_input_metadata['WhereClause.Label'] = "Where clause"
+        parameter_input_metadata['WhereClause.Required'] = False
+        parameter_input_metadata['WhereClause.Tooltip'] = (
+            "SQL where clause used by the data provider to select the features to read, for example:  "
+            "\"COUNTY\" = 'Larimer'. ${Property} syntax is recognized.")
+        parameter_input_metadata['WhereClause.Value.Default.Description'] = "read all features"
+    # ReadAttributes
+    parameter_input_metadata['ReadAttributes.Description'] = "attributes to read"
+    parameter_input_metadata['ReadAttributes.Label'] = "Read attributes"
+    parameter_input_metadata['ReadAttributes.Required'] = False
+    parameter_input_metadata['ReadAttributes.Tooltip'] = (
+        "Comma-separated list of attributes to read. Other attributes are not read.")
+    parameter_input_metadata['ReadAttributes.Value.Default.Description'] = "read all attributes"
+
+
 def append_command_status_log_records(command_status: CommandStatus, commands: []) -> None:
     """
     Append log records from a list of commands to a status. For example,
@@ -73,6 +125,36 @@ def append_command_status_log_records(command_status: CommandStatus, commands: [
 
 
 # TODO smalers 2020-01-15 cannot type hint GeoProcessor because it results in circular dependence with import.
+def check_read_filter_parameters(command, command_parameters: dict, warning_message: str) -> str:
+    """
+    Check the vector read command parameters that filter the features that are read,
+    currently that the BoundingBox can be parsed if it does not use ${Property} syntax.
+    A FAILURE log record is added to the command status for each invalid parameter.
+
+    Args:
+        command (AbstractCommand):  Command instance derived from AbstractCommand.
+        command_parameters (dict):  The dictionary of command parameters to check (key:string_value).
+        warning_message (str):  Warning message that is appended to.
+
+    Returns:
+        The warning message with any new warnings appended.
+    """
+    # noinspection PyPep8Naming
+    pv_BoundingBox = command.get_parameter_value(parameter_name="BoundingBox", command_parameters=command_parameters)
+    if pv_BoundingBox is not None and pv_BoundingBox.find("${") < 0:
+        try:
+            qgis_util.parse_qgs_rectangle(pv_BoundingBox)
+        except ValueError as e:
+            # Use the exception.
+            message = str(e)
+            recommendation = "Specify the BoundingBox as MinX,MinY,MaxX,MaxY."
+            warning_message += "\n" + message
+            command.command_status.add_to_log(
+                CommandPhaseType.INITIALIZATION,
+                CommandLogRecord(CommandStatusType.FAILURE, message, recommendation))
+    return warning_message
+
+
 def get_command_status_max_severity(processor) -> CommandStatusType:
     """
     Get the maximum command status severity for the processor.
@@ -133,6 +215,48 @@ def get_highest_command_status_severity(command_status: CommandStatusType) -> Co
     return status_severity
 
 
+def get_read_filters(command) -> tuple:
+    """
+    Get the filters used by a vector read command, from the BoundingBox, ClipGeoLayerID and ReadAttributes
+    parameters, expanding ${Property} syntax.  The filters are passed to the data provider so that only the
+    needed features and attributes are read.  The WhereClause parameter is handled by the command.
+
+    Args:
+        command (AbstractCommand):  Command instance derived from AbstractCommand.
+
+    Returns:
+        Tuple of bounding box (QgsRectangle), clip layer (QgsVectorLayer), and list of attribute names to read,
+        each of which is None if not specified.
+
+    Raises:
+        ValueError if a filter is invalid.
+    """
+    # noinspection PyPep8Naming
+    pv_BoundingBox = command.get_parameter_value("BoundingBox")
+    # noinspection PyPep8Naming
+    pv_ClipGeoLayerID = command.get_parameter_value("ClipGeoLayerID")
+    # noinspection PyPep8Naming
+    pv_ReadAttributes = command.get_parameter_value("ReadAttributes")
+
+    bounding_box = qgis_util.parse_qgs_rectangle(
+        command.command_processor.expand_parameter_value(pv_BoundingBox, command))
+
+    clip_layer = None
+    if pv_ClipGeoLayerID:
+        # noinspection PyPep8Naming
+        pv_ClipGeoLayerID = command.command_processor.expand_parameter_value(pv_ClipGeoLayerID, command)
+        clip_geolayer = command.command_processor.get_geolayer(pv_ClipGeoLayerID)
+        if clip_geolayer is None:
+            raise ValueError("The ClipGeoLayerID ({}) is not a valid GeoLayer ID.".format(pv_ClipGeoLayerID))
+        clip_layer = clip_geolayer.qgs_layer
+
+    read_attributes = None
+    if pv_ReadAttributes:
+        read_attributes = string_util.delimited_string_to_list(pv_ReadAttributes)
+
+    return bounding_box, clip_layer, read_attributes
+
+
 def get_required_parameter_names(command) -> list:
     """
     Examine the command.parameter_input_metadata list and return parameter names for *.Required = True instances.
@@ -0,0 +1,213 @@
+# geojson_util - useful utility functions for reading GeoJSON files
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+import gzip
+import json
+
+# Characters that are skipped between JSON values:
+# - includes the record separator used by RFC 8142 GeoJSON text sequences
+__WHITESPACE = " \t\r\n\x1e"
+
+
+def is_gzip_file(file_path: str) -> bool:
+    """
+    Determine whether a file is compressed with gzip, by checking the file's magic number.
+
+    Args:
+        file_path (str): the full pathname of the file to check
+
+    Returns:
+        True if the file is compressed with gzip, False if not.
+    """
+    with open(file_path, "rb") as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+def open_geojson_file(file_path: str):
+    """
+    Open a GeoJSON file for reading text, decompressing if the file is compressed with gzip.
+
+    Args:
+        file_path (str): the full pathname of the GeoJSON file
+
+    Returns:
+        Text file object, which should be closed by the caller.
+    """
+    if is_gzip_file(file_path):
+        return gzip.open(file_path, "rt", encoding="utf-8")
+    else:
+        return open(file_path, "r", encoding="utf-8")
+
+
+def read_geojson_features(file_path: str, members: dict = None, chunk_size: int = 1048576):
+    """
+    Read features from a GeoJSON file one at a time, without reading the whole file into memory.
+
+    The following are handled:
+
+    * a FeatureCollection, in which case features in the 'features' array are returned
+    * newline-delimited GeoJSON (GeoJSONSeq) and RFC 8142 GeoJSON text sequences,
+      in which case each top-level Feature is returned
+    * gzip-compressed files
+
+    Only one feature and one chunk of the file are held in memory at a time.
+
+    Args:
+        file_path (str): the full pathname of the GeoJSON file
+        members (dict): if not None, FeatureCollection members other than 'features' (e.g., 'crs', 'name')
+            are added to the dictionary as they are read.  Members that occur before 'features' are available
+            when the first feature is returned.
+        chunk_size (int): number of characters to read from the file at a time
+
+    Returns:
+        Generator of features, each a dictionary as returned by json.loads().
+
+    Raises:
+        ValueError if the file is not valid GeoJSON.
+    """
+    decoder = json.JSONDecoder()
+    with open_geojson_file(file_path) as input_file:
+        buffer = ""
+        position = 0
+        eof = False
+        read_size = chunk_size
+
+        # Parser state:
+        # - "top": before a top-level object
+        # - "key": expecting a member name or the end of the top-level object
+        # - "colon": expecting the colon after a member name
+        # - "value": expecting a member value
+        # - "after_value": expecting a comma or the end of the top-level object
+        # - "feature_first": expecting the first feature or the end of the features array
+        # - "feature_value": expecting a feature
+        # - "feature_next": expecting a comma or the end of the features array
+        state = "top"
+        # Members of the current top-level object, other than 'features'.
+        current = None
+        current_key = None
+        has_features = False
+
+        while True:
+            # Skip whitespace.
+            while position < len(buffer) and buffer[position] in __WHITESPACE:
+                position += 1
+
+            if position >= len(buffer):
+                if eof:
+                    break
+                chunk = input_file.read(read_size)
+                if len(chunk) == 0:
+                    eof = True
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            c = buffer[position]
+            if state == "top":
+                if c != "{":
+                    raise ValueError("Expecting '{{' at the start of a GeoJSON object, found '{}'.".format(c))
+                position += 1
+                current = dict()
+                has_features = False
+                state = "key"
+                continue
+            elif state == "key" and c == "}":
+                position += 1
+                if not has_features and current.get("type") == "Feature":
+                    # Top-level feature in a GeoJSON sequence.
+                    yield current
+                current = None
+                state = "top"
+                continue
+            elif state == "colon":
+                if c != ":":
+                    raise ValueError("Expecting ':' after GeoJSON member '{}'.".format(current_key))
+                position += 1
+                state = "value"
+                continue
+            elif state == "after_value":
+                position += 1
+                if c == ",":
+                    state = "key"
+                elif c == "}":
+                    # Handle the end of the object in the "key" state.
+                    position -= 1
+                    state = "key"
+                else:
+                    raise ValueError("Expecting ',' or '}}' after GeoJSON member '{}'.".format(current_key))
+                continue
+            elif state == "value" and current_key == "features" and c == "[":
+                position += 1
+                has_features = True
+                if members is not None:
+                    # Make the members that have been read so far available before the first feature.
+                    members.update(current)
+                state = "feature_first"
+                continue
+            elif state == "feature_first" and c == "]":
+                position += 1
+                state = "after_value"
+                continue
+            elif state == "feature_next":
+                position += 1
+                if c == ",":
+                    state = "feature_value"
+                elif c == "]":
+                    state = "after_value"
+                else:
+                    raise ValueError("Expecting ',' or ']' in the GeoJSON features array.")
+                continue
+
+            # Decode a complete JSON value (member name, member value or feature).
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                if end >= len(buffer) and not eof:
+                    # The value may be truncated (e.g., a number), so read more before accepting it.
+                    raise json.JSONDecodeError("Value may be incomplete", buffer, end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("Invalid GeoJSON at character {} in the remaining buffer.".format(position))
+                # Read more of the file and try again:
+                # - increase the read size so that a very large feature does not cause many retries
+                chunk = input_file.read(read_size)
+                if len(chunk) == 0:
+                    eof = True
+                buffer = buffer[position:] + chunk
+                position = 0
+                read_size = max(read_size, len(buffer))
+                continue
+
+            position = end
+            if state == "key":
+                if not isinstance(value, str):
+                    raise ValueError("Expecting a GeoJSON member name, found '{}'.".format(value))
+                current_key = value
+                state = "colon"
+            elif state == "value":
+                current[current_key] = value
+                if has_features and members is not None:
+                    members[current_key] = value
+                state = "after_value"
+            else:
+                # "feature_first" or "feature_value"
+                yield value
+                state = "feature_next"
+
+    if state != "top":
+        raise ValueError("Unexpected end of GeoJSON file.")
@@ -23,6 +23,7 @@ import geoprocessor.util.app_util as app_util
 import geoprocessor.util.os_util as os_util
 
 from datetime import datetime
+import fnmatch
 import getpass
 import logging
 import os
@@ -423,6 +424,41 @@ def is_url(path: str) -> bool:
         return False
 
 
+def list_files(folder: str, extensions: [str] = None, pattern: str = None, recursive: bool = False) -> [str]:
+    """
+    List the files in a folder, optionally including sub-folders.
+    The folder is read with os.scandir(), which avoids a separate call to check the type of each entry.
+
+    Args:
+        folder (str): the folder to list
+        extensions ([str]): file extensions to match, including the period (e.g., [".shp", ".geojson"]),
+            case-insensitive, or None to match all files
+        pattern (str): glob-style pattern to match the file name (not the path), or None to match all files
+        recursive (bool): whether to also list files in sub-folders
+
+    Returns:
+        The list of full paths to the matched files, sorted so that the order is deterministic.
+    """
+    if extensions is not None:
+        extensions = tuple([extension.lower() for extension in extensions])
+    files = []
+    folders = [folder]
+    while len(folders) > 0:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive:
+                        folders.append(entry.path)
+                elif entry.is_file():
+                    if extensions is not None and not entry.name.lower().endswith(extensions):
+                        continue
+                    if pattern and not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    files.append(entry.path)
+    files.sort()
+    return files
+
+
 def print_standard_file_header(ofp: TextIO, comment_line_prefix: str = '#', max_width: int = 120,
                                properties: dict = None) -> None:
     """
@@ -516,7 +552,7 @@ def remove_tmp_file(tmp_file_path: str or Path, tmp_file_comments: [str] = None,
 
     if isinstance(tmp_file_path, str):
         # Path is a string so convert to Path.
-        tmp_file_path = Path(str)
+        tmp_file_path = Path(tmp_file_path)
     if tmp_file_path.exists():
         # noinspection PyBroadException
         try:
@@ -17,24 +17,41 @@
 #     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
 # ________________________________________________________________NoticeEnd___
 
+import collections
+import concurrent.futures
 from datetime import datetime
+import gzip
+import itertools
+import json
 
 import logging
+import math
+import multiprocessing
 import os
 import numpy
+import threading
 
 # Import the QGIS version utilities first so that the version can be checked for imports below.
 import geoprocessor.util.qgis_version_util as qgis_version_util
 
 from qgis.core import QgsApplication
 from qgis.core import QgsCoordinateReferenceSystem
+from qgis.core import QgsCoordinateTransform
 from qgis.core import QgsCoordinateTransformContext
 from qgis.core import QgsExpression
 from qgis.core import QgsFeature
+from qgis.core import QgsFeatureRequest
 from qgis.core import QgsField
+from qgis.core import QgsFields
+from qgis.core import QgsJsonUtils
+from qgis.core import QgsMemoryProviderUtils
+from qgis.core import QgsProject
 from qgis.core import QgsRasterBandStats
+from qgis.core import QgsSpatialIndex
+from qgis.core import QgsWkbTypes
 from qgis.core import QgsGeometry, QgsMapLayer, QgsRasterLayer, QgsRectangle, QgsVectorFileWriter, QgsVectorLayer
-from qgis.core import QgsExpressionContext, QgsExpressionContextScope
+from qgis.core import QgsExpressionContext, QgsExpressionContextScope, QgsExpressionContextUtils
+from qgis.core import NULL
 if (qgis_version_util.get_qgis_version_int(1) >= 3) and (qgis_version_util.get_qgis_version_int(2) <= 10):
     # Works on QGIS 3.10.
     from qgis import processing
@@ -48,11 +65,13 @@ from PyQt5 import QtWidgets
 if (qgis_version_util.get_qgis_version_int(1) >= 3) and (qgis_version_util.get_qgis_version_int(2) <= 10):
     # The following worked with QGIS 3.10.
     import gdal
+    import ogr
     import osr
 elif (qgis_version_util.get_qgis_version_int(1) >= 3) and (qgis_version_util.get_qgis_version_int(2) > 10):
     # The following works with QGIS 3.26.3:
     # - could adjust the PYTHONPATH that runs GeoProcessor.
     import osgeo.gdal as gdal
+    import osgeo.ogr as ogr
     import osgeo.osr as osr
 
 from plugins.processing.core.Processing import Processing
@@ -63,11 +82,14 @@ import qgis.utils
 import sys
 
 import geoprocessor.util.app_util as app_util
+import geoprocessor.util.geojson_util as geojson_util
 import geoprocessor.util.io_util as io_util
 import geoprocessor.util.os_util as os_util
+import geoprocessor.util.raster_expression_util as raster_expression_util
 import geoprocessor.util.string_util as string_util
 
 from PyQt5.QtCore import QVariant, QFileInfo
+from PyQt5.QtCore import QDate, QDateTime, QTime, Qt
 from PyQt5 import QtCore
 
 """
@@ -91,6 +113,17 @@ dev_qgis_version : str = "3.26.3"
 # The QgsApplication instance opened with initialize_qgis(), used to simplify application management.
 qgs_app: QgsApplication = None
 
+# GDAL and NumPy data types for raster band data types, using lowercase names.
+__raster_data_types = {
+    'byte': (gdal.GDT_Byte, numpy.uint8),
+    'float32': (gdal.GDT_Float32, numpy.float32),
+    'float64': (gdal.GDT_Float64, numpy.float64),
+    'int16': (gdal.GDT_Int16, numpy.int16),
+    'int32': (gdal.GDT_Int32, numpy.int32),
+    'uint16': (gdal.GDT_UInt16, numpy.uint16),
+    'uint32': (gdal.GDT_UInt32, numpy.uint32)
+}
+
 
 def add_feature_to_qgsvectorlayer(qgsvectorlayer: QgsVectorLayer, qgsgeometry: QgsGeometry) -> None:
     """
@@ -182,6 +215,639 @@ def add_qgsvectorlayer_attribute(qgsvectorlayer: QgsVectorLayer, attribute_name:
         raise ValueError(message)
 
 
+def append_qgsvectorlayer_to_geopackage(qgsvectorlayer: QgsVectorLayer,
+                                        output_file_full: str,
+                                        layer_name: str) -> str:
+    """
+    Write the QgsVectorLayer object as a layer in a GeoPackage file.
+    If the GeoPackage file exists, the layer is added to the file (or replaces a layer with the same name),
+    which allows a single GeoPackage to be used as a scratch file for many layers.
+    The layer is written in its own coordinate reference system.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object
+        output_file_full (str): the full pathname to the GeoPackage file, including .gpkg extension
+        layer_name (str): the name of the layer in the GeoPackage
+
+    Returns:
+        The data source URI for the layer, which can be used as input to processing algorithms:
+        "path|layername=name"
+
+    Raises:
+        RuntimeError if the layer could not be written.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Appending layer '{}' to GeoPackage: {}".format(layer_name, output_file_full))
+
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "GPKG"
+    options.fileEncoding = "utf-8"
+    options.layerName = layer_name
+    if os.path.exists(output_file_full):
+        # Add the layer to the existing file rather than recreating the file.
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+    else:
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+    result = QgsVectorFileWriter.writeAsVectorFormatV2(layer=qgsvectorlayer,
+                                                      fileName=output_file_full,
+                                                      transformContext=QgsCoordinateTransformContext(),
+                                                      options=options)
+    if result[0] != QgsVectorFileWriter.NoError:
+        raise RuntimeError("Error writing layer '{}' to GeoPackage '{}' ({}).".format(
+            layer_name, output_file_full, result[1]))
+
+    return "{}|layername={}".format(output_file_full, layer_name)
+
+
+def __calculate_raster_window(code: object, variables: dict, window: (int, int, int, int), numpy_data_type: type,
+                              nodata_value: int or float, datasets: dict) -> numpy.ndarray:
+    """
+    Evaluate a raster expression for one window (block) of the input rasters.
+    This is called by calculate_raster_expression() and may run in a worker thread.
+
+    Args:
+        code (object): the compiled expression from raster_expression_util.parse_raster_expression()
+        variables (dict): expression variable name -> (raster file, band number, band NoData value or None)
+        window ((int, int, int, int)): the window column offset, row offset, number of columns and number of rows
+        numpy_data_type (type): NumPy data type for the output
+        nodata_value (int or float): output NoData value
+        datasets (dict): raster file -> GDAL dataset for the current thread, opened if not in the dictionary,
+            because GDAL datasets cannot be shared between threads
+
+    Returns:
+        The output values for the window as a NumPy array.
+    """
+    x_offset, y_offset, num_columns, num_rows = window
+    namespace = dict()
+    for name in raster_expression_util.RASTER_EXPRESSION_FUNCTIONS + raster_expression_util.RASTER_EXPRESSION_CONSTANTS:
+        namespace[name] = getattr(numpy, name)
+    # Cells that are NoData in any input are NoData in the output.
+    nodata_mask = numpy.zeros((num_rows, num_columns), dtype=bool)
+    for name, (raster_file, band_number, band_nodata_value) in variables.items():
+        dataset = datasets.get(raster_file)
+        if dataset is None:
+            dataset = gdal.Open(raster_file)
+            datasets[raster_file] = dataset
+        # Evaluate using 64-bit floating point so that integer inputs don't overflow or truncate division.
+        array = dataset.GetRasterBand(band_number).ReadAsArray(x_offset, y_offset, num_columns, num_rows).astype(
+            numpy.float64)
+        if band_nodata_value is not None:
+            if math.isnan(band_nodata_value):
+                nodata_mask |= numpy.isnan(array)
+            else:
+                nodata_mask |= array == band_nodata_value
+        namespace[name] = array
+
+    with numpy.errstate(all='ignore'):
+        result = eval(code, {"__builtins__": {}}, namespace)
+        # Constant expressions result in a scalar.
+        result = numpy.broadcast_to(numpy.asarray(result, dtype=numpy.float64), (num_rows, num_columns)).copy()
+        # Division by zero and other invalid operations result in NoData.
+        nodata_mask |= ~numpy.isfinite(result)
+        if numpy.issubdtype(numpy_data_type, numpy.integer):
+            # Round to integers and set values outside the data type range to NoData.
+            result = numpy.rint(result)
+            info = numpy.iinfo(numpy_data_type)
+            nodata_mask |= (result < info.min) | (result > info.max)
+    result[nodata_mask] = nodata_value
+    return result.astype(numpy_data_type)
+
+
+def calculate_raster_expression(expression: str, inputs: dict, output_file: str, data_type: str = "Float32",
+                                nodata_value: int or float = None, max_workers: int = 1,
+                                creation_options: [str] = None) -> None:
+    """
+    Calculate a raster from an expression that uses one or more input raster bands, for example a band ratio,
+    threshold or mask, and write the result to a GeoTIFF file.
+    The expression uses Python syntax and is checked by raster_expression_util.parse_raster_expression().
+
+    The rasters are processed one window at a time using the block (tile or strip) size of the first input,
+    so memory use depends on the block size and number of workers, not the raster size,
+    and rasters larger than memory can be processed.
+    Values are calculated using 64-bit floating point NumPy arrays and then converted to the output data type.
+    Output cells are NoData if any input cell is NoData, the result is not a finite number
+    (for example division by zero), or the result is outside the range of an integer output data type.
+
+    Args:
+        expression (str): the expression, for example "(A - B) / (A + B)" or "where(A > 100, 1, 0)"
+        inputs (dict): expression variable name -> (raster file, band number).
+            The rasters must have the same size and geotransform.
+        output_file (str): the GeoTIFF file to create, can be a /vsimem/ path
+        data_type (str): output data type ('Byte', 'Float32', 'Float64', 'Int16', 'Int32', 'UInt16', 'UInt32')
+        nodata_value (int or float): output NoData value, or None to use -9999 for signed and floating point
+            data types and the largest value for unsigned data types
+        max_workers (int): number of threads used to calculate windows, 1 to calculate in the current thread
+        creation_options ([str]): additional GeoTIFF creation options, for example "COMPRESS=LZW"
+
+    Raises:
+        ValueError if the expression or inputs are invalid.
+        RuntimeError if the output file could not be created.
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        gdal_data_type, numpy_data_type = __raster_data_types[data_type.lower()]
+    except KeyError:
+        raise ValueError('Raster data type "{}" is not supported.'.format(data_type))
+    if nodata_value is None:
+        if numpy.issubdtype(numpy_data_type, numpy.unsignedinteger):
+            nodata_value = int(numpy.iinfo(numpy_data_type).max)
+        else:
+            nodata_value = -9999
+    if max_workers is None or max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+
+    code, used_variables = raster_expression_util.parse_raster_expression(expression, list(inputs.keys()))
+    if len(used_variables) == 0:
+        raise ValueError("The raster expression '{}' does not use any input rasters.".format(expression))
+
+    # Check the inputs and get the NoData value for each band.
+    variables = dict()
+    first_dataset = None
+    for name in used_variables:
+        raster_file, band_number = inputs[name]
+        raster_file = str(raster_file)
+        dataset = gdal.Open(raster_file)
+        if dataset is None:
+            raise ValueError('Raster "{}" for "{}" could not be opened.'.format(raster_file, name))
+        if band_number < 1 or band_number > dataset.RasterCount:
+            raise ValueError('Raster "{}" for "{}" does not have band {}.'.format(raster_file, name, band_number))
+        if first_dataset is None:
+            first_dataset = dataset
+        elif (dataset.RasterXSize != first_dataset.RasterXSize) or \
+                (dataset.RasterYSize != first_dataset.RasterYSize) or \
+                not numpy.allclose(dataset.GetGeoTransform(), first_dataset.GetGeoTransform()):
+            raise ValueError('Raster "{}" for "{}" does not have the same size and cells as the other inputs.'.format(
+                raster_file, name))
+        variables[name] = (raster_file, band_number, dataset.GetRasterBand(band_number).GetNoDataValue())
+
+    # Determine the windows from the block size of the first input:
+    # - for rasters stored in strips (blocks that are full rows), use 256 rows per window,
+    #   which matches the default output tile height
+    num_columns = first_dataset.RasterXSize
+    num_rows = first_dataset.RasterYSize
+    first_band_number = variables[used_variables[0]][1]
+    block_columns, block_rows = first_dataset.GetRasterBand(first_band_number).GetBlockSize()
+    if block_columns >= num_columns:
+        block_columns = num_columns
+        block_rows = 256
+    windows = []
+    for y_offset in range(0, num_rows, block_rows):
+        for x_offset in range(0, num_columns, block_columns):
+            windows.append((x_offset, y_offset, min(block_columns, num_columns - x_offset),
+                            min(block_rows, num_rows - y_offset)))
+    logger.info("Calculating raster expression '{}' for {} columns, {} rows in {} windows of {}x{} "
+                "with {} worker(s).".format(expression, num_columns, num_rows, len(windows), block_columns,
+                                            block_rows, max_workers))
+
+    # Create the output using the same tile size, if valid for GeoTIFF (multiple of 16).
+    options = ["TILED=YES", "BIGTIFF=IF_SAFER"]
+    if block_columns % 16 == 0 and block_rows % 16 == 0 and block_columns < num_columns:
+        options += ["BLOCKXSIZE={}".format(block_columns), "BLOCKYSIZE={}".format(block_rows)]
+    if creation_options is not None:
+        options += creation_options
+    output_dataset = gdal.GetDriverByName("GTiff").Create(str(output_file), num_columns, num_rows, 1,
+                                                          gdal_data_type, options=options)
+    if output_dataset is None:
+        raise RuntimeError('Error creating raster "{}" ({}).'.format(output_file, gdal.GetLastErrorMsg()))
+    output_dataset.SetGeoTransform(first_dataset.GetGeoTransform())
+    output_dataset.SetProjection(first_dataset.GetProjection())
+    output_band = output_dataset.GetRasterBand(1)
+    output_band.SetNoDataValue(nodata_value)
+    first_dataset = None
+
+    # Datasets opened by each thread, which are closed at the end.
+    thread_datasets = []
+    thread_data = threading.local()
+
+    def calculate_window(window: (int, int, int, int)) -> numpy.ndarray:
+        if not hasattr(thread_data, "datasets"):
+            thread_data.datasets = dict()
+            thread_datasets.append(thread_data.datasets)
+        return __calculate_raster_window(code, variables, window, numpy_data_type, nodata_value,
+                                         thread_data.datasets)
+
+    try:
+        if max_workers == 1:
+            for window in windows:
+                output_band.WriteArray(calculate_window(window), window[0], window[1])
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Windows in progress, in order:
+                # - results are written by this thread because the output dataset cannot be shared between threads
+                # - limit the windows in progress so that memory use is bounded
+                pending = collections.deque()
+                for window in windows:
+                    pending.append((window, executor.submit(calculate_window, window)))
+                    if len(pending) >= 2 * max_workers:
+                        window, future = pending.popleft()
+                        output_band.WriteArray(future.result(), window[0], window[1])
+                while len(pending) > 0:
+                    window, future = pending.popleft()
+                    output_band.WriteArray(future.result(), window[0], window[1])
+    finally:
+        output_band.FlushCache()
+        output_band = None
+        # GDAL docs say to do the following to close the dataset.
+        output_dataset = None
+        for datasets in thread_datasets:
+            datasets.clear()
+
+
+def __accumulate_zonal_statistics(zones: numpy.ndarray, values: numpy.ndarray, accumulators: dict) -> None:
+    """
+    Add raster values to the zonal statistics accumulators using vectorized NumPy operations.
+    This is called by calculate_zonal_statistics() for each window of the rasterized zones.
+
+    Args:
+        zones (numpy.ndarray): zone number (1+) for each value
+        values (numpy.ndarray): 64-bit floating point values, with NoData already removed
+        accumulators (dict): 'count', 'sum', 'sum2' (sum of squares), 'min' and 'max' arrays,
+            indexed by zone number
+
+    Returns:
+        None
+    """
+    if zones.size == 0:
+        return
+    num_zones = accumulators['count'].size
+    accumulators['count'] += numpy.bincount(zones, minlength=num_zones)
+    accumulators['sum'] += numpy.bincount(zones, weights=values, minlength=num_zones)
+    accumulators['sum2'] += numpy.bincount(zones, weights=values * values, minlength=num_zones)
+    # Sort by zone so that the minimum and maximum of all zones can be calculated with one call each.
+    order = numpy.argsort(zones, kind='stable')
+    sorted_zones = zones[order]
+    sorted_values = values[order]
+    starts = numpy.flatnonzero(numpy.concatenate(([True], sorted_zones[1:] != sorted_zones[:-1])))
+    zone_numbers = sorted_zones[starts]
+    accumulators['min'][zone_numbers] = numpy.minimum(accumulators['min'][zone_numbers],
+                                                      numpy.minimum.reduceat(sorted_values, starts))
+    accumulators['max'][zone_numbers] = numpy.maximum(accumulators['max'][zone_numbers],
+                                                      numpy.maximum.reduceat(sorted_values, starts))
+
+
+def __get_zonal_statistics_window(geotransform: (float,), num_columns: int, num_rows: int,
+                                  envelope: (float, float, float, float)) -> (int, int, int, int):
+    """
+    Determine the raster window that contains an envelope, limited to the raster.
+
+    Args:
+        geotransform ((float,)): the GDAL geotransform of the raster (not rotated)
+        num_columns (int): number of columns in the raster
+        num_rows (int): number of rows in the raster
+        envelope ((float, float, float, float)): the OGR envelope (min x, max x, min y, max y)
+
+    Returns:
+        The window column offset, row offset, number of columns and number of rows.
+        The number of columns or rows is zero or negative if the envelope does not overlap the raster.
+    """
+    min_x, max_x, min_y, max_y = envelope
+    origin_x, pixel_width, _, origin_y, _, pixel_height = geotransform
+    columns = sorted([(min_x - origin_x) / pixel_width, (max_x - origin_x) / pixel_width])
+    rows = sorted([(min_y - origin_y) / pixel_height, (max_y - origin_y) / pixel_height])
+    first_column = max(0, int(math.floor(columns[0])))
+    last_column = min(num_columns, int(math.ceil(columns[1])))
+    first_row = max(0, int(math.floor(rows[0])))
+    last_row = min(num_rows, int(math.ceil(rows[1])))
+    return first_column, first_row, last_column - first_column, last_row - first_row
+
+
+def __calculate_zonal_statistics_rasterize(band, geotransform: (float,), zone_geometries: list,
+                                           accumulators: dict) -> None:
+    """
+    Calculate zonal statistics by rasterizing all zones to a zone number raster aligned with the value raster,
+    and then reading the zone and value rasters one window at a time.
+    This is efficient for many small zones but a cell is only in one zone if zones overlap.
+
+    Args:
+        band (gdal.Band): the value raster band
+        geotransform ((float,)): the GDAL geotransform of the value raster
+        zone_geometries (list): OGR geometries of the zones in the value raster's CRS, zone number is position + 1
+        accumulators (dict): zonal statistics accumulators, see __accumulate_zonal_statistics()
+
+    Returns:
+        None
+    """
+    nodata_value = band.GetNoDataValue()
+    ogr_dataset = ogr.GetDriverByName("Memory").CreateDataSource("zones")
+    ogr_layer = ogr_dataset.CreateLayer("zones", geom_type=ogr.wkbUnknown)
+    ogr_layer.CreateField(ogr.FieldDefn("zone", ogr.OFTInteger))
+    layer_definition = ogr_layer.GetLayerDefn()
+    for zone_number, geometry in enumerate(zone_geometries, start=1):
+        ogr_feature = ogr.Feature(layer_definition)
+        ogr_feature.SetField(0, zone_number)
+        ogr_feature.SetGeometry(geometry)
+        ogr_layer.CreateFeature(ogr_feature)
+
+    # Limit the zone raster to the part of the value raster that contains the zones.
+    x_offset, y_offset, num_columns, num_rows = __get_zonal_statistics_window(
+        geotransform, band.XSize, band.YSize, ogr_layer.GetExtent())
+    if num_columns <= 0 or num_rows <= 0:
+        return
+
+    # Read windows using the value raster block size, with full rows for rasters stored in strips,
+    # and align the zone raster with the value raster blocks so that each block is read once.
+    block_columns, block_rows = band.GetBlockSize()
+    if block_columns >= band.XSize:
+        block_columns = band.XSize
+        block_rows = 256
+    num_columns += x_offset % block_columns
+    x_offset -= x_offset % block_columns
+    num_rows += y_offset % block_rows
+    y_offset -= y_offset % block_rows
+
+    # The zone raster compresses well and is small even for large rasters.
+    zone_file = "/vsimem/zonal_statistics_{}_{}.tif".format(os.getpid(), threading.get_ident())
+    zone_band = None
+    zone_dataset = gdal.GetDriverByName("GTiff").Create(
+        zone_file, num_columns, num_rows, 1, gdal.GDT_Int32,
+        options=["TILED=YES", "COMPRESS=DEFLATE", "SPARSE_OK=TRUE", "BIGTIFF=IF_SAFER"])
+    try:
+        origin_x, pixel_width, _, origin_y, _, pixel_height = geotransform
+        zone_dataset.SetGeoTransform((origin_x + x_offset * pixel_width, pixel_width, 0.0,
+                                      origin_y + y_offset * pixel_height, 0.0, pixel_height))
+        if gdal.RasterizeLayer(zone_dataset, [1], ogr_layer, options=["ATTRIBUTE=zone"]) != 0:
+            raise RuntimeError("Error rasterizing zones ({}).".format(gdal.GetLastErrorMsg()))
+        zone_band = zone_dataset.GetRasterBand(1)
+        for window_y in range(0, num_rows, block_rows):
+            window_rows = min(block_rows, num_rows - window_y)
+            for window_x in range(0, num_columns, block_columns):
+                window_columns = min(block_columns, num_columns - window_x)
+                zones = zone_band.ReadAsArray(window_x, window_y, window_columns, window_rows).ravel()
+                in_zone = zones > 0
+                if not in_zone.any():
+                    # Don't read values outside the zones.
+                    continue
+                values = band.ReadAsArray(x_offset + window_x, y_offset + window_y, window_columns,
+                                          window_rows).ravel().astype(numpy.float64)
+                in_zone &= numpy.isfinite(values)
+                if nodata_value is not None and not math.isnan(nodata_value):
+                    in_zone &= values != nodata_value
+                __accumulate_zonal_statistics(zones[in_zone], values[in_zone], accumulators)
+    finally:
+        zone_band = None
+        zone_dataset = None
+        gdal.Unlink(zone_file)
+
+
+def __calculate_zonal_statistics_window(band, geotransform: (float,), zone_geometries: list,
+                                        accumulators: dict) -> None:
+    """
+    Calculate zonal statistics one zone at a time by reading the value raster window for the zone's envelope
+    and rasterizing the zone to a mask for the window.
+    This is efficient for a small number of zones and handles overlapping zones.
+
+    Args:
+        band (gdal.Band): the value raster band
+        geotransform ((float,)): the GDAL geotransform of the value raster
+        zone_geometries (list): OGR geometries of the zones in the value raster's CRS, zone number is position + 1
+        accumulators (dict): zonal statistics accumulators, see __accumulate_zonal_statistics()
+
+    Returns:
+        None
+    """
+    nodata_value = band.GetNoDataValue()
+    mem_driver = gdal.GetDriverByName("MEM")
+    ogr_dataset = ogr.GetDriverByName("Memory").CreateDataSource("zone")
+    ogr_layer = ogr_dataset.CreateLayer("zone", geom_type=ogr.wkbUnknown)
+    layer_definition = ogr_layer.GetLayerDefn()
+    origin_x, pixel_width, _, origin_y, _, pixel_height = geotransform
+    for zone_number, geometry in enumerate(zone_geometries, start=1):
+        x_offset, y_offset, num_columns, num_rows = __get_zonal_statistics_window(
+            geotransform, band.XSize, band.YSize, geometry.GetEnvelope())
+        if num_columns <= 0 or num_rows <= 0:
+            continue
+        # Rasterize the zone to a mask for the window.
+        ogr_feature = ogr.Feature(layer_definition)
+        ogr_feature.SetGeometry(geometry)
+        ogr_layer.CreateFeature(ogr_feature)
+        mask_dataset = mem_driver.Create("", num_columns, num_rows, 1, gdal.GDT_Byte)
+        mask_dataset.SetGeoTransform((origin_x + x_offset * pixel_width, pixel_width, 0.0,
+                                      origin_y + y_offset * pixel_height, 0.0, pixel_height))
+        gdal.RasterizeLayer(mask_dataset, [1], ogr_layer, burn_values=[1])
+        ogr_layer.DeleteFeature(ogr_feature.GetFID())
+        in_zone = mask_dataset.GetRasterBand(1).ReadAsArray() > 0
+        mask_dataset = None
+
+        values = band.ReadAsArray(x_offset, y_offset, num_columns, num_rows).astype(numpy.float64)
+        in_zone &= numpy.isfinite(values)
+        if nodata_value is not None and not math.isnan(nodata_value):
+            in_zone &= values != nodata_value
+        zone_values = values[in_zone]
+        if zone_values.size > 0:
+            accumulators['count'][zone_number] = zone_values.size
+            accumulators['sum'][zone_number] = zone_values.sum()
+            accumulators['sum2'][zone_number] = (zone_values * zone_values).sum()
+            accumulators['min'][zone_number] = zone_values.min()
+            accumulators['max'][zone_number] = zone_values.max()
+
+
+def calculate_zonal_statistics(qgsvectorlayer: QgsVectorLayer, raster_file: str, band_number: int = 1,
+                               statistics: [str] = None, attribute_prefix: str = "", method: str = "auto",
+                               chunk_size: int = 10000) -> int:
+    """
+    Calculate statistics of raster cell values for each feature (zone) of a polygon layer
+    and set the statistics as feature attributes.
+    A cell is in a zone if the cell center is inside the zone polygon.
+    Cells that are NoData or not a finite number are ignored.
+
+    The statistics can be calculated using one of the following methods:
+
+    * "rasterize" - rasterize all zones to a zone number raster and read the zone and value rasters
+      one window at a time, calculating the statistics for all zones with vectorized NumPy operations,
+      which is efficient for many zones but a cell is only counted in one zone if zones overlap
+    * "window" - for each zone, read the value raster for the zone's envelope and rasterize a mask for the zone,
+      which is efficient for a small number of zones and handles overlapping zones
+    * "auto" (default) - use "window" for up to 1000 zones and "rasterize" otherwise
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the polygon layer to receive the attributes, which is edited.
+            Features are transformed to the raster CRS if necessary.
+        raster_file (str): the raster file, can be a /vsimem/ path
+        band_number (int): the raster band number (1+)
+        statistics ([str]): the statistics to calculate:
+            "count", "sum", "mean", "min", "max", "stddev" (population standard deviation),
+            by default "count", "mean", "min", "max"
+        attribute_prefix (str): prefix for the attribute names, which are the prefix and the statistic,
+            for example "precip_mean".  Attributes are added if they don't exist.
+            The count is an integer and other statistics are real numbers (NULL if the count is zero).
+        method (str): "auto", "rasterize", or "window", see above
+        chunk_size (int): the maximum number of features to change in one data provider call
+
+    Returns:
+        The number of features that have one or more cell values.
+
+    Raises:
+        ValueError if the input is invalid.
+        RuntimeError if the zones could not be rasterized.
+    """
+    logger = logging.getLogger(__name__)
+
+    if statistics is None or len(statistics) == 0:
+        statistics = ["count", "mean", "min", "max"]
+    statistics = [statistic.lower() for statistic in statistics]
+    for statistic in statistics:
+        if statistic not in ["count", "sum", "mean", "min", "max", "stddev"]:
+            raise ValueError('Zonal statistic "{}" is not supported.'.format(statistic))
+    method = method.lower()
+    if method not in ["auto", "rasterize", "window"]:
+        raise ValueError('Zonal statistics method "{}" is not supported.'.format(method))
+    if attribute_prefix is None:
+        attribute_prefix = ""
+
+    dataset = gdal.Open(str(raster_file))
+    if dataset is None:
+        raise ValueError('Raster "{}" could not be opened.'.format(raster_file))
+    if band_number < 1 or band_number > dataset.RasterCount:
+        raise ValueError('Raster "{}" does not have band {}.'.format(raster_file, band_number))
+    geotransform = dataset.GetGeoTransform()
+    if geotransform[2] != 0.0 or geotransform[4] != 0.0:
+        raise ValueError('Raster "{}" is rotated, which is not supported.'.format(raster_file))
+    band = dataset.GetRasterBand(band_number)
+
+    # Transform the zones to the raster CRS if necessary.
+    transform = None
+    raster_crs = QgsCoordinateReferenceSystem()
+    raster_crs.createFromWkt(dataset.GetProjection())
+    if raster_crs.isValid() and qgsvectorlayer.crs().isValid() and raster_crs != qgsvectorlayer.crs():
+        transform = QgsCoordinateTransform(qgsvectorlayer.crs(), raster_crs, QgsProject.instance())
+
+    # Get the zone geometries as OGR geometries, which are used by GDAL to rasterize.
+    feature_ids = []
+    zone_geometries = []
+    for feature in qgsvectorlayer.getFeatures(QgsFeatureRequest().setNoAttributes()):
+        geometry = feature.geometry()
+        if geometry is None or geometry.isEmpty():
+            continue
+        if transform is not None:
+            geometry.transform(transform)
+        feature_ids.append(feature.id())
+        zone_geometries.append(ogr.CreateGeometryFromWkb(bytes(geometry.asWkb())))
+
+    # Accumulators for the statistics, indexed by zone number, where zone number 0 is not used.
+    num_zones = len(zone_geometries) + 1
+    accumulators = {
+        'count': numpy.zeros(num_zones, dtype=numpy.int64),
+        'sum': numpy.zeros(num_zones, dtype=numpy.float64),
+        'sum2': numpy.zeros(num_zones, dtype=numpy.float64),
+        'min': numpy.full(num_zones, numpy.inf, dtype=numpy.float64),
+        'max': numpy.full(num_zones, -numpy.inf, dtype=numpy.float64)
+    }
+    if method == "auto":
+        # Reading a window per zone has overhead for each zone, so rasterize when there are many zones.
+        method = "window" if len(zone_geometries) <= 1000 else "rasterize"
+    logger.info('Calculating zonal statistics for {} zones using the "{}" method.'.format(
+        len(zone_geometries), method))
+    if method == "rasterize":
+        __calculate_zonal_statistics_rasterize(band, geotransform, zone_geometries, accumulators)
+    else:
+        __calculate_zonal_statistics_window(band, geotransform, zone_geometries, accumulators)
+    band = None
+    dataset = None
+
+    count = accumulators['count']
+    with numpy.errstate(all='ignore'):
+        mean = accumulators['sum'] / count
+        results = {
+            'count': count,
+            'sum': accumulators['sum'],
+            'mean': mean,
+            'min': accumulators['min'],
+            'max': accumulators['max'],
+            # Population standard deviation, limited to zero because of round-off.
+            'stddev': numpy.sqrt(numpy.maximum(accumulators['sum2'] / count - mean * mean, 0.0))
+        }
+
+    # Add the attributes if they do not already exist.
+    data_provider = qgsvectorlayer.dataProvider()
+    fields_to_add = []
+    for statistic in statistics:
+        attribute_name = attribute_prefix + statistic
+        if qgsvectorlayer.fields().lookupField(attribute_name) < 0:
+            if statistic == "count":
+                fields_to_add.append(QgsField(attribute_name, QVariant.Int))
+            else:
+                fields_to_add.append(QgsField(attribute_name, QVariant.Double))
+    if len(fields_to_add) > 0:
+        data_provider.addAttributes(fields_to_add)
+        qgsvectorlayer.updateFields()
+    attribute_indices = [qgsvectorlayer.fields().lookupField(attribute_prefix + statistic)
+                         for statistic in statistics]
+
+    zone_count = 0
+    changes = {}
+    for zone_number, feature_id in enumerate(feature_ids, start=1):
+        zone_cell_count = int(count[zone_number])
+        if zone_cell_count > 0:
+            zone_count += 1
+        values = {}
+        for statistic, attribute_index in zip(statistics, attribute_indices):
+            if statistic == "count":
+                values[attribute_index] = zone_cell_count
+            elif zone_cell_count == 0:
+                values[attribute_index] = None
+            else:
+                values[attribute_index] = float(results[statistic][zone_number])
+        changes[feature_id] = values
+        if len(changes) >= chunk_size:
+            __change_qgsvectorlayer_attribute_values(data_provider, changes, "zonal statistics")
+            changes = {}
+
+    if len(changes) > 0:
+        __change_qgsvectorlayer_attribute_values(data_provider, changes, "zonal statistics")
+
+    logger.info("Calculated zonal statistics for {} of {} zones with raster cell values.".format(
+        zone_count, len(feature_ids)))
+    return zone_count
+
+
+def __change_qgsvectorlayer_attribute_values(data_provider, changes: dict, attribute_name: str) -> int:
+    """
+    Change attribute values for a chunk of features using a single data provider call.
+
+    Args:
+        data_provider (QgsVectorDataProvider): data provider for the layer
+        changes (dict): change map, where the key is the feature ID and the value is dictionary of
+            attribute index and value
+        attribute_name (str): the name of the attribute being set, used for logging
+
+    Returns:
+        The number of features that were changed.
+    """
+    if data_provider.changeAttributeValues(changes):
+        # Success.
+        return len(changes)
+    else:
+        logger = logging.getLogger(__name__)
+        logger.warning("Error setting attribute '{}' for {} features: {}".format(
+            attribute_name, len(changes), data_provider.errors()))
+        return 0
+
+
+def copy_raster_file(input_file: str, output_file: str, creation_options: [str] = None) -> None:
+    """
+    Copy a raster file to a GeoTIFF file using GDAL in the current process.
+    This is used to copy a raster in GDAL's /vsimem/ in-memory file system to a file that can be read by
+    other processes, such as the GDAL programs that are run by QGIS 'gdal:' processing algorithms.
+
+    Args:
+        input_file (str): path to the input raster file, can be a /vsimem/ path
+        output_file (str): path to the output GeoTIFF file
+        creation_options ([str]): GeoTIFF creation options (e.g., "TILED=YES")
+
+    Raises:
+        RuntimeError if the file could not be copied.
+    """
+    if creation_options is None:
+        creation_options = []
+    output_dataset = gdal.Translate(str(output_file), str(input_file), format="GTiff",
+                                    creationOptions=creation_options)
+    if output_dataset is None:
+        raise RuntimeError('Error copying raster "{}" to "{}" ({}).'.format(
+            input_file, output_file, gdal.GetLastErrorMsg()))
+    # Close the dataset.
+    output_dataset = None
+
+
 def create_qgsgeometry(geometry_format: str, geometry_input_as_string: str) -> QgsGeometry or None:
     """
     Create a QGSGeometry object from input data. Can create an object from data in well-known text (WKT) and
@@ -236,11 +902,17 @@ def create_qgsrasterlayer(
     crs: str = "EPSG:4326", layer_name: str = "",
     num_rows: int = 1, num_columns: int = 1, num_bands: int = 1,
     origin_x: float = 0.0, origin_y: float = 0.0, pixel_width: float = 1.0, pixel_height: float = 1.0,
-    data_type: str = "Int32", initial_value: int or float = None) -> QgsRasterLayer:
+    data_type: str = "Int32", initial_value: int or float = None, nodata_value: int or float = None,
+    in_memory: bool = False, block_size: int = 256, output_file: str = None) -> QgsRasterLayer:
     """
     Create a new QgsRasterLayer (in memory QgsRasterLayer object) using provided initial data values.
     This is useful for creating test data or initializing a blank raster.
 
+    The raster is created as a tiled GeoTIFF and the initial value is written one row of tiles at a time
+    using a typed numpy array, so memory use depends on the number of columns and block size,
+    not the size of the raster.  Tiles that would contain only NoData (or zero if NoData is not set)
+    are not written, so a raster without an initial value is sparse and is created quickly.
+
     Args:
         crs (str): a coordinate reference system code (e.g., "EPSG:4326")
         layer_name (str): the name of the new QgsVectorLayer (this is not the GeoLayer ID)
@@ -252,52 +924,68 @@ def create_qgsrasterlayer(
         pixel_width (float): pixel width in coordinate reference system units
         pixel_height (float): pixel height in coordinate reference system units
         data_type (str): band data type ('Byte', 'Float32', 'Float64', 'Int16', 'Int32', 'UInt16', 'UInt32')
-        initial_value (int or float): initial value for the raster
+        initial_value (int or float): initial value for the raster, or None to initialize with NoData (or zero)
+        nodata_value (int or float): NoData value for each band, or None to not set NoData
+        in_memory (bool): if True, create the GeoTIFF in GDAL's /vsimem/ in-memory file system
+            rather than a temporary file on disk.  The /vsimem/ file is used by the layer and is not removed.
+        block_size (int): tile width and height in pixels
+        output_file (str): path to the GeoTIFF file to create, which can be a /vsimem/ path,
+            for example a raster scratch file from the processor.
+            The file is used by the layer and is not removed.
+            If not specified, a temporary file is created as indicated by 'in_memory'.
 
     Raises:
         ValueError if the input to create the layer is invalid.
 
     Return:
-        - QgsVectorLayer object if the new QgsVectorLayer object is valid
-        - None if input is not valid
+        - QgsRasterLayer object if the new QgsRasterLayer object is valid
     """
 
     logger = logging.getLogger(__name__)
 
     # Create a layer given initial data.
-    gdal_data_types = {
-        'byte': gdal.GDT_Byte,
-        'float32': gdal.GDT_Float32,
-        'float64': gdal.GDT_Float64,
-        'int16': gdal.GDT_Int16,
-        'int32': gdal.GDT_Int32,
-        'uint16': gdal.GDT_UInt16,
-        'uint32': gdal.GDT_UInt32,
-        'unknown': gdal.GDT_Unknown
-    }
+    try:
+        band_data_type, numpy_data_type = __raster_data_types[data_type.lower()]
+    except KeyError:
+        message = 'Raster data type "{}" is not supported.'.format(data_type)
+        logger.warning(message)
+        raise ValueError(message)
+    if num_rows < 1 or num_columns < 1 or num_bands < 1:
+        message = 'Raster size ({} rows, {} columns, {} bands) is invalid.'.format(num_rows, num_columns, num_bands)
+        logger.warning(message)
+        raise ValueError(message)
 
-    # Create a temporary filename used to initialize the layer
-    tmp_filename = io_util.create_tmp_filename('gp', 'createraster', 'tif')
-
-    # Create a data array
-    # - rows are the normal axes:
-    #     rowN
-    #     ...
-    #     row0
-    # - for TIF need to reverse the rows because Y axis is from top
-    array = None
-    band_data_type = gdal_data_types[data_type.lower()]
-    # Initial value is expected to be of the correct type.
-    # - if None, let the GDAL default be used
-    if initial_value is not None:
-        array = numpy.array([[initial_value]*num_columns for i in range(0, num_rows)])
-        array = array[::-1]
-
-    # Create the initial raster
+    # Create a temporary filename used to initialize the layer:
+    # - use the same name in /vsimem/ if in memory
+    # - keep the file if specified by the caller
+    remove_tmp_file = output_file is None
+    if output_file is not None:
+        tmp_filename = str(output_file)
+        in_memory = tmp_filename.startswith("/vsimem/")
+    else:
+        tmp_filename = io_util.create_tmp_filename('gp', 'createraster', 'tif')
+        if in_memory:
+            tmp_filename = "/vsimem/{}".format(Path(tmp_filename).name)
+
+    # Create the initial raster:
+    # - tiled so that blocks can be written independently
+    # - sparse so that tiles that are not written are not allocated and are read as NoData (or zero)
     # See:  https://gdal.org/tutorials/raster_api_tut.html
-    # Also:  "Create raster from an array" in https://pcjericks.github.io/py-gdalogr-cookbook/raster_layers.html
+    # Also:  https://gdal.org/drivers/raster/gtiff.html
     driver = gdal.GetDriverByName("GTiff")
-    raster = driver.Create(str(tmp_filename), num_columns, num_rows, num_bands, band_data_type)
+    creation_options = [
+        "TILED=YES",
+        "BLOCKXSIZE={}".format(block_size),
+        "BLOCKYSIZE={}".format(block_size),
+        "SPARSE_OK=TRUE",
+        "BIGTIFF=IF_SAFER"
+    ]
+    raster = driver.Create(str(tmp_filename), num_columns, num_rows, num_bands, band_data_type,
+                           options=creation_options)
+    if raster is None:
+        message = 'Error creating raster "{}" ({}).'.format(tmp_filename, gdal.GetLastErrorMsg())
+        logger.warning(message)
+        raise ValueError(message)
     # Set the raster coordinate system information
     raster.SetGeoTransform([origin_x, pixel_width, 0, origin_y, 0, pixel_height])
     srs = osr.SpatialReference()
@@ -308,33 +996,56 @@ def create_qgsrasterlayer(
     srs.ImportFromEPSG(crs_epsg_number)
     logger.info("Setting projection to WKT: {}".format(srs.ExportToWkt()))
     raster.SetProjection(srs.ExportToWkt())
-    # Initialize the band data.
+
+    # Determine whether the initial value needs to be written:
+    # - unwritten sparse tiles are read as NoData if set, or zero
+    write_initial_value = initial_value is not None
+    if write_initial_value:
+        if nodata_value is not None:
+            write_initial_value = initial_value != nodata_value
+        else:
+            write_initial_value = initial_value != 0
+
+    # Initialize the band data:
     # - bands are numbered 1+
+    # - write one row of tiles at a time, reusing the same typed array for all full rows of tiles
+    block = None
+    if write_initial_value:
+        block = numpy.full((min(block_size, num_rows), num_columns), initial_value, dtype=numpy_data_type)
     for iband in range(1, (num_bands + 1)):
-        if array is not None:
-            band = raster.GetRasterBand(iband)
-            band.WriteArray(array)
-            band.FlushCache()
+        band = raster.GetRasterBand(iband)
+        if nodata_value is not None:
+            band.SetNoDataValue(nodata_value)
+        if block is not None:
+            for row in range(0, num_rows, block_size):
+                block_rows = min(block_size, num_rows - row)
+                band.WriteArray(block[0:block_rows], 0, row)
+        band.FlushCache()
 
     # GDAL docs say to do the following to close the dataset
     raster = None
 
-    # TODO smalers 2020-11-26 how is the TIF file closed?
-
     # Read in the temporary TIF file created by GDAL code into QGIS object.
-    layer = read_qgsrasterlayer_from_file(tmp_filename)
+    try:
+        layer = read_qgsrasterlayer_from_file(tmp_filename)
+    except IOError:
+        layer = None
 
-    if layer.isValid():
+    if layer is not None and layer.isValid():
         # QgsRasterLayer object is valid so return it.
-        # -first remove the original layer since a temporary file
-        io_util.remove_tmp_file(tmp_filename)
+        # - first remove the original layer if a temporary file on disk
+        if remove_tmp_file and not in_memory:
+            io_util.remove_tmp_file(tmp_filename)
 
         return layer
     else:
         message = 'Error creating raster layer "' + str(layer_name) + '"'
         logger.warning(message)
         # Remove the original layer since a temporary file
-        io_util.remove_tmp_file(tmp_filename)
+        if in_memory:
+            gdal.Unlink(tmp_filename)
+        else:
+            io_util.remove_tmp_file(tmp_filename)
         raise ValueError(message)
 
 
@@ -373,14 +1084,18 @@ def create_qgsvectorlayer(geometry: str, crs_code: str, layer_name: str) -> QgsV
         raise ValueError(message)
 
 
-def deepcopy_qqsvectorlayer(qgsvectorlayer: QgsVectorLayer) -> QgsVectorLayer:
+def deepcopy_qqsvectorlayer(qgsvectorlayer: QgsVectorLayer, batch_size: int = 10000) -> QgsVectorLayer:
     """
     Creates a deep copy (separate instance) of a QgsVectorLayer object. Spatial features, attributes, and the
     coordinate reference system from the input QgsVectorLayer object will be retained in the output copied
     QgsVectorLayer object.
 
+    Features are streamed from the input layer and added to the copy in batches,
+    so that the full list of features does not need to be held in memory at the same time as the copy.
+
     Args:
         qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object to deep copy.
+        batch_size (int): the number of features to add to the copy at a time.
 
     Returns:
         The deep copied QgsVectorLater object.
@@ -389,9 +1104,6 @@ def deepcopy_qqsvectorlayer(qgsvectorlayer: QgsVectorLayer) -> QgsVectorLayer:
     # REF: https://gis.stackexchange.com/questions/205947/duplicating-layer-in-memory-using-pyqgis
     # acceptable geometry values: Point, LineString, Polygon, MultiLineString, MultiPolygon
 
-    # Get the features of the input QgsVectorLayer.
-    feats = [feat for feat in qgsvectorlayer.getFeatures()]
-
     # Get the geometry of the input QgsVectorLayer (qgis format).
     qgis_geometry = get_geometrytype_qgis(qgsvectorlayer)
 
@@ -416,13 +1128,79 @@ def deepcopy_qqsvectorlayer(qgsvectorlayer: QgsVectorLayer) -> QgsVectorLayer:
     copied_qgsvectorlayer_data.addAttributes(attr)
     copied_qgsvectorlayer.updateFields()
 
-    # Add the features of the input QgsVectorLayer to the copied QgsVectorLayer.
-    copied_qgsvectorlayer_data.addFeatures(feats)
+    # Add the features of the input QgsVectorLayer to the copied QgsVectorLayer, one batch at a time.
+    if batch_size is None or batch_size <= 0:
+        batch_size = 10000
+    feats = []
+    for feat in qgsvectorlayer.getFeatures():
+        feats.append(feat)
+        if len(feats) >= batch_size:
+            copied_qgsvectorlayer_data.addFeatures(feats)
+            feats = []
+    if len(feats) > 0:
+        copied_qgsvectorlayer_data.addFeatures(feats)
+    copied_qgsvectorlayer.updateExtents()
 
     # Return the deep copied QgsVectorLayer.
     return copied_qgsvectorlayer
 
 
+def estimate_qgsrasterlayer_size(qgsrasterlayer: QgsRasterLayer) -> int:
+    """
+    Estimate the uncompressed size of the cell values in a QgsRasterLayer,
+    which is the number of cells multiplied by the data type size of each band.
+
+    Args:
+        qgsrasterlayer (QgsRasterLayer): the QgsRasterLayer object
+
+    Returns:
+        The estimated size of the cell values, in bytes.
+    """
+    provider = qgsrasterlayer.dataProvider()
+    band_bytes = 0
+    for band in range(1, qgsrasterlayer.bandCount() + 1):
+        band_bytes += provider.dataTypeSize(band)
+    return qgsrasterlayer.width() * qgsrasterlayer.height() * band_bytes
+
+
+def estimate_qgsvectorlayer_size(qgsvectorlayer: QgsVectorLayer, sample_size: int = 100) -> int:
+    """
+    Estimate the memory used by the features in a QgsVectorLayer.
+    The size of the geometry (as WKB) and attribute values of a sample of features is
+    scaled by the number of features.  The estimate is approximate and is intended to decide whether
+    a layer is large, for example to move a large in-memory layer to disk.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object
+        sample_size (int): the number of features to sample
+
+    Returns:
+        The estimated size of the features, in bytes.
+    """
+    feature_count = qgsvectorlayer.featureCount()
+    if feature_count <= 0:
+        return 0
+
+    request = QgsFeatureRequest()
+    request.setLimit(sample_size)
+    sample_count = 0
+    sample_bytes = 0
+    for feature in qgsvectorlayer.getFeatures(request):
+        sample_count += 1
+        geometry = feature.geometry()
+        if geometry is not None and not geometry.isNull():
+            sample_bytes += len(geometry.asWkb())
+        for value in feature.attributes():
+            if isinstance(value, str):
+                sample_bytes += len(value)
+            else:
+                # Numbers, dates, and null values.
+                sample_bytes += 8
+    if sample_count == 0:
+        return 0
+    return int(sample_bytes * feature_count / sample_count)
+
+
 def exit_qgis() -> None:
     """
     Exit QGIS environment.
@@ -435,6 +1213,138 @@ def exit_qgis() -> None:
         qgs.exit()
 
 
+def __filter_qgsvectorlayer(qgs_vector_layer: QgsVectorLayer,
+                            where_clause: str = None,
+                            bounding_box: QgsRectangle = None,
+                            clip_layer: QgsVectorLayer = None,
+                            read_attributes: [str] = None,
+                            batch_size: int = 10000) -> QgsVectorLayer:
+    """
+    Filter a QgsVectorLayer that was just opened from a data source, so that only the requested features
+    and attributes are read.  The filters are pushed down to the OGR data provider:
+
+    * where_clause - set as the layer subset string, which OGR evaluates as an attribute filter (SQL WHERE)
+    * bounding_box and clip_layer - set as the request filter rectangle, which OGR uses as the spatial filter
+      (using the spatial index of the format if available)
+    * read_attributes - set as the request subset of attributes, so OGR ignores the other fields
+
+    If a spatial filter or attribute list is used, the matching features are copied into an in-memory layer,
+    because these filters only apply to a feature request.
+    Otherwise, the original layer is returned with the subset string set.
+
+    Args:
+        qgs_vector_layer (QgsVectorLayer): the layer to filter, typically from the 'ogr' provider
+        where_clause (str): SQL WHERE clause (without 'WHERE') to select features
+        bounding_box (QgsRectangle): rectangle in the layer's coordinate reference system,
+            features that intersect the rectangle are read
+        clip_layer (QgsVectorLayer): layer containing features that are used to select features,
+            features that intersect any clip layer feature are read (geometry is not clipped)
+        read_attributes ([str]): the attributes to read, or None to read all attributes
+        batch_size (int): the number of features to add to the in-memory layer at a time
+
+    Returns:
+        The filtered QgsVectorLayer.
+
+    Raises:
+        ValueError if the where clause is invalid or an attribute is not found.
+    """
+    logger = logging.getLogger(__name__)
+
+    if where_clause is not None and where_clause != "":
+        logger.info("Setting subset string to filter layer features: {}".format(where_clause))
+        if not qgs_vector_layer.setSubsetString(where_clause):
+            raise ValueError("The where clause is invalid: {}".format(where_clause))
+
+    if bounding_box is None and clip_layer is None and not read_attributes:
+        # No other filters so can use the original layer.
+        return qgs_vector_layer
+
+    request = QgsFeatureRequest()
+    filter_rectangle = bounding_box
+    clip_engine = None
+    if clip_layer is not None:
+        # Combine the clip layer geometries in the layer's coordinate reference system.
+        transform = None
+        if clip_layer.crs() != qgs_vector_layer.crs():
+            transform = QgsCoordinateTransform(clip_layer.crs(), qgs_vector_layer.crs(), QgsProject.instance())
+        clip_geometries = []
+        for clip_feature in clip_layer.getFeatures(QgsFeatureRequest().setNoAttributes()):
+            clip_geometry = clip_feature.geometry()
+            if clip_geometry.isNull():
+                continue
+            if transform is not None:
+                clip_geometry.transform(transform)
+            clip_geometries.append(clip_geometry)
+        clip_geometry = QgsGeometry.unaryUnion(clip_geometries) if len(clip_geometries) > 0 else QgsGeometry()
+        if clip_geometry.isNull() or clip_geometry.isEmpty():
+            # No features can intersect the clip layer so don't read any features.
+            logger.info("The clip layer has no geometries so no features are read.")
+            clip_engine = None
+        else:
+            if filter_rectangle is None:
+                filter_rectangle = clip_geometry.boundingBox()
+            else:
+                filter_rectangle = filter_rectangle.intersect(clip_geometry.boundingBox())
+            clip_engine = QgsGeometry.createGeometryEngine(clip_geometry.constGet())
+            clip_engine.prepareGeometry()
+    if filter_rectangle is not None:
+        logger.info("Setting spatial filter to read layer features: {}".format(filter_rectangle.toString()))
+        request.setFilterRect(filter_rectangle)
+        if clip_engine is None:
+            # Only read features that intersect the rectangle, not just the bounding box of features.
+            request.setFlags(QgsFeatureRequest.ExactIntersect)
+
+    fields = qgs_vector_layer.fields()
+    if read_attributes:
+        for attribute_name in read_attributes:
+            if fields.indexFromName(attribute_name) < 0:
+                raise ValueError("Attribute '{}' was not found.".format(attribute_name))
+        request.setSubsetOfAttributes(read_attributes, fields)
+        attribute_indices = [fields.indexFromName(attribute_name) for attribute_name in read_attributes]
+    else:
+        attribute_indices = list(range(fields.count()))
+
+    # Create the in-memory layer with the requested attributes,
+    # using the original geometry type (including Z and M) and coordinate reference system.
+    filtered_fields = QgsFields()
+    for i in attribute_indices:
+        filtered_fields.append(fields.at(i))
+    filtered_layer = QgsMemoryProviderUtils.createMemoryLayer(qgs_vector_layer.name(), filtered_fields,
+                                                              qgs_vector_layer.wkbType(), qgs_vector_layer.crs())
+    filtered_layer_data = filtered_layer.dataProvider()
+    filtered_fields = filtered_layer.fields()
+
+    if clip_layer is not None and clip_engine is None:
+        # The clip layer is empty so return the empty layer.
+        return filtered_layer
+
+    if batch_size is None or batch_size <= 0:
+        batch_size = 10000
+    feature_count = 0
+    feats = []
+    for feature in qgs_vector_layer.getFeatures(request):
+        if clip_engine is not None and \
+                (feature.geometry().isNull() or not clip_engine.intersects(feature.geometry().constGet())):
+            # Features without geometry can't intersect the clip layer.
+            continue
+        filtered_feature = QgsFeature(filtered_fields)
+        filtered_feature.setGeometry(feature.geometry())
+        attributes = feature.attributes()
+        filtered_feature.setAttributes([attributes[i] for i in attribute_indices])
+        feats.append(filtered_feature)
+        if len(feats) >= batch_size:
+            filtered_layer_data.addFeatures(feats)
+            feature_count += len(feats)
+            feats = []
+    if len(feats) > 0:
+        filtered_layer_data.addFeatures(feats)
+        feature_count += len(feats)
+    filtered_layer.updateExtents()
+    logger.info("Read {} features and {} attributes after filtering.".format(feature_count, len(attribute_indices)))
+
+    return filtered_layer
+
+
 def get_extent_from_geolayers(selected_geolayers: [QgsMapLayer], buffer_fraction: float = None) -> QgsRectangle:
     """
     Return the maximum extent for a list of geolayers.
@@ -491,6 +1401,36 @@ def get_extent_from_geolayers(selected_geolayers: [QgsMapLayer], buffer_fraction
     return qgis.core.QgsRectangle(xmin, ymin, xmax, ymax)
 
 
+def get_feature_attribute_values(qgsvectorlayer: QgsVectorLayer, attribute_name: str):
+    """
+    Iterate through the features of a QgsVectorLayer, returning the feature ID and the value of one attribute.
+    Only the requested attribute is fetched and geometry is not fetched,
+    which is much faster than iterating through full features for large layers.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object to read
+        attribute_name (str): the name of the attribute to return
+
+    Returns:
+        Generator of (feature ID, attribute value) tuples.  NULL attribute values are returned as None.
+
+    Raises:
+        ValueError if the attribute is not found.
+    """
+    attribute_index = qgsvectorlayer.fields().indexFromName(attribute_name)
+    if attribute_index < 0:
+        raise ValueError("Attribute '{}' was not found.".format(attribute_name))
+
+    request = QgsFeatureRequest()
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes([attribute_index])
+    for feature in qgsvectorlayer.getFeatures(request):
+        attribute_value = feature.attributes()[attribute_index]
+        if attribute_value == NULL:
+            attribute_value = None
+        yield feature.id(), attribute_value
+
+
 def get_features_matching_attributes(qgsvectorlayer: QgsVectorLayer, attribute_dict: dict) -> [QgsFeature]:
     """
     Returns the QgsFeature objects of the features that match the input attribute list.
@@ -805,6 +1745,100 @@ def get_geometrytype_wkt(qgsvectorlayer: QgsVectorLayer) -> str:
             return "Unknown"
 
 
+def get_raster_band_statistics(raster_file: str, band_number: int = 1, approximate: bool = False,
+                               histogram_bins: int = None) -> dict:
+    """
+    Return the statistics and optionally the histogram of a raster band.
+    Statistics that were previously calculated are read from the band metadata,
+    which GDAL persists in the '.aux.xml' sidecar file, so that only the first request for a raster scans the data.
+    Approximate statistics are calculated from overviews or a sample of blocks,
+    and are recalculated if exact statistics are requested.
+
+    Args:
+        raster_file (str): path to the raster file, which can be in GDAL's /vsimem/ in-memory file system
+        band_number (int): band number (1+)
+        approximate (bool): whether approximate statistics are OK
+        histogram_bins (int): number of histogram bins between the minimum and maximum,
+            or None to not return a histogram
+
+    Returns:
+        Dictionary with 'Minimum', 'Maximum', 'Mean', 'StdDev', 'ValidPercent' and 'Approximate' values,
+        and if histogram_bins is specified 'Histogram' (list of counts), 'HistogramMinimum', 'HistogramMaximum'.
+
+    Raises:
+        ValueError if the raster cannot be opened, the band does not exist, or the band has no valid cells.
+    """
+    dataset = gdal.Open(str(raster_file))
+    if dataset is None:
+        raise ValueError("Unable to open raster file: {}".format(raster_file))
+    if band_number < 1 or band_number > dataset.RasterCount:
+        raise ValueError("Band {} is not in raster with {} bands: {}".format(band_number, dataset.RasterCount,
+                                                                           raster_file))
+    band = dataset.GetRasterBand(band_number)
+
+    metadata = band.GetMetadata()
+    cached_approximate = metadata.get("STATISTICS_APPROXIMATE", "NO").upper() == "YES"
+    if "STATISTICS_MINIMUM" in metadata and (approximate or not cached_approximate):
+        # Use the statistics that were previously calculated.
+        stats = [float(metadata["STATISTICS_MINIMUM"]), float(metadata["STATISTICS_MAXIMUM"]),
+                 float(metadata["STATISTICS_MEAN"]), float(metadata["STATISTICS_STDDEV"])]
+        stats_approximate = cached_approximate
+    else:
+        # Calculating the statistics also sets the band metadata, which is saved when the dataset is closed.
+        stats = band.ComputeStatistics(approximate)
+        if stats is None:
+            raise ValueError("Band {} has no valid cells: {}".format(band_number, raster_file))
+        metadata = band.GetMetadata()
+        stats_approximate = approximate
+    statistics = {
+        "Minimum": stats[0],
+        "Maximum": stats[1],
+        "Mean": stats[2],
+        "StdDev": stats[3],
+        "ValidPercent": float(metadata["STATISTICS_VALID_PERCENT"]) if "STATISTICS_VALID_PERCENT" in metadata
+        else None,
+        "Approximate": stats_approximate
+    }
+
+    if histogram_bins is not None:
+        # The default histogram is also saved in the sidecar file.
+        # GDAL does not save whether it is approximate so use a band metadata item.
+        histogram = band.GetDefaultHistogram(force=False)
+        histogram_approximate = metadata.get("HISTOGRAM_APPROXIMATE", "YES").upper() == "YES"
+        if histogram is None or len(histogram[3]) != histogram_bins or (histogram_approximate and not approximate):
+            histogram_min = statistics["Minimum"]
+            histogram_max = statistics["Maximum"]
+            counts = band.GetHistogram(min=histogram_min, max=histogram_max, buckets=histogram_bins,
+                                       include_out_of_range=True, approx_ok=approximate)
+            band.SetDefaultHistogram(histogram_min, histogram_max, counts)
+            band.SetMetadataItem("HISTOGRAM_APPROXIMATE", "YES" if approximate else "NO")
+            histogram = (histogram_min, histogram_max, histogram_bins, counts)
+        statistics["HistogramMinimum"] = histogram[0]
+        statistics["HistogramMaximum"] = histogram[1]
+        statistics["Histogram"] = list(histogram[3])
+
+    # Close the dataset to write the '.aux.xml' file.
+    band = None
+    dataset = None
+    return statistics
+
+
+def get_raster_file_size(raster_file: str) -> int:
+    """
+    Return the size of a raster file, which can be in GDAL's /vsimem/ in-memory file system.
+
+    Args:
+        raster_file (str): path to the raster file
+
+    Returns:
+        The size of the file in bytes, or 0 if the file does not exist.
+    """
+    stat = gdal.VSIStatL(str(raster_file))
+    if stat is None:
+        return 0
+    return stat.size
+
+
 def get_layer_feature_count(qgsvectorlayer: QgsVectorLayer) -> int:
     """
     Return the number of features in a layer, needed because QgsVectorLayer.getFeatures() does not implement
@@ -977,6 +2011,134 @@ def initialize_qgis_processor() -> Processing:
     return pr
 
 
+def join_qgsvectorlayer_attributes_by_location(target_layer: QgsVectorLayer,
+                                               intersect_layer: QgsVectorLayer,
+                                               attribute_names: [str],
+                                               statistic: str = "mean",
+                                               chunk_size: int = 10000) -> int:
+    """
+    Join attributes from the features of an intersect layer onto the intersecting features of a target layer.
+    The target features are not clipped.
+
+    * If a target feature is within an intersect feature, or intersects only one intersect feature,
+      the attribute values of that intersect feature are used.
+    * If a target feature intersects multiple intersect features,
+      string values are joined with a comma and numeric values are summarized using the statistic.
+
+    A spatial index (bulk-loaded STR tree) of the intersect features is used to find the candidate
+    intersect features for each target feature using bounding boxes,
+    and the geometry of each intersect feature is prepared once for the repeated within/intersects predicates.
+    Attribute values are written to the target layer in chunks.
+
+    Args:
+        target_layer (QgsVectorLayer): the layer to receive the attributes, which is edited
+        intersect_layer (QgsVectorLayer): the layer providing the attributes
+        attribute_names ([str]): the names of the intersect layer attributes to join
+        statistic (str): statistic for numeric values when intersecting multiple features:
+            "mean" (default), "sum", "min", or "max"
+        chunk_size (int): the maximum number of features to change in one data provider call
+
+    Returns:
+        The number of target features that were joined to intersect features.
+    """
+    logger = logging.getLogger(__name__)
+
+    # Get the intersect layer attributes to join.
+    intersect_fields = intersect_layer.fields()
+    join_fields = []
+    for attribute_name in attribute_names:
+        index = intersect_fields.lookupField(attribute_name)
+        if index >= 0:
+            join_fields.append(intersect_fields.at(index))
+
+    # Add the attributes to the target layer if they do not already exist.
+    target_provider = target_layer.dataProvider()
+    fields_to_add = [QgsField(field) for field in join_fields if target_layer.fields().lookupField(field.name()) < 0]
+    if len(fields_to_add) > 0:
+        target_provider.addAttributes(fields_to_add)
+        target_layer.updateFields()
+    target_attribute_indices = [target_layer.fields().lookupField(field.name()) for field in join_fields]
+
+    # Build the spatial index of the intersect features:
+    # - the iterator constructor bulk loads the tree
+    # - geometries are stored in the index so that they don't need to be read again
+    index = QgsSpatialIndex(intersect_layer.getFeatures(), None, QgsSpatialIndex.FlagStoreFeatureGeometries)
+
+    # Read the intersect attributes without geometry.
+    request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes([field.name() for field in join_fields], intersect_fields)
+    intersect_attributes = {}
+    for feature in intersect_layer.getFeatures(request):
+        intersect_attributes[feature.id()] = [feature[field.name()] for field in join_fields]
+
+    # Prepared geometry engines for intersect features, created when first needed.
+    engines = {}
+
+    statistic = statistic.upper()
+    join_count = 0
+    changes = {}
+    for target_feature in target_layer.getFeatures(QgsFeatureRequest().setNoAttributes()):
+        target_geometry = target_feature.geometry()
+        if target_geometry is None or target_geometry.isEmpty():
+            continue
+        target_geometry_const = target_geometry.constGet()
+
+        within_id = None
+        intersecting_ids = []
+        for intersect_id in index.intersects(target_geometry.boundingBox()):
+            engine = engines.get(intersect_id)
+            if engine is None:
+                intersect_geometry = index.geometry(intersect_id)
+                engine = QgsGeometry.createGeometryEngine(intersect_geometry.constGet())
+                engine.prepareGeometry()
+                engines[intersect_id] = engine
+            # The target is within the intersect feature if the intersect feature contains the target.
+            if engine.contains(target_geometry_const):
+                within_id = intersect_id
+            elif engine.intersects(target_geometry_const):
+                intersecting_ids.append(intersect_id)
+
+        if within_id is not None:
+            values = intersect_attributes[within_id]
+        elif len(intersecting_ids) == 1:
+            values = intersect_attributes[intersecting_ids[0]]
+        elif len(intersecting_ids) > 1:
+            # Summarize the values of the intersecting features.
+            values = []
+            for i, field in enumerate(join_fields):
+                field_values = [intersect_attributes[intersect_id][i] for intersect_id in intersecting_ids]
+                field_values = [value for value in field_values if value is not None and value != NULL]
+                if len(field_values) == 0:
+                    values.append(None)
+                elif field.isNumeric():
+                    if statistic == "SUM":
+                        values.append(sum(field_values))
+                    elif statistic == "MIN":
+                        values.append(min(field_values))
+                    elif statistic == "MAX":
+                        values.append(max(field_values))
+                    else:
+                        values.append(sum(field_values) / len(field_values))
+                else:
+                    values.append(",".join([str(value) for value in field_values]))
+        else:
+            # No intersecting features.
+            continue
+
+        join_count += 1
+        changes[target_feature.id()] = dict(zip(target_attribute_indices, values))
+        if len(changes) >= chunk_size:
+            __change_qgsvectorlayer_attribute_values(target_provider, changes, "joined attributes")
+            changes = {}
+
+    if len(changes) > 0:
+        __change_qgsvectorlayer_attribute_values(target_provider, changes, "joined attributes")
+
+    logger.info("Joined attributes to {} target features using {} intersect features.".format(
+        join_count, len(intersect_attributes)))
+    return join_count
+
+
 def log_raster_metadata(qgs_raster_layer: QgsRasterLayer, logger: logging.Logger = None) -> None:
     """
     Log raster metadata, useful for troubleshooting.
@@ -1041,9 +2203,26 @@ def log_raster_metadata(qgs_raster_layer: QgsRasterLayer, logger: logging.Logger
         10: "CFloat32",
         11: "CFloat64"
     }
+    # Logging must not modify the raster so only use statistics that were previously saved with the raster,
+    # and do not compute statistics with GDAL because that writes the '.aux.xml' file.
+    dataset = None
+    if qgs_raster_layer.providerType() == "gdal":
+        dataset = gdal.Open(qgs_raster_layer.source(), gdal.GA_ReadOnly)
     for iband in range(1, (qgs_raster_layer.bandCount() + 1)):
         logger.info("  Band: {}".format(qgs_raster_layer.bandName(iband)))
-        stats = qgs_raster_layer.dataProvider().bandStatistics(iband, QgsRasterBandStats.All)
+        metadata = {}
+        if dataset is not None and iband <= dataset.RasterCount:
+            metadata = dataset.GetRasterBand(iband).GetMetadata()
+        if "STATISTICS_MINIMUM" in metadata and "STATISTICS_STDDEV" in metadata:
+            stats_source = "saved"
+            stats = {"Minimum": metadata["STATISTICS_MINIMUM"], "Maximum": metadata["STATISTICS_MAXIMUM"],
+                     "Mean": metadata["STATISTICS_MEAN"], "StdDev": metadata["STATISTICS_STDDEV"]}
+        else:
+            # Sample the cells rather than scanning the full raster.
+            stats_source = "sampled"
+            band_stats = raster_data_provider.bandStatistics(iband, QgsRasterBandStats.All, QgsRectangle(), 250000)
+            stats = {"Minimum": band_stats.minimumValue, "Maximum": band_stats.maximumValue,
+                     "Mean": band_stats.mean, "StdDev": band_stats.stdDev}
         logger.info("    Data type = {} {}".format(raster_data_provider.dataType(iband),
                                                    data_types[raster_data_provider.dataType(iband)]))
         logger.info("    Source data type = {} {}".format(raster_data_provider.sourceDataType(iband),
@@ -1055,14 +2234,11 @@ def log_raster_metadata(qgs_raster_layer: QgsRasterLayer, logger: logging.Logger
         logger.info("      Source has nodata value = {}".format(raster_data_provider.sourceHasNoDataValue(iband)))
         if raster_data_provider.sourceHasNoDataValue(iband):
             logger.info("      Source nodata value = {}".format(raster_data_provider.sourceNoDataValue(iband)))
-        logger.info("    Statistics:")
-        logger.info("      Minimum = {}".format(stats.minimumValue))
-        logger.info("      Maximum = {}".format(stats.maximumValue))
-        logger.info("      Mean = {}".format(stats.mean))
-        logger.info("      Range = {}".format(stats.range))
-        logger.info("      StdDev = {}".format(stats.stdDev))
-        # logger.info("      Sum = {}".format(stats.sum))
-        # logger.info("      SumOfSquares = {}".format(stats.sumOfSquares))
+        logger.info("    Statistics ({}):".format(stats_source))
+        for statistic in ["Minimum", "Maximum", "Mean", "StdDev"]:
+            logger.info("      {} = {}".format(statistic, stats[statistic]))
+    # Close the dataset.
+    dataset = None
 
 
 def parse_qgs_crs(crs_code: str) -> QgsCoordinateReferenceSystem or None:
@@ -1114,6 +2290,500 @@ def parse_qgs_expression(expression_as_string: str) -> QgsExpression or None:
         return None
 
 
+def parse_qgs_rectangle(rectangle_as_string: str) -> QgsRectangle or None:
+    """
+    Parse a rectangle from a string with format "MinX,MinY,MaxX,MaxY".
+
+    Args:
+        rectangle_as_string (str): the rectangle as a string
+
+    Returns:
+        - QgsRectangle object, if valid.
+        - None if the string is None or empty.
+
+    Raises:
+        ValueError if the string cannot be parsed or the minimum is greater than the maximum.
+    """
+    if rectangle_as_string is None or rectangle_as_string.strip() == "":
+        return None
+
+    parts = rectangle_as_string.split(",")
+    if len(parts) != 4:
+        raise ValueError("Rectangle '{}' does not have 4 values (MinX,MinY,MaxX,MaxY).".format(rectangle_as_string))
+    min_x, min_y, max_x, max_y = [float(part.strip()) for part in parts]
+    if min_x > max_x or min_y > max_y:
+        raise ValueError("Rectangle '{}' minimum is greater than maximum.".format(rectangle_as_string))
+    return QgsRectangle(min_x, min_y, max_x, max_y)
+
+
+def __process_wkb_geometries(operation: str, wkb_geometries: [bytes], geometry_type: int,
+                             tolerance: float = None) -> [bytes or None]:
+    """
+    Process a chunk of geometries, called by process_qgsvectorlayer_geometries() in a worker process.
+    Geometries are passed as WKB because QGIS objects cannot be passed between processes.
+
+    Args:
+        operation (str): "Fix" or "Simplify", see process_qgsvectorlayer_geometries()
+        wkb_geometries ([bytes]): the geometries as WKB, with empty bytes for a null geometry
+        geometry_type (int): the layer's geometry type (QgsWkbTypes.GeometryType as an integer),
+            used to drop fixed geometries that collapse to a different type
+        tolerance (float): the tolerance for "Simplify"
+
+    Returns:
+        List of the processed geometries as WKB, in the same order as the input,
+        with empty bytes for a null geometry and None if the feature should be dropped.
+    """
+    output_wkb_geometries = []
+    for wkb in wkb_geometries:
+        if len(wkb) == 0:
+            # Null geometry is passed through.
+            output_wkb_geometries.append(wkb)
+            continue
+        geometry = QgsGeometry()
+        geometry.fromWkb(wkb)
+        if operation == "Simplify":
+            output_geometry = geometry.simplify(tolerance)
+        else:
+            # Fix the geometry, consistent with the 'native:fixgeometries' algorithm.
+            output_geometry = geometry.makeValid()
+            if output_geometry.isNull():
+                # Unable to fix so keep the original geometry.
+                output_geometry = geometry
+            elif QgsWkbTypes.flatType(output_geometry.wkbType()) == QgsWkbTypes.GeometryCollection:
+                # Keep the parts with the layer's geometry type, for example drop lines from a collapsed polygon.
+                parts = [part for part in output_geometry.asGeometryCollection() if int(part.type()) == geometry_type]
+                if len(parts) > 0:
+                    output_geometry = QgsGeometry.collectGeometry(parts)
+                else:
+                    output_geometry = QgsGeometry()
+            if output_geometry.isNull() or int(output_geometry.type()) != geometry_type:
+                # The fixed geometry is a different type so drop the feature.
+                output_wkb_geometries.append(None)
+                continue
+            output_geometry.convertToMultiType()
+        if output_geometry.isNull():
+            output_wkb_geometries.append(b"")
+        else:
+            output_wkb_geometries.append(bytes(output_geometry.asWkb()))
+    return output_wkb_geometries
+
+
+def process_qgsvectorlayer_geometries(qgsvectorlayer: QgsVectorLayer,
+                                      operation: str,
+                                      tolerance: float = None,
+                                      max_workers: int = None,
+                                      chunk_size: int = 10000) -> QgsVectorLayer:
+    """
+    Process the geometry of each feature in a layer using parallel worker processes,
+    as an alternative to processing algorithms that run on one core.
+    The features are read in order and split into chunks of consecutive features,
+    the geometries are processed in worker processes (passed as WKB),
+    and the results are added to a new in-memory layer in the original feature order with the original attributes.
+    A limited number of chunks are in progress at a time so that memory use is bounded.
+
+    The following operations are supported:
+
+    * "Fix" - fix invalid geometries, consistent with the 'native:fixgeometries' algorithm:
+      the output is multi-part, and features that collapse to a different geometry type are dropped
+    * "Simplify" - simplify geometries using the Douglas-Peucker algorithm with the given tolerance,
+      consistent with the 'native:simplifygeometries' algorithm
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the input layer, which is not modified
+        operation (str): the operation, "Fix" or "Simplify"
+        tolerance (float): the tolerance for "Simplify", in the layer's CRS units
+        max_workers (int): the maximum number of worker processes, or None to use the number of CPUs.
+            If 1, the geometries are processed in this process.
+        chunk_size (int): the number of features in a chunk
+
+    Returns:
+        A new in-memory QgsVectorLayer with the processed features.
+
+    Raises:
+        ValueError if the operation is not recognized.
+    """
+    if operation not in ["Fix", "Simplify"]:
+        raise ValueError("Geometry operation '{}' is not recognized.".format(operation))
+    if max_workers is None or max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None or chunk_size <= 0:
+        chunk_size = 10000
+
+    logger = logging.getLogger(__name__)
+    logger.info("Processing geometries ({}) for {} features with {} worker(s), chunk size {}.".format(
+        operation, qgsvectorlayer.featureCount(), max_workers, chunk_size))
+
+    geometry_type = int(qgsvectorlayer.geometryType())
+    wkb_type = qgsvectorlayer.wkbType()
+    if operation == "Fix":
+        wkb_type = QgsWkbTypes.multiType(wkb_type)
+    output_layer = QgsMemoryProviderUtils.createMemoryLayer(qgsvectorlayer.name(), qgsvectorlayer.fields(),
+                                                            wkb_type, qgsvectorlayer.crs())
+    data_provider = output_layer.dataProvider()
+    output_fields = output_layer.fields()
+    dropped_count = 0
+
+    def read_chunks():
+        # Read the features in order, returning the attributes and WKB geometries one chunk at a time.
+        attributes = []
+        wkb_geometries = []
+        for feature in qgsvectorlayer.getFeatures():
+            attributes.append(feature.attributes())
+            geometry = feature.geometry()
+            if geometry is None or geometry.isNull():
+                wkb_geometries.append(b"")
+            else:
+                wkb_geometries.append(bytes(geometry.asWkb()))
+            if len(attributes) >= chunk_size:
+                yield attributes, wkb_geometries
+                attributes = []
+                wkb_geometries = []
+        if len(attributes) > 0:
+            yield attributes, wkb_geometries
+
+    def add_chunk(attributes: [list], output_wkb_geometries: [bytes or None]) -> None:
+        # Add the processed chunk to the output layer.
+        nonlocal dropped_count
+        features = []
+        for feature_attributes, wkb in zip(attributes, output_wkb_geometries):
+            if wkb is None:
+                dropped_count += 1
+                continue
+            feature = QgsFeature(output_fields)
+            feature.setAttributes(feature_attributes)
+            if len(wkb) > 0:
+                geometry = QgsGeometry()
+                geometry.fromWkb(wkb)
+                feature.setGeometry(geometry)
+            features.append(feature)
+        data_provider.addFeatures(features)
+
+    if max_workers == 1:
+        for attributes, wkb_geometries in read_chunks():
+            add_chunk(attributes, __process_wkb_geometries(operation, wkb_geometries, geometry_type, tolerance))
+    else:
+        # Use 'spawn' rather than 'fork' because forking a process that is running QGIS is not safe.
+        mp_context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            # Chunks in progress, in input order:
+            # - results are added in input order, which preserves the feature order
+            # - limit the chunks in progress so that the whole layer is not read into memory
+            pending = collections.deque()
+            for attributes, wkb_geometries in read_chunks():
+                future = executor.submit(__process_wkb_geometries, operation, wkb_geometries, geometry_type,
+                                         tolerance)
+                pending.append((attributes, future))
+                if len(pending) >= 2 * max_workers:
+                    attributes, future = pending.popleft()
+                    add_chunk(attributes, future.result())
+            while len(pending) > 0:
+                attributes, future = pending.popleft()
+                add_chunk(attributes, future.result())
+
+    output_layer.updateExtents()
+    if dropped_count > 0:
+        logger.info("Dropped {} features with geometry that could not be fixed as the layer's geometry type.".format(
+            dropped_count))
+    return output_layer
+
+
+def __rasterize_tile(window: (int, int, int, int), geotransform: (float,), projection: str, shapes: [(bytes, float)],
+                     gdal_data_type: int, nodata_value: int or float or None, tile_file: str = None) -> object:
+    """
+    Rasterize the shapes that intersect a tile of the output grid, called by rasterize_qgsvectorlayer().
+
+    Args:
+        window ((int, int, int, int)): tile column offset, row offset, number of columns, and number of rows
+        geotransform ((float,)): the GDAL geotransform of the full output grid
+        projection (str): the output projection as WKT
+        shapes ([(bytes, float)]): WKB geometry and burn value for the features that intersect the tile
+        gdal_data_type (int): GDAL data type of the output
+        nodata_value (int or float or None): NoData value used to initialize the tile, or None to use 0
+        tile_file (str): GeoTIFF file to write the tile to, or None to return the tile values
+
+    Returns:
+        The tile values as a NumPy array if 'tile_file' is None, otherwise None.
+    """
+    # Each tile uses its own OGR layer because OGR and GDAL datasets cannot be shared between threads.
+    ogr_dataset = ogr.GetDriverByName("Memory").CreateDataSource("shapes")
+    ogr_layer = ogr_dataset.CreateLayer("shapes", geom_type=ogr.wkbUnknown)
+    ogr_layer.CreateField(ogr.FieldDefn("value", ogr.OFTReal))
+    layer_definition = ogr_layer.GetLayerDefn()
+    for wkb, value in shapes:
+        ogr_feature = ogr.Feature(layer_definition)
+        ogr_feature.SetField(0, value)
+        ogr_feature.SetGeometry(ogr.CreateGeometryFromWkb(wkb))
+        ogr_layer.CreateFeature(ogr_feature)
+
+    x_offset, y_offset, num_columns, num_rows = window
+    origin_x, pixel_width, _, origin_y, _, pixel_height = geotransform
+    if tile_file is None:
+        tile_dataset = gdal.GetDriverByName("MEM").Create("", num_columns, num_rows, 1, gdal_data_type)
+    else:
+        tile_dataset = gdal.GetDriverByName("GTiff").Create(
+            tile_file, num_columns, num_rows, 1, gdal_data_type,
+            options=["TILED=YES", "COMPRESS=DEFLATE", "SPARSE_OK=TRUE"])
+        if tile_dataset is None:
+            raise RuntimeError('Error creating raster "{}" ({}).'.format(tile_file, gdal.GetLastErrorMsg()))
+    try:
+        tile_dataset.SetGeoTransform((origin_x + x_offset * pixel_width, pixel_width, 0.0,
+                                      origin_y + y_offset * pixel_height, 0.0, pixel_height))
+        tile_dataset.SetProjection(projection)
+        tile_band = tile_dataset.GetRasterBand(1)
+        if nodata_value is not None:
+            tile_band.SetNoDataValue(nodata_value)
+            tile_band.Fill(nodata_value)
+        tile_band = None
+        if len(shapes) > 0 and gdal.RasterizeLayer(tile_dataset, [1], ogr_layer, options=["ATTRIBUTE=value"]) != 0:
+            raise RuntimeError("Error rasterizing tile {} ({}).".format(window, gdal.GetLastErrorMsg()))
+        if tile_file is None:
+            return tile_dataset.GetRasterBand(1).ReadAsArray()
+        return None
+    finally:
+        # GDAL docs say to do the following to close the dataset.
+        tile_dataset = None
+
+
+def rasterize_qgsvectorlayer(qgsvectorlayer: QgsVectorLayer, output_file: str, extent: QgsRectangle,
+                             num_columns: int, num_rows: int, attribute: str = None, burn_value: float = 1,
+                             data_type: str = "Float32", nodata_value: int or float = None,
+                             tile_size: int = 2048, max_workers: int = 1, output_format: str = "GTiff") -> int:
+    """
+    Rasterize a vector layer one tile at a time, as an alternative to the 'gdal:rasterize' algorithm
+    for large output grids.
+    The output grid is split into tiles of 'tile_size' columns and rows.
+    For each tile, only the features that intersect the tile are found using a spatial index
+    and are rasterized to the tile, so memory use depends on the tile size and number of workers,
+    not the output size.
+    Features are read in the calling thread because QGIS layers cannot be shared between threads,
+    and tiles are rasterized by GDAL in worker threads.
+
+    The tiles are assembled into one of the following:
+
+    * "GTiff" - a single tiled GeoTIFF file, which can be a /vsimem/ path
+    * "VRT" - a GDAL virtual raster that references one GeoTIFF file for each tile that contains features,
+      in the folder with the same name as the output file without extension and with "_tiles" appended.
+      Tiles that do not contain features are not written and are NoData in the virtual raster.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the input layer
+        output_file (str): the output GeoTIFF or VRT file
+        extent (QgsRectangle): the output extent, in the layer's CRS
+        num_columns (int): the number of output columns
+        num_rows (int): the number of output rows
+        attribute (str): the numeric attribute to burn, or None to burn 'burn_value'.
+            Features with a NULL attribute value are not rasterized.
+        burn_value (float): the value to burn if 'attribute' is None
+        data_type (str): output data type ('Byte', 'Float32', 'Float64', 'Int16', 'Int32', 'UInt16', 'UInt32')
+        nodata_value (int or float): output NoData value, or None to not set NoData and initialize with 0
+        tile_size (int): the number of columns and rows in a tile, should be a multiple of 16
+        max_workers (int): number of threads used to rasterize tiles, 1 to rasterize in the current thread
+        output_format (str): "GTiff" or "VRT"
+
+    Returns:
+        The number of tiles that contain features.
+
+    Raises:
+        ValueError if the parameters are invalid.
+        RuntimeError if the output could not be created.
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        gdal_data_type = __raster_data_types[data_type.lower()][0]
+    except KeyError:
+        raise ValueError('Raster data type "{}" is not supported.'.format(data_type))
+    if output_format.upper() not in ["GTIFF", "VRT"]:
+        raise ValueError('Rasterize output format "{}" is not supported.'.format(output_format))
+    if num_columns <= 0 or num_rows <= 0:
+        raise ValueError("The output size {}x{} is invalid.".format(num_columns, num_rows))
+    if tile_size is None or tile_size <= 0:
+        tile_size = 2048
+    if max_workers is None or max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+    attribute_index = -1
+    if attribute is not None:
+        attribute_index = qgsvectorlayer.fields().lookupField(attribute)
+        if attribute_index < 0:
+            raise ValueError('Attribute "{}" is not in the layer.'.format(attribute))
+
+    output_file = str(output_file)
+    pixel_width = extent.width() / num_columns
+    pixel_height = extent.height() / num_rows
+    geotransform = (extent.xMinimum(), pixel_width, 0.0, extent.yMaximum(), 0.0, -pixel_height)
+    projection = qgsvectorlayer.crs().toWkt()
+    windows = []
+    for y_offset in range(0, num_rows, tile_size):
+        for x_offset in range(0, num_columns, tile_size):
+            windows.append((x_offset, y_offset, min(tile_size, num_columns - x_offset),
+                            min(tile_size, num_rows - y_offset)))
+    logger.info("Rasterizing {} features to {} columns, {} rows in {} tiles of {}x{} with {} worker(s).".format(
+        qgsvectorlayer.featureCount(), num_columns, num_rows, len(windows), tile_size, tile_size, max_workers))
+
+    # The spatial index only contains the feature bounding boxes, the features are read for each tile.
+    request = QgsFeatureRequest().setNoAttributes()
+    spatial_index = QgsSpatialIndex(qgsvectorlayer.getFeatures(request))
+
+    def read_shapes(window: (int, int, int, int)) -> [(bytes, float)]:
+        # Read the geometry and burn value of the features that intersect the tile.
+        x_offset, y_offset, window_columns, window_rows = window
+        window_rectangle = QgsRectangle(
+            geotransform[0] + x_offset * pixel_width, geotransform[3] - (y_offset + window_rows) * pixel_height,
+            geotransform[0] + (x_offset + window_columns) * pixel_width, geotransform[3] - y_offset * pixel_height)
+        feature_ids = spatial_index.intersects(window_rectangle)
+        if len(feature_ids) == 0:
+            return []
+        feature_request = QgsFeatureRequest().setFilterFids(feature_ids)
+        if attribute_index >= 0:
+            feature_request.setSubsetOfAttributes([attribute_index])
+        else:
+            feature_request.setNoAttributes()
+        shapes = []
+        for feature in qgsvectorlayer.getFeatures(feature_request):
+            geometry = feature.geometry()
+            if geometry is None or geometry.isNull():
+                continue
+            if attribute_index >= 0:
+                value = feature.attribute(attribute_index)
+                if value is None or value == NULL:
+                    continue
+                shapes.append((bytes(geometry.asWkb()), float(value)))
+            else:
+                shapes.append((bytes(geometry.asWkb()), burn_value))
+        return shapes
+
+    tile_count = 0
+    if output_format.upper() == "VRT":
+        tile_folder = os.path.splitext(output_file)[0] + "_tiles"
+        os.makedirs(tile_folder, exist_ok=True)
+        tile_files = []
+
+        def rasterize_window(window: (int, int, int, int), shapes: [(bytes, float)]) -> None:
+            tile_file = os.path.join(tile_folder, "tile_{}_{}.tif".format(window[1] // tile_size,
+                                                                          window[0] // tile_size))
+            tile_files.append(tile_file)
+            __rasterize_tile(window, geotransform, projection, shapes, gdal_data_type, nodata_value, tile_file)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Limit the tiles in progress so that memory use is bounded.
+            pending = collections.deque()
+            for window in windows:
+                shapes = read_shapes(window)
+                if len(shapes) == 0:
+                    continue
+                tile_count += 1
+                pending.append(executor.submit(rasterize_window, window, shapes))
+                if len(pending) >= 2 * max_workers:
+                    pending.popleft().result()
+            while len(pending) > 0:
+                pending.popleft().result()
+        if len(tile_files) == 0:
+            # The virtual raster needs at least one source, so write an empty tile.
+            rasterize_window(windows[0], [])
+
+        # Use the full output extent and cell size, which may be larger than the tiles that were written.
+        vrt_options = gdal.BuildVRTOptions(
+            outputBounds=(extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()),
+            xRes=pixel_width, yRes=pixel_height, resolution="user", srcNodata=nodata_value, VRTNodata=nodata_value)
+        vrt_dataset = gdal.BuildVRT(output_file, sorted(tile_files), options=vrt_options)
+        if vrt_dataset is None:
+            raise RuntimeError('Error creating virtual raster "{}" ({}).'.format(output_file, gdal.GetLastErrorMsg()))
+        vrt_dataset = None
+    else:
+        options = ["TILED=YES", "BIGTIFF=IF_SAFER", "SPARSE_OK=TRUE"]
+        if tile_size % 16 == 0:
+            block_size = min(tile_size, 512)
+            options += ["BLOCKXSIZE={}".format(block_size), "BLOCKYSIZE={}".format(block_size)]
+        output_dataset = gdal.GetDriverByName("GTiff").Create(output_file, num_columns, num_rows, 1, gdal_data_type,
+                                                              options=options)
+        if output_dataset is None:
+            raise RuntimeError('Error creating raster "{}" ({}).'.format(output_file, gdal.GetLastErrorMsg()))
+        output_dataset.SetGeoTransform(geotransform)
+        output_dataset.SetProjection(projection)
+        output_band = output_dataset.GetRasterBand(1)
+        if nodata_value is not None:
+            # Blocks that are not written are read as NoData because of SPARSE_OK.
+            output_band.SetNoDataValue(nodata_value)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Tiles in progress:
+                # - results are written by this thread because the output dataset cannot be shared between threads
+                # - limit the tiles in progress so that memory use is bounded
+                pending = collections.deque()
+                for window in windows:
+                    shapes = read_shapes(window)
+                    if len(shapes) == 0:
+                        continue
+                    tile_count += 1
+                    pending.append((window, executor.submit(__rasterize_tile, window, geotransform, projection,
+                                                            shapes, gdal_data_type, nodata_value)))
+                    if len(pending) >= 2 * max_workers:
+                        window, future = pending.popleft()
+                        output_band.WriteArray(future.result(), window[0], window[1])
+                while len(pending) > 0:
+                    window, future = pending.popleft()
+                    output_band.WriteArray(future.result(), window[0], window[1])
+        finally:
+            output_band.FlushCache()
+            output_band = None
+            # GDAL docs say to do the following to close the dataset.
+            output_dataset = None
+
+    logger.info("Rasterized {} of {} tiles that contain features.".format(tile_count, len(windows)))
+    return tile_count
+
+
+def read_crs_code_from_file(spatial_data_file_abs: str or Path, layer_name: str = None) -> str or None:
+    """
+    Read the coordinate reference system code of a vector or raster spatial data file without creating a QGIS layer.
+    The file is opened with GDAL, which only reads the file header and metadata,
+    and is much faster than creating a QgsVectorLayer or QgsRasterLayer.
+    This is used to provide metadata for lazy-loaded layers.
+
+    Args:
+        spatial_data_file_abs (str or Path): the full pathname to a spatial data file
+        layer_name (str): the layer to read for formats that contain multiple vector layers,
+            or None to read the first layer
+
+    Returns:
+        The CRS code (e.g., "EPSG:4326"),
+        or None if the file does not have a CRS or the CRS cannot be identified with an authority code.
+
+    Raises:
+        IOError if the file or layer cannot be opened.
+    """
+    dataset = gdal.OpenEx(str(spatial_data_file_abs), gdal.OF_VECTOR | gdal.OF_RASTER | gdal.OF_READONLY)
+    if dataset is None:
+        raise IOError('Unable to open spatial data file "{}".'.format(spatial_data_file_abs))
+
+    if dataset.GetLayerCount() > 0:
+        # Vector dataset.
+        if layer_name:
+            layer = dataset.GetLayerByName(layer_name)
+        else:
+            layer = dataset.GetLayer(0)
+        if layer is None:
+            raise IOError('Layer "{}" was not found in spatial data file "{}".'.format(
+                layer_name, spatial_data_file_abs))
+        spatial_ref = layer.GetSpatialRef()
+    else:
+        # Raster dataset.
+        spatial_ref = dataset.GetSpatialRef()
+    if spatial_ref is None:
+        return None
+
+    # Identify the EPSG code if the file does not include it, for example a shapefile .prj file:
+    # - raises an exception if GDAL exceptions are enabled and the CRS is not recognized
+    try:
+        spatial_ref.AutoIdentifyEPSG()
+    except RuntimeError:
+        pass
+    authority_name = spatial_ref.GetAuthorityName(None)
+    authority_code = spatial_ref.GetAuthorityCode(None)
+    if authority_name and authority_code:
+        return "{}:{}".format(authority_name, authority_code)
+    return None
+
+
 def read_qgsrasterlayer_from_file(spatial_data_file_abs: str or Path) -> QgsRasterLayer:
     """
     Reads the full pathname of spatial data file and returns a QGSRasterLayer object.
@@ -1271,7 +2941,10 @@ def read_qgsvectorlayer_from_excel_worksheet(excel_workbook_abs: str, worksheet_
 
 def read_qgsvectorlayer_from_feature_class(file_gdb_path_abs: str,
                                            feature_class: str,
-                                           query: str = None) -> QgsVectorLayer:
+                                           query: str = None,
+                                           bounding_box: QgsRectangle = None,
+                                           clip_layer: QgsVectorLayer = None,
+                                           read_attributes: [str] = None) -> QgsVectorLayer:
     """
     Reads a feature class in an Esri file geodatabase and returns a QGSVectorLayerObject.
 
@@ -1281,7 +2954,10 @@ def read_qgsvectorlayer_from_feature_class(file_gdb_path_abs: str,
     Args:
         file_gdb_path_abs (str): the full pathname to a file geodatabase
         feature_class (str): the name of the feature class to read
-        query (str): SQL query string to use for a subset of the full layer (applied after reading the full layer)
+        query (str): SQL WHERE clause to read a subset of the features, passed to OGR as the subset string
+        bounding_box (QgsRectangle): only read features that intersect the rectangle (in the layer's CRS)
+        clip_layer (QgsVectorLayer): only read features that intersect features in the layer
+        read_attributes ([str]): the attributes to read, or None to read all attributes
 
     Returns:
         A QGSVectorLayer object containing the data from the input feature class.
@@ -1306,12 +2982,9 @@ def read_qgsvectorlayer_from_feature_class(file_gdb_path_abs: str,
     # Check that the newly created QgsVectorLayer object is valid. If so, create a GeoLayer object within
     # the geoprocessor and add the GeoLayer object to the geoprocessor's GeoLayers list.
     if qgs_vector_layer_obj.isValid():
-        # Subset the layer
-        if query is not None and query != '':
-            logger = logging.getLogger(__name__)
-            logger.info("Setting subset string to filter layer features: {}".format(query))
-            qgs_vector_layer_obj.setSubsetString(query)
-        return qgs_vector_layer_obj
+        # Subset the layer.
+        return __filter_qgsvectorlayer(qgs_vector_layer_obj, where_clause=query, bounding_box=bounding_box,
+                                       clip_layer=clip_layer, read_attributes=read_attributes)
 
     # If the created QGSVectorLayer object is invalid, print a warning message and return None.
     else:
@@ -1322,7 +2995,11 @@ def read_qgsvectorlayer_from_feature_class(file_gdb_path_abs: str,
         raise IOError(message)
 
 
-def read_qgsvectorlayer_from_file(spatial_data_file_abs: str, layer_name: str = None) -> QgsVectorLayer:
+def read_qgsvectorlayer_from_file(spatial_data_file_abs: str, layer_name: str = None,
+                                  where_clause: str = None,
+                                  bounding_box: QgsRectangle = None,
+                                  clip_layer: QgsVectorLayer = None,
+                                  read_attributes: [str] = None) -> QgsVectorLayer:
     """
     General function to read a QGSVectorLayer object using OGR drivers.
     The OGR driver is determined from the filename extension.
@@ -1332,9 +3009,14 @@ def read_qgsvectorlayer_from_file(spatial_data_file_abs: str, layer_name: str =
         layer_name (str):
             layer name to read from the file, needed when the format supports multiple layer names.
             It will be added after the data source using '|layername=...'.
+        where_clause (str): SQL WHERE clause to read a subset of the features, passed to OGR as the subset string
+        bounding_box (QgsRectangle): only read features that intersect the rectangle (in the layer's CRS)
+        clip_layer (QgsVectorLayer): only read features that intersect features in the layer
+        read_attributes ([str]): the attributes to read, or None to read all attributes
 
     Raises:
         IOError if the geodatabase layer is invalid.
+        ValueError if a filter is invalid.
 
     Returns:
         A QGSVectorLayer object containing the data from the input spatial data file.
@@ -1362,7 +3044,8 @@ def read_qgsvectorlayer_from_file(spatial_data_file_abs: str, layer_name: str =
     # Check that the newly created QgsVectorLayer object is valid. If so, create a GeoLayer object within the
     # geoprocessor and add the GeoLayer object to the geoprocessor's GeoLayers list.
     if qgs_vector_layer_obj.isValid():
-        return qgs_vector_layer_obj
+        return __filter_qgsvectorlayer(qgs_vector_layer_obj, where_clause=where_clause, bounding_box=bounding_box,
+                                       clip_layer=clip_layer, read_attributes=read_attributes)
 
     # If the created QGSVectorLayer object is invalid, print a warning message and return None.
     else:
@@ -1372,9 +3055,247 @@ def read_qgsvectorlayer_from_file(spatial_data_file_abs: str, layer_name: str =
         raise IOError(message)
 
 
+def __create_geojson_stream_layer(layer_name: str, fields: QgsFields, wkb_type: int, members: dict,
+                                  geopackage_file_abs: str = None) -> QgsVectorLayer:
+    """
+    Create the empty output layer for read_qgsvectorlayer_from_geojson_stream().
+
+    Args:
+        layer_name (str): the name of the layer
+        fields (QgsFields): the attributes of the layer
+        wkb_type (int): the QgsWkbTypes geometry type of the layer
+        members (dict): FeatureCollection members that have been read, used to determine the CRS
+        geopackage_file_abs (str): the full pathname to a GeoPackage file to store the features,
+            or None to use an in-memory layer
+
+    Returns:
+        QgsVectorLayer without features.
+
+    Raises:
+        RuntimeError if the GeoPackage layer cannot be created.
+    """
+    crs = QgsCoordinateReferenceSystem("EPSG:4326")
+    crs_member = members.get("crs")
+    if isinstance(crs_member, dict) and isinstance(crs_member.get("properties"), dict):
+        crs_name = crs_member["properties"].get("name")
+        if crs_name:
+            crs_from_name = QgsCoordinateReferenceSystem.fromOgcWmsCrs(crs_name)
+            if crs_from_name.isValid():
+                crs = crs_from_name
+            else:
+                logger = logging.getLogger(__name__)
+                logger.warning("GeoJSON CRS '{}' is not recognized, using EPSG:4326.".format(crs_name))
+
+    output_layer = QgsMemoryProviderUtils.createMemoryLayer(layer_name, fields, wkb_type, crs)
+    if geopackage_file_abs is not None:
+        # Create an empty GeoPackage layer and then add features directly to it.
+        layer_uri = append_qgsvectorlayer_to_geopackage(output_layer, geopackage_file_abs, layer_name)
+        output_layer = QgsVectorLayer(layer_uri, layer_name, "ogr")
+        if not output_layer.isValid():
+            raise RuntimeError("Could not open GeoPackage layer: {}".format(layer_uri))
+    return output_layer
+
+
+def __get_geojson_new_fields(features: [dict], field_names: set) -> [QgsField]:
+    """
+    Return the attributes for GeoJSON feature properties that are not in the set of known attribute names,
+    used by read_qgsvectorlayer_from_geojson_stream().
+    QGIS determines the type of each attribute from the first non-null value in the features.
+
+    Args:
+        features ([dict]): GeoJSON features as returned by json.loads()
+        field_names (set): names of the attributes that are already known
+
+    Returns:
+        List of QgsField for the new attributes, in the order they were found.
+    """
+    values = dict()
+    for feature in features:
+        properties = feature.get("properties")
+        if not properties:
+            continue
+        for name, value in properties.items():
+            if name not in field_names and values.get(name) is None:
+                values[name] = value
+    if len(values) == 0:
+        return []
+    # Parse one feature that has a value for each new property.
+    feature_json = json.dumps({"type": "FeatureCollection",
+                               "features": [{"type": "Feature", "geometry": None, "properties": values}]})
+    return QgsJsonUtils.stringToFields(feature_json).toList()
+
+
+def read_qgsvectorlayer_from_geojson_stream(geojson_file_abs: str,
+                                            layer_name: str = None,
+                                            geopackage_file_abs: str = None,
+                                            bounding_box: QgsRectangle = None,
+                                            filter_expression: str = None,
+                                            read_attributes: [str] = None,
+                                            feature_limit: int = None,
+                                            batch_size: int = 10000) -> QgsVectorLayer:
+    """
+    Read a GeoJSON file incrementally into a new layer, rather than having OGR parse the entire file.
+    Features are read in batches of batch_size and added to an in-memory layer or a GeoPackage layer,
+    so that at most one batch of features is parsed in memory at a time.
+    If a GeoPackage is used, peak memory is bounded by the batch size.
+
+    FeatureCollection, newline-delimited GeoJSON (GeoJSONSeq) and gzip-compressed files can be read
+    (see geojson_util.read_geojson_features).
+
+    The attribute definitions are determined from the properties of all features in the first batch,
+    and attributes that are first found in later batches are added to the layer.
+    The type of an attribute is determined from its first non-null value.
+    The geometry type is determined from the first feature with a geometry and geometries are promoted to
+    multi-part so that single and multi-part features can be stored in the same layer.
+    An empty layer is returned if the file has no features or the feature limit is zero.
+
+    Args:
+        geojson_file_abs (str): the full pathname to the GeoJSON file
+        layer_name (str): the name of the layer, default is the file name without extension
+        geopackage_file_abs (str): the full pathname to a GeoPackage file to store the features,
+            or None to use an in-memory layer
+        bounding_box (QgsRectangle): rectangle in the layer's coordinate reference system,
+            features that intersect the rectangle are read
+        filter_expression (str): QGIS expression to select features, for example:  "COUNTY" = 'Larimer'
+        read_attributes ([str]): the attributes to read, or None to read all attributes
+        feature_limit (int): maximum number of features to read (e.g., to preview a large file), or None to read all
+        batch_size (int): the number of features to parse and add to the layer at a time
+
+    Returns:
+        QgsVectorLayer containing the features.
+
+    Raises:
+        ValueError if the file is not valid GeoJSON, the filter expression is invalid,
+        or an attribute to read is not found.
+        RuntimeError if the GeoPackage layer cannot be created.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Reading GeoJSON file incrementally: {}".format(geojson_file_abs))
+
+    if layer_name is None:
+        layer_name = os.path.basename(geojson_file_abs)
+        for extension in [".gz", ".geojsonl", ".geojsons", ".geojson", ".json"]:
+            if layer_name.lower().endswith(extension):
+                layer_name = layer_name[:-len(extension)]
+
+    expression = None
+    expression_context = None
+    if filter_expression is not None and filter_expression != "":
+        expression = QgsExpression(filter_expression)
+        if expression.hasParserError():
+            raise ValueError("The filter expression is invalid: {} ({})".format(
+                filter_expression, expression.parserErrorString()))
+
+    # FeatureCollection members such as 'crs' are added as they are read.
+    members = dict()
+    features = geojson_util.read_geojson_features(geojson_file_abs, members=members)
+
+    # Attributes for all features read so far, in the order they were found.
+    fields = QgsFields()
+    field_names = set()
+    output_layer = None
+    output_data_provider = None
+    output_indices = None
+    read_count = 0
+    feature_count = 0
+    # Read the first batch even if the feature limit is zero so that the layer has the attributes and geometry type.
+    while output_layer is None or feature_limit is None or feature_count < feature_limit:
+        batch = list(itertools.islice(features, batch_size))
+        if len(batch) == 0:
+            break
+        read_count += len(batch)
+        if read_attributes:
+            for feature in batch:
+                properties = feature.get("properties")
+                if properties:
+                    feature["properties"] = {name: properties[name] for name in read_attributes
+                                             if name in properties}
+
+        # Add attributes that are first found in the batch.
+        new_fields = __get_geojson_new_fields(batch, field_names)
+        for new_field in new_fields:
+            fields.append(new_field)
+            field_names.add(new_field.name())
+
+        # Use the QGIS JSON parser to convert the batch to features.
+        batch_json = json.dumps({"type": "FeatureCollection", "features": batch})
+        del batch
+        qgs_features = QgsJsonUtils.stringToFeatureList(batch_json, fields)
+        del batch_json
+
+        if output_layer is None:
+            # Create the output layer using the first geometry to determine the geometry type.
+            wkb_type = QgsWkbTypes.NoGeometry
+            for qgs_feature in qgs_features:
+                if qgs_feature.hasGeometry():
+                    wkb_type = QgsWkbTypes.multiType(qgs_feature.geometry().wkbType())
+                    break
+            output_layer = __create_geojson_stream_layer(layer_name, fields, wkb_type, members, geopackage_file_abs)
+            output_data_provider = output_layer.dataProvider()
+        elif len(new_fields) > 0:
+            output_data_provider.addAttributes(new_fields)
+            output_layer.updateFields()
+
+        if output_indices is None or len(new_fields) > 0:
+            # GeoPackage layers have an 'fid' field so map the attributes by name.
+            output_fields = output_layer.fields()
+            output_indices = [output_fields.indexFromName(name) for name in fields.names()]
+            if expression is not None:
+                expression_context = QgsExpressionContext()
+                expression_context.setFields(fields)
+                expression.prepare(expression_context)
+
+        output_features = []
+        output_field_count = output_layer.fields().count()
+        for qgs_feature in qgs_features:
+            if feature_limit is not None and feature_count + len(output_features) >= feature_limit:
+                break
+            if bounding_box is not None and \
+                    (not qgs_feature.hasGeometry() or not qgs_feature.geometry().intersects(bounding_box)):
+                continue
+            if expression is not None:
+                expression_context.setFeature(qgs_feature)
+                if not expression.evaluate(expression_context):
+                    continue
+            output_feature = QgsFeature(output_layer.fields())
+            if qgs_feature.hasGeometry():
+                geometry = qgs_feature.geometry()
+                geometry.convertToMultiType()
+                output_feature.setGeometry(geometry)
+            attributes = [None] * output_field_count
+            for attribute_index, attribute_value in enumerate(qgs_feature.attributes()):
+                attributes[output_indices[attribute_index]] = attribute_value
+            output_feature.setAttributes(attributes)
+            output_features.append(output_feature)
+        del qgs_features
+
+        output_data_provider.addFeatures(output_features)
+        feature_count += len(output_features)
+        logger.info("Read {} features, added {} features.".format(read_count, feature_count))
+
+    # Stop reading the file if the feature limit was reached.
+    features.close()
+
+    if read_attributes:
+        for attribute_name in read_attributes:
+            if attribute_name not in field_names:
+                raise ValueError("Attribute '{}' was not found.".format(attribute_name))
+    if output_layer is None:
+        # The file has no features.
+        logger.info("No features were found in GeoJSON file: {}".format(geojson_file_abs))
+        output_layer = __create_geojson_stream_layer(layer_name, fields, QgsWkbTypes.NoGeometry, members,
+                                                     geopackage_file_abs)
+    output_layer.updateExtents()
+    return output_layer
+
+
 def read_qgsvectorlayer_from_geopackage(geopackage_file_path_abs: str,
                                         layer_name: str,
-                                        layer_description: str) -> QgsVectorLayer:
+                                        layer_description: str,
+                                        where_clause: str = None,
+                                        bounding_box: QgsRectangle = None,
+                                        clip_layer: QgsVectorLayer = None,
+                                        read_attributes: [str] = None) -> QgsVectorLayer:
     """
     Read a layer from a GeoPackage file and returns a QGSVectorLayerObject.
 
@@ -1385,6 +3306,11 @@ def read_qgsvectorlayer_from_geopackage(geopackage_file_path_abs: str,
         geopackage_file_path_abs (str): the full path to a GeoPackage file
         layer_name (str): the name of the layer to read (a sub-layer in the main layer)
         layer_description (str): the layer description to assign
+        where_clause (str): SQL WHERE clause to read a subset of the features, passed to OGR as the subset string
+        bounding_box (QgsRectangle): only read features that intersect the rectangle (in the layer's CRS),
+            which uses the GeoPackage spatial index
+        clip_layer (QgsVectorLayer): only read features that intersect features in the layer
+        read_attributes ([str]): the attributes to read, or None to read all attributes
 
     Returns:
         A QGSVectorLayer object containing the layer.
@@ -1402,7 +3328,8 @@ def read_qgsvectorlayer_from_geopackage(geopackage_file_path_abs: str,
     # Check that the newly created QgsVectorLayer object is valid. If so, create a GeoLayer object within
     # the geoprocessor and add the GeoLayer object to the geoprocessor's GeoLayers list.
     if qgs_vector_layer_obj.isValid():
-        return qgs_vector_layer_obj
+        return __filter_qgsvectorlayer(qgs_vector_layer_obj, where_clause=where_clause, bounding_box=bounding_box,
+                                       clip_layer=clip_layer, read_attributes=read_attributes)
 
     else:
         # If the created QGSVectorLayer object is invalid, print a warning message and return None.
@@ -1413,6 +3340,96 @@ def read_qgsvectorlayer_from_geopackage(geopackage_file_path_abs: str,
         raise IOError(message)
 
 
+def read_qgsvectorlayers_from_files(spatial_data_files_abs: [str], max_workers: int = None) -> [tuple]:
+    """
+    Read QgsVectorLayer objects from many spatial data files, using a bounded thread pool.
+    Opening and validating files with OGR releases the Python global interpreter lock,
+    so many small files can be opened concurrently.
+    Each layer is moved to the main thread after it is opened so that it can be used as if read sequentially.
+    An error reading one file does not stop the other files from being read.
+
+    Args:
+        spatial_data_files_abs ([str]): the full pathnames to the spatial data files
+        max_workers (int): the maximum number of threads, or None to use a default based on the number of CPUs
+
+    Returns:
+        List of (QgsVectorLayer, Exception) tuples in the same order as the input files,
+        where the layer is None if an exception occurred and the exception is None if the read was successful.
+    """
+
+    main_thread = None
+    if QtCore.QCoreApplication.instance() is not None:
+        main_thread = QtCore.QCoreApplication.instance().thread()
+
+    def read_file(spatial_data_file_abs: str) -> tuple:
+        # noinspection PyBroadException
+        try:
+            qgs_vector_layer = read_qgsvectorlayer_from_file(spatial_data_file_abs)
+            if main_thread is not None:
+                qgs_vector_layer.moveToThread(main_thread)
+            return qgs_vector_layer, None
+        except Exception as e:
+            return None, e
+
+    if max_workers is None or max_workers <= 0:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+    if max_workers == 1 or len(spatial_data_files_abs) <= 1:
+        return [read_file(spatial_data_file_abs) for spatial_data_file_abs in spatial_data_files_abs]
+
+    # The map() function returns results in the order of the input.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_file, spatial_data_files_abs))
+
+
+def rearrange_raster_file_bands(input_file: str, output_file: str, bands: [int]) -> None:
+    """
+    Create a GDAL virtual raster (VRT) that references bands of a raster file in the requested order,
+    as an alternative to the 'gdal:rearrange_bands' algorithm.
+    No cell values are copied, so this is fast for large rasters.
+    The cell values are read from the input file when the virtual raster is read,
+    so the input file must exist while the virtual raster is used.
+
+    Args:
+        input_file (str): path to the input raster file, can be a /vsimem/ path
+        output_file (str): path to the output VRT file, can be a /vsimem/ path
+        bands ([int]): band numbers (1+) in the output order, bands can be omitted or repeated
+
+    Raises:
+        ValueError if a band is not in the input.
+        RuntimeError if the virtual raster could not be created.
+    """
+    input_dataset = gdal.Open(str(input_file))
+    if input_dataset is None:
+        raise RuntimeError('Error opening raster "{}" ({}).'.format(input_file, gdal.GetLastErrorMsg()))
+    for band in bands:
+        if band < 1 or band > input_dataset.RasterCount:
+            raise ValueError('Raster "{}" does not have band {}.'.format(input_file, band))
+    output_dataset = gdal.Translate(str(output_file), input_dataset, format="VRT", bandList=bands)
+    if output_dataset is None:
+        raise RuntimeError('Error creating virtual raster "{}" ({}).'.format(output_file, gdal.GetLastErrorMsg()))
+    # Close the datasets.
+    output_dataset = None
+    input_dataset = None
+
+
+def remove_raster_file(raster_file: str) -> None:
+    """
+    Remove a temporary raster file and its GDAL .aux.xml file.
+    Files in GDAL's /vsimem/ in-memory file system are unlinked to release the memory,
+    and other files are removed with io_util.remove_tmp_file() so that locked files are removed later.
+
+    Args:
+        raster_file (str): path to the raster file
+    """
+    raster_file = str(raster_file)
+    for file in [raster_file, raster_file + ".aux.xml"]:
+        if file.startswith("/vsimem/"):
+            if gdal.VSIStatL(file) is not None:
+                gdal.Unlink(file)
+        else:
+            io_util.remove_tmp_file(file)
+
+
 def remove_qgsvectorlayer_attribute(qgsvectorlayer: QgsVectorLayer, attribute_name: str) -> None:
     """
     Deletes an attribute of a QgsVectorLayer object.
@@ -1467,20 +3484,29 @@ def remove_qgsvectorlayer_attributes(qgsvectorlayer: QgsVectorLayer,
         remove_qgsvectorlayer_attribute(qgsvectorlayer, attr_to_remove)
 
 
-def remove_qgsvectorlayer_features(qgsvectorlayer: QgsVectorLayer, list_of_feature_ids: [int]) -> None:
+def remove_qgsvectorlayer_features(qgsvectorlayer: QgsVectorLayer, list_of_feature_ids: [int] or {int},
+                                   chunk_size: int = 10000) -> None:
     """
     Removes features from a QgsVectorLayer.
+    Features are deleted in chunks to limit the size of each provider call for large removals.
 
     Args:
         qgsvectorlayer (QgsVectorLayer): a QgsVectorLayer object
-        list_of_feature_ids (list of ints): a list of ids of the features to remove
+        list_of_feature_ids (list or set of ints): the ids of the features to remove
+        chunk_size (int): the number of features to delete in each call to the data provider
 
     Returns:
         None
     """
 
+    if chunk_size is None or chunk_size <= 0:
+        chunk_size = 10000
+    feature_ids = list(list_of_feature_ids)
+
     # Delete the features from the QgsVectorLayer object.
-    qgsvectorlayer.dataProvider().deleteFeatures(list_of_feature_ids)
+    data_provider = qgsvectorlayer.dataProvider()
+    for i in range(0, len(feature_ids), chunk_size):
+        data_provider.deleteFeatures(feature_ids[i:i + chunk_size])
 
 
 def rename_qgsvectorlayer_attribute(qgsvectorlayer: QgsVectorLayer, attribute_name: str,
@@ -1555,18 +3581,39 @@ def run_processing(processor: Processing or None, algorithm: str, algorithm_para
 
 
 def set_qgsvectorlayer_attribute(qgsvectorlayer: QgsVectorLayer, attribute_name: str,
-                                 attribute_value: str or None) -> int:
+                                 attribute_value: str or None = None,
+                                 attribute_values: dict = None,
+                                 attribute_expression: str or QgsExpression = None,
+                                 chunk_size: int = 10000) -> int:
     """
-    Set an attribute of a QgsVectorLayer with a single attribute value. If the attribute already has a value,
-    the value will be overwritten with the new input attribute value. All features will have the same attribute value.
+    Set an attribute of a QgsVectorLayer. If the attribute already has a value,
+    the value will be overwritten with the new value.
+
+    The value can be specified in one of the following ways, checked in order:
+
+    * attribute_expression - a QGIS expression that is evaluated for each feature
+    * attribute_values - a dictionary of values, where the key is the feature ID,
+      only features in the dictionary are set
+    * attribute_value - a single value that is set for all features
+
+    Changes are accumulated into a change map and passed to the data provider in chunks of chunk_size features,
+    rather than calling the data provider once per feature,
+    which is much faster for file-based providers such as GeoPackage and shapefile.
+    Geometry is not fetched when iterating features unless the expression requires it.
 
     Args:
         qgsvectorlayer (QgsVectorLayer): a QgsVectorLayer object
         attribute_name (str): the name of the attribute to set
         attribute_value (str): the object to set as the attribute's value (will be set for each matched feature)
+        attribute_values (dict): dictionary of feature ID to attribute value
+        attribute_expression (str or QgsExpression): expression to evaluate for each feature
+        chunk_size (int): the maximum number of features to change in one data provider call
 
     Returns:
         The number of features that had the attribute set.
+
+    Raises:
+        ValueError if the expression is invalid.
     """
 
     logger = logging.getLogger(__name__)
@@ -1581,30 +3628,220 @@ def set_qgsvectorlayer_attribute(qgsvectorlayer: QgsVectorLayer, attribute_name:
         logger.info("Layer attribute '{}' is at index {}.".format(attribute_name, attribute_index))
 
     set_count = 0
-    if attribute_index >= 0:
-        # Create an attribute dictionary.
-        # Key: the index of the attribute to populate
-        # Value: the string to populate as the attribute's values
-        attribute = {attribute_index: attribute_value}
-
-        # Iterate over the features of the QgsVectorLayer
-        # QgsVectorDataProvider
-        data_provider = qgsvectorlayer.dataProvider()
-        for feature in qgsvectorlayer.getFeatures():
-            # Set the feature's attribute with the attribute value.
-            status = data_provider.changeAttributeValues({feature.id(): attribute})
-            if status:
-                # Success
-                if debug:
-                    logger.info("Success setting feature ID {} attribute '{}' to {}".format(
-                        feature.id(), attribute_name, attribute_value))
-                set_count += 1
-            else:
-                logger.warning("Error setting feature attribute '{}' to {}".format(attribute_name, attribute_value))
+    if attribute_index < 0:
+        return set_count
+
+    if chunk_size is None or chunk_size <= 0:
+        chunk_size = 10000
+
+    # Request used to iterate the features:
+    # - only the feature ID is needed for constant and dictionary values
+    # - the expression determines the attributes and geometry that are needed
+    request = QgsFeatureRequest()
+    expression = None
+    context = None
+    if attribute_expression is not None:
+        if isinstance(attribute_expression, QgsExpression):
+            expression = attribute_expression
+        else:
+            expression = QgsExpression(attribute_expression)
+        if expression.hasParserError():
+            message = "Attribute expression '{}' is invalid: {}".format(expression.expression(),
+                                                                        expression.parserErrorString())
+            logger.warning(message)
+            raise ValueError(message)
+        context = QgsExpressionContext()
+        context.appendScopes(QgsExpressionContextUtils.globalProjectLayerScopes(qgsvectorlayer))
+        expression.prepare(context)
+        if not expression.needsGeometry():
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(expression.referencedColumns(), qgsvectorlayer.fields())
+    else:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setNoAttributes()
+        if attribute_values is not None:
+            # Only request the features that will be changed.
+            request.setFilterFids(list(attribute_values.keys()))
+
+    # QgsVectorDataProvider
+    data_provider = qgsvectorlayer.dataProvider()
+
+    # Change map:
+    # - key is the feature ID
+    # - value is a dictionary of attribute index and value
+    changes = {}
+    for feature in qgsvectorlayer.getFeatures(request):
+        if expression is not None:
+            context.setFeature(feature)
+            value = expression.evaluate(context)
+            if expression.hasEvalError():
+                logger.warning("Error evaluating expression for feature ID {}: {}".format(
+                    feature.id(), expression.evalErrorString()))
+                continue
+        elif attribute_values is not None:
+            value = attribute_values[feature.id()]
+        else:
+            value = attribute_value
+        changes[feature.id()] = {attribute_index: value}
+        if len(changes) >= chunk_size:
+            set_count += __change_qgsvectorlayer_attribute_values(data_provider, changes, attribute_name)
+            changes = {}
+
+    if len(changes) > 0:
+        set_count += __change_qgsvectorlayer_attribute_values(data_provider, changes, attribute_name)
 
     return set_count
 
 
+def split_qgsvectorlayer_by_attribute(qgsvectorlayer: QgsVectorLayer, attribute_name: str,
+                                      include_value=None, batch_size: int = 10000) -> dict:
+    """
+    Split a QgsVectorLayer into in-memory QgsVectorLayer objects, one for each unique attribute value.
+    The input layer is read in a single pass.
+    Features are grouped by the string representation of the attribute value using a dictionary and
+    are added to the layer for the value in batches.
+    Output layers have the same attributes, geometry type, and coordinate reference system as the input layer.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object to split
+        attribute_name (str): the name of the attribute to split by
+        include_value: function that is called with the attribute value string and returns True if the
+            value should be included in the output, or None to include all values
+        batch_size (int): the number of features to add to an output layer at a time
+
+    Returns:
+        Dictionary of output QgsVectorLayer, where the key is the attribute value string.
+
+    Raises:
+        ValueError if the attribute is not found.
+    """
+    logger = logging.getLogger(__name__)
+
+    attribute_index = qgsvectorlayer.fields().indexFromName(attribute_name)
+    if attribute_index < 0:
+        raise ValueError("Attribute '{}' was not found.".format(attribute_name))
+    if batch_size is None or batch_size <= 0:
+        batch_size = 10000
+
+    fields = qgsvectorlayer.fields()
+    wkb_type = qgsvectorlayer.wkbType()
+    crs = qgsvectorlayer.crs()
+
+    # Output layers and features waiting to be added, both by attribute value string.
+    split_layers = {}
+    pending_features = {}
+    # Attribute values that are not included, to avoid calling the include function for each feature.
+    excluded_values = set()
+    for feature in qgsvectorlayer.getFeatures():
+        attribute_str = str(feature.attributes()[attribute_index])
+        feats = pending_features.get(attribute_str)
+        if feats is None:
+            if attribute_str in excluded_values:
+                continue
+            if include_value is not None and not include_value(attribute_str):
+                excluded_values.add(attribute_str)
+                continue
+            # Create a new in-memory layer for the attribute value.
+            split_layer = QgsMemoryProviderUtils.createMemoryLayer("{}_{}".format(attribute_name, attribute_str),
+                                                                   fields, wkb_type, crs)
+            split_layers[attribute_str] = split_layer
+            feats = []
+            pending_features[attribute_str] = feats
+        feats.append(feature)
+        if len(feats) >= batch_size:
+            split_layers[attribute_str].dataProvider().addFeatures(feats)
+            feats.clear()
+
+    # Add the remaining features.
+    for attribute_str, feats in pending_features.items():
+        if len(feats) > 0:
+            split_layers[attribute_str].dataProvider().addFeatures(feats)
+        split_layers[attribute_str].updateExtents()
+
+    logger.info("Split layer into {} layers using attribute '{}' ({} values excluded).".format(
+        len(split_layers), attribute_name, len(excluded_values)))
+    return split_layers
+
+
+def warp_raster_file(input_file: str, output_file: str, crs: QgsCoordinateReferenceSystem,
+                     resampling: str = "Nearest", target_resolution: float = None,
+                     target_extent: QgsRectangle = None, output_format: str = "GTiff",
+                     num_threads: str = "ALL_CPUS", warp_memory: int = None,
+                     creation_options: [str] = None) -> None:
+    """
+    Reproject (warp) a raster file using GDAL in the current process.
+    Unlike the QGIS 'gdal:warpreproject' algorithm, which runs a separate program,
+    the input and output can be in GDAL's /vsimem/ in-memory file system.
+
+    Args:
+        input_file (str): path to the input raster file, can be a /vsimem/ path
+        output_file (str): path to the output file, can be a /vsimem/ path
+        crs (QgsCoordinateReferenceSystem): the output CRS
+        resampling (str): resampling method ("Nearest", "Bilinear", "Cubic", "CubicSpline", "Lanczos",
+            "Average", "Mode", "Max", "Min", "Median", "Q1", "Q3")
+        target_resolution (float): output cell size in output CRS units, or None to calculate from the input
+        target_extent (QgsRectangle): output extent in output CRS units, or None to calculate from the input
+        output_format (str): "GTiff" to write a tiled GeoTIFF, or "VRT" to write a virtual warped raster,
+            which is warped when read and is only valid while the input file exists
+        num_threads (str): number of threads used to warp, or "ALL_CPUS", multithreading is used if not 1
+        warp_memory (int): warp memory limit in megabytes, or None for the GDAL default
+        creation_options ([str]): additional GeoTIFF creation options (e.g., "COMPRESS=LZW")
+
+    Raises:
+        ValueError if the input is invalid.
+        RuntimeError if the file could not be warped.
+    """
+    logger = logging.getLogger(__name__)
+
+    if output_format.upper() not in ["GTIFF", "VRT"]:
+        raise ValueError('Raster warp output format "{}" is not supported.'.format(output_format))
+    if num_threads is None or num_threads == "":
+        num_threads = "ALL_CPUS"
+    num_threads = str(num_threads)
+    # GDAL resampling names.
+    resampling_algorithms = {
+        "nearest": "near", "bilinear": "bilinear", "cubic": "cubic", "cubicspline": "cubicspline",
+        "lanczos": "lanczos", "average": "average", "mode": "mode", "max": "max", "min": "min",
+        "median": "med", "q1": "q1", "q3": "q3"
+    }
+    try:
+        resample_algorithm = resampling_algorithms[resampling.lower()]
+    except KeyError:
+        raise ValueError('Raster resampling method "{}" is not supported.'.format(resampling))
+
+    warp_options = {
+        "format": "VRT" if output_format.upper() == "VRT" else "GTiff",
+        "dstSRS": crs.toWkt(QgsCoordinateReferenceSystem.WKT_PREFERRED_GDAL),
+        "resampleAlg": resample_algorithm,
+        # Use multiple threads to warp chunks and to compute the transformation.
+        "multithread": num_threads != "1",
+        "warpOptions": ["NUM_THREADS={}".format(num_threads)]
+    }
+    if target_resolution is not None:
+        warp_options["xRes"] = target_resolution
+        warp_options["yRes"] = target_resolution
+        # Align the output cells with the CRS origin so that outputs can be combined.
+        warp_options["targetAlignedPixels"] = True
+    if target_extent is not None:
+        warp_options["outputBounds"] = (target_extent.xMinimum(), target_extent.yMinimum(),
+                                        target_extent.xMaximum(), target_extent.yMaximum())
+    if warp_memory is not None:
+        # The warp memory in megabytes.
+        warp_options["warpMemoryLimit"] = warp_memory
+    if output_format.upper() != "VRT":
+        options = ["TILED=YES", "BIGTIFF=IF_SAFER", "NUM_THREADS={}".format(num_threads)]
+        if creation_options is not None:
+            options += creation_options
+        warp_options["creationOptions"] = options
+
+    logger.info('Warping raster "{}" to "{}" with options: {}'.format(input_file, output_file, warp_options))
+    output_dataset = gdal.Warp(str(output_file), str(input_file), **warp_options)
+    if output_dataset is None:
+        raise RuntimeError('Error warping raster "{}" ({}).'.format(input_file, gdal.GetLastErrorMsg()))
+    # Close the dataset, which writes the output.
+    output_dataset = None
+
+
 def write_algorithm_help(output_file: str = None, list_algorithms: bool = False,
                          algorithm_ids: [str] = None) -> [str]:
     """
@@ -1746,6 +3983,53 @@ def write_qgsvectorlayer_to_delimited_file(qgsvectorlayer: QgsVectorLayer,
                                                           'SEPARATOR={}'.format(separator)])
 
 
+def write_qgsvectorlayer_to_flatgeobuf(qgsvectorlayer: QgsVectorLayer,
+                                       output_file_full: str,
+                                       crs_code: str,
+                                       spatial_index: bool = True) -> None:
+    """
+    Write the QgsVectorLayer object to a spatial data file in FlatGeobuf format.
+    REF: `QGIS API Documentation <https://qgis.org/api/classQgsVectorFileWriter.html>_`
+    See:  https://gdal.org/drivers/vector/flatgeobuf.html
+
+    The OGR driver streams features to the file and, if requested, writes a packed Hilbert R-tree spatial index
+    so that readers can use a bounding box filter to read only the features that are needed.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object
+        output_file_full (str): the full pathname to the output file
+        crs_code (str): the output coordinate reference system in EPSG code
+        spatial_index (bool): whether to write the spatial index
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError if the layer could not be written.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Writing FlatGeobuf: {}".format(output_file_full))
+
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "FlatGeobuf"
+    options.fileEncoding = "utf-8"
+    if spatial_index:
+        options.layerOptions = ['SPATIAL_INDEX=YES']
+    else:
+        options.layerOptions = ['SPATIAL_INDEX=NO']
+    # Transform the features if the output CRS is different from the layer CRS.
+    source_crs = qgsvectorlayer.crs()
+    output_crs = QgsCoordinateReferenceSystem(crs_code) if crs_code else source_crs
+    if output_crs.isValid() and source_crs.isValid() and output_crs != source_crs:
+        options.ct = QgsCoordinateTransform(source_crs, output_crs, QgsProject.instance())
+    result = QgsVectorFileWriter.writeAsVectorFormatV2(layer=qgsvectorlayer,
+                                                      fileName=output_file_full,
+                                                      transformContext=QgsProject.instance().transformContext(),
+                                                      options=options)
+    if result[0] != QgsVectorFileWriter.NoError:
+        raise RuntimeError("Error writing FlatGeobuf '{}' ({}).".format(output_file_full, result[1]))
+
+
 # TODO smalers 2020-03-30 need to enable more properties without breaking default options for testing
 def write_qgsvectorlayer_to_geojson(qgsvectorlayer: QgsVectorLayer,
                                     output_file_full: str,
@@ -1791,6 +4075,140 @@ def write_qgsvectorlayer_to_geojson(qgsvectorlayer: QgsVectorLayer,
                                             layerOptions=layer_options)
 
 
+def __get_json_attribute_value(value: object) -> object:
+    """
+    Convert an attribute value to a value that can be serialized by the json module.
+
+    Args:
+        value (object): attribute value from a QgsFeature
+
+    Returns:
+        Value that can be serialized as JSON.  NULL and non-finite numbers are returned as None.
+    """
+    if value is None or value == NULL:
+        return None
+    elif isinstance(value, bool) or isinstance(value, int) or isinstance(value, str):
+        return value
+    elif isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        return value
+    elif isinstance(value, QDate) or isinstance(value, QDateTime) or isinstance(value, QTime):
+        return value.toString(Qt.ISODate)
+    elif isinstance(value, list) or isinstance(value, dict):
+        return value
+    else:
+        return str(value)
+
+
+def write_qgsvectorlayer_to_geojson_stream(qgsvectorlayer: QgsVectorLayer,
+                                           output_file_full: str,
+                                           precision: int = 5,
+                                           crs_code: str = None,
+                                           rfc7946: bool = True,
+                                           attribute_names: [str] = None,
+                                           sequence: bool = False,
+                                           gzip_output: bool = False) -> int:
+    """
+    Write the QgsVectorLayer object to a GeoJSON file, writing each feature as it is read from the layer.
+    Unlike write_qgsvectorlayer_to_geojson, the output is not built in memory by QgsVectorFileWriter,
+    coordinates are written with the requested precision, and only the requested attributes are read.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object
+        output_file_full (str): the full pathname to the output file
+        precision (int): number of decimal places to include in the output coordinates
+        crs_code (str): the output coordinate reference system code, used if rfc7946 is False,
+            default is the layer's coordinate reference system
+        rfc7946 (bool): whether to follow RFC 7946, in which case coordinates are reprojected to EPSG:4326
+            and polygon exterior rings are counterclockwise
+        attribute_names ([str]): names of attributes to write, default is all attributes
+        sequence (bool): if True, write newline-delimited GeoJSON (GeoJSONSeq) with one feature per line,
+            if False, write a FeatureCollection
+        gzip_output (bool): whether to compress the output with gzip
+
+    Returns:
+        Number of features that were written.
+
+    Raises:
+        ValueError if an attribute name is not found in the layer.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Writing GeoJSON: {}".format(output_file_full))
+
+    # Determine the output coordinate reference system and transform.
+    source_crs = qgsvectorlayer.crs()
+    if rfc7946:
+        output_crs = QgsCoordinateReferenceSystem("EPSG:4326")
+    elif crs_code:
+        output_crs = QgsCoordinateReferenceSystem(crs_code)
+    else:
+        output_crs = source_crs
+    transform = None
+    if output_crs.isValid() and source_crs.isValid() and output_crs != source_crs:
+        transform = QgsCoordinateTransform(source_crs, output_crs, QgsProject.instance())
+
+    # Only read the attributes that are written.
+    fields = qgsvectorlayer.fields()
+    if attribute_names is None:
+        attribute_names = fields.names()
+    attribute_indices = []
+    for attribute_name in attribute_names:
+        attribute_index = fields.indexFromName(attribute_name)
+        if attribute_index < 0:
+            raise ValueError("Attribute '{}' is not found in the layer.".format(attribute_name))
+        attribute_indices.append(attribute_index)
+    request = QgsFeatureRequest()
+    request.setSubsetOfAttributes(attribute_indices)
+
+    if gzip_output:
+        output_file = gzip.open(output_file_full, "wt", encoding="utf-8", newline="\n")
+    else:
+        output_file = open(output_file_full, "w", encoding="utf-8", newline="\n")
+
+    feature_count = 0
+    with output_file:
+        if not sequence:
+            output_file.write('{"type": "FeatureCollection",\n')
+            if not rfc7946 and output_crs.isValid():
+                # GeoJSON 2008 'crs' member, which RFC 7946 does not allow.
+                output_file.write('"crs": {{"type": "name", "properties": {{"name": "{}"}}}},\n'.format(
+                    output_crs.authid()))
+            output_file.write('"features": [\n')
+
+        for feature in qgsvectorlayer.getFeatures(request):
+            geometry = feature.geometry()
+            if geometry is None or geometry.isNull():
+                geometry_json = "null"
+            else:
+                if transform is not None:
+                    geometry.transform(transform)
+                if rfc7946 and hasattr(geometry, "forcePolygonCounterClockwise"):
+                    # Available in QGIS 3.24 and later.
+                    geometry = geometry.forcePolygonCounterClockwise()
+                geometry_json = geometry.asJson(precision)
+
+            properties = {}
+            for attribute_name, attribute_index in zip(attribute_names, attribute_indices):
+                properties[attribute_name] = __get_json_attribute_value(feature.attribute(attribute_index))
+            feature_json = '{{"type": "Feature", "properties": {}, "geometry": {}}}'.format(
+                json.dumps(properties, ensure_ascii=False), geometry_json)
+
+            if sequence:
+                output_file.write(feature_json + "\n")
+            else:
+                if feature_count > 0:
+                    output_file.write(",\n")
+                output_file.write(feature_json)
+            feature_count += 1
+
+        if not sequence:
+            output_file.write("\n]}\n")
+
+    logger.info("Wrote {} features to GeoJSON: {}".format(feature_count, output_file_full))
+    return feature_count
+
+
 def write_qgsvectorlayer_to_geopackage(qgsvectorlayer: QgsVectorLayer,
                                        output_file_full: str,
                                        crs_code: str) -> None:
@@ -1837,6 +4255,58 @@ def write_qgsvectorlayer_to_geopackage(qgsvectorlayer: QgsVectorLayer,
                                                   options=options)
 
 
+def write_qgsvectorlayer_to_geoparquet(qgsvectorlayer: QgsVectorLayer,
+                                       output_file_full: str,
+                                       crs_code: str,
+                                       compression: str = "SNAPPY",
+                                       row_group_size: int = 65536) -> None:
+    """
+    Write the QgsVectorLayer object to a spatial data file in GeoParquet format.
+    REF: `QGIS API Documentation <https://qgis.org/api/classQgsVectorFileWriter.html>_`
+    See:  https://gdal.org/drivers/vector/parquet.html
+
+    The GDAL Parquet driver (GDAL 3.5 or later, built with Arrow) is used.
+    Geometry is written as WKB with GeoParquet metadata, attributes are written as typed columns,
+    and a bounding box column is written for each feature so that readers can filter by bounding box
+    without decoding geometry.
+
+    Args:
+        qgsvectorlayer (QgsVectorLayer): the QgsVectorLayer object
+        output_file_full (str): the full pathname to the output file
+        crs_code (str): the output coordinate reference system in EPSG code
+        compression (str): compression codec (`NONE`, `SNAPPY`, `GZIP`, `BROTLI`, `ZSTD` or `LZ4_RAW`)
+        row_group_size (int): maximum number of features in a row group
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError if the layer could not be written, for example if GDAL does not include the Parquet driver.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Writing GeoParquet: {}".format(output_file_full))
+
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "Parquet"
+    options.fileEncoding = "utf-8"
+    # WRITE_COVERING_BBOX requires GDAL 3.9 and is ignored by older versions.
+    options.layerOptions = ['GEOMETRY_ENCODING=WKB',
+                            'COMPRESSION={}'.format(compression.upper()),
+                            'ROW_GROUP_SIZE={}'.format(row_group_size),
+                            'WRITE_COVERING_BBOX=YES']
+    # Transform the features if the output CRS is different from the layer CRS.
+    source_crs = qgsvectorlayer.crs()
+    output_crs = QgsCoordinateReferenceSystem(crs_code) if crs_code else source_crs
+    if output_crs.isValid() and source_crs.isValid() and output_crs != source_crs:
+        options.ct = QgsCoordinateTransform(source_crs, output_crs, QgsProject.instance())
+    result = QgsVectorFileWriter.writeAsVectorFormatV2(layer=qgsvectorlayer,
+                                                      fileName=output_file_full,
+                                                      transformContext=QgsProject.instance().transformContext(),
+                                                      options=options)
+    if result[0] != QgsVectorFileWriter.NoError:
+        raise RuntimeError("Error writing GeoParquet '{}' ({}).".format(output_file_full, result[1]))
+
+
 def write_qgsvectorlayer_to_kml(qgsvectorlayer: QgsVectorLayer,
                                 output_file_full: str,
                                 crs_code: str,
@@ -1937,3 +4407,165 @@ def write_qgsvectorlayer_to_shapefile(qgsvectorlayer: QgsVectorLayer,
                                                 fileEncoding="utf-8",
                                                 destCRS=QgsCoordinateReferenceSystem(crs_code),
                                                 driverName="ESRI Shapefile")
+
+
+def write_raster_file_to_geotiff(input_file: str, output_file: str, profile: str = "GTiff",
+                                 block_size: int = 512, compression: str = "LZW", predictor: str = "None",
+                                 overview_levels: [int] or str = None, overview_resampling: str = "Average",
+                                 num_threads: str = "ALL_CPUS",
+                                 output_crs: QgsCoordinateReferenceSystem = None) -> None:
+    """
+    Write a raster file to a tiled GeoTIFF or Cloud Optimized GeoTIFF (COG) file using GDAL in the current process,
+    so that readers only decode the tiles and overview levels that they need.
+
+    The profile determines the file layout:
+
+    * "GTiff" - tiled GeoTIFF with the requested block size, with overviews added to the file after the
+      full resolution data
+    * "COG" - Cloud Optimized GeoTIFF written by the GDAL COG driver, with overviews before the full resolution
+      data so that HTTP range requests can read overviews without reading the full resolution data
+
+    Compression and overview building use multiple threads (GDAL NUM_THREADS and GDAL_NUM_THREADS).
+
+    Args:
+        input_file (str): path to the input raster file, can be a /vsimem/ path
+        output_file (str): path to the output GeoTIFF file
+        profile (str): "GTiff" or "COG", see above
+        block_size (int): tile width and height in pixels, a multiple of 16
+        compression (str): compression ("None", "LZW", "Deflate", "ZSTD", "LERC", "JPEG", or "WEBP")
+        predictor (str): compression predictor:  "None", "Horizontal" (for integer data),
+            "FloatingPoint" (for floating point data), or "Auto" to use the predictor for the data type
+            if the compression is LZW, Deflate or ZSTD
+        overview_levels ([int] or str): overview decimation factors (e.g., [2, 4, 8, 16]),
+            "Auto" to add levels until the overview fits in one tile, or None for no overviews.
+            For COG, the levels must be 2, 4, 8, etc. and only the number of levels is used.
+        overview_resampling (str): overview resampling method ("Nearest", "Average", "Bilinear", "Cubic",
+            "CubicSpline", "Lanczos", "Mode")
+        num_threads (str): number of threads or "ALL_CPUS"
+        output_crs (QgsCoordinateReferenceSystem): output CRS, or None to use the input CRS.
+            If different from the input CRS, the raster is reprojected using a virtual warped raster.
+
+    Raises:
+        ValueError if the input is invalid.
+        RuntimeError if the file could not be written.
+    """
+    logger = logging.getLogger(__name__)
+
+    profile = profile.upper()
+    if profile not in ["GTIFF", "COG"]:
+        raise ValueError('Raster output profile "{}" is not supported.'.format(profile))
+    if block_size is None or block_size <= 0 or block_size % 16 != 0:
+        raise ValueError("Raster block size ({}) must be a multiple of 16.".format(block_size))
+    if compression is None or compression == "":
+        compression = "None"
+    if predictor is None or predictor == "":
+        predictor = "None"
+    if num_threads is None or num_threads == "":
+        num_threads = "ALL_CPUS"
+    num_threads = str(num_threads)
+
+    input_dataset = gdal.Open(str(input_file))
+    if input_dataset is None:
+        raise ValueError('Raster "{}" could not be opened.'.format(input_file))
+
+    if output_crs is not None and output_crs.isValid():
+        input_crs = QgsCoordinateReferenceSystem()
+        input_crs.createFromWkt(input_dataset.GetProjection())
+        if input_crs != output_crs:
+            # Reproject using a virtual warped raster so that the warp is done while writing the tiles.
+            logger.info("Reprojecting raster from {} to {}.".format(input_crs.authid(), output_crs.authid()))
+            input_dataset = gdal.Warp("", input_dataset, format="VRT",
+                                      dstSRS=output_crs.toWkt(QgsCoordinateReferenceSystem.WKT_PREFERRED_GDAL),
+                                      multithread=True, warpOptions=["NUM_THREADS={}".format(num_threads)])
+            if input_dataset is None:
+                raise RuntimeError('Error reprojecting raster "{}" ({}).'.format(input_file, gdal.GetLastErrorMsg()))
+
+    # Determine the predictor value from the data type of the first band.
+    is_floating_point = input_dataset.GetRasterBand(1).DataType in [gdal.GDT_Float32, gdal.GDT_Float64]
+    predictor_upper = predictor.upper()
+    if predictor_upper == "AUTO":
+        if compression.upper() in ["LZW", "DEFLATE", "ZSTD"]:
+            predictor_upper = "FLOATINGPOINT" if is_floating_point else "HORIZONTAL"
+        else:
+            predictor_upper = "NONE"
+    if predictor_upper == "FLOATINGPOINT" and not is_floating_point:
+        raise ValueError("The FloatingPoint predictor can only be used with floating point data.")
+    # GTiff uses numbers and COG uses names.
+    predictor_values = {
+        "NONE": ("1", "NO"),
+        "HORIZONTAL": ("2", "STANDARD"),
+        "FLOATINGPOINT": ("3", "FLOATING_POINT")
+    }
+    try:
+        gtiff_predictor, cog_predictor = predictor_values[predictor_upper]
+    except KeyError:
+        raise ValueError('Raster compression predictor "{}" is not supported.'.format(predictor))
+
+    # Determine the overview levels.
+    if isinstance(overview_levels, str):
+        if overview_levels.upper() == "AUTO":
+            overview_levels = []
+            level = 2
+            while max(input_dataset.RasterXSize, input_dataset.RasterYSize) / level > block_size:
+                overview_levels.append(level)
+                level *= 2
+            # Add the level for which the overview fits in one tile.
+            if max(input_dataset.RasterXSize, input_dataset.RasterYSize) > block_size:
+                overview_levels.append(level)
+        elif overview_levels.upper() == "NONE" or overview_levels == "":
+            overview_levels = None
+        else:
+            raise ValueError('Raster overview levels "{}" are not supported.'.format(overview_levels))
+    if overview_levels is not None and len(overview_levels) == 0:
+        overview_levels = None
+
+    creation_options = ["COMPRESS={}".format(compression.upper()), "NUM_THREADS={}".format(num_threads),
+                        "BIGTIFF=IF_SAFER"]
+    if profile == "COG":
+        creation_options += ["BLOCKSIZE={}".format(block_size), "PREDICTOR={}".format(cog_predictor),
+                             "OVERVIEW_RESAMPLING={}".format(overview_resampling.upper())]
+        if overview_levels is None:
+            creation_options.append("OVERVIEWS=NONE")
+        else:
+            if overview_levels != [2 ** (i + 1) for i in range(len(overview_levels))]:
+                raise ValueError("COG overview levels ({}) must be 2, 4, 8, etc.".format(overview_levels))
+            creation_options.append("OVERVIEWS=IGNORE_EXISTING")
+            if int(gdal.VersionInfo("VERSION_NUM")) >= 3060000:
+                creation_options.append("OVERVIEW_COUNT={}".format(len(overview_levels)))
+            else:
+                # OVERVIEW_COUNT requires GDAL 3.6 so use the driver default,
+                # which creates overviews until the overview fits in one block.
+                logger.warning("GDAL {} does not support COG OVERVIEW_COUNT, using default overview levels.".format(
+                    gdal.VersionInfo("RELEASE_NAME")))
+    else:
+        creation_options += ["TILED=YES", "BLOCKXSIZE={}".format(block_size), "BLOCKYSIZE={}".format(block_size),
+                             "PREDICTOR={}".format(gtiff_predictor)]
+
+    logger.info('Writing raster "{}" using the {} profile with creation options: {}'.format(
+        output_file, profile, creation_options))
+    # The COG driver builds overviews using GDAL_NUM_THREADS.
+    previous_num_threads = gdal.GetConfigOption("GDAL_NUM_THREADS")
+    gdal.SetConfigOption("GDAL_NUM_THREADS", num_threads)
+    try:
+        output_dataset = gdal.Translate(str(output_file), input_dataset, format=profile,
+                                        creationOptions=creation_options)
+        if output_dataset is None:
+            raise RuntimeError('Error writing raster "{}" ({}).'.format(output_file, gdal.GetLastErrorMsg()))
+        if profile == "GTIFF" and overview_levels is not None:
+            # Add overviews to the file, compressed the same as the full resolution data.
+            previous_compress_overview = gdal.GetConfigOption("COMPRESS_OVERVIEW")
+            previous_predictor_overview = gdal.GetConfigOption("PREDICTOR_OVERVIEW")
+            gdal.SetConfigOption("COMPRESS_OVERVIEW", compression.upper())
+            gdal.SetConfigOption("PREDICTOR_OVERVIEW", gtiff_predictor)
+            try:
+                if output_dataset.BuildOverviews(overview_resampling.upper(), overview_levels) != 0:
+                    raise RuntimeError('Error building overviews for raster "{}" ({}).'.format(
+                        output_file, gdal.GetLastErrorMsg()))
+            finally:
+                gdal.SetConfigOption("COMPRESS_OVERVIEW", previous_compress_overview)
+                gdal.SetConfigOption("PREDICTOR_OVERVIEW", previous_predictor_overview)
+        # Close the dataset.
+        output_dataset = None
+    finally:
+        gdal.SetConfigOption("GDAL_NUM_THREADS", previous_num_threads)
+        input_dataset = None
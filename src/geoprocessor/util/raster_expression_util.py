@@ -0,0 +1,139 @@
+# raster_expression_util - useful utility functions for raster calculator expressions
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Parse raster calculator expressions, such as "(A - B) / (A + B)" or "where(A > 100, 1, 0)".
+Expressions use Python syntax and are checked so that only arithmetic, comparisons, conditions,
+input variables and the functions in RASTER_EXPRESSION_FUNCTIONS are used.
+Conditions are converted to element-wise operations so that the expression can be evaluated with
+NumPy arrays for the variables, with the functions provided by NumPy functions of the same name.
+This module does not depend on NumPy.
+"""
+
+import ast
+
+# Functions that can be used in expressions, which are evaluated using NumPy functions with the same name.
+RASTER_EXPRESSION_FUNCTIONS = [
+    "abs", "arccos", "arcsin", "arctan", "ceil", "clip", "cos", "exp", "floor", "isnan", "log", "log10",
+    "maximum", "minimum", "power", "round", "sin", "sqrt", "tan", "where"
+]
+
+# Constants that can be used in expressions, which are evaluated using NumPy constants with the same name.
+RASTER_EXPRESSION_CONSTANTS = ["e", "pi"]
+
+# Expression syntax that is allowed, after conditions are converted to element-wise operations.
+__ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.BitAnd, ast.BitOr, ast.Invert, ast.UAdd, ast.USub,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE
+)
+
+
+class __ElementWiseTransformer(ast.NodeTransformer):
+    """
+    Convert conditions that only work with scalars to element-wise operations that also work with arrays:
+
+    * 'a and b' to '(a) & (b)', 'a or b' to '(a) | (b)', and 'not a' to '~(a)'
+    * 'x if c else y' to 'where(c, x, y)'
+    * 'a < b < c' to '(a < b) & (b < c)'
+    """
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return ast.copy_location(result, node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.copy_location(ast.UnaryOp(op=ast.Invert(), operand=node.operand), node)
+        return node
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.AST:
+        self.generic_visit(node)
+        call = ast.Call(func=ast.Name(id="where", ctx=ast.Load()), args=[node.test, node.body, node.orelse],
+                        keywords=[])
+        return ast.copy_location(call, node)
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        result = None
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            compare = ast.Compare(left=left, ops=[op], comparators=[right])
+            result = compare if result is None else ast.BinOp(left=result, op=ast.BitAnd(), right=compare)
+            left = right
+        return ast.copy_location(result, node)
+
+
+def parse_raster_expression(expression: str, variable_names: [str]) -> (object, [str]):
+    """
+    Parse and check a raster calculator expression.
+
+    Args:
+        expression (str): the expression, using Python syntax, for example "where(A > 100, (A - B) / A, 0)"
+        variable_names ([str]): names of the variables that can be used in the expression, for example ["A", "B"]
+
+    Returns:
+        Tuple of the compiled expression, which can be evaluated with eval() using a namespace that
+        provides the variables, functions and constants, and the sorted list of variables used in the expression.
+
+    Raises:
+        ValueError if the expression is invalid or uses syntax, functions or names that are not allowed.
+    """
+    if expression is None or expression.strip() == "":
+        raise ValueError("The raster expression is empty.")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError("The raster expression '{}' is invalid ({}).".format(expression, e.msg))
+
+    tree = ast.fix_missing_locations(__ElementWiseTransformer().visit(tree))
+
+    # Names that are called as functions, which must be in RASTER_EXPRESSION_FUNCTIONS.
+    function_name_ids = [id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)]
+    used_variables = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, __ALLOWED_NODES):
+            raise ValueError("The raster expression '{}' uses syntax that is not allowed ({}).".format(
+                expression, type(node).__name__))
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ValueError("The raster expression '{}' uses a value that is not a number ({}).".format(
+                    expression, repr(node.value)))
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in RASTER_EXPRESSION_FUNCTIONS:
+                raise ValueError("The raster expression '{}' uses a function that is not allowed.".format(
+                    expression))
+            if len(node.keywords) > 0:
+                raise ValueError("The raster expression '{}' uses function keyword arguments, "
+                                 "which are not allowed.".format(expression))
+        elif isinstance(node, ast.Name) and id(node) not in function_name_ids:
+            if node.id in variable_names:
+                used_variables.add(node.id)
+            elif node.id not in RASTER_EXPRESSION_CONSTANTS:
+                raise ValueError("The raster expression '{}' uses unknown name '{}'.".format(expression, node.id))
+
+    return compile(tree, "<raster expression>", "eval"), sorted(used_variables)
@@ -0,0 +1,513 @@
+# tile_cache_util - functions for a local disk cache of web map tiles
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Functions for a local disk cache of web map tiles, used with Tile Map Service (TMS) and
+Web Map Service (WMS) raster GeoLayers.
+
+The cache is an MBTiles (SQLite) file so that GDAL and QGIS can read it directly as a raster layer:
+- tile images are content-addressed (SHA-256 of the image) so that identical tiles
+  (e.g., empty ocean tiles) are stored once
+- the 'map' table associates each tile position with an image and records when the tile was fetched
+  and last accessed, which is used for TTL expiration and least recently used (LRU) eviction
+- the access time is only updated when a tile is read with get_tile() or read_tile():
+  GDAL and QGIS read the 'tiles' view directly, so for layers read from the cache file
+  the access time is the time the tile was fetched and eviction removes the least recently fetched tiles
+- the standard 'tiles' view and 'metadata' table are provided for MBTiles readers
+
+Tile positions in function arguments use the XYZ ("slippy map") scheme with row 0 at the top.
+The MBTiles file uses the TMS scheme with row 0 at the bottom, and rows are flipped when reading and writing.
+"""
+
+import concurrent.futures
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Half the width of the Web Mercator (EPSG:3857) world, in meters.
+WEB_MERCATOR_HALF_WIDTH = 20037508.342789244
+
+# Maximum latitude of the Web Mercator world, in degrees.
+WEB_MERCATOR_MAX_LATITUDE = 85.0511287798066
+
+
+def __get_tile_format(tile_data: bytes) -> str:
+    """
+    Determine the MBTiles format from the leading bytes of a tile image.
+
+    Args:
+        tile_data (bytes): tile image
+
+    Returns:
+        The MBTiles format ("png", "jpg", or "webp"), defaulting to "png".
+    """
+    if tile_data.startswith(b'\xff\xd8'):
+        return "jpg"
+    elif tile_data[0:4] == b'RIFF' and tile_data[8:12] == b'WEBP':
+        return "webp"
+    return "png"
+
+
+def __open_tile_cache_schema(connection: sqlite3.Connection) -> None:
+    """
+    Create the tile cache tables and view if they do not exist.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+
+    Returns:
+        None
+    """
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS images (tile_id TEXT PRIMARY KEY, tile_data BLOB);
+        CREATE TABLE IF NOT EXISTS map (
+            zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT,
+            fetched REAL, accessed REAL,
+            PRIMARY KEY (zoom_level, tile_column, tile_row));
+        CREATE INDEX IF NOT EXISTS map_accessed ON map (accessed);
+        CREATE INDEX IF NOT EXISTS map_tile_id ON map (tile_id);
+        CREATE VIEW IF NOT EXISTS tiles AS
+            SELECT map.zoom_level AS zoom_level, map.tile_column AS tile_column, map.tile_row AS tile_row,
+                images.tile_data AS tile_data
+            FROM map JOIN images ON images.tile_id = map.tile_id;
+        """)
+    connection.commit()
+
+
+def evict_tiles(connection: sqlite3.Connection, max_size: int = None, ttl: float = None) -> int:
+    """
+    Remove expired tiles and then the least recently used tiles until the cache is within its size limit.
+    Tiles are ordered by the access time, which is the time the tile was fetched unless it was later read
+    with get_tile() or read_tile(), so tiles that are only read by GDAL or QGIS are evicted by fetch time.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+        max_size (int): maximum total size of the tile images in bytes, or None for no limit
+        ttl (float): time to live in seconds for a tile after it is fetched, or None if tiles do not expire
+
+    Returns:
+        The number of tiles that were removed.
+    """
+    removed_count = 0
+    if ttl is not None:
+        cursor = connection.execute("DELETE FROM map WHERE fetched < ?", (time.time() - ttl,))
+        removed_count += cursor.rowcount
+        connection.execute("DELETE FROM images WHERE tile_id NOT IN (SELECT tile_id FROM map)")
+    if max_size is not None:
+        excess_size = get_tile_cache_size(connection) - max_size
+        while excess_size > 0:
+            # Select the least recently used tiles with enough total size to remove the excess.
+            # Removing a tile only frees its image if no other tile uses the image, so repeat until within the limit.
+            rowids = []
+            selected_size = 0
+            for rowid, tile_size in connection.execute(
+                    "SELECT map.rowid, LENGTH(images.tile_data) FROM map JOIN images ON images.tile_id = map.tile_id "
+                    "ORDER BY map.accessed"):
+                rowids.append((rowid,))
+                selected_size += tile_size
+                if selected_size >= excess_size:
+                    break
+            if not rowids:
+                break
+            connection.executemany("DELETE FROM map WHERE rowid = ?", rowids)
+            removed_count += len(rowids)
+            connection.execute("DELETE FROM images WHERE tile_id NOT IN (SELECT tile_id FROM map)")
+            excess_size = get_tile_cache_size(connection) - max_size
+    connection.commit()
+    return removed_count
+
+
+def fetch_tile(session: requests.Session, url: str, zoom: int, column: int, row: int,
+               timeout: float = 30.0) -> bytes or None:
+    """
+    Fetch a tile from a tile server.
+
+    Args:
+        session (requests.Session): session to use for connection pooling, from create_tile_session()
+        url (str): tile URL template, see format_tile_url()
+        zoom (int): zoom level
+        column (int): tile column
+        row (int): tile row, XYZ scheme
+        timeout (float): request timeout in seconds
+
+    Returns:
+        The tile image, or None if the server does not have the tile (HTTP 204 or 404).
+
+    Raises:
+        requests.RequestException if the request fails.
+    """
+    response = session.get(format_tile_url(url, zoom, column, row), timeout=timeout)
+    if response.status_code in (204, 404):
+        return None
+    response.raise_for_status()
+    return response.content
+
+
+def create_tile_session(max_workers: int = 8) -> requests.Session:
+    """
+    Create a requests session with a connection pool large enough for concurrent tile requests.
+
+    Args:
+        max_workers (int): number of threads that will use the session
+
+    Returns:
+        The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def format_tile_url(url: str, zoom: int, column: int, row: int) -> str:
+    """
+    Format the URL for a tile.  The following are recognized in the URL template:
+    - {z}, {x}, {y} - zoom level, column, and row with row 0 at the top (XYZ)
+    - {-y} - row with row 0 at the bottom (TMS)
+    - {bbox-epsg-3857} - tile extent "MinX,MinY,MaxX,MaxY" in Web Mercator meters,
+      for a Web Map Service (WMS) GetMap request
+
+    Args:
+        url (str): URL template
+        zoom (int): zoom level
+        column (int): tile column
+        row (int): tile row, XYZ scheme
+
+    Returns:
+        The URL for the tile.
+    """
+    if "{bbox-epsg-3857}" in url:
+        tile_size = 2.0 * WEB_MERCATOR_HALF_WIDTH / (1 << zoom)
+        min_x = -WEB_MERCATOR_HALF_WIDTH + column * tile_size
+        max_y = WEB_MERCATOR_HALF_WIDTH - row * tile_size
+        url = url.replace("{bbox-epsg-3857}", "{!r},{!r},{!r},{!r}".format(
+            min_x, max_y - tile_size, min_x + tile_size, max_y))
+    return url.replace("{z}", str(zoom)).replace("{x}", str(column)).replace(
+        "{-y}", str((1 << zoom) - 1 - row)).replace("{y}", str(row))
+
+
+def get_tile(connection: sqlite3.Connection, zoom: int, column: int, row: int, ttl: float = None) -> bytes or None:
+    """
+    Get a tile from the cache and update its access time.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+        zoom (int): zoom level
+        column (int): tile column
+        row (int): tile row, XYZ scheme
+        ttl (float): time to live in seconds for a tile after it is fetched, or None if tiles do not expire
+
+    Returns:
+        The tile image, or None if the tile is not in the cache or is expired.
+    """
+    tile_row = (1 << zoom) - 1 - row
+    result = connection.execute(
+        "SELECT images.tile_data, map.fetched FROM map JOIN images ON images.tile_id = map.tile_id "
+        "WHERE map.zoom_level = ? AND map.tile_column = ? AND map.tile_row = ?",
+        (zoom, column, tile_row)).fetchone()
+    if result is None:
+        return None
+    now = time.time()
+    if ttl is not None and result[1] < now - ttl:
+        return None
+    connection.execute("UPDATE map SET accessed = ? WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                       (now, zoom, column, tile_row))
+    connection.commit()
+    return result[0]
+
+
+def get_tile_cache_size(connection: sqlite3.Connection) -> int:
+    """
+    Get the total size of the tile images in the cache.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+
+    Returns:
+        The total size of the tile images in bytes.
+    """
+    return connection.execute("SELECT COALESCE(SUM(LENGTH(tile_data)), 0) FROM images").fetchone()[0]
+
+
+def get_tile_ranges(extent: [float], min_zoom: int, max_zoom: int) -> [(int, int, int, int, int)]:
+    """
+    Get the ranges of tiles that cover an extent for a range of zoom levels.
+
+    Args:
+        extent ([float]): extent "[MinX, MinY, MaxX, MaxY]" in longitude and latitude degrees (EPSG:4326)
+        min_zoom (int): minimum zoom level
+        max_zoom (int): maximum zoom level
+
+    Returns:
+        A list of (zoom, min_column, min_row, max_column, max_row), inclusive, with rows using the XYZ scheme.
+    """
+    min_lon, min_lat, max_lon, max_lat = extent
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("Extent minimum is greater than maximum: {}".format(extent))
+
+    def to_tile(lon: float, lat: float, zoom: int) -> (int, int):
+        lat = max(-WEB_MERCATOR_MAX_LATITUDE, min(WEB_MERCATOR_MAX_LATITUDE, lat))
+        n = 1 << zoom
+        column = int((lon + 180.0) / 360.0 * n)
+        row = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+        return min(max(column, 0), n - 1), min(max(row, 0), n - 1)
+
+    tile_ranges = []
+    for zoom in range(min_zoom, max_zoom + 1):
+        min_column, min_row = to_tile(min_lon, max_lat, zoom)
+        max_column, max_row = to_tile(max_lon, min_lat, zoom)
+        tile_ranges.append((zoom, min_column, min_row, max_column, max_row))
+    return tile_ranges
+
+
+def open_tile_cache(cache_file: str, name: str = None) -> sqlite3.Connection:
+    """
+    Open a tile cache file, creating it if it does not exist.
+
+    Args:
+        cache_file (str): path to the MBTiles cache file
+        name (str): name for the MBTiles metadata, by default the file name without extension
+
+    Returns:
+        The connection to the cache file, which should be closed when no longer needed.
+    """
+    folder = os.path.dirname(cache_file)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    connection = sqlite3.connect(cache_file)
+    # Write-ahead logging allows readers such as QGIS while the cache is updated.
+    connection.execute("PRAGMA journal_mode=WAL")
+    __open_tile_cache_schema(connection)
+    if name is None:
+        name = os.path.splitext(os.path.basename(cache_file))[0]
+    connection.executemany("INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)",
+                           [("name", name), ("type", "baselayer"), ("version", "1.0"),
+                            ("description", "GeoProcessor tile cache")])
+    connection.commit()
+    return connection
+
+
+def parse_zoom_levels(zoom_levels: str) -> (int, int):
+    """
+    Parse a range of zoom levels from a string with format "MinZoom-MaxZoom" or "Zoom".
+
+    Args:
+        zoom_levels (str): the zoom levels as a string
+
+    Returns:
+        The minimum and maximum zoom levels.
+
+    Raises:
+        ValueError if the string cannot be parsed, a zoom level is not 0 to 24, or the minimum is greater than maximum.
+    """
+    parts = zoom_levels.split("-")
+    if len(parts) > 2:
+        raise ValueError("Zoom levels '{}' are not MinZoom-MaxZoom.".format(zoom_levels))
+    min_zoom = int(parts[0].strip())
+    max_zoom = int(parts[-1].strip())
+    if min_zoom < 0 or max_zoom > 24 or min_zoom > max_zoom:
+        raise ValueError("Zoom levels '{}' are not in the range 0-24.".format(zoom_levels))
+    return min_zoom, max_zoom
+
+
+def put_tile(connection: sqlite3.Connection, zoom: int, column: int, row: int, tile_data: bytes,
+             commit: bool = True) -> None:
+    """
+    Add a tile to the cache, replacing an existing tile at the same position.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+        zoom (int): zoom level
+        column (int): tile column
+        row (int): tile row, XYZ scheme
+        tile_data (bytes): tile image
+        commit (bool): whether to commit the change, use False when adding many tiles and commit at the end
+
+    Returns:
+        None
+    """
+    tile_id = hashlib.sha256(tile_data).hexdigest()
+    now = time.time()
+    connection.execute("INSERT OR IGNORE INTO images (tile_id, tile_data) VALUES (?, ?)", (tile_id, tile_data))
+    connection.execute("INSERT OR REPLACE INTO map (zoom_level, tile_column, tile_row, tile_id, fetched, accessed) "
+                       "VALUES (?, ?, ?, ?, ?, ?)", (zoom, column, (1 << zoom) - 1 - row, tile_id, now, now))
+    if connection.execute("SELECT value FROM metadata WHERE name = 'format'").fetchone() is None:
+        connection.execute("INSERT INTO metadata (name, value) VALUES ('format', ?)",
+                           (__get_tile_format(tile_data),))
+    if commit:
+        connection.commit()
+
+
+def read_tile(connection: sqlite3.Connection, session: requests.Session, url: str, zoom: int, column: int,
+              row: int, ttl: float = None, timeout: float = 30.0) -> bytes or None:
+    """
+    Read a tile from the cache, fetching it from the tile server and adding it to the cache if not cached or expired.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+        session (requests.Session): session to use for connection pooling, from create_tile_session()
+        url (str): tile URL template, see format_tile_url()
+        zoom (int): zoom level
+        column (int): tile column
+        row (int): tile row, XYZ scheme
+        ttl (float): time to live in seconds for a tile after it is fetched, or None if tiles do not expire
+        timeout (float): request timeout in seconds
+
+    Returns:
+        The tile image, or None if the server does not have the tile.
+    """
+    tile_data = get_tile(connection, zoom, column, row, ttl=ttl)
+    if tile_data is None:
+        tile_data = fetch_tile(session, url, zoom, column, row, timeout=timeout)
+        if tile_data is not None:
+            put_tile(connection, zoom, column, row, tile_data)
+    return tile_data
+
+
+def __is_tile_cached(connection: sqlite3.Connection, zoom: int, column: int, row: int, ttl: float = None) -> bool:
+    """
+    Determine whether a tile is in the cache and not expired, without reading the tile or updating its access time.
+
+    Args:
+        connection (sqlite3.Connection): open connection to the cache file
+        zoom (int): zoom level
+        column (int): tile column
+        row (int): tile row, XYZ scheme
+        ttl (float): time to live in seconds for a tile after it is fetched, or None if tiles do not expire
+
+    Returns:
+        True if the tile is cached and not expired, False if not.
+    """
+    tile_row = (1 << zoom) - 1 - row
+    result = connection.execute(
+        "SELECT fetched FROM map WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+        (zoom, column, tile_row)).fetchone()
+    if result is None:
+        return False
+    return ttl is None or result[0] >= time.time() - ttl
+
+
+def seed_tile_cache(cache_file: str, url: str, extent: [float], min_zoom: int, max_zoom: int,
+                    max_workers: int = 8, max_size: int = None, ttl: float = None, timeout: float = 30.0,
+                    session: requests.Session = None) -> dict:
+    """
+    Prefetch the tiles covering an extent for a range of zoom levels into a tile cache.
+    Tiles are fetched concurrently using a pooled session, and are written to the cache by the calling thread
+    because SQLite connections cannot be shared between threads.
+    Tiles that are already cached and not expired are not fetched.
+
+    Args:
+        cache_file (str): path to the MBTiles cache file, created if it does not exist
+        url (str): tile URL template, see format_tile_url()
+        extent ([float]): extent "[MinX, MinY, MaxX, MaxY]" in longitude and latitude degrees (EPSG:4326)
+        min_zoom (int): minimum zoom level
+        max_zoom (int): maximum zoom level
+        max_workers (int): number of concurrent requests
+        max_size (int): maximum total size of the tile images in bytes, or None for no limit
+        ttl (float): time to live in seconds for a tile after it is fetched, or None if tiles do not expire
+        timeout (float): request timeout in seconds
+        session (requests.Session): session to use, by default one is created with create_tile_session()
+
+    Returns:
+        Dictionary with the count of tiles that were "Cached" (already in the cache), "Fetched",
+        "Missing" (not available from the server), "Failed", and "Evicted".
+    """
+    logger = logging.getLogger(__name__)
+    counts = {"Cached": 0, "Fetched": 0, "Missing": 0, "Failed": 0, "Evicted": 0}
+    tile_ranges = get_tile_ranges(extent, min_zoom, max_zoom)
+    if session is None:
+        session = create_tile_session(max_workers)
+
+    connection = open_tile_cache(cache_file)
+    try:
+        # Tile positions (XYZ scheme) that are needed, generated lazily because there may be many.
+        def needed_tiles():
+            for zoom, min_column, min_row, max_column, max_row in tile_ranges:
+                for column in range(min_column, max_column + 1):
+                    for row in range(min_row, max_row + 1):
+                        if __is_tile_cached(connection, zoom, column, row, ttl=ttl):
+                            counts["Cached"] += 1
+                        else:
+                            yield zoom, column, row
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Limit the number of pending requests so that memory use does not depend on the number of tiles.
+            pending = dict()
+            tiles = needed_tiles()
+            more_tiles = True
+            while more_tiles or pending:
+                while more_tiles and len(pending) < max_workers * 4:
+                    tile = next(tiles, None)
+                    if tile is None:
+                        more_tiles = False
+                    else:
+                        pending[executor.submit(fetch_tile, session, url, *tile, timeout)] = tile
+                if not pending:
+                    break
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    zoom, column, row = pending.pop(future)
+                    try:
+                        tile_data = future.result()
+                    except requests.RequestException as e:
+                        counts["Failed"] += 1
+                        logger.warning("Error fetching tile {}/{}/{} ({}).".format(zoom, column, row, e))
+                        continue
+                    if tile_data is None:
+                        counts["Missing"] += 1
+                    else:
+                        put_tile(connection, zoom, column, row, tile_data, commit=False)
+                        counts["Fetched"] += 1
+                connection.commit()
+
+        # Update the metadata for MBTiles readers:
+        # - readers such as GDAL limit the raster to the bounds,
+        #   so use the union with the bounds of previous seeds so that previously cached areas remain visible
+        zoom_range = connection.execute("SELECT MIN(zoom_level), MAX(zoom_level) FROM map").fetchone()
+        if zoom_range[0] is not None:
+            bounds = list(extent)
+            result = connection.execute("SELECT value FROM metadata WHERE name = 'bounds'").fetchone()
+            if result is not None:
+                try:
+                    old_bounds = [float(value) for value in result[0].split(",")]
+                except ValueError:
+                    old_bounds = []
+                if len(old_bounds) == 4:
+                    bounds = [min(bounds[0], old_bounds[0]), min(bounds[1], old_bounds[1]),
+                              max(bounds[2], old_bounds[2]), max(bounds[3], old_bounds[3])]
+            connection.executemany(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                [("minzoom", str(zoom_range[0])), ("maxzoom", str(zoom_range[1])),
+                 ("bounds", ",".join([str(value) for value in bounds]))])
+            connection.commit()
+
+        counts["Evicted"] = evict_tiles(connection, max_size=max_size, ttl=ttl)
+    finally:
+        connection.close()
+
+    logger.info("Seeded tile cache {}: {}".format(cache_file, counts))
+    return counts
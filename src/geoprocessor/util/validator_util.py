@@ -137,10 +137,19 @@ def run_check(command, condition: str, parameter_name: str, parameter_value: str
         second_parameter_name = other_values[0]
         second_parameter_value = other_values[1]
 
-        input_crs = command.command_processor.get_geolayer(parameter_value).get_crs()
-        second_crs = command.command_processor.get_geolayer(second_parameter_value).get_crs()
+        input_geolayer = command.command_processor.get_geolayer(parameter_value)
+        second_geolayer = command.command_processor.get_geolayer(second_parameter_value)
+
+        # Compare the CRS codes, which are cached for lazy-loaded GeoLayers so the layers don't need to be loaded.
+        input_crs_code = input_geolayer.get_crs_code()
+        second_crs_code = second_geolayer.get_crs_code()
+        if input_crs_code and second_crs_code:
+            crs_matches = input_crs_code == second_crs_code
+        else:
+            # A CRS does not have a code, so compare the full CRS.
+            crs_matches = input_geolayer.get_crs() == second_geolayer.get_crs()
 
-        if not input_crs == second_crs:
+        if not crs_matches:
             message = 'The {} ({}) and the {} ({}) do not have the same coordinate reference' \
                       ' system.'.format(parameter_name, parameter_value, second_parameter_name, second_parameter_value)
             recommendation = 'Specify GeoLayers that have the same coordinate reference system.'
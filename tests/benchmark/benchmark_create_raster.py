@@ -0,0 +1,82 @@
+# benchmark_create_raster - measure raster creation time and peak memory for large grids
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark qgis_util.create_qgsrasterlayer() for large grids.
+
+Rasters are created on disk and in GDAL's /vsimem/ file system, with an initial value that must be written
+and with the initial value equal to NoData, in which case tiles are not written.
+The creation time, the peak Python (numpy) memory measured with tracemalloc,
+and the peak resident memory of the process are printed.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_create_raster.py --size 20000 --data-type Float32
+"""
+
+import argparse
+import resource
+import sys
+import time
+import tracemalloc
+
+from qgis.core import QgsApplication
+from osgeo import gdal
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark raster creation")
+    parser.add_argument("--size", type=int, default=20000, help="number of rows and columns")
+    parser.add_argument("--bands", type=int, default=1, help="number of bands")
+    parser.add_argument("--data-type", default="Float32", help="band data type")
+    parser.add_argument("--block-size", type=int, default=256, help="tile size in pixels")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    for in_memory in [False, True]:
+        for label, initial_value, nodata_value in [("InitialValue=1", 1, -9999), ("InitialValue=NoData", None, -9999)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            layer = qgis_util.create_qgsrasterlayer(
+                crs="EPSG:26913", num_rows=args.size, num_columns=args.size, num_bands=args.bands,
+                origin_x=500000.0, origin_y=4500000.0, pixel_width=10.0, pixel_height=-10.0,
+                data_type=args.data_type, initial_value=initial_value, nodata_value=nodata_value,
+                in_memory=in_memory, block_size=args.block_size)
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # ru_maxrss is in kilobytes on Linux.
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+            print("{}x{} {} InMemory={} {}: {:.1f} s, peak numpy/Python {:.1f} MB, process max RSS {:.0f} MB".format(
+                args.size, args.size, args.data_type, in_memory, label, seconds, peak / 1.0e6, max_rss))
+            source = layer.source()
+            layer = None
+            if in_memory:
+                gdal.Unlink(source)
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# benchmark_flatgeobuf - compare FlatGeobuf and GeoJSON file size and read/write speed
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark FlatGeobuf against GeoJSON.
+
+A layer of random polygons is written to both formats, and then read in full and with a bounding box
+covering a small part of the extent.  FlatGeobuf uses its packed Hilbert R-tree to read only the
+features in the bounding box, whereas GeoJSON must be fully parsed.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_flatgeobuf.py --features 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from qgis.core import QgsApplication
+from qgis.core import QgsFeature
+from qgis.core import QgsField
+from qgis.core import QgsGeometry
+from qgis.core import QgsRectangle
+from qgis.core import QgsVectorLayer
+from PyQt5.QtCore import QVariant
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def create_polygon_layer(count: int, extent: float) -> QgsVectorLayer:
+    """
+    Create an in-memory layer of small random squares with a few attributes.
+    """
+    layer = QgsVectorLayer("Polygon?crs=EPSG:26913", "polygons", "memory")
+    layer.dataProvider().addAttributes([QgsField("id", QVariant.Int),
+                                        QgsField("name", QVariant.String),
+                                        QgsField("value", QVariant.Double)])
+    layer.updateFields()
+    features = []
+    for i in range(count):
+        x = random.uniform(0, extent)
+        y = random.uniform(0, extent)
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(x, y, x + 100.0, y + 100.0)))
+        feature.setAttributes([i, "feature{}".format(i), random.uniform(0, 1000)])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def time_read(path: str, bounding_box: QgsRectangle = None) -> (float, int):
+    """
+    Read a file, optionally with a bounding box, returning the seconds and number of features read.
+    """
+    start = time.perf_counter()
+    layer = qgis_util.read_qgsvectorlayer_from_file(path, bounding_box=bounding_box)
+    count = layer.featureCount()
+    return time.perf_counter() - start, count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark FlatGeobuf and GeoJSON")
+    parser.add_argument("--features", type=int, default=1000000, help="number of polygon features")
+    parser.add_argument("--folder", default=None, help="folder for output files (default is a temporary folder)")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    random.seed(0)
+    extent = 1000000.0
+
+    folder = args.folder
+    if folder is None:
+        folder = tempfile.mkdtemp(prefix="benchmark-flatgeobuf-")
+    layer = create_polygon_layer(args.features, extent)
+    # Bounding box covering 1% of the extent.
+    bounding_box = QgsRectangle(0.0, 0.0, extent / 10.0, extent / 10.0)
+
+    fgb_file = os.path.join(folder, "benchmark.fgb")
+    start = time.perf_counter()
+    qgis_util.write_qgsvectorlayer_to_flatgeobuf(layer, fgb_file, "EPSG:26913")
+    fgb_write = time.perf_counter() - start
+
+    geojson_file = os.path.join(folder, "benchmark.geojson")
+    start = time.perf_counter()
+    qgis_util.write_qgsvectorlayer_to_geojson(layer, geojson_file, "EPSG:4326", 5)
+    geojson_write = time.perf_counter() - start
+
+    # The GeoJSON file is in EPSG:4326 so transform the bounding box for a fair comparison.
+    geojson_bounding_box = qgis_util.read_qgsvectorlayer_from_file(geojson_file).extent()
+    geojson_bounding_box = QgsRectangle(geojson_bounding_box.xMinimum(), geojson_bounding_box.yMinimum(),
+                                        geojson_bounding_box.xMinimum() + geojson_bounding_box.width() / 10.0,
+                                        geojson_bounding_box.yMinimum() + geojson_bounding_box.height() / 10.0)
+
+    for label, path, write_seconds, box in [
+            ("FlatGeobuf", fgb_file, fgb_write, bounding_box),
+            ("GeoJSON", geojson_file, geojson_write, geojson_bounding_box)]:
+        full_seconds, full_count = time_read(path)
+        box_seconds, box_count = time_read(path, box)
+        print("{}: {:.1f} MB, write {:.1f} s, read all {:.1f} s ({} features), read bbox {:.2f} s ({} features)".format(
+            label, os.path.getsize(path) / 1.0e6, write_seconds, full_seconds, full_count, box_seconds, box_count))
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
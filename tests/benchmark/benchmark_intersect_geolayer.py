@@ -0,0 +1,138 @@
+# benchmark_intersect_geolayer - compare IntersectGeoLayer attribute join methods
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark the IntersectGeoLayer AttributeJoin method.
+
+The spatial index join (qgis_util.join_qgsvectorlayer_attributes_by_location) is compared with the
+original nested loop that tested every line against every polygon.
+The nested loop is only run on a sample of the lines because it is too slow for the full data.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_intersect_geolayer.py --lines 100000 --polygons 10000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from qgis.core import QgsApplication
+from qgis.core import QgsFeature
+from qgis.core import QgsField
+from qgis.core import QgsGeometry
+from qgis.core import QgsPointXY
+from qgis.core import QgsRectangle
+from qgis.core import QgsVectorLayer
+from PyQt5.QtCore import QVariant
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def create_line_layer(count: int, extent: float) -> QgsVectorLayer:
+    """
+    Create an in-memory layer of short random lines.
+    """
+    layer = QgsVectorLayer("LineString?crs=EPSG:26913", "lines", "memory")
+    layer.dataProvider().addAttributes([QgsField("line_id", QVariant.Int)])
+    layer.updateFields()
+    features = []
+    for i in range(count):
+        x = random.uniform(0, extent)
+        y = random.uniform(0, extent)
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPolylineXY(
+            [QgsPointXY(x, y), QgsPointXY(x + random.uniform(-50, 50), y + random.uniform(-50, 50))]))
+        feature.setAttributes([i])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def create_polygon_layer(count: int, extent: float) -> QgsVectorLayer:
+    """
+    Create an in-memory layer of square polygons in a grid covering the extent.
+    """
+    layer = QgsVectorLayer("Polygon?crs=EPSG:26913", "polygons", "memory")
+    layer.dataProvider().addAttributes([QgsField("zone", QVariant.String), QgsField("value", QVariant.Double)])
+    layer.updateFields()
+    columns = int(count ** 0.5)
+    size = extent / columns
+    features = []
+    for i in range(columns * columns):
+        x = (i % columns) * size
+        y = (i // columns) * size
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(x, y, x + size, y + size)))
+        feature.setAttributes(["zone{}".format(i), float(i)])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def nested_loop_join(line_layer: QgsVectorLayer, polygon_layer: QgsVectorLayer, sample: int) -> float:
+    """
+    Time the original nested loop approach for a sample of the lines, returning seconds per line.
+    """
+    start = time.perf_counter()
+    count = 0
+    for line in line_layer.getFeatures():
+        matches = []
+        for polygon in polygon_layer.getFeatures():
+            if line.geometry().intersects(polygon.geometry()):
+                matches.append(polygon["zone"])
+        count += 1
+        if count >= sample:
+            break
+    return (time.perf_counter() - start) / count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark IntersectGeoLayer AttributeJoin")
+    parser.add_argument("--lines", type=int, default=100000, help="number of line features")
+    parser.add_argument("--polygons", type=int, default=10000, help="number of polygon features")
+    parser.add_argument("--sample", type=int, default=100, help="lines to time for the nested loop")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    random.seed(0)
+    extent = 100000.0
+
+    line_layer = create_line_layer(args.lines, extent)
+    polygon_layer = create_polygon_layer(args.polygons, extent)
+
+    seconds_per_line = nested_loop_join(line_layer, polygon_layer, args.sample)
+    print("Nested loop: {:.1f} s estimated for {} lines ({:.4f} s/line, {} sampled)".format(
+        seconds_per_line * args.lines, args.lines, seconds_per_line, args.sample))
+
+    start = time.perf_counter()
+    join_count = qgis_util.join_qgsvectorlayer_attributes_by_location(line_layer, polygon_layer, ["zone", "value"])
+    print("Spatial index: {:.1f} s for {} lines ({} joined)".format(
+        time.perf_counter() - start, args.lines, join_count))
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
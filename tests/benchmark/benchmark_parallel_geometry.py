@@ -0,0 +1,130 @@
+# benchmark_parallel_geometry - compare single-process and chunked multi-process geometry simplify and fix
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark chunked, multi-process geometry processing against the single-process QGIS algorithms.
+
+A layer of random polygons with many vertices, some of which are invalid (self-intersecting "bow ties"),
+is simplified and fixed using the 'native:simplifygeometries' and 'native:fixgeometries' algorithms,
+and then using qgis_util.process_qgsvectorlayer_geometries() with an increasing number of worker processes.
+The output feature count and order are checked against the algorithm output.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example on a 16-core computer:
+
+    python tests/benchmark/benchmark_parallel_geometry.py --features 1000000 --workers 1,2,4,8,16
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from qgis.core import QgsApplication
+from qgis.core import QgsFeature
+from qgis.core import QgsField
+from qgis.core import QgsGeometry
+from qgis.core import QgsPointXY
+from qgis.core import QgsVectorLayer
+from PyQt5.QtCore import QVariant
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def create_polygon_layer(count: int, vertices: int, extent: float) -> QgsVectorLayer:
+    """
+    Create an in-memory layer of random jagged polygons, every tenth of which is self-intersecting.
+    """
+    layer = QgsVectorLayer("Polygon?crs=EPSG:26913", "polygons", "memory")
+    layer.dataProvider().addAttributes([QgsField("id", QVariant.Int), QgsField("name", QVariant.String)])
+    layer.updateFields()
+    features = []
+    for i in range(count):
+        x = random.uniform(0, extent)
+        y = random.uniform(0, extent)
+        points = []
+        for j in range(vertices):
+            angle = 2.0 * math.pi * j / vertices
+            radius = random.uniform(800.0, 1000.0)
+            points.append(QgsPointXY(x + radius * math.cos(angle), y + radius * math.sin(angle)))
+        if i % 10 == 0:
+            # Swap two vertices to create a self-intersection.
+            points[0], points[vertices // 2] = points[vertices // 2], points[0]
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPolygonXY([points]))
+        feature.setAttributes([i, "feature{}".format(i)])
+        features.append(feature)
+        if len(features) >= 10000:
+            layer.dataProvider().addFeatures(features)
+            features = []
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def feature_ids(layer: QgsVectorLayer) -> [int]:
+    """
+    Return the 'id' attribute of the features in order, to check that the order is preserved.
+    """
+    return [feature["id"] for feature in layer.getFeatures()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark chunked multi-process geometry processing")
+    parser.add_argument("--features", type=int, default=200000, help="number of polygon features")
+    parser.add_argument("--vertices", type=int, default=200, help="number of vertices per polygon")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="comma-separated worker counts")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="features per chunk")
+    parser.add_argument("--tolerance", type=float, default=50.0, help="simplify tolerance")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    processor = qgis_util.initialize_qgis_processor()
+    random.seed(0)
+
+    layer = create_polygon_layer(args.features, args.vertices, 1000000.0)
+    worker_counts = [int(workers) for workers in args.workers.split(",")]
+
+    for operation, algorithm, parameters in [
+            ("Simplify", "native:simplifygeometries", {"METHOD": 0, "TOLERANCE": args.tolerance}),
+            ("Fix", "native:fixgeometries", {})]:
+        algorithm_parameters = {"INPUT": layer, "OUTPUT": "memory:"}
+        algorithm_parameters.update(parameters)
+        start = time.perf_counter()
+        expected = qgis_util.run_processing(processor, algorithm, algorithm_parameters)["OUTPUT"]
+        algorithm_seconds = time.perf_counter() - start
+        expected_ids = feature_ids(expected)
+        print("{} {}: {:.1f} s ({} features)".format(operation, algorithm, algorithm_seconds, len(expected_ids)))
+
+        for workers in worker_counts:
+            start = time.perf_counter()
+            output = qgis_util.process_qgsvectorlayer_geometries(layer, operation, tolerance=args.tolerance,
+                                                                 max_workers=workers, chunk_size=args.chunk_size)
+            seconds = time.perf_counter() - start
+            matches = feature_ids(output) == expected_ids
+            print("{} MaxWorkers={}: {:.1f} s, speedup {:.1f}x, same features and order: {}".format(
+                operation, workers, seconds, algorithm_seconds / seconds, matches))
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
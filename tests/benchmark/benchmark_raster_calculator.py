@@ -0,0 +1,82 @@
+# benchmark_raster_calculator - measure block-windowed raster expression time and peak memory
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark qgis_util.calculate_raster_expression() for large rasters.
+
+Two input rasters are created on disk with create_qgsrasterlayer(), and a band ratio with a condition
+is calculated with an increasing number of worker threads.
+The calculation time and the peak resident memory of the process are printed,
+which should not depend on the raster size.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_raster_calculator.py --size 40000 --workers 1,2,4,8
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from qgis.core import QgsApplication
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the raster calculator")
+    parser.add_argument("--size", type=int, default=20000, help="number of rows and columns")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--expression", default="where(A > 0, (A - B) / (A + B), 0)", help="expression")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    with tempfile.TemporaryDirectory() as folder:
+        inputs = dict()
+        for name, initial_value in [("A", 3), ("B", 1)]:
+            raster_file = os.path.join(folder, "{}.tif".format(name))
+            qgis_util.create_qgsrasterlayer(
+                crs="EPSG:26913", layer_name=name, num_rows=args.size, num_columns=args.size, num_bands=1,
+                origin_x=500000.0, origin_y=4500000.0, pixel_width=10.0, pixel_height=-10.0,
+                data_type="Int16", initial_value=initial_value, nodata_value=-9999, output_file=raster_file)
+            inputs[name] = (raster_file, 1)
+
+        for workers in [int(workers) for workers in args.workers.split(",")]:
+            output_file = os.path.join(folder, "output{}.tif".format(workers))
+            start = time.perf_counter()
+            qgis_util.calculate_raster_expression(args.expression, inputs, output_file, data_type="Float32",
+                                                  max_workers=workers)
+            seconds = time.perf_counter() - start
+            # ru_maxrss is in kilobytes on Linux.
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+            print("{}x{} MaxWorkers={}: {:.1f} s, process max RSS {:.0f} MB".format(
+                args.size, args.size, workers, seconds, max_rss))
+            os.remove(output_file)
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# benchmark_raster_statistics - compare repeated raster band statistics requests with provider statistics
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark RasterGeoLayer.get_band_statistics() for a large raster.
+
+A raster with random values is created and the exact and approximate statistics with a histogram
+are requested several times, for a RasterGeoLayer and then for a new RasterGeoLayer that uses the '.aux.xml' file.
+The time is compared with the QGIS provider statistics, which scan the raster for each new layer.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_raster_statistics.py --size 20000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy
+from osgeo import gdal
+from qgis.core import QgsApplication
+from qgis.core import QgsRasterBandStats
+
+from geoprocessor.core.RasterGeoLayer import RasterGeoLayer
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark raster band statistics")
+    parser.add_argument("--size", type=int, default=20000, help="number of raster rows and columns")
+    parser.add_argument("--repeat", type=int, default=3, help="number of requests for each layer")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Create a tiled raster with random values and overviews, used for approximate statistics.
+        raster_file = os.path.join(folder, "values.tif")
+        dataset = gdal.GetDriverByName("GTiff").Create(raster_file, args.size, args.size, 1, gdal.GDT_Float32,
+                                                       options=["TILED=YES"])
+        dataset.SetGeoTransform((500000.0, 10.0, 0.0, 4500000.0, 0.0, -10.0))
+        random = numpy.random.default_rng(0)
+        for y_offset in range(0, args.size, 256):
+            rows = min(256, args.size - y_offset)
+            dataset.GetRasterBand(1).WriteArray(
+                random.uniform(0.0, 100.0, (rows, args.size)).astype(numpy.float32), 0, y_offset)
+        dataset.BuildOverviews("AVERAGE", [2, 4, 8, 16])
+        dataset = None
+
+        for approximate in [True, False]:
+            for layer_number in range(2):
+                geolayer = RasterGeoLayer("values", "values",
+                                          qgs_raster_layer=qgis_util.read_qgsrasterlayer_from_file(raster_file))
+                for request in range(args.repeat):
+                    start = time.perf_counter()
+                    statistics = geolayer.get_band_statistics(1, approximate=approximate, histogram_bins=256)
+                    print("get_band_statistics approximate={} layer {} request {}: {:.3f} s, mean={:.4f}".format(
+                        approximate, layer_number + 1, request + 1, time.perf_counter() - start,
+                        statistics["Mean"]))
+
+        qgs_raster_layer = qgis_util.read_qgsrasterlayer_from_file(raster_file)
+        start = time.perf_counter()
+        stats = qgs_raster_layer.dataProvider().bandStatistics(1, QgsRasterBandStats.All)
+        print("Provider bandStatistics: {:.3f} s, mean={:.4f}".format(time.perf_counter() - start, stats.mean))
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# benchmark_rasterize - compare tiled rasterize with the gdal:rasterize algorithm for large outputs
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark qgis_util.rasterize_qgsvectorlayer() for large output grids.
+
+A layer of random polygons with a numeric attribute is created and rasterized with the 'gdal:rasterize'
+QGIS algorithm, and then with the tiled GTiff and VRT outputs with an increasing number of worker threads.
+The time and the peak resident memory of the process are printed,
+and the tiled outputs are checked to have the same checksum as the algorithm output.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_rasterize.py --features 100000 --size 40000 --workers 1,4,8
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from osgeo import gdal
+from qgis.core import QgsApplication
+from qgis.core import QgsFeature
+from qgis.core import QgsField
+from qgis.core import QgsGeometry
+from qgis.core import QgsRectangle
+from qgis.core import QgsVectorLayer
+from PyQt5.QtCore import QVariant
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def create_polygon_layer(num_features: int, extent: float) -> QgsVectorLayer:
+    """
+    Create an in-memory layer of random rectangles with a 'value' attribute.
+    """
+    layer = QgsVectorLayer("Polygon?crs=EPSG:26913", "polygons", "memory")
+    layer.dataProvider().addAttributes([QgsField("value", QVariant.Double)])
+    layer.updateFields()
+    generator = random.Random(0)
+    features = []
+    for i in range(num_features):
+        size = generator.uniform(extent / 5000.0, extent / 500.0)
+        x = generator.uniform(0.0, extent - size)
+        y = generator.uniform(0.0, extent - size)
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(x, y, x + size, y + size)))
+        feature.setAttributes([float(i % 250 + 1)])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def checksum(raster_file: str) -> int:
+    """
+    Return the GDAL checksum of the first band.
+    """
+    return gdal.Open(raster_file).GetRasterBand(1).Checksum()
+
+
+def max_rss_mb() -> float:
+    """
+    Return the process peak resident memory in megabytes (ru_maxrss is in kilobytes on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tiled rasterize")
+    parser.add_argument("--features", type=int, default=100000, help="number of polygons")
+    parser.add_argument("--size", type=int, default=20000, help="number of output rows and columns")
+    parser.add_argument("--tile-size", type=int, default=2048, help="tile size in cells")
+    parser.add_argument("--workers", default="1,4,8", help="comma-separated worker counts")
+    parser.add_argument("--skip-algorithm", action="store_true", help="don't run gdal:rasterize")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    processor = qgis_util.initialize_qgis_processor()
+
+    layer = create_polygon_layer(args.features, 100000.0)
+    extent = layer.extent()
+
+    with tempfile.TemporaryDirectory() as folder:
+        expected_checksum = None
+        if not args.skip_algorithm:
+            output_file = os.path.join(folder, "algorithm.tif")
+            start = time.perf_counter()
+            qgis_util.run_processing(processor, "gdal:rasterize",
+                                     {"INPUT": layer, "FIELD": "value", "UNITS": 0, "WIDTH": args.size,
+                                      "HEIGHT": args.size, "DATA_TYPE": 5, "NODATA": 0,
+                                      "EXTENT": "{},{},{},{}".format(extent.xMinimum(), extent.xMaximum(),
+                                                                     extent.yMinimum(), extent.yMaximum()),
+                                      "OUTPUT": output_file})
+            print("gdal:rasterize: {:.1f} s, process max RSS {:.0f} MB".format(
+                time.perf_counter() - start, max_rss_mb()))
+            expected_checksum = checksum(output_file)
+            os.remove(output_file)
+
+        for output_format, ext in [("GTiff", "tif"), ("VRT", "vrt")]:
+            for workers in [int(workers) for workers in args.workers.split(",")]:
+                output_file = os.path.join(folder, "tiled{}-{}.{}".format(output_format, workers, ext))
+                start = time.perf_counter()
+                tile_count = qgis_util.rasterize_qgsvectorlayer(
+                    layer, output_file, extent, args.size, args.size, attribute="value", data_type="Float32",
+                    nodata_value=0, tile_size=args.tile_size, max_workers=workers, output_format=output_format)
+                seconds = time.perf_counter() - start
+                same = "" if expected_checksum is None else \
+                    ", same as algorithm: {}".format(checksum(output_file) == expected_checksum)
+                print("Tiled {} MaxWorkers={}: {} tiles, {:.1f} s, process max RSS {:.0f} MB{}".format(
+                    output_format, workers, tile_count, seconds, max_rss_mb(), same))
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
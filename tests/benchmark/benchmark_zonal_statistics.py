@@ -0,0 +1,135 @@
+# benchmark_zonal_statistics - compare zonal statistics methods for many zones
+# ________________________________________________________________NoticeStart_
+# GeoProcessor
+# Copyright (C) 2017-2026 Open Water Foundation
+#
+# GeoProcessor is free software:  you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     GeoProcessor is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with GeoProcessor.  If not, see <https://www.gnu.org/licenses/>.
+# ________________________________________________________________NoticeEnd___
+
+"""
+Benchmark qgis_util.calculate_zonal_statistics() with the "rasterize" and "window" methods.
+
+A raster with random values is created, and a grid of square polygon zones (by default 100,000)
+covering the raster is created.  The statistics are calculated with each method
+and the results are checked to be the same, and the time is compared with the
+'native:zonalstatisticsfb' QGIS algorithm.
+
+This is not a pytest test.  Run with the QGIS version of Python, for example:
+
+    python tests/benchmark/benchmark_zonal_statistics.py --zones 100000 --size 10000
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy
+from osgeo import gdal
+from qgis.core import QgsApplication
+from qgis.core import QgsFeature
+from qgis.core import QgsGeometry
+from qgis.core import QgsRectangle
+from qgis.core import QgsVectorLayer
+
+import geoprocessor.util.qgis_util as qgis_util
+
+
+def create_zone_layer(zones_per_side: int, extent: float, origin_x: float, origin_y: float) -> QgsVectorLayer:
+    """
+    Create an in-memory layer of square polygon zones covering the raster.
+    """
+    layer = QgsVectorLayer("Polygon?crs=EPSG:26913", "zones", "memory")
+    size = extent / zones_per_side
+    features = []
+    for row in range(zones_per_side):
+        for column in range(zones_per_side):
+            x = origin_x + column * size
+            y = origin_y - (row + 1) * size
+            feature = QgsFeature(layer.fields())
+            feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(x, y, x + size, y + size)))
+            features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def read_attribute(layer: QgsVectorLayer, attribute_name: str) -> numpy.ndarray:
+    """
+    Return the attribute values in feature order, with NULL as NaN.
+    """
+    return numpy.array([feature[attribute_name] if feature[attribute_name] is not None else math.nan
+                        for feature in layer.getFeatures()], dtype=numpy.float64)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark zonal statistics")
+    parser.add_argument("--zones", type=int, default=100000, help="approximate number of zones")
+    parser.add_argument("--size", type=int, default=10000, help="number of raster rows and columns")
+    args = parser.parse_args()
+
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    processor = qgis_util.initialize_qgis_processor()
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Create a tiled raster with random values and some NoData.
+        raster_file = os.path.join(folder, "values.tif")
+        pixel_size = 10.0
+        origin_x = 500000.0
+        origin_y = 4500000.0
+        dataset = gdal.GetDriverByName("GTiff").Create(raster_file, args.size, args.size, 1, gdal.GDT_Float32,
+                                                       options=["TILED=YES"])
+        dataset.SetGeoTransform((origin_x, pixel_size, 0.0, origin_y, 0.0, -pixel_size))
+        band = dataset.GetRasterBand(1)
+        band.SetNoDataValue(-9999)
+        random = numpy.random.default_rng(0)
+        for y_offset in range(0, args.size, 256):
+            rows = min(256, args.size - y_offset)
+            values = random.uniform(0.0, 100.0, (rows, args.size)).astype(numpy.float32)
+            values[random.random((rows, args.size)) < 0.01] = -9999
+            band.WriteArray(values, 0, y_offset)
+        band = None
+        dataset = None
+
+        zones_per_side = int(math.sqrt(args.zones))
+        results = {}
+        for method in ["rasterize", "window"]:
+            layer = create_zone_layer(zones_per_side, args.size * pixel_size, origin_x, origin_y)
+            start = time.perf_counter()
+            zone_count = qgis_util.calculate_zonal_statistics(layer, raster_file,
+                                                              statistics=["count", "mean", "min", "max"],
+                                                              method=method)
+            seconds = time.perf_counter() - start
+            print("Method {}: {} zones, {:.1f} s".format(method, zone_count, seconds))
+            results[method] = [read_attribute(layer, name) for name in ["count", "mean", "min", "max"]]
+
+        same = all(numpy.allclose(a, b, equal_nan=True) for a, b in zip(results["rasterize"], results["window"]))
+        print("Same results for both methods: {}".format(same))
+
+        layer = create_zone_layer(zones_per_side, args.size * pixel_size, origin_x, origin_y)
+        start = time.perf_counter()
+        qgis_util.run_processing(processor, "native:zonalstatisticsfb",
+                                 {"INPUT": layer, "INPUT_RASTER": raster_file, "RASTER_BAND": 1,
+                                  "COLUMN_PREFIX": "_", "STATISTICS": [0, 2, 5, 6], "OUTPUT": "memory:"})
+        print("Algorithm native:zonalstatisticsfb: {:.1f} s".format(time.perf_counter() - start))
+
+    qgs.exitQgis()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import gzip
+import json
+
+import pytest
+
+import geoprocessor.util.geojson_util as geojson_util
+
+
+def make_feature(i: int) -> dict:
+    return {"type": "Feature", "properties": {"id": i, "name": "feature {}".format(i), "value": i * 1.5},
+            "geometry": {"type": "Point", "coordinates": [-105.0 + i * 0.001, 40.0 + i * 0.001]}}
+
+
+@pytest.fixture
+def features():
+    return [make_feature(i) for i in range(25)]
+
+
+@pytest.fixture
+def feature_collection_file(tmpdir, features):
+    file = tmpdir.join("features.geojson")
+    collection = {"type": "FeatureCollection", "name": "test",
+                  "crs": {"type": "name", "properties": {"name": "urn:ogc:def:crs:EPSG::26913"}},
+                  "features": features}
+    file.write(json.dumps(collection, indent=2))
+    return str(file)
+
+
+# Tests for read_geojson_features()
+def test_read_geojson_features_feature_collection(feature_collection_file, features):
+    """ Test reading all features from a FeatureCollection. """
+    assert list(geojson_util.read_geojson_features(feature_collection_file)) == features
+
+
+def test_read_geojson_features_small_chunks(feature_collection_file, features):
+    """ Test that features are read correctly when values span many chunks. """
+    assert list(geojson_util.read_geojson_features(feature_collection_file, chunk_size=7)) == features
+
+
+def test_read_geojson_features_members_before_features(feature_collection_file):
+    """ Test that members before 'features' are available when the first feature is read. """
+    members = dict()
+    generator = geojson_util.read_geojson_features(feature_collection_file, members=members)
+    next(generator)
+    assert members["name"] == "test"
+    assert members["crs"]["properties"]["name"] == "urn:ogc:def:crs:EPSG::26913"
+    generator.close()
+
+
+def test_read_geojson_features_members_after_features(tmpdir, features):
+    """ Test that members after 'features' are read. """
+    file = tmpdir.join("features.geojson")
+    file.write('{"features": ' + json.dumps(features) + ', "type": "FeatureCollection", "bbox": [0, 1, 2, 3]}')
+    members = dict()
+    assert list(geojson_util.read_geojson_features(str(file), members=members, chunk_size=16)) == features
+    assert members["type"] == "FeatureCollection"
+    assert members["bbox"] == [0, 1, 2, 3]
+
+
+def test_read_geojson_features_empty_collection(tmpdir):
+    """ Test reading a FeatureCollection with no features. """
+    file = tmpdir.join("empty.geojson")
+    file.write('{"type": "FeatureCollection", "features": []}')
+    assert list(geojson_util.read_geojson_features(str(file))) == []
+
+
+def test_read_geojson_features_sequence(tmpdir, features):
+    """ Test reading newline-delimited GeoJSON (GeoJSONSeq). """
+    file = tmpdir.join("features.geojsonl")
+    file.write("\n".join([json.dumps(feature) for feature in features]) + "\n")
+    assert list(geojson_util.read_geojson_features(str(file), chunk_size=10)) == features
+
+
+def test_read_geojson_features_rfc8142_sequence(tmpdir, features):
+    """ Test reading an RFC 8142 GeoJSON text sequence, which uses record separators. """
+    file = tmpdir.join("features.geojsons")
+    file.write("".join(["\x1e" + json.dumps(feature) + "\n" for feature in features]))
+    assert list(geojson_util.read_geojson_features(str(file))) == features
+
+
+def test_read_geojson_features_gzip(tmpdir, features):
+    """ Test reading a gzip-compressed FeatureCollection. """
+    file = str(tmpdir.join("features.geojson.gz"))
+    with gzip.open(file, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "FeatureCollection", "features": features}))
+    assert list(geojson_util.read_geojson_features(file, chunk_size=100)) == features
+
+
+def test_read_geojson_features_truncated(tmpdir, features):
+    """ Test that a truncated file raises ValueError. """
+    file = tmpdir.join("truncated.geojson")
+    file.write(json.dumps({"type": "FeatureCollection", "features": features})[:-50])
+    with pytest.raises(ValueError):
+        list(geojson_util.read_geojson_features(str(file)))
+
+
+def test_read_geojson_features_not_json(tmpdir):
+    """ Test that a file that is not JSON raises ValueError. """
+    file = tmpdir.join("bad.geojson")
+    file.write("this is not GeoJSON")
+    with pytest.raises(ValueError):
+        list(geojson_util.read_geojson_features(str(file)))
+
+
+# Tests for is_gzip_file()
+def test_is_gzip_file(tmpdir, feature_collection_file):
+    """ Test that gzip files are detected by content, not extension. """
+    file = str(tmpdir.join("features.gz"))
+    with gzip.open(file, "wb") as f:
+        f.write(b"{}")
+    assert geojson_util.is_gzip_file(file)
+    assert not geojson_util.is_gzip_file(feature_collection_file)
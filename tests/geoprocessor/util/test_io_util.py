@@ -228,4 +228,35 @@ def test_format_standard_file_header_is_xml():
     assert pytest.approx(io_util.format_standard_file_header("", 120, True) == expected)
 
 def test_get_col_names_from_delimited_file():
-    pass
\ No newline at end of file
+    pass
+
+# Create a folder of files for testing list_files()
+@pytest.fixture
+def spatial_data_folder(tmpdir):
+    tmpdir.join("b.shp").write("")
+    tmpdir.join("a.geojson").write("")
+    tmpdir.join("a.dbf").write("")
+    tmpdir.join("C.GeoJSON").write("")
+    tmpdir.mkdir("sub").join("d.shp").write("")
+    return str(tmpdir)
+
+
+# Tests for list_files()
+def test_list_files_extensions(spatial_data_folder):
+    """ Test that only files with the extensions are listed, case-insensitive, in sorted order. """
+    files = io_util.list_files(spatial_data_folder, extensions=[".shp", ".geojson"])
+    assert [os.path.basename(file) for file in files] == ["C.GeoJSON", "a.geojson", "b.shp"]
+
+
+def test_list_files_pattern(spatial_data_folder):
+    """ Test that the glob-style pattern is matched against the file name. """
+    files = io_util.list_files(spatial_data_folder, pattern="a.*")
+    assert [os.path.basename(file) for file in files] == ["a.dbf", "a.geojson"]
+
+
+def test_list_files_recursive(spatial_data_folder):
+    """ Test that files in sub-folders are only listed when recursive. """
+    files = io_util.list_files(spatial_data_folder, extensions=[".shp"])
+    assert files == [os.path.join(spatial_data_folder, "b.shp")]
+    files = io_util.list_files(spatial_data_folder, extensions=[".shp"], recursive=True)
+    assert files == [os.path.join(spatial_data_folder, "b.shp"), os.path.join(spatial_data_folder, "sub", "d.shp")]
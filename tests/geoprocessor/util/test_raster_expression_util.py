@@ -0,0 +1,50 @@
+import pytest
+
+import geoprocessor.util.raster_expression_util as raster_expression_util
+
+
+def evaluate(expression: str, **variables) -> object:
+    """ Parse and evaluate an expression with scalar values, using Python functions in place of NumPy. """
+    code, used_variables = raster_expression_util.parse_raster_expression(expression, list(variables.keys()))
+    namespace = {"where": lambda condition, x, y: x if condition else y, "abs": abs, "pi": 3.14159}
+    namespace.update(variables)
+    return eval(code, {"__builtins__": {}}, namespace)
+
+
+# Tests for parse_raster_expression()
+def test_parse_raster_expression_used_variables():
+    """ Test that only the variables used in the expression are returned, sorted. """
+    code, used_variables = raster_expression_util.parse_raster_expression("(C - A) / (C + A)", ["A", "B", "C"])
+    assert used_variables == ["A", "C"]
+
+
+def test_parse_raster_expression_arithmetic():
+    """ Test evaluating arithmetic, functions and constants. """
+    assert evaluate("(A - B) / (A + B)", A=3.0, B=1.0) == 0.5
+    assert evaluate("abs(A) * 2 + pi", A=-1) == 2 + 3.14159
+
+
+def test_parse_raster_expression_conditional():
+    """ Test that 'if' expressions are converted to where(). """
+    assert evaluate("1 if A > 10 else 0", A=11) == 1
+    assert evaluate("1 if A > 10 else 0", A=9) == 0
+    assert evaluate("where(A > 10, A, 0)", A=20) == 20
+
+
+def test_parse_raster_expression_boolean_operators():
+    """ Test that 'and', 'or' and chained comparisons are converted to element-wise operators. """
+    assert evaluate("A > 1 and B > 1", A=2, B=2)
+    assert not evaluate("A > 1 and B > 1", A=2, B=0)
+    assert evaluate("A > 1 or B > 1", A=0, B=2)
+    assert evaluate("0 < A < 5", A=3)
+    assert not evaluate("0 < A < 5", A=7)
+
+
+@pytest.mark.parametrize("expression", [
+    "", "A +", "__import__('os')", "open('file')", "A.real", "A[0]", "'text'", "lambda: 1",
+    "B + 1", "where", "where(A, x=1)", "[A, A]", "True"
+])
+def test_parse_raster_expression_invalid(expression):
+    """ Test that invalid or unsafe expressions raise ValueError. """
+    with pytest.raises(ValueError):
+        raster_expression_util.parse_raster_expression(expression, ["A"])
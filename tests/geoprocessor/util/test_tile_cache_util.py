@@ -0,0 +1,149 @@
+import http.server
+import threading
+import time
+
+import pytest
+
+# The tile cache uses the 'requests' package for connection pooling.
+pytest.importorskip("requests")
+
+import geoprocessor.util.tile_cache_util as tile_cache_util
+
+
+class TileRequestHandler(http.server.BaseHTTPRequestHandler):
+    """ Stand-in tile server that returns the request path as the tile, and 404 for zoom level 9. """
+
+    requests = []
+
+    def do_GET(self) -> None:
+        TileRequestHandler.requests.append(self.path)
+        if self.path.startswith("/9/"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        content = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def tile_server():
+    """ Run the stand-in tile server on a local port and return the tile URL template. """
+    TileRequestHandler.requests = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TileRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/{{z}}/{{x}}/{{y}}".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_format_tile_url():
+    """ Test formatting XYZ, TMS and WMS bounding box tile URLs. """
+    assert tile_cache_util.format_tile_url("https://host/{z}/{x}/{y}.png", 3, 2, 1) == "https://host/3/2/1.png"
+    assert tile_cache_util.format_tile_url("https://host/{z}/{x}/{-y}.png", 3, 2, 1) == "https://host/3/2/6.png"
+    url = tile_cache_util.format_tile_url("https://host/wms?BBOX={bbox-epsg-3857}", 1, 1, 0)
+    bbox = [float(value) for value in url.split("=")[1].split(",")]
+    assert bbox == pytest.approx([0.0, 0.0, tile_cache_util.WEB_MERCATOR_HALF_WIDTH,
+                                  tile_cache_util.WEB_MERCATOR_HALF_WIDTH])
+
+
+def test_get_tile_ranges():
+    """ Test the tiles covering an extent. """
+    assert tile_cache_util.get_tile_ranges([-180, -85, 180, 85], 0, 1) == [(0, 0, 0, 0, 0), (1, 0, 0, 1, 1)]
+    # Denver, Colorado at zoom level 10.
+    assert tile_cache_util.get_tile_ranges([-104.99, 39.74, -104.99, 39.74], 10, 10) == [(10, 213, 388, 213, 388)]
+    with pytest.raises(ValueError):
+        tile_cache_util.get_tile_ranges([10, 0, 0, 10], 0, 1)
+
+
+def test_parse_zoom_levels():
+    """ Test parsing zoom level ranges. """
+    assert tile_cache_util.parse_zoom_levels("0-12") == (0, 12)
+    assert tile_cache_util.parse_zoom_levels("5") == (5, 5)
+    for zoom_levels in ["12-0", "a-b", "0-30", "1-2-3"]:
+        with pytest.raises(ValueError):
+            tile_cache_util.parse_zoom_levels(zoom_levels)
+
+
+def test_put_get_tile_deduplicates_and_flips_rows(tmp_path):
+    """ Test that identical tiles are stored once and that rows are stored with the MBTiles (TMS) scheme. """
+    connection = tile_cache_util.open_tile_cache(str(tmp_path / "cache.mbtiles"))
+    tile_cache_util.put_tile(connection, 2, 1, 0, b"same")
+    tile_cache_util.put_tile(connection, 2, 2, 0, b"same")
+    assert tile_cache_util.get_tile(connection, 2, 1, 0) == b"same"
+    assert tile_cache_util.get_tile(connection, 2, 3, 3) is None
+    assert connection.execute("SELECT COUNT(*) FROM images").fetchone()[0] == 1
+    assert connection.execute("SELECT tile_row FROM tiles WHERE tile_column = 1").fetchone()[0] == 3
+    connection.close()
+
+
+def test_evict_tiles_lru_and_ttl(tmp_path):
+    """ Test that expired tiles and then the least recently used tiles are removed. """
+    connection = tile_cache_util.open_tile_cache(str(tmp_path / "cache.mbtiles"))
+    for column in range(3):
+        tile_cache_util.put_tile(connection, 2, column, 0, bytes([column]) * 100)
+    connection.execute("UPDATE map SET accessed = tile_column, fetched = ?", (time.time(),))
+    connection.execute("UPDATE map SET fetched = 0 WHERE tile_column = 2")
+    connection.commit()
+
+    # The expired tile is not returned and is removed.
+    assert tile_cache_util.get_tile(connection, 2, 2, 0, ttl=3600) is None
+    assert tile_cache_util.evict_tiles(connection, ttl=3600) == 1
+    # Access tile 0 so that tile 1 is the least recently used.
+    tile_cache_util.get_tile(connection, 2, 0, 0)
+    assert tile_cache_util.evict_tiles(connection, max_size=150) == 1
+    assert tile_cache_util.get_tile(connection, 2, 0, 0) is not None
+    assert tile_cache_util.get_tile(connection, 2, 1, 0) is None
+    connection.close()
+
+
+def test_seed_tile_cache(tmp_path, tile_server):
+    """ Test prefetching tiles from a local tile server and that cached tiles are not fetched again. """
+    cache_file = str(tmp_path / "cache.mbtiles")
+    counts = tile_cache_util.seed_tile_cache(cache_file, tile_server, [-180, -85, 180, 85], 0, 2, max_workers=4)
+    assert counts["Fetched"] == 1 + 4 + 16
+    assert len(TileRequestHandler.requests) == 21
+
+    counts = tile_cache_util.seed_tile_cache(cache_file, tile_server, [-180, -85, 180, 85], 0, 2, max_workers=4)
+    assert counts["Cached"] == 21 and counts["Fetched"] == 0
+    assert len(TileRequestHandler.requests) == 21
+
+    connection = tile_cache_util.open_tile_cache(cache_file)
+    assert tile_cache_util.get_tile(connection, 2, 3, 1) == b"/2/3/1"
+    assert connection.execute("SELECT value FROM metadata WHERE name = 'maxzoom'").fetchone()[0] == "2"
+    connection.close()
+
+
+def test_seed_tile_cache_bounds_and_access(tmp_path, tile_server):
+    """ Test that the bounds include previous seeds and that seeding does not change the access time. """
+    cache_file = str(tmp_path / "cache.mbtiles")
+    tile_cache_util.seed_tile_cache(cache_file, tile_server, [-105, 39, -104, 40], 0, 0)
+    connection = tile_cache_util.open_tile_cache(cache_file)
+    connection.execute("UPDATE map SET accessed = 1")
+    connection.commit()
+    connection.close()
+
+    counts = tile_cache_util.seed_tile_cache(cache_file, tile_server, [10, 45, 11, 46], 0, 0)
+    assert counts["Cached"] == 1
+    connection = tile_cache_util.open_tile_cache(cache_file)
+    bounds = connection.execute("SELECT value FROM metadata WHERE name = 'bounds'").fetchone()[0]
+    assert [float(value) for value in bounds.split(",")] == [-105, 39, 11, 46]
+    assert connection.execute("SELECT accessed FROM map").fetchone()[0] == 1
+    connection.close()
+
+
+def test_read_tile_missing(tmp_path, tile_server):
+    """ Test that a tile that is not available from the server is not cached. """
+    connection = tile_cache_util.open_tile_cache(str(tmp_path / "cache.mbtiles"))
+    session = tile_cache_util.create_tile_session(1)
+    assert tile_cache_util.read_tile(connection, session, tile_server, 9, 0, 0) is None
+    assert tile_cache_util.read_tile(connection, session, tile_server, 1, 0, 0) == b"/1/0/0"
+    assert tile_cache_util.read_tile(connection, session, tile_server, 1, 0, 0) == b"/1/0/0"
+    assert len(TileRequestHandler.requests) == 2
+    connection.close()